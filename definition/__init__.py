@@ -0,0 +1,53 @@
+"""
+Fillhead Definitions
+JSON definitions of the Fillhead telemetry and command protocol, the code generated from them and
+the host-side tools built on them.
+
+Submodules are imported on first attribute access, so "import definition" loads nothing else and a
+headless service only pays for what it uses. The protocol modules import no GUI code or NumPy:
+
+    telemetry_codec, telemetry_record   decode binary frames and text telemetry
+    command_table, command_client       encode commands and send them to a device
+    schema                              load the JSON definitions from the precompiled cache
+
+gui needs tkinter and the host application's src.theme; the logging, diagnostics and simulation
+modules need NumPy.
+
+Usage:
+    import definition
+    record = definition.telemetry_record.TelemetryRecord.from_message(text)
+"""
+import importlib
+
+_SUBMODULES = (
+    'benchmark',
+    'codegen',
+    'command_client',
+    'command_table',
+    'diagnostics',
+    'gui',
+    'injection_analytics',
+    'schema',
+    'schema_cache',
+    'sim_engine',
+    'sim_farm',
+    'sim_physics',
+    'sim_sweep',
+    'simulator',
+    'telemetry_codec',
+    'telemetry_ingest',
+    'telemetry_log',
+    'telemetry_record',
+)
+
+__all__ = list(_SUBMODULES)
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return importlib.import_module(f'.{name}', __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_SUBMODULES))
@@ -0,0 +1,627 @@
+"""
+Fillhead Benchmarks
+Measures the throughput of the host-side protocol stack, simulator and GUI against stored baselines.
+
+Every benchmark reports a rate (higher is better) and is compared with benchmark_baselines.json:
+a rate more than the tolerance below its baseline is measured once more, and if it is still low
+it is a regression and makes the run exit with status 1, as does a benchmark that reports a
+failure. Benchmarks whose requirements are missing are reported as skipped, not failed:
+
+    cpp_*   need a host C++ compiler (c++ or g++) to build command_parser.cpp and telemetry.cpp;
+            the harness also checks that a telemetry_build_message() message decodes back to
+            the values it was built from, and reports a failure if it does not
+    gui_*   need a display, or Xvfb on the PATH to start one, and the host application's
+            src.theme module that gui.py imports
+
+Baselines are only comparable on the machine they were recorded on; the run says so when they
+name a different machine. Record them again with --update-baselines on an otherwise idle host
+after changing machines, or when a change is meant to move a number.
+
+Usage:
+    python -m definition.benchmark
+    python -m definition.benchmark --only telemetry --duration 2
+    python -m definition.benchmark --update-baselines
+"""
+import argparse
+import contextlib
+import fnmatch
+import gc
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from .command_table import COMMAND_IDS, COMMAND_PARAMS
+from .telemetry_codec import (BATCH_MAX_SAMPLES, FIELD_NAMES, TelemetryDeltaEncoder, TelemetryStateDecoder,
+                              decode_batch, decode_frame, encode_batch, encode_frame)
+from .telemetry_record import TELEM_PREFIX, TelemetryRecord
+
+DEFINITION_DIR = Path(__file__).parent
+BASELINES_PATH = DEFINITION_DIR / 'benchmark_baselines.json'
+DEFAULT_DURATION = 1.0     # Seconds of measurement per benchmark, split across the repeats
+DEFAULT_REPEATS = 5        # The best repeat is reported, which filters out scheduler noise
+DEFAULT_TOLERANCE = 0.25   # Fraction below baseline that still passes
+DEVICE_COUNTS = (1, 10, 100)
+SAMPLE_COUNT = 64          # Distinct telemetry snapshots cycled through by the decode benchmarks
+TELEM_KEY_WIDTH = 25       # Key padding of the TELEM_KEY_* macros in telemetry.h
+
+# Sample argument for each commands.json parameter type
+_SAMPLE_ARGS = {'float': '1.5', 'int': '3', 'string': 'test'}
+
+
+class SkipBenchmark(Exception):
+    """Raised by a benchmark whose requirements are not available on this machine."""
+
+
+class BenchmarkFailure(Exception):
+    """Raised by a benchmark whose code under test produced wrong results."""
+
+
+BENCHMARKS = {}
+
+
+def benchmark(name, unit):
+    """
+    Register a benchmark function.
+
+    The function takes the measurement duration in seconds and returns a rate in unit, or raises
+    SkipBenchmark.
+    """
+    def register(function):
+        if name in BENCHMARKS:
+            raise ValueError(f"Duplicate benchmark '{name}'")
+        BENCHMARKS[name] = (function, unit)
+        return function
+    return register
+
+
+def measure(step, duration, ops_per_step=1, repeats=DEFAULT_REPEATS):
+    """
+    Call step() repeatedly and return the best rate over several repeats.
+
+    Args:
+        step: Callable performing ops_per_step operations
+        duration: Total seconds of measurement, split evenly across the repeats
+        ops_per_step: Operations performed by one call of step
+        repeats: Number of timed repeats
+
+    Returns:
+        Best observed rate in operations per second
+    """
+    window = duration / repeats
+    best = 0.0
+    # Like timeit, keep garbage collection from landing in one repeat and not another.
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeats):
+            calls = 0
+            batch = 1
+            start = time.perf_counter()
+            while True:
+                for _ in range(batch):
+                    step()
+                calls += batch
+                elapsed = time.perf_counter() - start
+                if elapsed >= window:
+                    break
+                # Grow the batch so the clock is read rarely once the step cost is known.
+                batch = min(batch * 2, 1024)
+            best = max(best, calls * ops_per_step / elapsed)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return best
+
+
+# --- Telemetry ---
+
+def telemetry_samples(count=SAMPLE_COUNT):
+    """
+    Returns count telemetry snapshots shaped like a device mid-injection.
+
+    Analog fields change in every snapshot and states change occasionally, so delta frames and
+    change detection see a realistic mix rather than all or nothing.
+    """
+    samples = []
+    for i in range(count):
+        record = TelemetryRecord(
+            main_state=1 if i % 16 < 12 else 0,
+            injector_state=3 if i % 16 < 12 else 0,
+            heater_state=1,
+            vacuum_state=4,
+            injector_torque=20.0 + (i % 7) * 1.5,
+            injector_homed=1,
+            injection_cumulative_ml=100.0 + i * 0.25,
+            injection_active_ml=i * 0.25,
+            injection_target_ml=50.0,
+            inj_valve_pos=10.0,
+            inj_valve_homed=True,
+            vac_valve_pos=0.0,
+            vac_valve_homed=True,
+            temp_c=68.0 + (i % 11) * 0.2,
+            vacuum_psig=-13.5 - (i % 5) * 0.05,
+        )
+        samples.append(record.as_dict())
+    return samples
+
+
+def telemetry_message(values):
+    """Returns the text telemetry message the firmware would send for a snapshot."""
+    items = []
+    for name in FIELD_NAMES:
+        value = values[name]
+        key = f"{name:<{TELEM_KEY_WIDTH}}"
+        items.append(f"{key}:{value:.2f}" if isinstance(value, float) else f"{key}:{int(value)}")
+    return TELEM_PREFIX + ','.join(items)
+
+
+@benchmark('telemetry_text_decode', 'msg/s')
+def _bench_telemetry_text_decode(duration):
+    messages = [telemetry_message(values) for values in telemetry_samples()]
+    record = TelemetryRecord()
+
+    def step():
+        for message in messages:
+            record.update_from_message(message)
+    return measure(step, duration, len(messages))
+
+
+@benchmark('telemetry_frame_decode', 'frame/s')
+def _bench_telemetry_frame_decode(duration):
+    frames = [encode_frame(values, sequence) for sequence, values in enumerate(telemetry_samples())]
+    record = TelemetryRecord()
+
+    def step():
+        for frame in frames:
+            record.update(decode_frame(frame)[1])
+    return measure(step, duration, len(frames))
+
+
+@benchmark('telemetry_delta_decode', 'frame/s')
+def _bench_telemetry_delta_decode(duration):
+    encoder = TelemetryDeltaEncoder()
+    frames = [encoder.encode(values) for values in telemetry_samples()]
+
+    # Each pass starts a new decoder, since replaying the stream would look like a sequence gap.
+    def step():
+        decoder = TelemetryStateDecoder()
+        for frame in frames:
+            decoder.feed(frame)
+    return measure(step, duration, len(frames))
+
+
+@benchmark('telemetry_batch_decode', 'sample/s')
+def _bench_telemetry_batch_decode(duration):
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        raise SkipBenchmark("NumPy is not installed")
+    samples = [(i * 10, values) for i, values in enumerate(telemetry_samples(BATCH_MAX_SAMPLES))]
+    frame = encode_batch(samples, 0)
+    return measure(lambda: decode_batch(frame), duration, len(samples))
+
+
+# --- Python command dispatch and simulation ---
+
+def sample_commands():
+    """Returns one command line per command in commands.json, with every parameter filled in."""
+    return [' '.join([name] + [_SAMPLE_ARGS[kind] for _, kind, _ in COMMAND_PARAMS.get(name, ())])
+            for name in COMMAND_IDS]
+
+
+class _NullSocket:
+    """Stands in for a device socket; replies are discarded."""
+
+    def sendto(self, data, address):
+        pass
+
+
+@benchmark('simulator_handle_command', 'cmd/s')
+def _bench_simulator_handle_command(duration):
+    from . import simulator
+    from .sim_engine import SimEngine
+    from .sim_farm import SimulatedFillhead
+    from .sim_physics import FillheadPhysics
+
+    engine = SimEngine(realtime=False)
+    device = SimulatedFillhead(0, 0, engine, FillheadPhysics(1))
+    device.sock = _NullSocket()
+    commands = [line.split() for line in sample_commands()]
+    address = ('127.0.0.1', 0)
+
+    # Homing and injection schedule events, so run them off each pass to keep the queue bounded.
+    def step():
+        for command, *args in commands:
+            simulator.handle_command(device, command, args, address)
+        engine.advance(engine.now + simulator.HOMING_DURATION)
+    return measure(step, duration, len(commands))
+
+
+def _bench_simulator_ticks(count, duration):
+    from . import simulator
+    from .sim_engine import SimEngine
+
+    class Device:
+        def __init__(self):
+            self.state = simulator.initial_state()
+            self.state.update(heater_state=1, vacuum_state=simulator.VACUUM_PULLDOWN)
+            self.sock = _NullSocket()
+
+        def set_state(self, key, value):
+            self.state[key] = value
+
+    engine = SimEngine(realtime=False)
+    for _ in range(count):
+        simulator.attach(Device(), engine)
+    return measure(lambda: engine.advance(engine.now + simulator.PHYSICS_PERIOD), duration)
+
+
+def _bench_farm_ticks(count, duration):
+    from . import simulator
+    from .sim_farm import SimulatorFarm
+
+    farm = SimulatorFarm(count)
+    for device in farm.devices:
+        device.sock = _NullSocket()
+        device.state.update(heater_state=1, vacuum_state=simulator.VACUUM_PULLDOWN)
+    engine = farm.engine
+    return measure(lambda: engine.advance(engine.now + simulator.PHYSICS_PERIOD), duration)
+
+
+for _count in DEVICE_COUNTS:
+    benchmark(f'simulator_ticks_{_count}', 'tick/s')(
+        lambda duration, count=_count: _bench_simulator_ticks(count, duration))
+for _count in DEVICE_COUNTS:
+    benchmark(f'farm_ticks_{_count}', 'tick/s')(
+        lambda duration, count=_count: _bench_farm_ticks(count, duration))
+
+
+# --- Host-compiled firmware code ---
+
+_CPP_HARNESS = r"""
+#include <chrono>
+#include <cstdio>
+#include <cstdlib>
+#include "command_parser.h"
+#include "telemetry.h"
+
+static const char* const COMMANDS[] = {
+%(commands)s
+};
+static const size_t COMMAND_COUNT = sizeof(COMMANDS) / sizeof(COMMANDS[0]);
+static volatile long g_sink;
+
+template <typename F>
+static double measure(F step, double seconds, int repeats) {
+	double best = 0.0;
+	for (int r = 0; r < repeats; r++) {
+		long ops = 0;
+		auto start = std::chrono::steady_clock::now();
+		double elapsed;
+		do {
+			for (int i = 0; i < 1000; i++) step();
+			ops += 1000;
+			elapsed = std::chrono::duration<double>(std::chrono::steady_clock::now() - start).count();
+		} while (elapsed < seconds / repeats);
+		if (ops / elapsed > best) best = ops / elapsed;
+	}
+	return best;
+}
+
+int main(int argc, char** argv) {
+	double seconds = argc > 1 ? atof(argv[1]) : 1.0;
+	int repeats = argc > 2 ? atoi(argv[2]) : 3;
+	size_t next = 0;
+	printf("cpp_command_dispatch %%f\n", measure([&] {
+		const char* line = COMMANDS[next++ %% COMMAND_COUNT];
+		Command cmd = parseCommand(line);
+		g_sink += dispatchCommand(cmd, getCommandParams(line, cmd));
+	}, seconds, repeats));
+
+	TelemetryData data;
+	telemetry_init(&data);
+	char message[1024];
+	uint8_t frame[1024];
+	uint32_t sequence = 0;
+%(snapshot)s
+	telemetry_build_message(&data, message, sizeof(message));
+	printf("message %%s\n", message);
+	printf("cpp_telemetry_message %%f\n", measure([&] {
+		data.temp_c = 68.0f + (sequence++ & 15) * 0.2f;
+		g_sink += telemetry_build_message(&data, message, sizeof(message));
+	}, seconds, repeats));
+	printf("cpp_telemetry_frame %%f\n", measure([&] {
+		data.temp_c = 68.0f + (sequence & 15) * 0.2f;
+		g_sink += telemetry_build_frame(&data, sequence++, frame, sizeof(frame));
+	}, seconds, repeats));
+	return 0;
+}
+"""
+
+_cpp_results = {}
+
+
+def _c_literal(value):
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, float):
+        return f"{value!r}f"
+    return str(value)
+
+
+def check_telemetry_roundtrip(message, expected):
+    """
+    Check that a text telemetry message built by the firmware's telemetry_build_message() decodes
+    to the values it was built from.
+
+    Raises:
+        ValueError: If a field is missing or decodes to a different value
+    """
+    record = TelemetryRecord.from_message(message)
+    mismatched = [f"{name}: sent {value!r}, decoded {getattr(record, name)!r}"
+                  for name, value in expected.items() if abs(getattr(record, name) - value) > 0.006]
+    if mismatched:
+        raise ValueError("C telemetry message does not round-trip: " + '; '.join(mismatched))
+
+
+def _run_cpp_harness(duration):
+    """
+    Build the C++ harness once per process, run it and return its rates by benchmark name.
+
+    A failure is remembered too, so every cpp_* benchmark reports it without rebuilding the harness.
+    """
+    if duration not in _cpp_results:
+        _cpp_results[duration] = _build_and_run_cpp_harness(duration)
+    rates = _cpp_results[duration]
+    if isinstance(rates, BenchmarkFailure):
+        raise rates
+    return rates
+
+
+def _build_and_run_cpp_harness(duration):
+    """Returns the C++ harness's rates by benchmark name, or a BenchmarkFailure if its output is wrong."""
+    compiler = os.environ.get('CXX') or shutil.which('c++') or shutil.which('g++')
+    if not compiler:
+        raise SkipBenchmark("no C++ compiler found (set CXX)")
+
+    commands = ',\n'.join('\t' + json.dumps(line) for line in sample_commands())
+    expected = telemetry_samples(1)[0]
+    snapshot = '\n'.join(f"\tdata.{name} = {_c_literal(value)};" for name, value in expected.items())
+    with tempfile.TemporaryDirectory(prefix='fillhead_bench_') as build_dir:
+        source = Path(build_dir) / 'harness.cpp'
+        binary = Path(build_dir) / 'harness'
+        source.write_text(_CPP_HARNESS % {'commands': commands, 'snapshot': snapshot})
+        build = [compiler, '-O2', '-std=c++11', '-I', str(DEFINITION_DIR),
+                 str(source), str(DEFINITION_DIR / 'command_parser.cpp'), str(DEFINITION_DIR / 'telemetry.cpp'),
+                 '-o', str(binary)]
+        result = subprocess.run(build, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise SkipBenchmark(f"C++ harness failed to build: {result.stderr.strip().splitlines()[-1:]}")
+        run = subprocess.run([str(binary), str(duration), str(DEFAULT_REPEATS)], capture_output=True, text=True)
+
+    if run.returncode != 0:
+        return BenchmarkFailure(f"C++ harness exited with status {run.returncode}")
+    rates = {}
+    for line in run.stdout.splitlines():
+        name, _, value = line.partition(' ')
+        if name == 'message':
+            try:
+                check_telemetry_roundtrip(value, expected)
+            except ValueError as exc:
+                return BenchmarkFailure(str(exc))
+        else:
+            rates[name] = float(value)
+    return rates
+
+
+for _name, _unit in (('cpp_command_dispatch', 'cmd/s'),
+                     ('cpp_telemetry_message', 'msg/s'),
+                     ('cpp_telemetry_frame', 'frame/s')):
+    benchmark(_name, _unit)(lambda duration, name=_name: _run_cpp_harness(duration)[name])
+
+
+# --- GUI ---
+
+@contextlib.contextmanager
+def _display():
+    """Use the current display, or start a private Xvfb server for the duration of the block."""
+    if os.environ.get('DISPLAY'):
+        yield
+        return
+    xvfb = shutil.which('Xvfb')
+    if xvfb is None:
+        raise SkipBenchmark("no DISPLAY and Xvfb is not installed")
+    read_fd, write_fd = os.pipe()
+    server = subprocess.Popen([xvfb, '-displayfd', str(write_fd), '-nolisten', 'tcp'],
+                              pass_fds=(write_fd,), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    os.close(write_fd)
+    try:
+        with os.fdopen(read_fd) as pipe:
+            number = pipe.readline().strip()
+        if not number:
+            raise SkipBenchmark("Xvfb failed to start")
+        os.environ['DISPLAY'] = f':{number}'
+        yield
+    finally:
+        os.environ.pop('DISPLAY', None)
+        server.terminate()
+        server.wait()
+
+
+@benchmark('gui_telemetry_update', 'update/s')
+def _bench_gui_telemetry_update(duration):
+    with _display():
+        try:
+            import tkinter as tk
+            from . import gui
+        except ImportError as exc:
+            raise SkipBenchmark(f"gui.py cannot be imported: {exc}")
+
+        try:
+            root = tk.Tk()
+        except tk.TclError as exc:
+            raise SkipBenchmark(f"cannot open display: {exc}")
+        root.withdraw()
+        try:
+            refs = {}
+            gui.create_gui_components(tk.Frame(root), refs)
+            updater = refs['fillhead_update_batcher']
+            messages = [telemetry_message(values) for values in telemetry_samples()]
+            record = TelemetryRecord()
+
+            # One update is what the panel does per received message at frame rate: decode,
+            # queue the changed fields, run the tracers and let Tk process the redraws.
+            def step():
+                for message in messages:
+                    gui.apply_telemetry_record(refs, record, record.update_from_message(message))
+                    updater.flush()
+                    root.update_idletasks()
+            return measure(step, duration, len(messages))
+        finally:
+            root.destroy()
+
+
+# --- Baselines ---
+
+def load_baselines(path=BASELINES_PATH):
+    """Returns the stored baselines, or an empty set if none have been recorded."""
+    path = Path(path)
+    if not path.exists():
+        return {'tolerance': DEFAULT_TOLERANCE, 'benchmarks': {}}
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def machine_description():
+    """Returns the host name, architecture and Python version that baselines are recorded with."""
+    return f"{platform.node()} {platform.machine()} Python {platform.python_version()}"
+
+
+def save_baselines(results, path=BASELINES_PATH, tolerance=DEFAULT_TOLERANCE):
+    """Record the rates of every benchmark that ran as the new baselines, keeping the rest."""
+    baselines = load_baselines(path)
+    baselines['tolerance'] = tolerance
+    baselines['machine'] = machine_description()
+    for name, result in results.items():
+        if result['rate'] is not None:
+            baselines['benchmarks'][name] = {'rate': round(result['rate'], 1), 'unit': result['unit']}
+    baselines['benchmarks'] = dict(sorted(baselines['benchmarks'].items()))
+    with open(path, 'w') as f:
+        json.dump(baselines, f, indent=4)
+        f.write('\n')
+
+
+def run_benchmarks(pattern='*', duration=DEFAULT_DURATION, baselines=None, tolerance=None):
+    """
+    Run every benchmark whose name matches pattern and compare it with its baseline.
+
+    Args:
+        pattern: fnmatch pattern; a bare word matches any name containing it
+        duration: Seconds of measurement per benchmark
+        baselines: Baselines as returned by load_baselines(); None loads the stored ones
+        tolerance: Allowed fraction below baseline; None uses the baselines' own tolerance
+
+    Returns:
+        Dict of benchmark name to {"rate", "unit", "baseline", "status", "detail"}, where status
+        is "ok", "regression", "new" (no baseline), "failed" or "skipped"
+    """
+    if baselines is None:
+        baselines = load_baselines()
+    if tolerance is None:
+        tolerance = baselines.get('tolerance', DEFAULT_TOLERANCE)
+    if not any(c in pattern for c in '*?['):
+        pattern = f'*{pattern}*'
+
+    results = {}
+    for name, (function, unit) in BENCHMARKS.items():
+        if not fnmatch.fnmatch(name, pattern):
+            continue
+        baseline = baselines['benchmarks'].get(name, {}).get('rate')
+        result = {'rate': None, 'unit': unit, 'baseline': baseline, 'status': 'skipped', 'detail': ''}
+        try:
+            result['rate'] = function(duration)
+            if baseline is not None and result['rate'] < baseline * (1.0 - tolerance):
+                # Measure a low rate again, so a burst of load from elsewhere on the host is not a regression.
+                _cpp_results.clear()
+                result['rate'] = max(result['rate'], function(duration))
+        except SkipBenchmark as exc:
+            result['detail'] = str(exc)
+        except BenchmarkFailure as exc:
+            result['status'] = 'failed'
+            result['detail'] = str(exc)
+        else:
+            if baseline is None:
+                result['status'] = 'new'
+            elif result['rate'] < baseline * (1.0 - tolerance):
+                result['status'] = 'regression'
+            else:
+                result['status'] = 'ok'
+        results[name] = result
+    return results
+
+
+def format_results(results):
+    """Returns the results as a table."""
+    lines = [f"{'benchmark':<28} {'rate':>14} {'unit':<9} {'baseline':>14} {'change':>8}  status"]
+    for name, result in results.items():
+        rate, baseline = result['rate'], result['baseline']
+        rate_text = f"{rate:,.0f}" if rate is not None else '-'
+        baseline_text = f"{baseline:,.0f}" if baseline is not None else '-'
+        change = f"{(rate / baseline - 1.0) * 100:+.1f}%" if rate is not None and baseline else ''
+        status = result['status'] + (f" ({result['detail']})" if result['detail'] else '')
+        lines.append(f"{name:<28} {rate_text:>14} {result['unit']:<9} {baseline_text:>14} {change:>8}  {status}")
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the host-side protocol stack, simulator and GUI.")
+    parser.add_argument('--only', default='*', help="run only benchmarks matching this pattern")
+    parser.add_argument('--duration', type=float, default=DEFAULT_DURATION,
+                        help="seconds of measurement per benchmark")
+    parser.add_argument('--tolerance', type=float, default=None,
+                        help=f"allowed fraction below baseline (stored value, or {DEFAULT_TOLERANCE})")
+    parser.add_argument('--baselines', default=str(BASELINES_PATH), help="baselines file")
+    parser.add_argument('--update-baselines', action='store_true',
+                        help="store this run's rates as the new baselines")
+    parser.add_argument('--json', metavar='PATH', help="also write the results as JSON")
+    parser.add_argument('--list', action='store_true', help="list the benchmarks and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, (_, unit) in BENCHMARKS.items():
+            print(f"{name:<28} {unit}")
+        return 0
+
+    baselines = load_baselines(args.baselines)
+    results = run_benchmarks(args.only, args.duration, baselines, args.tolerance)
+    print(format_results(results))
+    recorded_on = baselines.get('machine')
+    if recorded_on and recorded_on != machine_description():
+        print(f"\nBaselines were recorded on {recorded_on}, not on this machine ({machine_description()})")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=4)
+    if args.update_baselines:
+        tolerance = args.tolerance if args.tolerance is not None else baselines.get('tolerance', DEFAULT_TOLERANCE)
+        save_baselines(results, args.baselines, tolerance)
+        print(f"\nBaselines written to {args.baselines}")
+        return 0
+
+    regressions = [name for name, result in results.items() if result['status'] == 'regression']
+    failures = [name for name, result in results.items() if result['status'] == 'failed']
+    if regressions:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+    if failures:
+        print(f"\n{len(failures)} failure(s): {', '.join(failures)}")
+    return 1 if regressions or failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,2319 @@
+"""
+Fillhead Code Generator
+Generates the firmware telemetry and command sources and the matching host-side Python
+modules from the JSON definitions.
+
+Only files whose inputs changed are regenerated, and only files whose content changed are
+rewritten; see generate_all().
+
+Usage:
+    python -m definition.codegen            # regenerate what is out of date
+    python -m definition.codegen --check    # list out-of-date files, exit 1 if any
+"""
+import argparse
+import ast
+import json
+import os
+import pprint
+import struct
+import sys
+
+from .schema import source_crc
+
+DEFINITION_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Binary frame constants shared by the C++ and Python outputs.
+FRAME_MAGIC = 0xF17E        # Little-endian bytes 0x7E 0xF1; never the start of an ASCII message
+FRAME_VERSION = 1
+FRAME_TYPE_FULL = 0
+FRAME_TYPE_DELTA = 1
+FRAME_TYPE_BATCH = 2
+FRAME_HEADER_FORMAT = 'HBBII'  # magic, version, frame_type, schema_hash, sequence
+DEFAULT_KEYFRAME_INTERVAL = 50  # Delta frames between keyframes (5 s at the default telemetry rate)
+BATCH_HEADER_FORMAT = 'HH'     # sample_count, dropped_samples (follows the frame header)
+BATCH_CAPACITY = 64            # Samples held by the firmware ring buffer between batch frames
+MAX_DATAGRAM_SIZE = 1024       # MAX_PACKET_LENGTH in inc/config.h
+MESSAGE_SEPARATOR = b'\n'      # TX_MESSAGE_SEPARATOR in inc/config.h
+TELEM_KEY_WIDTH = 25           # Telemetry keys are padded to this width in the TELEM_KEY_* macros
+CORRELATION_PREFIX = '#'       # Leads the correlation ID appended to a command and echoed in its replies
+
+# Host command client defaults
+DEFAULT_COMMAND_PORT = 8888        # LOCAL_PORT in inc/config.h
+DEFAULT_REPLY_TIMEOUT = 0.5        # Seconds without any tagged reply before a command is resent
+DEFAULT_COMMAND_RETRIES = 3
+DEFAULT_COMPLETION_TIMEOUT = 60.0  # Seconds from the first reply to the terminal reply
+DEFAULT_MAX_IN_FLIGHT = 16         # Half of RX_QUEUE_SIZE in inc/config.h
+
+# Telemetry type mappings for the TelemetryData struct, the packed frame and the Python struct format.
+C_TYPES = {
+    'int': 'int32_t',
+    'float': 'float',
+    'bool': 'bool',
+}
+FRAME_C_TYPES = {
+    'int': 'int32_t',
+    'float': 'float',
+    'bool': 'uint8_t',
+}
+STRUCT_CHARS = {
+    'int': 'i',
+    'float': 'f',
+    'bool': 'B',
+}
+NUMPY_DTYPES = {
+    'int': '<i4',
+    'float': '<f4',
+    'bool': 'u1',
+}
+
+
+def load_definition(name):
+    """
+    Load one of the JSON definition files from this directory.
+
+    Args:
+        name: File name, e.g. "telemetry.json"
+
+    Returns:
+        The parsed JSON content
+    """
+    with open(os.path.join(DEFINITION_DIR, name), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def fnv1a_32(data, seed=0x811C9DC5):
+    """Computes the 32-bit FNV-1a hash of a byte string."""
+    h = seed
+    for byte in data:
+        h ^= byte
+        h = (h * 0x01000193) & 0xFFFFFFFF
+    return h
+
+
+def telemetry_schema_hash(telemetry):
+    """
+    Hash the wire-relevant part of the telemetry schema (field order, names, types and
+    batch membership).
+
+    Help text, units and enum maps do not change the frame layout and are excluded,
+    so editing them does not invalidate frames from older firmware.
+    """
+    canonical = ';'.join(f"{name}:{spec['type']}{'+batch' if spec.get('batch') else ''}"
+                         for name, spec in telemetry.items())
+    return fnv1a_32(canonical.encode('ascii'))
+
+
+def frame_struct_format(telemetry):
+    """Returns the little-endian struct format string for a full binary telemetry frame."""
+    return '<' + FRAME_HEADER_FORMAT + ''.join(STRUCT_CHARS[spec['type']] for spec in telemetry.values())
+
+
+def batch_fields(telemetry):
+    """Returns the names of the telemetry fields marked "batch" (sampled at sensor rate into batch frames)."""
+    return [name for name, spec in telemetry.items() if spec.get('batch')]
+
+
+def batch_sample_format(telemetry):
+    """Returns the struct format (without byte order) of one batch sample: a uint32 timestamp then the batched fields."""
+    return 'I' + ''.join(STRUCT_CHARS[telemetry[name]['type']] for name in batch_fields(telemetry))
+
+
+def batch_max_samples(telemetry):
+    """Returns the number of samples that fit in one batch frame without exceeding MAX_DATAGRAM_SIZE."""
+    header_size = struct.calcsize('<' + FRAME_HEADER_FORMAT + BATCH_HEADER_FORMAT)
+    return (MAX_DATAGRAM_SIZE - header_size) // struct.calcsize('<' + batch_sample_format(telemetry))
+
+
+def delta_mask_words(telemetry):
+    """Returns the number of 32-bit words needed for one changed-field bit per telemetry field."""
+    return (len(telemetry) + 31) // 32
+
+
+def _c_default(spec):
+    if spec['type'] == 'float':
+        return f"{float(spec.get('default', 0.0))}f"
+    if spec['type'] == 'bool':
+        return 'true' if spec.get('default', 0) else 'false'
+    return str(int(spec.get('default', 0)))
+
+
+def _printf_spec(spec):
+    if spec['type'] == 'float':
+        return f"%.{spec.get('precision', 2)}f"
+    return '%d'
+
+
+def _key_macro(name):
+    return f"TELEM_KEY_{name.upper()}"
+
+
+#==================================================================================================
+# telemetry.h
+#==================================================================================================
+
+def generate_telemetry_header(telemetry, stamp):
+    """Generate the contents of telemetry.h."""
+    lines = [
+        '/**',
+        ' * @file telemetry.h',
+        ' * @brief Telemetry structure and construction interface for the Fillhead controller.',
+        ' * @details AUTO-GENERATED FILE - DO NOT EDIT MANUALLY',
+        f' * Generated from telemetry.json (source CRC-32 {stamp})',
+        ' * ',
+        ' * This header defines the complete telemetry data structure for the Fillhead.',
+        ' * All telemetry fields are assembled in one centralized location.',
+        ' * To modify telemetry fields, edit telemetry.json and regenerate this file.',
+        ' */',
+        '#pragma once',
+        '',
+        '#include <stdint.h>',
+        '#include <stdbool.h>',
+        '#include <stddef.h>',
+        '',
+        '//==================================================================================================',
+        '// Telemetry Field Keys',
+        '//==================================================================================================',
+        '',
+        '/**',
+        ' * @name Telemetry Field Identifiers',
+        ' * @brief String keys used in telemetry messages.',
+        ' * Format: "FILLHEAD_TELEM: field1:value1,field2:value2,..."',
+        ' * @{',
+        ' */',
+    ]
+    for name, spec in telemetry.items():
+        lines.append(f'#define {_key_macro(name):<40} "{name:<{TELEM_KEY_WIDTH}}"  ///< {spec.get("help", "")}')
+    lines += [
+        '/** @} */',
+        '',
+        '//==================================================================================================',
+        '// Telemetry Data Structure',
+        '//==================================================================================================',
+        '',
+        '/**',
+        ' * @struct TelemetryData',
+        ' * @brief Complete telemetry state for the Fillhead device.',
+        ' * @details This structure contains all telemetry values that are transmitted to the host.',
+        ' */',
+        'typedef struct {',
+    ]
+    for name, spec in telemetry.items():
+        lines.append(f'    {C_TYPES[spec["type"]]:<12} {name:<30}; ///< {spec.get("help", "")}')
+    lines += [
+        '} TelemetryData;',
+        '',
+        '//==================================================================================================',
+        '// Binary Telemetry Frame',
+        '//==================================================================================================',
+        '',
+        '/**',
+        ' * @name Binary Frame Constants',
+        ' * @brief Header values identifying a packed binary telemetry frame.',
+        ' * @details The frame is a fixed, little-endian layout of every field in telemetry.json.',
+        ' * The host rejects frames whose schema hash does not match its own copy of telemetry.json.',
+        ' * @{',
+        ' */',
+        f'#define {"TELEM_FRAME_MAGIC":<40} {f"0x{FRAME_MAGIC:04X}":<14} ///< Leading frame marker. Its first byte is never printable ASCII.',
+        f'#define {"TELEM_FRAME_VERSION":<40} {FRAME_VERSION:<14} ///< Version of the frame header layout.',
+        f'#define {"TELEM_SCHEMA_HASH":<40} {f"0x{telemetry_schema_hash(telemetry):08X}u":<14} ///< FNV-1a hash of the telemetry field names, types and batch membership.',
+        f'#define {"TELEM_FRAME_TYPE_FULL":<40} {FRAME_TYPE_FULL:<14} ///< Frame carries every telemetry field (keyframe).',
+        f'#define {"TELEM_FRAME_TYPE_DELTA":<40} {FRAME_TYPE_DELTA:<14} ///< Frame carries only the fields that changed since the previous frame.',
+        f'#define {"TELEM_DELTA_MASK_WORDS":<40} {delta_mask_words(telemetry):<14} ///< Number of 32-bit changed-field mask words in a delta frame.',
+        f'#define {"TELEM_DEFAULT_KEYFRAME_INTERVAL":<40} {DEFAULT_KEYFRAME_INTERVAL:<14} ///< Default number of delta frames between keyframes.',
+        f'#define {"TELEM_FRAME_TYPE_BATCH":<40} {FRAME_TYPE_BATCH:<14} ///< Frame carries a block of timestamped samples of the batched fields.',
+        f'#define {"TELEM_BATCH_CAPACITY":<40} {BATCH_CAPACITY:<14} ///< Samples held by a TelemetryBatchBuffer before the oldest is overwritten.',
+        f'#define {"TELEM_BATCH_MAX_SAMPLES":<40} {batch_max_samples(telemetry):<14} ///< Most samples that fit in one {MAX_DATAGRAM_SIZE}-byte batch frame.',
+        '/** @} */',
+        '',
+        '/**',
+        ' * @struct TelemetryFrameHeader',
+        ' * @brief Header prepended to every binary telemetry frame.',
+        ' */',
+        'typedef struct __attribute__((packed)) {',
+        f'    {"uint16_t":<12} {"magic":<30}; ///< Always TELEM_FRAME_MAGIC',
+        f'    {"uint8_t":<12} {"version":<30}; ///< Always TELEM_FRAME_VERSION',
+        f'    {"uint8_t":<12} {"frame_type":<30}; ///< One of the TELEM_FRAME_TYPE_* values',
+        f'    {"uint32_t":<12} {"schema_hash":<30}; ///< Always TELEM_SCHEMA_HASH',
+        f'    {"uint32_t":<12} {"sequence":<30}; ///< Incremented by the sender for every frame',
+        '} TelemetryFrameHeader;',
+        '',
+        '/**',
+        ' * @struct TelemetryFrame',
+        ' * @brief Packed on-the-wire image of TelemetryData.',
+        ' */',
+        'typedef struct __attribute__((packed)) {',
+        f'    TelemetryFrameHeader {"header":<22}; ///< Frame header',
+    ]
+    for name, spec in telemetry.items():
+        lines.append(f'    {FRAME_C_TYPES[spec["type"]]:<12} {name:<30}; ///< {spec.get("help", "")}')
+    lines += [
+        '} TelemetryFrame;',
+        '',
+        '/**',
+        ' * @name Delta Frame Layout',
+        ' * @brief A delta frame is a TelemetryFrameHeader, TELEM_DELTA_MASK_WORDS changed-field mask words',
+        ' * (bit N set means the Nth field of telemetry.json follows), then the changed fields packed in',
+        ' * schema order with the same types as TelemetryFrame.',
+        ' * @{',
+        ' */',
+        f'#define {"TELEM_DELTA_FRAME_MAX_SIZE":<40} {"(sizeof(TelemetryFrame) + TELEM_DELTA_MASK_WORDS * sizeof(uint32_t))":<14} ///< Largest possible delta frame.',
+        '/** @} */',
+        '',
+        '/**',
+        ' * @struct TelemetryDeltaState',
+        ' * @brief Sender-side state for delta telemetry.',
+        ' * @details Holds the snapshot the host last received so that only changed fields are sent.',
+        ' */',
+        'typedef struct {',
+        f'    {"TelemetryData":<12} {"last":<30}; ///< Snapshot described by the most recent frame',
+        f'    {"uint32_t":<12} {"frames_since_keyframe":<30}; ///< Delta frames sent since the last keyframe',
+        f'    {"uint32_t":<12} {"keyframe_interval":<30}; ///< Delta frames between forced keyframes',
+        f'    {"bool":<12} {"keyframe_pending":<30}; ///< Send a keyframe next, regardless of the interval',
+        '} TelemetryDeltaState;',
+        '',
+        '/**',
+        ' * @struct TelemetrySample',
+        ' * @brief One timestamped sample of the telemetry fields marked "batch" in telemetry.json.',
+        ' */',
+        'typedef struct __attribute__((packed)) {',
+        f'    {"uint32_t":<12} {"timestamp_ms":<30}; ///< Milliseconds since boot when the sample was taken',
+    ]
+    for name in batch_fields(telemetry):
+        spec = telemetry[name]
+        lines.append(f'    {FRAME_C_TYPES[spec["type"]]:<12} {name:<30}; ///< {spec.get("help", "")}')
+    lines += [
+        '} TelemetrySample;',
+        '',
+        '/**',
+        ' * @struct TelemetryBatchHeader',
+        ' * @brief Header of a batch frame, followed by sample_count TelemetrySample records, oldest first.',
+        ' */',
+        'typedef struct __attribute__((packed)) {',
+        f'    TelemetryFrameHeader {"header":<22}; ///< Frame header',
+        f'    {"uint16_t":<12} {"sample_count":<30}; ///< Number of samples in this frame',
+        f'    {"uint16_t":<12} {"dropped_samples":<30}; ///< Samples overwritten in the ring buffer since the previous batch frame',
+        '} TelemetryBatchHeader;',
+        '',
+        '/**',
+        ' * @struct TelemetryBatchBuffer',
+        ' * @brief Ring buffer of samples waiting to be sent in batch frames.',
+        ' * @details When full, the oldest sample is overwritten and counted in dropped.',
+        ' */',
+        'typedef struct {',
+        f'    {"TelemetrySample":<12} {"samples[TELEM_BATCH_CAPACITY]":<30}; ///< Sample storage',
+        f'    {"uint16_t":<12} {"head":<30}; ///< Index of the oldest queued sample',
+        f'    {"uint16_t":<12} {"count":<30}; ///< Number of queued samples',
+        f'    {"uint32_t":<12} {"dropped":<30}; ///< Samples overwritten since the last batch frame',
+        '} TelemetryBatchBuffer;',
+        '',
+        '//==================================================================================================',
+        '// Telemetry Construction Functions',
+        '//==================================================================================================',
+        '',
+        '/**',
+        ' * @brief Initialize telemetry data structure with default values.',
+        ' * @param data Pointer to TelemetryData structure to initialize',
+        ' */',
+        'void telemetry_init(TelemetryData* data);',
+        '',
+        '/**',
+        ' * @brief Build complete telemetry message string from data structure.',
+        ' * @param data Pointer to TelemetryData structure containing current values',
+        ' * @param buffer Output buffer to write telemetry message',
+        ' * @param buffer_size Size of output buffer',
+        ' * @return Number of characters written (excluding null terminator)',
+        ' * ',
+        ' * @details Constructs a message in the format: "FILLHEAD_TELEM: field1:value1,field2:value2,..."',
+        ' */',
+        'int telemetry_build_message(const TelemetryData* data, char* buffer, size_t buffer_size);',
+        '',
+        '/**',
+        ' * @brief Build a packed binary telemetry frame from data structure.',
+        ' * @param data Pointer to TelemetryData structure containing current values',
+        ' * @param sequence Frame sequence number, incremented by the caller for every frame sent',
+        ' * @param buffer Output buffer to write the frame into',
+        ' * @param buffer_size Size of output buffer',
+        ' * @return Number of bytes written, or 0 if the buffer is too small',
+        ' * ',
+        ' * @details The frame contains zero bytes, so it must be sent with an explicit length',
+        ' * rather than as a null-terminated string.',
+        ' */',
+        'int telemetry_build_frame(const TelemetryData* data, uint32_t sequence, uint8_t* buffer, size_t buffer_size);',
+        '',
+        '/**',
+        ' * @brief Initialize delta telemetry state.',
+        ' * @param state Pointer to TelemetryDeltaState structure to initialize',
+        ' * @param keyframe_interval Delta frames between keyframes (0 selects TELEM_DEFAULT_KEYFRAME_INTERVAL)',
+        ' * ',
+        ' * @details The first frame built after initialization is always a keyframe.',
+        ' */',
+        'void telemetry_delta_init(TelemetryDeltaState* state, uint32_t keyframe_interval);',
+        '',
+        '/**',
+        ' * @brief Force the next delta frame to be a keyframe.',
+        ' * @param state Pointer to TelemetryDeltaState structure',
+        ' * ',
+        ' * @details Call this when the host sends request_keyframe after a sequence gap, or when a new host',
+        ' * is discovered.',
+        ' */',
+        'void telemetry_delta_request_keyframe(TelemetryDeltaState* state);',
+        '',
+        '/**',
+        ' * @brief Build the next frame of a delta telemetry stream.',
+        ' * @param state Pointer to TelemetryDeltaState structure, updated with the values sent',
+        ' * @param data Pointer to TelemetryData structure containing current values',
+        ' * @param sequence Frame sequence number, incremented by the caller for every frame sent',
+        ' * @param buffer Output buffer to write the frame into',
+        ' * @param buffer_size Size of output buffer (at least TELEM_DELTA_FRAME_MAX_SIZE)',
+        ' * @return Number of bytes written, or 0 if the buffer is too small',
+        ' * ',
+        ' * @details Emits a full frame when a keyframe is due, otherwise a delta frame containing only',
+        ' * the fields that differ from the previous frame. A delta frame with no changed fields is',
+        ' * still sent so the host can detect gaps from the sequence number.',
+        ' */',
+        'int telemetry_build_delta_frame(TelemetryDeltaState* state, const TelemetryData* data, uint32_t sequence, uint8_t* buffer, size_t buffer_size);',
+        '',
+        '/**',
+        ' * @brief Initialize a batch ring buffer.',
+        ' * @param batch Pointer to TelemetryBatchBuffer structure to initialize',
+        ' */',
+        'void telemetry_batch_init(TelemetryBatchBuffer* batch);',
+        '',
+        '/**',
+        ' * @brief Queue one sample of the batched fields.',
+        ' * @param batch Pointer to TelemetryBatchBuffer structure',
+        ' * @param data Pointer to TelemetryData structure containing current values',
+        ' * @param timestamp_ms Time the values were sampled, in milliseconds',
+        ' * ',
+        ' * @details Call this at sensor sample rate. If the buffer is full, the oldest sample is overwritten.',
+        ' */',
+        'void telemetry_batch_push(TelemetryBatchBuffer* batch, const TelemetryData* data, uint32_t timestamp_ms);',
+        '',
+        '/**',
+        ' * @brief Move the oldest queued samples into a batch frame.',
+        ' * @param batch Pointer to TelemetryBatchBuffer structure; sent samples are removed',
+        ' * @param sequence Frame sequence number of the batch stream, incremented by the caller for every batch frame sent',
+        ' * @param buffer Output buffer to write the frame into',
+        ' * @param buffer_size Size of output buffer',
+        ' * @return Number of bytes written, or 0 if no samples are queued or the buffer cannot hold one sample',
+        ' * ',
+        ' * @details At most TELEM_BATCH_MAX_SAMPLES samples are sent per frame. Call repeatedly until it returns',
+        ' * 0 to drain the buffer. Batch frames use their own sequence counter, separate from full and delta frames.',
+        ' */',
+        'int telemetry_batch_build_frame(TelemetryBatchBuffer* batch, uint32_t sequence, uint8_t* buffer, size_t buffer_size);',
+        '',
+        '/**',
+        ' * @brief Send telemetry message via Serial.',
+        ' * @param data Pointer to TelemetryData structure containing current values',
+        ' * ',
+        ' * @details Builds and transmits the complete telemetry message. Only available when',
+        ' * sendMessage is defined as a macro before telemetry.cpp is compiled.',
+        ' */',
+        'void telemetry_send(const TelemetryData* data);',
+    ]
+    return '\n'.join(lines)
+
+
+#==================================================================================================
+# telemetry.cpp
+#==================================================================================================
+
+def generate_telemetry_source(telemetry, stamp):
+    """Generate the contents of telemetry.cpp."""
+    lines = [
+        '/**',
+        ' * @file telemetry.cpp',
+        ' * @brief Telemetry construction implementation for the Fillhead controller.',
+        ' * @details AUTO-GENERATED FILE - DO NOT EDIT MANUALLY',
+        f' * Generated from telemetry.json (source CRC-32 {stamp})',
+        ' */',
+        '',
+        '#include "telemetry.h"',
+        '#include <stdio.h>',
+        '#include <string.h>',
+        '// #include "ClearCore.h"  // Include if using ClearCore hardware',
+        '',
+        '#define TELEM_PREFIX "FILLHEAD_TELEM: "',
+        '',
+        '//==================================================================================================',
+        '// Telemetry Initialization',
+        '//==================================================================================================',
+        '',
+        'void telemetry_init(TelemetryData* data) {',
+        '    if (data == NULL) return;',
+        '    ',
+    ]
+    for name, spec in telemetry.items():
+        lines.append(f'    data->{name} = {_c_default(spec)};')
+    lines += [
+        '}',
+        '',
+        '//==================================================================================================',
+        '// Telemetry Message Construction',
+        '//==================================================================================================',
+        '',
+        'int telemetry_build_message(const TelemetryData* data, char* buffer, size_t buffer_size) {',
+        '    if (data == NULL || buffer == NULL || buffer_size == 0) return 0;',
+        '    ',
+        '    int pos = 0;',
+        '    ',
+        '    // Write prefix',
+        '    pos += snprintf(buffer + pos, buffer_size - pos, "%s", TELEM_PREFIX);',
+        '    ',
+    ]
+    names = list(telemetry)
+    for name, spec in telemetry.items():
+        separator = ',' if name != names[-1] else ''
+        value = f'data->{name} ? 1 : 0' if spec['type'] == 'bool' else f'data->{name}'
+        lines += [
+            f'    // {name}',
+            '    if (pos < buffer_size) {',
+            f'        pos += snprintf(buffer + pos, buffer_size - pos, "%s:{_printf_spec(spec)}{separator}", {_key_macro(name)}, {value});',
+            '    }',
+            '    ',
+        ]
+    lines += [
+        '    return pos;',
+        '}',
+        '',
+        '//==================================================================================================',
+        '// Binary Frame Construction',
+        '//==================================================================================================',
+        '',
+        'int telemetry_build_frame(const TelemetryData* data, uint32_t sequence, uint8_t* buffer, size_t buffer_size) {',
+        '    if (data == NULL || buffer == NULL || buffer_size < sizeof(TelemetryFrame)) return 0;',
+        '    ',
+        '    TelemetryFrame frame;',
+        '    frame.header.magic = TELEM_FRAME_MAGIC;',
+        '    frame.header.version = TELEM_FRAME_VERSION;',
+        '    frame.header.frame_type = TELEM_FRAME_TYPE_FULL;',
+        '    frame.header.schema_hash = TELEM_SCHEMA_HASH;',
+        '    frame.header.sequence = sequence;',
+        '    ',
+    ]
+    for name, spec in telemetry.items():
+        value = f'data->{name} ? 1 : 0' if spec['type'] == 'bool' else f'data->{name}'
+        lines.append(f'    frame.{name} = {value};')
+    lines += [
+        '    ',
+        '    memcpy(buffer, &frame, sizeof(frame));',
+        '    return (int)sizeof(frame);',
+        '}',
+        '',
+        '//==================================================================================================',
+        '// Delta Frame Construction',
+        '//==================================================================================================',
+        '',
+        'void telemetry_delta_init(TelemetryDeltaState* state, uint32_t keyframe_interval) {',
+        '    if (state == NULL) return;',
+        '    ',
+        '    telemetry_init(&state->last);',
+        '    state->frames_since_keyframe = 0;',
+        '    state->keyframe_interval = keyframe_interval > 0 ? keyframe_interval : TELEM_DEFAULT_KEYFRAME_INTERVAL;',
+        '    state->keyframe_pending = true;',
+        '}',
+        '',
+        'void telemetry_delta_request_keyframe(TelemetryDeltaState* state) {',
+        '    if (state == NULL) return;',
+        '    state->keyframe_pending = true;',
+        '}',
+        '',
+        'int telemetry_build_delta_frame(TelemetryDeltaState* state, const TelemetryData* data, uint32_t sequence, uint8_t* buffer, size_t buffer_size) {',
+        '    if (state == NULL || data == NULL || buffer == NULL || buffer_size < TELEM_DELTA_FRAME_MAX_SIZE) return 0;',
+        '    ',
+        '    // Keyframe: resend everything and restart the interval.',
+        '    if (state->keyframe_pending || state->frames_since_keyframe >= state->keyframe_interval) {',
+        '        state->keyframe_pending = false;',
+        '        state->frames_since_keyframe = 0;',
+        '        state->last = *data;',
+        '        return telemetry_build_frame(data, sequence, buffer, buffer_size);',
+        '    }',
+        '    ',
+        '    TelemetryFrameHeader header;',
+        '    header.magic = TELEM_FRAME_MAGIC;',
+        '    header.version = TELEM_FRAME_VERSION;',
+        '    header.frame_type = TELEM_FRAME_TYPE_DELTA;',
+        '    header.schema_hash = TELEM_SCHEMA_HASH;',
+        '    header.sequence = sequence;',
+        '    memcpy(buffer, &header, sizeof(header));',
+        '    ',
+        '    uint32_t mask[TELEM_DELTA_MASK_WORDS] = {0};',
+        '    size_t pos = sizeof(header) + sizeof(mask);',
+        '    ',
+    ]
+    for index, (name, spec) in enumerate(telemetry.items()):
+        frame_type = FRAME_C_TYPES[spec['type']]
+        value = f'data->{name} ? 1 : 0' if spec['type'] == 'bool' else f'data->{name}'
+        lines += [
+            f'    // {name}',
+            f'    if (data->{name} != state->last.{name}) {{',
+            f'        {frame_type} value = {value};',
+            '        memcpy(buffer + pos, &value, sizeof(value));',
+            '        pos += sizeof(value);',
+            f'        mask[{index // 32}] |= (1u << {index % 32});',
+            '    }',
+            '    ',
+        ]
+    lines += [
+        '    memcpy(buffer + sizeof(header), mask, sizeof(mask));',
+        '    state->last = *data;',
+        '    state->frames_since_keyframe++;',
+        '    return (int)pos;',
+        '}',
+        '',
+        '//==================================================================================================',
+        '// Batch Frame Construction',
+        '//==================================================================================================',
+        '',
+        'void telemetry_batch_init(TelemetryBatchBuffer* batch) {',
+        '    if (batch == NULL) return;',
+        '    ',
+        '    batch->head = 0;',
+        '    batch->count = 0;',
+        '    batch->dropped = 0;',
+        '}',
+        '',
+        'void telemetry_batch_push(TelemetryBatchBuffer* batch, const TelemetryData* data, uint32_t timestamp_ms) {',
+        '    if (batch == NULL || data == NULL) return;',
+        '    ',
+        '    // Overwrite the oldest sample when full so the newest history is kept.',
+        '    if (batch->count == TELEM_BATCH_CAPACITY) {',
+        '        batch->head = (batch->head + 1) % TELEM_BATCH_CAPACITY;',
+        '        batch->count--;',
+        '        batch->dropped++;',
+        '    }',
+        '    ',
+        '    TelemetrySample* sample = &batch->samples[(batch->head + batch->count) % TELEM_BATCH_CAPACITY];',
+        '    sample->timestamp_ms = timestamp_ms;',
+    ]
+    for name in batch_fields(telemetry):
+        value = f'data->{name} ? 1 : 0' if telemetry[name]['type'] == 'bool' else f'data->{name}'
+        lines.append(f'    sample->{name} = {value};')
+    lines += [
+        '    batch->count++;',
+        '}',
+        '',
+        'int telemetry_batch_build_frame(TelemetryBatchBuffer* batch, uint32_t sequence, uint8_t* buffer, size_t buffer_size) {',
+        '    if (batch == NULL || buffer == NULL || buffer_size < sizeof(TelemetryBatchHeader) + sizeof(TelemetrySample)) return 0;',
+        '    if (batch->count == 0) return 0;',
+        '    ',
+        '    size_t n = (buffer_size - sizeof(TelemetryBatchHeader)) / sizeof(TelemetrySample);',
+        '    if (n > TELEM_BATCH_MAX_SAMPLES) n = TELEM_BATCH_MAX_SAMPLES;',
+        '    if (n > batch->count) n = batch->count;',
+        '    ',
+        '    TelemetryBatchHeader header;',
+        '    header.header.magic = TELEM_FRAME_MAGIC;',
+        '    header.header.version = TELEM_FRAME_VERSION;',
+        '    header.header.frame_type = TELEM_FRAME_TYPE_BATCH;',
+        '    header.header.schema_hash = TELEM_SCHEMA_HASH;',
+        '    header.header.sequence = sequence;',
+        '    header.sample_count = (uint16_t)n;',
+        '    header.dropped_samples = batch->dropped > 0xFFFF ? 0xFFFF : (uint16_t)batch->dropped;',
+        '    memcpy(buffer, &header, sizeof(header));',
+        '    ',
+        '    // Copy oldest first, in up to two runs when the queued samples wrap around the end of the ring.',
+        '    size_t pos = sizeof(header);',
+        '    size_t first = TELEM_BATCH_CAPACITY - batch->head;',
+        '    if (first > n) first = n;',
+        '    memcpy(buffer + pos, &batch->samples[batch->head], first * sizeof(TelemetrySample));',
+        '    pos += first * sizeof(TelemetrySample);',
+        '    if (n > first) {',
+        '        memcpy(buffer + pos, &batch->samples[0], (n - first) * sizeof(TelemetrySample));',
+        '        pos += (n - first) * sizeof(TelemetrySample);',
+        '    }',
+        '    ',
+        '    batch->head = (batch->head + n) % TELEM_BATCH_CAPACITY;',
+        '    batch->count -= n;',
+        '    batch->dropped = 0;',
+        '    return (int)pos;',
+        '}',
+        '',
+        '//==================================================================================================',
+        '// Telemetry Transmission',
+        '//==================================================================================================',
+        '',
+        '// NOTE: telemetry_send() is only compiled when sendMessage is defined for your comms setup.',
+        '// The Fillhead firmware builds its frames in Fillhead::publishTelemetry() instead.',
+        '// For example:',
+        '// extern CommsController comms;',
+        '// #define sendMessage(msg) comms.enqueueTx(msg, comms.m_guiIp, comms.m_guiPort)',
+        '',
+        '#ifdef sendMessage',
+        'void telemetry_send(const TelemetryData* data) {',
+        '    char buffer[512];',
+        '    int len = telemetry_build_message(data, buffer, sizeof(buffer));',
+        '    ',
+        '    if (len > 0) {',
+        '        sendMessage(buffer);',
+        '    }',
+        '}',
+        '#endif',
+    ]
+    return '\n'.join(lines)
+
+
+#==================================================================================================
+# telemetry_codec.py
+#==================================================================================================
+
+def generate_telemetry_codec(telemetry, stamp):
+    """Generate the contents of the host-side telemetry_codec.py module."""
+    field_names = ''.join(f"    '{name}',\n" for name in telemetry)
+    field_defaults = ''.join(
+        f"    {float(spec.get('default', 0.0)) if spec['type'] == 'float' else int(spec.get('default', 0))},\n"
+        for spec in telemetry.values())
+    field_maps = ''
+    for name, spec in telemetry.items():
+        if 'map' in spec:
+            entries = ', '.join(f"{int(k)}: {v!r}" for k, v in spec['map'].items())
+            field_maps += f"    '{name}': {{{entries}}},\n"
+    batch_names = ''.join(f"    '{name}',\n" for name in batch_fields(telemetry))
+    batch_dtype = ''.join(f"    ('{name}', '{NUMPY_DTYPES[telemetry[name]['type']]}'),\n"
+                          for name in batch_fields(telemetry))
+
+    return f'''"""
+Fillhead Telemetry Codec
+Encodes and decodes packed binary telemetry frames, delta telemetry streams and sample batches.
+
+AUTO-GENERATED FILE - DO NOT EDIT MANUALLY
+Generated from telemetry.json (source CRC-32 {stamp})
+To modify telemetry fields, edit telemetry.json and regenerate this file.
+"""
+import struct
+
+FRAME_MAGIC = 0x{FRAME_MAGIC:04X}
+FRAME_VERSION = {FRAME_VERSION}
+SCHEMA_HASH = 0x{telemetry_schema_hash(telemetry):08X}
+FRAME_TYPE_FULL = {FRAME_TYPE_FULL}
+FRAME_TYPE_DELTA = {FRAME_TYPE_DELTA}
+FRAME_TYPE_BATCH = {FRAME_TYPE_BATCH}
+DELTA_MASK_WORDS = {delta_mask_words(telemetry)}
+DEFAULT_KEYFRAME_INTERVAL = {DEFAULT_KEYFRAME_INTERVAL}
+BATCH_MAX_SAMPLES = {batch_max_samples(telemetry)}
+MESSAGE_SEPARATOR = {MESSAGE_SEPARATOR!r}
+
+FIELD_NAMES = (
+{field_names})
+
+FIELD_DEFAULTS = (
+{field_defaults})
+
+FIELD_MAPS = {{
+{field_maps}}}
+
+BATCH_FIELD_NAMES = (
+{batch_names})
+
+# NumPy structured dtype of one batch sample, matching TelemetrySample
+BATCH_DTYPE = [
+    ('timestamp_ms', '<u4'),
+{batch_dtype}]
+
+HEADER = struct.Struct('<{FRAME_HEADER_FORMAT}')
+FRAME = struct.Struct('{frame_struct_format(telemetry)}')
+FIELD_FORMATS = '{''.join(STRUCT_CHARS[spec['type']] for spec in telemetry.values())}'
+DELTA_MASK = struct.Struct('<{delta_mask_words(telemetry)}I')
+BATCH_HEADER = struct.Struct('<{BATCH_HEADER_FORMAT}')
+BATCH_SAMPLE = struct.Struct('<{batch_sample_format(telemetry)}')
+
+_MAGIC_BYTES = struct.pack('<H', FRAME_MAGIC)
+
+
+def is_frame(data):
+    """Returns True if a received datagram is a binary telemetry frame rather than a text message."""
+    return data[:2] == _MAGIC_BYTES
+
+
+def split_datagram(data):
+    """
+    Split a received datagram into the messages it carries.
+
+    The firmware coalesces consecutive text messages for the same destination into one
+    datagram, separated by MESSAGE_SEPARATOR. Binary frames are always sent on their own.
+
+    Returns:
+        List of bytes: the whole datagram for a binary frame, otherwise each non-empty message
+    """
+    if is_frame(data):
+        return [data]
+    return [message for message in data.split(MESSAGE_SEPARATOR) if message]
+
+
+def encode_frame(values, sequence):
+    """
+    Pack a telemetry snapshot into a full binary frame.
+
+    Args:
+        values: Mapping of field name to value; missing fields use their telemetry.json default
+        sequence: Frame sequence number
+
+    Returns:
+        The frame as bytes
+    """
+    payload = [values.get(name, default) for name, default in zip(FIELD_NAMES, FIELD_DEFAULTS)]
+    return FRAME.pack(FRAME_MAGIC, FRAME_VERSION, FRAME_TYPE_FULL, SCHEMA_HASH, sequence & 0xFFFFFFFF, *payload)
+
+
+def decode_header(data):
+    """
+    Unpack and validate the header of a binary frame.
+
+    Args:
+        data: Received datagram
+
+    Returns:
+        Tuple of (frame_type, sequence)
+
+    Raises:
+        ValueError: If the datagram is not a frame or was built from a different telemetry.json
+    """
+    if len(data) < HEADER.size:
+        raise ValueError(f"Frame too short: {{len(data)}} bytes")
+    magic, version, frame_type, schema_hash, sequence = HEADER.unpack_from(data)
+    if magic != FRAME_MAGIC:
+        raise ValueError(f"Bad frame magic 0x{{magic:04X}}")
+    if version != FRAME_VERSION:
+        raise ValueError(f"Unsupported frame version {{version}}")
+    if schema_hash != SCHEMA_HASH:
+        raise ValueError(f"Schema hash mismatch: device 0x{{schema_hash:08X}}, host 0x{{SCHEMA_HASH:08X}}")
+    return frame_type, sequence
+
+
+def decode_frame(data):
+    """
+    Unpack a full binary telemetry frame.
+
+    Args:
+        data: Received datagram
+
+    Returns:
+        Tuple of (sequence, dict of field name to raw value)
+
+    Raises:
+        ValueError: If the datagram is not a valid full frame for this schema
+    """
+    frame_type, sequence = decode_header(data)
+    if frame_type != FRAME_TYPE_FULL:
+        raise ValueError(f"Not a full frame (type {{frame_type}})")
+    if len(data) != FRAME.size:
+        raise ValueError(f"Frame length {{len(data)}} does not match schema length {{FRAME.size}}")
+    values = FRAME.unpack(data)
+    return sequence, dict(zip(FIELD_NAMES, values[5:]))
+
+
+_delta_layouts = {{}}
+
+
+def _delta_layout(mask):
+    """Returns the cached (struct, field names) pair for the payload of a delta frame with the given mask."""
+    layout = _delta_layouts.get(mask)
+    if layout is None:
+        indices = [i for i in range(len(FIELD_NAMES)) if mask >> i & 1]
+        layout = (struct.Struct('<' + ''.join(FIELD_FORMATS[i] for i in indices)),
+                  tuple(FIELD_NAMES[i] for i in indices))
+        _delta_layouts[mask] = layout
+    return layout
+
+
+def encode_batch(samples, sequence, dropped=0):
+    """
+    Pack timestamped samples of the batched fields into a batch frame.
+
+    Args:
+        samples: Sequence of (timestamp_ms, values) pairs, oldest first; missing fields in values
+            use their telemetry.json default
+        sequence: Batch stream sequence number
+        dropped: Number of samples lost before these ones
+
+    Returns:
+        The frame as bytes
+
+    Raises:
+        ValueError: If more than BATCH_MAX_SAMPLES samples are given
+    """
+    if len(samples) > BATCH_MAX_SAMPLES:
+        raise ValueError(f"Too many samples for one batch frame: {{len(samples)}} > {{BATCH_MAX_SAMPLES}}")
+    defaults = dict(zip(FIELD_NAMES, FIELD_DEFAULTS))
+    parts = [HEADER.pack(FRAME_MAGIC, FRAME_VERSION, FRAME_TYPE_BATCH, SCHEMA_HASH, sequence & 0xFFFFFFFF),
+             BATCH_HEADER.pack(len(samples), min(dropped, 0xFFFF))]
+    for timestamp_ms, values in samples:
+        parts.append(BATCH_SAMPLE.pack(timestamp_ms & 0xFFFFFFFF,
+                                       *(values.get(name, defaults[name]) for name in BATCH_FIELD_NAMES)))
+    return b''.join(parts)
+
+
+def decode_batch(data):
+    """
+    Unpack a batch frame into NumPy arrays. Requires NumPy.
+
+    Args:
+        data: Received datagram
+
+    Returns:
+        Tuple of (sequence, dropped_samples, dict of column name to array). The columns are
+        "timestamp_ms" and every name in BATCH_FIELD_NAMES, one element per sample, oldest first.
+        The arrays are read-only views of data.
+
+    Raises:
+        ValueError: If the datagram is not a valid batch frame for this schema
+    """
+    import numpy as np
+
+    frame_type, sequence = decode_header(data)
+    if frame_type != FRAME_TYPE_BATCH:
+        raise ValueError(f"Not a batch frame (type {{frame_type}})")
+    if len(data) < HEADER.size + BATCH_HEADER.size:
+        raise ValueError(f"Batch frame too short: {{len(data)}} bytes")
+    count, dropped = BATCH_HEADER.unpack_from(data, HEADER.size)
+    offset = HEADER.size + BATCH_HEADER.size
+    if len(data) != offset + count * BATCH_SAMPLE.size:
+        raise ValueError(f"Batch frame length {{len(data)}} does not match its sample count {{count}}")
+    samples = np.frombuffer(data, dtype=np.dtype(BATCH_DTYPE), count=count, offset=offset)
+    return sequence, dropped, {{name: samples[name] for name in samples.dtype.names}}
+
+
+class TelemetryDeltaEncoder:
+    """
+    Produces a delta telemetry stream, mirroring telemetry_build_delta_frame() in the firmware.
+
+    Args:
+        keyframe_interval: Delta frames between keyframes
+    """
+
+    def __init__(self, keyframe_interval=DEFAULT_KEYFRAME_INTERVAL):
+        self.keyframe_interval = keyframe_interval
+        self.sequence = 0
+        self._last = None
+        self._frames_since_keyframe = 0
+        self._keyframe_pending = True
+
+    def request_keyframe(self):
+        """Force the next frame to be a keyframe."""
+        self._keyframe_pending = True
+
+    def encode(self, values):
+        """
+        Build the next frame of the stream.
+
+        Args:
+            values: Mapping of field name to value; missing fields use their telemetry.json default
+
+        Returns:
+            The frame as bytes, either a full keyframe or a delta frame
+        """
+        current = tuple(values.get(name, default) for name, default in zip(FIELD_NAMES, FIELD_DEFAULTS))
+        sequence = self.sequence
+        self.sequence = (sequence + 1) & 0xFFFFFFFF
+
+        if self._keyframe_pending or self._frames_since_keyframe >= self.keyframe_interval:
+            self._keyframe_pending = False
+            self._frames_since_keyframe = 0
+            self._last = current
+            return FRAME.pack(FRAME_MAGIC, FRAME_VERSION, FRAME_TYPE_FULL, SCHEMA_HASH, sequence, *current)
+
+        mask = 0
+        changed = []
+        for index, (value, last) in enumerate(zip(current, self._last)):
+            if value != last:
+                mask |= 1 << index
+                changed.append(value)
+        self._last = current
+        self._frames_since_keyframe += 1
+        payload, _ = _delta_layout(mask)
+        words = [(mask >> (32 * i)) & 0xFFFFFFFF for i in range(DELTA_MASK_WORDS)]
+        return (HEADER.pack(FRAME_MAGIC, FRAME_VERSION, FRAME_TYPE_DELTA, SCHEMA_HASH, sequence)
+                + DELTA_MASK.pack(*words) + payload.pack(*changed))
+
+
+class TelemetryStateDecoder:
+    """
+    Rebuilds full telemetry state from a stream of keyframes and delta frames.
+
+    Attributes:
+        state: Dict of the latest value of every field, or None until the first keyframe arrives
+        sequence: Sequence number of the last frame received
+        gaps: Number of sequence gaps detected
+        needs_keyframe: True while the state is stale after a gap; delta frames are discarded
+            until the next keyframe arrives; send the request_keyframe command to get one early
+
+    Batch frames carry their own sequence counter and are ignored; decode them with decode_batch().
+    """
+
+    def __init__(self):
+        self.state = None
+        self.sequence = None
+        self.gaps = 0
+        self.needs_keyframe = True
+
+    def feed(self, data):
+        """
+        Apply one received frame.
+
+        Args:
+            data: Received datagram
+
+        Returns:
+            Dict of the fields updated by this frame (every field for a keyframe), or None if the
+            frame was a batch frame or was discarded while waiting for a keyframe
+
+        Raises:
+            ValueError: If the datagram is not a valid frame for this schema
+        """
+        frame_type, sequence = decode_header(data)
+        if frame_type == FRAME_TYPE_BATCH:
+            return None
+
+        # Validate the whole frame before touching the sequence so a truncated datagram is rejected
+        # without counting as received.
+        if frame_type == FRAME_TYPE_FULL:
+            if len(data) != FRAME.size:
+                raise ValueError(f"Frame length {{len(data)}} does not match schema length {{FRAME.size}}")
+            values = dict(zip(FIELD_NAMES, FRAME.unpack(data)[5:]))
+        elif frame_type == FRAME_TYPE_DELTA:
+            if len(data) < HEADER.size + DELTA_MASK.size:
+                raise ValueError(f"Delta frame too short: {{len(data)}} bytes")
+            words = DELTA_MASK.unpack_from(data, HEADER.size)
+            mask = 0
+            for i, word in enumerate(words):
+                mask |= word << (32 * i)
+            if mask >> len(FIELD_NAMES):
+                raise ValueError(f"Delta frame mask 0x{{mask:X}} names fields outside the schema")
+            payload, names = _delta_layout(mask)
+            if len(data) != HEADER.size + DELTA_MASK.size + payload.size:
+                raise ValueError(f"Delta frame length {{len(data)}} does not match its field mask")
+            values = dict(zip(names, payload.unpack_from(data, HEADER.size + DELTA_MASK.size)))
+        else:
+            raise ValueError(f"Unknown frame type {{frame_type}}")
+
+        if self.sequence is not None and sequence != (self.sequence + 1) & 0xFFFFFFFF:
+            self.gaps += 1
+            self.needs_keyframe = True
+        self.sequence = sequence
+
+        if frame_type == FRAME_TYPE_FULL:
+            self.state = values
+            self.needs_keyframe = False
+            return dict(values)
+        if self.needs_keyframe:
+            return None
+        self.state.update(values)
+        return values
+'''
+
+
+#==================================================================================================
+# telemetry_record.py
+#==================================================================================================
+
+PYTHON_TYPES = {
+    'int': 'int',
+    'float': 'float',
+    'bool': 'bool',
+}
+
+
+def _python_default(spec):
+    if spec['type'] == 'float':
+        return repr(float(spec.get('default', 0.0)))
+    if spec['type'] == 'bool':
+        return repr(bool(spec.get('default', 0)))
+    return repr(int(spec.get('default', 0)))
+
+
+def generate_telemetry_record(telemetry, stamp):
+    """Generate the contents of the host-side telemetry_record.py module."""
+    slots = ''.join(f"        '{name}',\n" for name in telemetry)
+    field_types = ''.join(f"    '{name}': {PYTHON_TYPES[spec['type']]},\n" for name, spec in telemetry.items())
+    field_units = ''.join(f"    '{name}': {spec['unit']!r},\n" for name, spec in telemetry.items() if 'unit' in spec)
+    field_precision = ''.join(f"    '{name}': {spec.get('precision', 2)},\n"
+                              for name, spec in telemetry.items() if spec['type'] == 'float')
+    field_maps = ''
+    for name, spec in telemetry.items():
+        if 'map' in spec:
+            entries = ', '.join(f"{int(k)}: {v!r}" for k, v in spec['map'].items())
+            field_maps += f"    '{name}': {{{entries}}},\n"
+    defaults = ''.join(f"        self.{name} = {_python_default(spec)}\n" for name, spec in telemetry.items())
+
+    return f'''"""
+Fillhead Telemetry Record
+Typed telemetry snapshot with one slot per telemetry field.
+
+AUTO-GENERATED FILE - DO NOT EDIT MANUALLY
+Generated from telemetry.json (source CRC-32 {stamp})
+To modify telemetry fields, edit telemetry.json and regenerate this file.
+"""
+
+TELEM_PREFIX = "FILLHEAD_TELEM: "
+
+FIELD_TYPES = {{
+{field_types}}}
+
+FIELD_UNITS = {{
+{field_units}}}
+
+FIELD_PRECISION = {{
+{field_precision}}}
+
+FIELD_MAPS = {{
+{field_maps}}}
+
+
+def _to_bool(value):
+    if isinstance(value, str):
+        value = float(value)
+    return bool(value)
+
+
+def _to_int(value):
+    # Firmware may print int fields with a float format, e.g. "1.00".
+    if isinstance(value, str):
+        value = float(value)
+    return int(value)
+
+
+_COERCE = {{name: _to_bool if kind is bool else _to_int if kind is int else kind
+           for name, kind in FIELD_TYPES.items()}}
+
+
+class TelemetryRecord:
+    """
+    Latest value of every telemetry field, stored as int, float or bool.
+
+    Enum fields keep their raw integer; label() decodes it through the telemetry.json map and
+    format() renders any field for display, so values are parsed once and formatted only when shown.
+
+    Args:
+        **values: Initial field values; unspecified fields use their telemetry.json default
+    """
+    __slots__ = (
+{slots}    )
+
+    def __init__(self, **values):
+{defaults}        if values:
+            self.update(values)
+
+    @classmethod
+    def from_message(cls, message):
+        """Build a record from a text telemetry message ("FILLHEAD_TELEM: key:value,...")."""
+        record = cls()
+        record.update_from_message(message)
+        return record
+
+    def update(self, values):
+        """
+        Set fields from a mapping, converting each value to the field's type.
+
+        Args:
+            values: Mapping of field name to value (e.g. the dict from a decoded binary frame)
+
+        Returns:
+            List of the names of fields whose value changed
+
+        Raises:
+            KeyError: If a name is not a telemetry field
+            ValueError: If a value cannot be converted to the field's type
+        """
+        changed = []
+        for name, value in values.items():
+            coerce = _COERCE.get(name)
+            if coerce is None:
+                raise KeyError(f"Unknown telemetry field '{{name}}'")
+            value = coerce(value)
+            if getattr(self, name) != value:
+                setattr(self, name, value)
+                changed.append(name)
+        return changed
+
+    def update_from_message(self, message):
+        """
+        Set fields from a text telemetry message. Keys that are not telemetry fields are ignored.
+
+        Keys may be padded with spaces, as the firmware's TELEM_KEY_* macros are. Empty items, such
+        as one left by a trailing comma, are skipped.
+
+        Returns:
+            List of the names of fields whose value changed
+
+        Raises:
+            ValueError: If the message is malformed or a value cannot be converted
+        """
+        if message.startswith(TELEM_PREFIX):
+            message = message[len(TELEM_PREFIX):]
+        values = {{}}
+        for item in message.strip().split(','):
+            if not item.strip():
+                continue
+            name, sep, value = item.partition(':')
+            if not sep:
+                raise ValueError(f"Malformed telemetry item '{{item}}'")
+            name = name.strip()
+            if name in _COERCE:
+                values[name] = value
+        return self.update(values)
+
+    def label(self, name):
+        """Returns the map label of an enum field's current value, or the value as text if unmapped."""
+        value = getattr(self, name)
+        return FIELD_MAPS[name].get(int(value), str(value))
+
+    def format(self, name):
+        """Returns the display text of a field: its label for enum fields, else value and unit."""
+        if name in FIELD_MAPS:
+            return self.label(name).title()
+        value = getattr(self, name)
+        text = f"{{value:.{{FIELD_PRECISION[name]}}f}}" if name in FIELD_PRECISION else str(value)
+        unit = FIELD_UNITS.get(name)
+        return f"{{text}} {{unit}}" if unit else text
+
+    def as_dict(self):
+        """Returns the record as a dict of field name to value."""
+        return {{name: getattr(self, name) for name in self.__slots__}}
+
+    def __eq__(self, other):
+        if not isinstance(other, TelemetryRecord):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self):
+        fields = ', '.join(f"{{name}}={{getattr(self, name)!r}}" for name in self.__slots__)
+        return f"TelemetryRecord({{fields}})"
+'''
+
+
+#==================================================================================================
+# commands.h / command_parser.h / command_parser.cpp / command_table.py
+#==================================================================================================
+
+COMMAND_GROUPS = ('General System', 'Motion', 'Valve', 'Heater', 'Vacuum')
+
+
+def command_group(name):
+    """Returns the commands.h section a command is listed under."""
+    if 'valve' in name:
+        return 'Valve'
+    if name.startswith('heater'):
+        return 'Heater'
+    if name.startswith('vacuum'):
+        return 'Vacuum'
+    if any(word in name for word in ('inject', 'jog', 'home', 'move')):
+        return 'Motion'
+    return 'General System'
+
+
+def ordered_commands(commands):
+    """Returns command names in Command enum order: grouped by section, then in commands.json order."""
+    return [name for group in COMMAND_GROUPS for name in commands if command_group(name) == group]
+
+
+def command_enum_values(commands):
+    """Returns a dict of command name to its Command enum value (CMD_UNKNOWN is 0)."""
+    return {name: index for index, name in enumerate(ordered_commands(commands), start=1)}
+
+
+def build_command_hash(names):
+    """
+    Build a minimal perfect hash over the command tokens using hash-and-displace.
+
+    Every token is hashed with the FNV-1a basis to pick a bucket. Each bucket then gets the
+    smallest displacement seed that sends all of its tokens to distinct free slots, so a lookup
+    costs exactly two hashes and one string comparison regardless of the number of commands.
+
+    Args:
+        names: Command tokens to place
+
+    Returns:
+        Tuple of (displacements per bucket, token per slot)
+    """
+    size = len(names)
+    buckets = [[] for _ in range(size)]
+    for name in names:
+        buckets[fnv1a_32(name.encode('ascii')) % size].append(name)
+
+    displacements = [0] * size
+    slots = [None] * size
+    for bucket_index in sorted(range(size), key=lambda b: -len(buckets[b])):
+        bucket = buckets[bucket_index]
+        if not bucket:
+            continue
+        seed = 1
+        while True:
+            targets = [fnv1a_32(name.encode('ascii'), seed) % size for name in bucket]
+            if len(set(targets)) == len(targets) and all(slots[t] is None for t in targets):
+                break
+            seed += 1
+            if seed > 0xFFFF:
+                raise RuntimeError("No perfect hash displacement found for commands.json")
+        displacements[bucket_index] = seed
+        for target, name in zip(targets, bucket):
+            slots[target] = name
+    return displacements, slots
+
+
+def _command_macro(name):
+    return f"CMD_STR_{name.upper()}"
+
+
+def _command_enum(name):
+    return f"CMD_{name.upper()}"
+
+
+def generate_commands_header(commands, stamp):
+    """Generate the contents of commands.h."""
+    lines = [
+        '/**',
+        ' * @file commands.h',
+        ' * @brief Defines the command interface for the Fillhead controller.',
+        ' * @details AUTO-GENERATED FILE - DO NOT EDIT MANUALLY',
+        f' * Generated from commands.json (source CRC-32 {stamp})',
+        ' * ',
+        ' * This header file defines all commands that can be sent TO the Fillhead device.',
+        ' * For response message formats, see responses.h',
+        ' * To modify commands, edit commands.json and regenerate this file.',
+        ' */',
+        '#pragma once',
+        '',
+        '//==================================================================================================',
+        '// Command Strings (Host → Device)',
+        '//==================================================================================================',
+    ]
+    for group in COMMAND_GROUPS:
+        lines += [
+            '',
+            '/**',
+            f' * @name {group} Commands',
+            ' * @{',
+            ' */',
+        ]
+        for name in commands:
+            if command_group(name) == group:
+                help_text = commands[name].get('help', 'No description available.')
+                literal = f'"{name}"'
+                lines.append(f'#define {_command_macro(name):<43} {literal:<32} ///< {help_text}')
+        lines.append('/** @} */')
+    lines += [
+        '',
+        '//==================================================================================================',
+        '// Command Enum',
+        '//==================================================================================================',
+        '',
+        '/**',
+        ' * @enum Command',
+        ' * @brief Enumerates all possible commands that can be processed by the Fillhead.',
+        ' * @details This enum provides a type-safe way to handle incoming commands.',
+        ' */',
+        'typedef enum {',
+        '    CMD_UNKNOWN,                        ///< Represents an unrecognized or invalid command.',
+    ]
+    for group in COMMAND_GROUPS:
+        lines += ['', f'    // {group} Commands']
+        for name in commands:
+            if command_group(name) == group:
+                lines.append(f'    {_command_enum(name) + ",":<39} ///< @see {_command_macro(name)}')
+    lines.append('} Command;')
+    return '\n'.join(lines)
+
+
+def generate_command_parser_header(commands, stamp):
+    """Generate the contents of command_parser.h."""
+    return '\n'.join([
+        '/**',
+        ' * @file command_parser.h',
+        ' * @brief Command parsing and dispatching declarations for the Fillhead controller.',
+        ' * @details AUTO-GENERATED FILE - DO NOT EDIT MANUALLY',
+        f' * Generated from commands.json (source CRC-32 {stamp})',
+        ' * ',
+        ' * This header declares utility functions to parse and dispatch commands for the Fillhead.',
+        ' * @see commands.h for command definitions',
+        ' * @see command_parser.cpp for implementations',
+        ' */',
+        '#pragma once',
+        '',
+        '#include "commands.h"',
+        '',
+        '//==================================================================================================',
+        '// Command Parser Functions',
+        '//==================================================================================================',
+        '',
+        '/**',
+        ' * @brief Parse a command string and return the corresponding Command enum.',
+        ' * @param cmdStr The command string to parse',
+        ' * @return The parsed Command enum value, or CMD_UNKNOWN if not recognized',
+        ' * ',
+        ' * @details The first whitespace-delimited token must match a command name exactly.',
+        ' * Lookup is a constant-time perfect hash generated from commands.json.',
+        ' */',
+        'Command parseCommand(const char* cmdStr);',
+        '',
+        '/**',
+        ' * @brief Extract parameter string from a command.',
+        ' * @param cmdStr The full command string',
+        ' * @param cmd The parsed command enum',
+        ' * @return Pointer to the parameter substring, or NULL if no parameters',
+        ' */',
+        'const char* getCommandParams(const char* cmdStr, Command cmd);',
+        '',
+        '/**',
+        ' * @brief Dispatch a parsed command to its handler (template - implement your handlers).',
+        ' * @param cmd The parsed command enum',
+        ' * @param params The parameter string (if any)',
+        ' * @return true if command was handled successfully, false otherwise',
+        ' * ',
+        ' * @note This is a template. Implement your actual command handlers and call them here.',
+        ' */',
+        'bool dispatchCommand(Command cmd, const char* params);',
+    ])
+
+
+def generate_command_parser_source(commands, stamp):
+    """Generate the contents of command_parser.cpp."""
+    displacements, slots = build_command_hash(list(commands))
+    max_length = max(len(name) for name in commands)
+    lines = [
+        '/**',
+        ' * @file command_parser.cpp',
+        ' * @brief Command parsing and dispatching implementations for the Fillhead controller.',
+        ' * @details AUTO-GENERATED FILE - DO NOT EDIT MANUALLY',
+        f' * Generated from commands.json (source CRC-32 {stamp})',
+        ' */',
+        '',
+        '#include "command_parser.h"',
+        '#include <stddef.h>',
+        '#include <stdint.h>',
+        '#include <string.h>',
+        '',
+        '//==================================================================================================',
+        '// Command Lookup Table',
+        '//==================================================================================================',
+        '',
+        '// Minimal perfect hash over the command names. The first hash (FNV-1a basis) selects a bucket;',
+        '// the bucket\'s displacement seeds a second hash that selects the only slot the token can be in.',
+        '// The slot is then compared exactly, so prefixes and unknown tokens return CMD_UNKNOWN.',
+        f'#define CMD_HASH_BASIS          0x811C9DC5u',
+        f'#define CMD_HASH_TABLE_SIZE     {len(slots)}',
+        f'#define CMD_MAX_TOKEN_LENGTH    {max_length}',
+        '',
+        'typedef struct {',
+        '    const char* name;',
+        '    uint8_t     length;',
+        '    Command     cmd;',
+        '} CommandEntry;',
+        '',
+        'static const uint16_t s_commandDisplacements[CMD_HASH_TABLE_SIZE] = {',
+    ]
+    for start in range(0, len(displacements), 8):
+        chunk = displacements[start:start + 8]
+        lines.append('    ' + ', '.join(f'{d:>5}' for d in chunk) + ',')
+    lines += [
+        '};',
+        '',
+        'static const CommandEntry s_commandTable[CMD_HASH_TABLE_SIZE] = {',
+    ]
+    for name in slots:
+        lines.append(f'    {{ {_command_macro(name) + ",":<36} {len(name):>2}, {_command_enum(name)} }},')
+    lines += [
+        '};',
+        '',
+        'static uint32_t commandHash(const char* str, size_t len, uint32_t seed) {',
+        '    uint32_t h = seed;',
+        '    for (size_t i = 0; i < len; i++) {',
+        '        h ^= (uint8_t)str[i];',
+        '        h *= 0x01000193u;',
+        '    }',
+        '    return h;',
+        '}',
+        '',
+        'static size_t commandTokenLength(const char* cmdStr) {',
+        '    size_t len = 0;',
+        "    while (cmdStr[len] != '\\0' && cmdStr[len] != ' ' && cmdStr[len] != '\\t' && cmdStr[len] != '\\r' && cmdStr[len] != '\\n') {",
+        '        len++;',
+        '    }',
+        '    return len;',
+        '}',
+        '',
+        '//==================================================================================================',
+        '// Command Parser Implementation',
+        '//==================================================================================================',
+        '',
+        'Command parseCommand(const char* cmdStr) {',
+        '    if (cmdStr == NULL) return CMD_UNKNOWN;',
+        '    ',
+        '    size_t len = commandTokenLength(cmdStr);',
+        '    if (len == 0 || len > CMD_MAX_TOKEN_LENGTH) return CMD_UNKNOWN;',
+        '    ',
+        '    uint32_t bucket = commandHash(cmdStr, len, CMD_HASH_BASIS) % CMD_HASH_TABLE_SIZE;',
+        '    uint32_t slot = commandHash(cmdStr, len, s_commandDisplacements[bucket]) % CMD_HASH_TABLE_SIZE;',
+        '    const CommandEntry* entry = &s_commandTable[slot];',
+        '    if (entry->length == len && memcmp(entry->name, cmdStr, len) == 0) return entry->cmd;',
+        '    return CMD_UNKNOWN;',
+        '}',
+        '',
+        'const char* getCommandParams(const char* cmdStr, Command cmd) {',
+        '    switch (cmd) {',
+    ]
+    for name, spec in commands.items():
+        if spec['params']:
+            lines.append(f'        case {_command_enum(name)}:')
+    lines += [
+        '            break;',
+        '        default:',
+        '            return NULL;',
+        '    }',
+        '    ',
+        '    const char* params = cmdStr + commandTokenLength(cmdStr);',
+        "    while (*params == ' ' || *params == '\\t') params++;",
+        '    return params;',
+        '}',
+        '',
+        '//==================================================================================================',
+        '// Command Dispatcher Template',
+        '//==================================================================================================',
+        '',
+        'bool dispatchCommand(Command cmd, const char* params) {',
+        '    switch (cmd) {',
+    ]
+    for name, spec in commands.items():
+        if spec['params']:
+            lines += [
+                f'        case {_command_enum(name)}:',
+                '            // TODO: Implement handler with parameters',
+                f'            // handle_{name}(params);',
+                '            return true;',
+                '',
+            ]
+        else:
+            lines += [
+                f'        case {_command_enum(name)}:',
+                '            // TODO: Implement handler',
+                f'            // handle_{name}();',
+                '            return true;',
+                '',
+            ]
+    lines += [
+        '        case CMD_UNKNOWN:',
+        '        default:',
+        '            return false;',
+        '    }',
+        '}',
+    ]
+    return '\n'.join(lines)
+
+
+def generate_command_table(commands, stamp):
+    """Generate the contents of the host-side command_table.py module."""
+    ids = ''.join(f"    '{name}': {value},\n" for name, value in command_enum_values(commands).items())
+    params = ''
+    for name, spec in commands.items():
+        entries = tuple((p['parameter'], p['type'], bool(p.get('optional', False))) for p in spec['params'])
+        params += f"    '{name}': {entries!r},\n"
+    returns = ''.join(f"    '{name}': {tuple(spec['returns'])!r},\n" for name, spec in commands.items())
+    idempotent = ''.join(f"    '{name}',\n" for name, spec in commands.items() if spec.get('idempotent'))
+
+    return f'''"""
+Fillhead Command Table
+Command names, Command enum values and parameter definitions for host-side tools.
+
+AUTO-GENERATED FILE - DO NOT EDIT MANUALLY
+Generated from commands.json (source CRC-32 {stamp})
+To modify commands, edit commands.json and regenerate this file.
+"""
+
+CMD_UNKNOWN = 0
+
+# Marks the optional trailing correlation ID argument, e.g. "jog_move 5.0 #17"
+CORRELATION_PREFIX = '{CORRELATION_PREFIX}'
+
+# Command name -> Command enum value in commands.h
+COMMAND_IDS = {{
+{ids}}}
+
+# Command name -> tuple of (parameter, type, optional)
+COMMAND_PARAMS = {{
+{params}}}
+
+# Command name -> reply types the device sends for it
+COMMAND_RETURNS = {{
+{returns}}}
+
+# Commands marked "idempotent" in commands.json: running one twice leaves the device as running it
+# once would, so they are the only commands a client may resend
+IDEMPOTENT_COMMANDS = frozenset((
+{idempotent}))
+
+
+def command_token(command):
+    """
+    Extract the command name from a raw command string.
+
+    Args:
+        command: Raw command string, e.g. "inject_stator 10 0.5" or "fillhead.machine_home"
+
+    Returns:
+        The lowercase command name without a leading device prefix
+    """
+    token = command.split(None, 1)[0].lower() if command.strip() else ''
+    if token.startswith('fillhead.'):
+        token = token[len('fillhead.'):]
+    return token
+
+
+def split_correlation(args):
+    """
+    Separate a trailing correlation ID from a command's arguments.
+
+    Args:
+        args: List of argument strings following the command name
+
+    Returns:
+        Tuple of (args without the ID, ID string including CORRELATION_PREFIX or None)
+    """
+    if args and args[-1].startswith(CORRELATION_PREFIX) and args[-1][len(CORRELATION_PREFIX):].isdigit():
+        return args[:-1], args[-1]
+    return args, None
+
+
+def encode_command(command, args=(), tag=None):
+    """
+    Build the datagram for a command.
+
+    Args:
+        command: Command name from commands.json
+        args: Already formatted argument strings
+        tag: Optional correlation ID number, appended as CORRELATION_PREFIX + tag
+
+    Returns:
+        The command line as ASCII bytes
+
+    Raises:
+        KeyError: If the command is not defined in commands.json
+    """
+    if command not in COMMAND_IDS:
+        raise KeyError(f"Unknown command: {{command}}")
+    words = [command, *args]
+    if tag is not None:
+        words.append(f"{{CORRELATION_PREFIX}}{{tag}}")
+    return ' '.join(words).encode('ascii')
+
+
+def build_dispatch(handlers):
+    """
+    Build a command dispatch dict, checking every entry against commands.json.
+
+    Args:
+        handlers: Mapping of command name to handler
+
+    Returns:
+        Dict of command name to handler
+
+    Raises:
+        KeyError: If a handler is registered for a command that commands.json does not define
+    """
+    unknown = [name for name in handlers if name not in COMMAND_IDS]
+    if unknown:
+        raise KeyError(f"Handlers registered for unknown commands: {{', '.join(sorted(unknown))}}")
+    return dict(handlers)
+'''
+
+
+#==================================================================================================
+# command_client.py
+#==================================================================================================
+
+# Parameter type in commands.json -> argument converter in command_client.py
+ARG_CONVERTERS = {
+    'float': '_float',
+    'int': '_int',
+    'string': '_string',
+}
+
+
+def _client_method(name, spec):
+    """Returns the source of the CommandClient coroutine for one command."""
+    params = spec['params']
+    for param in params:
+        if param['type'] not in ARG_CONVERTERS:
+            raise ValueError(f"Unsupported parameter type '{param['type']}' for {name}.{param['parameter']}")
+    signature = ''.join(f", {p['parameter']}=None" if p.get('optional') else f", {p['parameter']}" for p in params)
+    doc_args = ''
+    for p in params:
+        unit = f" in {p['unit']}" if 'unit' in p else ''
+        note = ' (optional)' if p.get('optional') else ''
+        doc_args += f"            {p['parameter']}: {p['type'].title()}{unit}{note}\n"
+
+    lines = [
+        f"    async def {name}(self{signature}, *, timeout=None, completion_timeout=None):",
+        f'        """',
+        f"        {spec.get('help', name)}",
+        f'',
+    ]
+    if doc_args:
+        lines += [f'        Args:', doc_args.rstrip('\n'), f'']
+    lines += [
+        f'        Returns:',
+        f"            Reply text, without its prefix and correlation ID",
+        f'        """',
+    ]
+    converted = {p['parameter']: f"{ARG_CONVERTERS[p['type']]}('{p['parameter']}', {p['parameter']})" for p in params}
+    if params:
+        required = ', '.join(converted[p['parameter']] for p in params if not p.get('optional'))
+        lines.append(f'        args = [{required}]')
+    optional_seen = []
+    for p in params:
+        arg = converted[p['parameter']]
+        if p.get('optional'):
+            lines.append(f"        if {p['parameter']} is not None:")
+            for earlier in optional_seen:
+                lines += [
+                    f"            if {earlier} is None:",
+                    f"                raise ValueError(\"{p['parameter']} requires {earlier}\")",
+                ]
+            lines.append(f"            args.append({arg})")
+            optional_seen.append(p['parameter'])
+    lines.append(f"        return await self.send('{name}', {'args' if params else '()'}, "
+                 f"timeout=timeout, completion_timeout=completion_timeout)")
+    return '\n'.join(lines) + '\n'
+
+
+def generate_command_client(commands, stamp):
+    """Generate the contents of the host-side command_client.py module."""
+    methods = '\n'.join(_client_method(name, spec) for name, spec in commands.items())
+
+    return f'''"""
+Fillhead Command Client
+Asyncio UDP client with one typed coroutine per command in commands.json.
+
+Commands are pipelined. By default no correlation IDs are sent, which is what the current firmware
+supports, and a terminal reply resolves the oldest command in flight whose name it echoes (e.g.
+"MACHINE_HOME_MOVE complete." answers machine_home); a reply that names no command only resolves
+a command that is alone in flight. With correlate=True each command carries a correlation
+ID that the device echoes in its START, DONE and ERROR replies (sim_farm does; the firmware
+parser does not yet), so each reply resolves the command that caused it, and an idempotent
+command (IDEMPOTENT_COMMANDS) is resent if nothing tagged with its ID arrives within the reply
+timeout. Motion, injection and other commands that must not run twice are never resent.
+
+AUTO-GENERATED FILE - DO NOT EDIT MANUALLY
+Generated from commands.json (source CRC-32 {stamp})
+To modify commands, edit commands.json and regenerate this file.
+
+Usage:
+    async with CommandClient('192.168.1.50') as fillhead:
+        await asyncio.gather(fillhead.injection_valve_open(), fillhead.vacuum_on(-14.0))
+        await fillhead.inject_stator(10.0, speed=0.5)
+"""
+import asyncio
+import itertools
+import math
+import re
+
+from .command_table import CORRELATION_PREFIX, COMMAND_IDS, IDEMPOTENT_COMMANDS, encode_command
+from .telemetry_codec import is_frame, split_datagram
+
+DEFAULT_PORT = {DEFAULT_COMMAND_PORT}
+DEFAULT_TIMEOUT = {DEFAULT_REPLY_TIMEOUT}
+DEFAULT_RETRIES = {DEFAULT_COMMAND_RETRIES}
+DEFAULT_COMPLETION_TIMEOUT = {DEFAULT_COMPLETION_TIMEOUT}
+DEFAULT_MAX_IN_FLIGHT = {DEFAULT_MAX_IN_FLIGHT}
+
+# Reply prefixes (device prefix removed) that finish a command, and those that report failure
+TERMINAL_REPLIES = ('DONE', 'ERROR', 'DISCOVERY', 'DISCOVERY_RESPONSE')
+ERROR_REPLIES = ('ERROR',)
+_DEVICE_PREFIXES = ('FILLHEAD_', 'INJ_')
+# Terminal replies that answer a command without naming it
+_REPLY_COMMANDS = {{'DISCOVERY': 'discover_device', 'DISCOVERY_RESPONSE': 'discover_device'}}
+_WORD = re.compile(r'[A-Za-z0-9_]+')
+
+
+class CommandError(RuntimeError):
+    """
+    Raised when the device answers a command with an ERROR reply.
+
+    Attributes:
+        command: Name of the failed command
+        reply: Reply text, without its prefix and correlation ID
+    """
+
+    def __init__(self, command, reply):
+        super().__init__(f"{{command}} failed: {{reply}}")
+        self.command = command
+        self.reply = reply
+
+
+def parse_reply(text):
+    """
+    Split a device message into its reply kind, body and correlation ID.
+
+    Args:
+        text: Message text, e.g. "FILLHEAD_DONE: jog_move #17"
+
+    Returns:
+        Tuple of (kind, body, correlation ID as int or None); kind is the prefix without
+        its device prefix (e.g. 'DONE'), or None if the message has no prefix
+    """
+    prefix, sep, body = text.partition(':')
+    if not sep:
+        return None, text.strip(), None
+    kind = prefix.strip().upper()
+    for device_prefix in _DEVICE_PREFIXES:
+        if kind.startswith(device_prefix):
+            kind = kind[len(device_prefix):]
+            break
+    body = body.strip()
+    head, _, last = body.rpartition(' ')
+    if last.startswith(CORRELATION_PREFIX) and last[len(CORRELATION_PREFIX):].isdigit():
+        return kind, head.rstrip(), int(last[len(CORRELATION_PREFIX):])
+    return kind, body, None
+
+
+def names_command(body, command):
+    """
+    Check whether a reply body echoes a command name.
+
+    Args:
+        body: Reply text without its prefix, e.g. "MACHINE_HOME_MOVE initiated."
+        command: Command name from commands.json, e.g. "machine_home"
+
+    Returns:
+        True if a word of body is the command name or extends it with '_' (case-insensitive)
+    """
+    name = command.upper()
+    return any(word == name or word.startswith(name + '_') for word in _WORD.findall(body.upper()))
+
+
+def _float(name, value):
+    if isinstance(value, bool):
+        raise ValueError(f"{{name}} must be a number, got {{value!r}}")
+    number = float(value)
+    if not math.isfinite(number):
+        raise ValueError(f"{{name}} must be finite, got {{value!r}}")
+    return repr(number)
+
+
+def _int(name, value):
+    if isinstance(value, bool) or int(value) != value:
+        raise ValueError(f"{{name}} must be an integer, got {{value!r}}")
+    return str(int(value))
+
+
+def _string(name, value):
+    text = str(value)
+    if not text or any(c.isspace() for c in text) or text.startswith(CORRELATION_PREFIX) or not text.isascii():
+        raise ValueError(f"{{name}} must be a single ASCII word, got {{value!r}}")
+    return text
+
+
+class _Pending:
+    __slots__ = ('command', 'future', 'acked')
+
+    def __init__(self, command, future):
+        self.command = command
+        self.future = future
+        self.acked = asyncio.Event()
+
+
+class _ClientProtocol(asyncio.DatagramProtocol):
+    def __init__(self, client):
+        self._client = client
+
+    def datagram_received(self, data, addr):
+        self._client._datagram_received(data)
+
+
+class CommandClient:
+    """
+    Pipelined command client for one fillhead.
+
+    Args:
+        host: Device IP address or host name
+        port: Device UDP port
+        timeout: Seconds to wait for the first reply to a command before resending it; only
+            used when correlate is True, since the firmware sends nothing before DONE for some
+            long-running commands
+        retries: Number of resends of an idempotent command before giving up; only used when
+            correlate is True, since without IDs a late reply to the first send cannot be told apart
+        completion_timeout: Seconds to wait for the terminal reply once the device has
+            answered (once the command is sent if correlate is False), or None to wait indefinitely
+        max_in_flight: Commands sent without a terminal reply yet, kept below the device's
+            RX queue size
+        correlate: If True, append a correlation ID to every command; only for devices that echo
+            it (sim_farm). The firmware parser rejects the extra argument, so by default no IDs
+            are sent and replies are matched by the command name they echo
+        on_message: Optional callback(message) for every message that does not answer a
+            command, such as telemetry and INFO messages; message is bytes for binary frames
+            and str otherwise
+    """
+
+    def __init__(self, host, port=DEFAULT_PORT, timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES,
+                 completion_timeout=DEFAULT_COMPLETION_TIMEOUT, max_in_flight=DEFAULT_MAX_IN_FLIGHT,
+                 correlate=False, on_message=None):
+        if max_in_flight < 1:
+            raise ValueError(f"max_in_flight must be at least 1, got {{max_in_flight}}")
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.retries = retries if correlate else 0
+        self.completion_timeout = completion_timeout
+        self.correlate = correlate
+        self.on_message = on_message
+        self._transport = None
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._ids = itertools.count(1)
+        self._pending = {{}}
+
+    async def connect(self, local_port=0, discover=True):
+        """
+        Open the UDP endpoint and, by default, register it as the device's GUI address so
+        replies and telemetry are sent here.
+
+        Args:
+            local_port: Local UDP port to bind (0 picks a free port)
+            discover: Send discover_device with this client's port
+        """
+        loop = asyncio.get_running_loop()
+        self._transport, _ = await loop.create_datagram_endpoint(
+            lambda: _ClientProtocol(self), local_addr=('0.0.0.0', local_port), remote_addr=(self.host, self.port))
+        if discover:
+            await self.send('discover_device', [f"PORT={{self._transport.get_extra_info('sockname')[1]}}"])
+
+    def close(self):
+        """Close the UDP endpoint and fail every command still waiting for a reply."""
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+        for pending in self._pending.values():
+            if not pending.future.done():
+                pending.future.set_exception(ConnectionError("Command client closed"))
+        self._pending.clear()
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+    @property
+    def in_flight(self):
+        """Number of commands sent that have not had a terminal reply yet."""
+        return len(self._pending)
+
+    async def send(self, command, args=(), timeout=None, completion_timeout=None):
+        """
+        Send a command and wait for its terminal reply.
+
+        Args:
+            command: Command name from commands.json
+            args: Already formatted argument strings
+            timeout: Overrides the client's reply timeout for this command
+            completion_timeout: Overrides the client's completion timeout for this command
+
+        Returns:
+            Reply text, without its prefix and correlation ID
+
+        Raises:
+            KeyError: If the command is not defined in commands.json
+            CommandError: If the device replies with an error
+            TimeoutError: If no reply or no terminal reply arrives in time
+        """
+        if command not in COMMAND_IDS:
+            raise KeyError(f"Unknown command: {{command}}")
+        if self._transport is None:
+            raise RuntimeError("Command client is not connected")
+        timeout = self.timeout if timeout is None else timeout
+        completion_timeout = self.completion_timeout if completion_timeout is None else completion_timeout
+
+        async with self._slots:
+            key = next(self._ids)
+            payload = encode_command(command, args, key if self.correlate else None)
+            pending = _Pending(command, asyncio.get_running_loop().create_future())
+            self._pending[key] = pending
+            attempts = self.retries + 1 if command in IDEMPOTENT_COMMANDS else 1
+            try:
+                self._transport.sendto(payload)
+                if self.correlate:
+                    await self._wait_for_ack(pending, payload, attempts, timeout)
+                try:
+                    return await asyncio.wait_for(pending.future, completion_timeout)
+                except asyncio.TimeoutError:
+                    raise TimeoutError(f"{{command}} did not complete within {{completion_timeout}} s") from None
+            finally:
+                self._pending.pop(key, None)
+
+    async def _wait_for_ack(self, pending, payload, attempts, timeout):
+        for attempt in range(1, attempts + 1):
+            try:
+                await asyncio.wait_for(pending.acked.wait(), timeout)
+                return
+            except asyncio.TimeoutError:
+                if attempt < attempts:
+                    self._transport.sendto(payload)
+        raise TimeoutError(f"No reply to {{pending.command}} after {{attempts}} attempt(s)")
+
+    def _datagram_received(self, data):
+        for message in split_datagram(data):
+            if is_frame(message):
+                if self.on_message is not None:
+                    self.on_message(message)
+            else:
+                self._handle_message(message.decode('ascii', errors='replace'))
+
+    def _handle_message(self, text):
+        kind, body, key = parse_reply(text)
+        terminal = kind in TERMINAL_REPLIES
+        if key is not None:
+            pending = self._pending.get(key)
+        elif terminal and not self.correlate:
+            pending = self._match_reply(kind, body)
+        else:
+            pending = None
+        if pending is None or pending.future.done():
+            if self.on_message is not None:
+                self.on_message(text)
+            return
+
+        pending.acked.set()
+        if not terminal:
+            if self.on_message is not None:
+                self.on_message(text)
+        elif kind in ERROR_REPLIES:
+            pending.future.set_exception(CommandError(pending.command, body))
+        else:
+            pending.future.set_result(body)
+
+    def _match_reply(self, kind, body):
+        """Returns the command an uncorrelated terminal reply answers, or None if it is not known."""
+        waiting = [pending for pending in self._pending.values() if not pending.future.done()]
+        command = _REPLY_COMMANDS.get(kind)
+        for pending in waiting:
+            if pending.command == command or names_command(body, pending.command):
+                return pending
+        return waiting[0] if len(waiting) == 1 else None
+
+    #----------------------------------------------------------------------------------------------
+    # Commands
+    #----------------------------------------------------------------------------------------------
+
+{methods}'''
+
+
+#==================================================================================================
+# schema_cache.py
+#==================================================================================================
+
+# Definitions that runtime modules load through schema.load_definition()
+SCHEMA_CACHE_FILES = ('telemetry.json', 'commands.json', 'diagnostics.json', 'events.json')
+
+
+def generate_schema_cache(sources, stamp):
+    """
+    Generate the contents of the schema_cache.py module.
+
+    Args:
+        sources: Mapping of definition file name to its raw bytes
+        stamp: Content stamp of the sources for the header
+    """
+    crcs = ''.join(f"    '{name}': 0x{source_crc(data):08X},\n" for name, data in sources.items())
+    definitions = {name: json.loads(data.decode('utf-8')) for name, data in sources.items()}
+    return f'''"""
+Fillhead Schema Cache
+Parsed copies of the JSON definitions, so loading them at runtime is an import of this module's
+bytecode instead of a JSON parse. Read through schema.load_definition(), which only uses an entry
+while the CRC-32 of its JSON file still matches.
+
+AUTO-GENERATED FILE - DO NOT EDIT MANUALLY
+Generated from {', '.join(sources)} (source CRC-32 {stamp})
+To modify a definition, edit its JSON file and regenerate this file.
+"""
+
+# File name -> CRC-32 of the JSON the entry was parsed from
+SOURCE_CRCS = {{
+{crcs}}}
+
+# File name -> parsed definition
+DEFINITIONS = {pprint.pformat(definitions, width=110, sort_dicts=False)}
+'''
+
+
+#==================================================================================================
+# Validation
+#==================================================================================================
+
+# Python types of simulator state values, per telemetry type (bools are sent as 0/1)
+SIMULATOR_VALUE_TYPES = {
+    'int': (int,),
+    'float': (float, int),
+    'bool': (int,),
+}
+
+
+def _validate_telemetry(telemetry):
+    problems = []
+    for name, spec in telemetry.items():
+        if spec.get('type') not in C_TYPES:
+            problems.append(f"telemetry.json: {name} has unsupported type {spec.get('type')!r}")
+            continue
+        value_map = spec.get('map')
+        if value_map is None:
+            continue
+        if spec['type'] == 'float':
+            problems.append(f"telemetry.json: {name} is a float field with a value map")
+        if not all(key.lstrip('-').isdigit() for key in value_map):
+            problems.append(f"telemetry.json: {name} has non-integer map keys")
+        elif str(int(spec.get('default', 0))) not in value_map:
+            problems.append(f"telemetry.json: {name} default {spec.get('default', 0)!r} is not in its map")
+    return problems
+
+
+def _validate_commands(commands):
+    problems = []
+    for name, spec in commands.items():
+        if not isinstance(spec.get('idempotent', False), bool):
+            problems.append(f"commands.json: {name}.idempotent must be true or false")
+        optional = False
+        for param in spec.get('params', ()):
+            if param['type'] not in ARG_CONVERTERS:
+                problems.append(f"commands.json: {name}.{param['parameter']} has unsupported type {param['type']!r}")
+            if optional and not param.get('optional'):
+                problems.append(f"commands.json: {name}.{param['parameter']} is required but follows an optional parameter")
+            optional = optional or bool(param.get('optional'))
+    return problems
+
+
+def _validate_messages(filename, messages, commands, seen):
+    """Checks events.json / warnings.json entries against the command set and each other."""
+    problems = []
+    devices = {spec.get('device') for spec in commands.values()}
+    for name, spec in messages.items():
+        if name in commands:
+            problems.append(f"{filename}: {name} has the same name as a command")
+        if name in seen:
+            problems.append(f"{filename}: {name} is also defined in {seen[name]}")
+        seen[name] = filename
+        if spec.get('device') not in devices:
+            problems.append(f"{filename}: {name} is for unknown device {spec.get('device')!r}")
+        for param in spec.get('params', ()):
+            if param.get('type') not in ARG_CONVERTERS:
+                problems.append(f"{filename}: {name}.{param.get('parameter')} has unsupported type {param.get('type')!r}")
+    return problems
+
+
+def simulator_state(source):
+    """
+    Read the simulator's state keys from the source of simulator.py without importing it.
+
+    Args:
+        source: Text of simulator.py
+
+    Returns:
+        (state, internal_keys): the dict literal returned by initial_state(), mapping each key to its
+        value (None where the value is not a literal or module constant), and the INTERNAL_KEYS tuple
+    """
+    tree = ast.parse(source)
+    constants = {}
+    state = None
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            try:
+                constants[node.targets[0].id] = ast.literal_eval(node.value)
+            except ValueError:
+                pass
+        elif isinstance(node, ast.FunctionDef) and node.name == 'initial_state':
+            returns = [child.value for child in ast.walk(node) if isinstance(child, ast.Return)]
+            if len(returns) != 1 or not isinstance(returns[0], ast.Dict):
+                raise ValueError("simulator.initial_state() must return a single dict literal")
+            state = {}
+            for key, value in zip(returns[0].keys, returns[0].values):
+                if isinstance(value, ast.Name):
+                    state[key.value] = constants.get(value.id)
+                else:
+                    try:
+                        state[key.value] = ast.literal_eval(value)
+                    except ValueError:
+                        state[key.value] = None
+    if state is None:
+        raise ValueError("simulator.py does not define initial_state()")
+    internal_keys = tuple(constants.get('INTERNAL_KEYS', ()))
+    return state, internal_keys
+
+
+def _validate_simulator(source, telemetry):
+    problems = []
+    state, internal_keys = simulator_state(source)
+    for key in internal_keys:
+        if key in telemetry:
+            problems.append(f"simulator.py: internal key {key} is a telemetry field")
+    for key, value in state.items():
+        if key in internal_keys:
+            continue
+        spec = telemetry.get(key)
+        if spec is None:
+            problems.append(f"simulator.py: state key {key} is not a telemetry.json field")
+        elif value is not None and (isinstance(value, bool) or
+                                    not isinstance(value, SIMULATOR_VALUE_TYPES.get(spec['type'], ()))):
+            problems.append(f"simulator.py: state key {key} = {value!r} does not match telemetry type {spec['type']}")
+        elif value is not None and 'map' in spec and str(value) not in spec['map']:
+            problems.append(f"simulator.py: state key {key} = {value!r} is not in its telemetry.json map")
+    for key in telemetry:
+        if key not in state:
+            problems.append(f"simulator.py: telemetry field {key} is missing from initial_state()")
+    return problems
+
+
+def validate_definitions(sources):
+    """
+    Check the definitions for errors and for drift between files.
+
+    Beyond per-file checks (field and parameter types, value maps), this checks that events.json
+    and warnings.json entries name a known device and do not shadow commands or each other, and
+    that the simulator's state holds exactly the telemetry.json fields with values of their type.
+
+    Args:
+        sources: Mapping of file name to raw bytes for VALIDATED_FILES
+
+    Returns:
+        List of problem descriptions; empty if the definitions are consistent
+    """
+    definitions = {name: json.loads(data.decode('utf-8')) for name, data in sources.items() if name.endswith('.json')}
+    telemetry = definitions['telemetry.json']
+    commands = definitions['commands.json']
+    problems = _validate_telemetry(telemetry) + _validate_commands(commands)
+    seen = {}
+    for name in ('events.json', 'warnings.json'):
+        problems += _validate_messages(name, definitions[name], commands, seen)
+    problems += _validate_simulator(sources['simulator.py'].decode('utf-8'), telemetry)
+    return problems
+
+
+#==================================================================================================
+# Entry Point
+#==================================================================================================
+
+# Generated file -> (generator, definition files its content is derived from)
+ARTIFACTS = {
+    'telemetry.h': (generate_telemetry_header, ('telemetry.json',)),
+    'telemetry.cpp': (generate_telemetry_source, ('telemetry.json',)),
+    'telemetry_codec.py': (generate_telemetry_codec, ('telemetry.json',)),
+    'telemetry_record.py': (generate_telemetry_record, ('telemetry.json',)),
+    'commands.h': (generate_commands_header, ('commands.json',)),
+    'command_parser.h': (generate_command_parser_header, ('commands.json',)),
+    'command_parser.cpp': (generate_command_parser_source, ('commands.json',)),
+    'command_table.py': (generate_command_table, ('commands.json',)),
+    'command_client.py': (generate_command_client, ('commands.json',)),
+    'schema_cache.py': (generate_schema_cache, SCHEMA_CACHE_FILES),
+}
+
+# Inputs of validate_definitions()
+VALIDATED_FILES = ('telemetry.json', 'commands.json', 'events.json', 'warnings.json', 'simulator.py')
+
+# Build cache: CRC-32s of the inputs that last validated and of each artifact and its inputs
+MANIFEST_FILE = '.codegen_manifest.json'
+
+
+def _read(path):
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def _load_manifest(path):
+    data = _read(path)
+    if data is None:
+        return {}
+    try:
+        manifest = json.loads(data.decode('utf-8'))
+    except ValueError:
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+
+def generate_all(output_dir=DEFINITION_DIR, force=False, check=False):
+    """
+    Regenerate the artifacts derived from the JSON definitions whose inputs changed.
+
+    Every input is identified by its CRC-32, together with this generator's own source, and each
+    artifact is stamped with the CRC of the definitions it was built from rather than a time, so
+    regenerating an unchanged schema produces identical files. A file is only rewritten when its
+    content differs, which keeps its modification time and spares the firmware a rebuild. The
+    manifest in output_dir records the inputs that last passed validate_definitions() and those
+    each artifact was built from, so an up-to-date artifact is not even regenerated.
+
+    Args:
+        output_dir: Directory to write the generated files into
+        force: Ignore the manifest and regenerate (but still only rewrite changed files)
+        check: Only report the artifacts that are out of date; write nothing
+
+    Returns:
+        List of file paths written (or, with check, that would be written)
+
+    Raises:
+        ValueError: If the definitions fail validation
+    """
+    names = set(VALIDATED_FILES).union(*(deps for _, deps in ARTIFACTS.values()))
+    sources = {name: _read(os.path.join(DEFINITION_DIR, name)) for name in sorted(names)}
+    crcs = {name: source_crc(data) for name, data in sources.items()}
+    generator_crc = source_crc(_read(os.path.abspath(__file__)))
+    manifest_path = os.path.join(output_dir, MANIFEST_FILE)
+    manifest = {} if force else _load_manifest(manifest_path)
+    outputs = manifest.get('outputs', {})
+
+    validated = {name: crcs[name] for name in VALIDATED_FILES}
+    validated['codegen.py'] = generator_crc
+    if manifest.get('validated') != validated:
+        problems = validate_definitions({name: sources[name] for name in VALIDATED_FILES})
+        if problems:
+            raise ValueError("Definition errors:\n  " + '\n  '.join(problems))
+
+    parsed = {}
+    written = []
+    for filename, (generate, deps) in ARTIFACTS.items():
+        path = os.path.join(output_dir, filename)
+        inputs = {name: crcs[name] for name in deps}
+        inputs['codegen.py'] = generator_crc
+        existing = _read(path)
+        entry = outputs.get(filename)
+        if (entry is not None and entry.get('inputs') == inputs and existing is not None
+                and entry.get('crc') == source_crc(existing)):
+            continue
+        stamp = f"{source_crc(b''.join(sources[name] for name in deps)):08X}"
+        if filename == 'schema_cache.py':
+            content = generate({name: sources[name] for name in deps}, stamp)
+        else:
+            if deps[0] not in parsed:
+                parsed[deps[0]] = json.loads(sources[deps[0]].decode('utf-8'))
+            content = generate(parsed[deps[0]], stamp)
+        data = content.encode('utf-8')
+        if data != existing:
+            written.append(path)
+            if not check:
+                with open(path, 'wb') as f:
+                    f.write(data)
+        outputs[filename] = {'inputs': inputs, 'crc': source_crc(data)}
+
+    if not check:
+        with open(manifest_path, 'w', encoding='utf-8', newline='\n') as f:
+            json.dump({'validated': validated, 'outputs': outputs}, f, indent=4)
+            f.write('\n')
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Regenerate the firmware and host code derived from the JSON definitions.")
+    parser.add_argument('--force', action='store_true', help="ignore the build manifest and regenerate every file")
+    parser.add_argument('--check', action='store_true',
+                        help="list out-of-date files without writing them; exit 1 if there are any")
+    args = parser.parse_args()
+    try:
+        paths = generate_all(force=args.force, check=args.check)
+    except ValueError as exc:
+        sys.exit(str(exc))
+    verb = "Out of date" if args.check else "Generated"
+    for path in paths:
+        print(f"{verb} {os.path.relpath(path, DEFINITION_DIR)}")
+    if not paths:
+        print("Generated files are up to date")
+    elif args.check:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
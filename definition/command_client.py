@@ -0,0 +1,641 @@
+"""
+Fillhead Command Client
+Asyncio UDP client with one typed coroutine per command in commands.json.
+
+Commands are pipelined. By default no correlation IDs are sent, which is what the current firmware
+supports, and a terminal reply resolves the oldest command in flight whose name it echoes (e.g.
+"MACHINE_HOME_MOVE complete." answers machine_home); a reply that names no command only resolves
+a command that is alone in flight. With correlate=True each command carries a correlation
+ID that the device echoes in its START, DONE and ERROR replies (sim_farm does; the firmware
+parser does not yet), so each reply resolves the command that caused it, and an idempotent
+command (IDEMPOTENT_COMMANDS) is resent if nothing tagged with its ID arrives within the reply
+timeout. Motion, injection and other commands that must not run twice are never resent.
+
+AUTO-GENERATED FILE - DO NOT EDIT MANUALLY
+Generated from commands.json (source CRC-32 B4AC7350)
+To modify commands, edit commands.json and regenerate this file.
+
+Usage:
+    async with CommandClient('192.168.1.50') as fillhead:
+        await asyncio.gather(fillhead.injection_valve_open(), fillhead.vacuum_on(-14.0))
+        await fillhead.inject_stator(10.0, speed=0.5)
+"""
+import asyncio
+import itertools
+import math
+import re
+
+from .command_table import CORRELATION_PREFIX, COMMAND_IDS, IDEMPOTENT_COMMANDS, encode_command
+from .telemetry_codec import is_frame, split_datagram
+
+DEFAULT_PORT = 8888
+DEFAULT_TIMEOUT = 0.5
+DEFAULT_RETRIES = 3
+DEFAULT_COMPLETION_TIMEOUT = 60.0
+DEFAULT_MAX_IN_FLIGHT = 16
+
+# Reply prefixes (device prefix removed) that finish a command, and those that report failure
+TERMINAL_REPLIES = ('DONE', 'ERROR', 'DISCOVERY', 'DISCOVERY_RESPONSE')
+ERROR_REPLIES = ('ERROR',)
+_DEVICE_PREFIXES = ('FILLHEAD_', 'INJ_')
+# Terminal replies that answer a command without naming it
+_REPLY_COMMANDS = {'DISCOVERY': 'discover_device', 'DISCOVERY_RESPONSE': 'discover_device'}
+_WORD = re.compile(r'[A-Za-z0-9_]+')
+
+
+class CommandError(RuntimeError):
+    """
+    Raised when the device answers a command with an ERROR reply.
+
+    Attributes:
+        command: Name of the failed command
+        reply: Reply text, without its prefix and correlation ID
+    """
+
+    def __init__(self, command, reply):
+        super().__init__(f"{command} failed: {reply}")
+        self.command = command
+        self.reply = reply
+
+
+def parse_reply(text):
+    """
+    Split a device message into its reply kind, body and correlation ID.
+
+    Args:
+        text: Message text, e.g. "FILLHEAD_DONE: jog_move #17"
+
+    Returns:
+        Tuple of (kind, body, correlation ID as int or None); kind is the prefix without
+        its device prefix (e.g. 'DONE'), or None if the message has no prefix
+    """
+    prefix, sep, body = text.partition(':')
+    if not sep:
+        return None, text.strip(), None
+    kind = prefix.strip().upper()
+    for device_prefix in _DEVICE_PREFIXES:
+        if kind.startswith(device_prefix):
+            kind = kind[len(device_prefix):]
+            break
+    body = body.strip()
+    head, _, last = body.rpartition(' ')
+    if last.startswith(CORRELATION_PREFIX) and last[len(CORRELATION_PREFIX):].isdigit():
+        return kind, head.rstrip(), int(last[len(CORRELATION_PREFIX):])
+    return kind, body, None
+
+
+def names_command(body, command):
+    """
+    Check whether a reply body echoes a command name.
+
+    Args:
+        body: Reply text without its prefix, e.g. "MACHINE_HOME_MOVE initiated."
+        command: Command name from commands.json, e.g. "machine_home"
+
+    Returns:
+        True if a word of body is the command name or extends it with '_' (case-insensitive)
+    """
+    name = command.upper()
+    return any(word == name or word.startswith(name + '_') for word in _WORD.findall(body.upper()))
+
+
+def _float(name, value):
+    if isinstance(value, bool):
+        raise ValueError(f"{name} must be a number, got {value!r}")
+    number = float(value)
+    if not math.isfinite(number):
+        raise ValueError(f"{name} must be finite, got {value!r}")
+    return repr(number)
+
+
+def _int(name, value):
+    if isinstance(value, bool) or int(value) != value:
+        raise ValueError(f"{name} must be an integer, got {value!r}")
+    return str(int(value))
+
+
+def _string(name, value):
+    text = str(value)
+    if not text or any(c.isspace() for c in text) or text.startswith(CORRELATION_PREFIX) or not text.isascii():
+        raise ValueError(f"{name} must be a single ASCII word, got {value!r}")
+    return text
+
+
+class _Pending:
+    __slots__ = ('command', 'future', 'acked')
+
+    def __init__(self, command, future):
+        self.command = command
+        self.future = future
+        self.acked = asyncio.Event()
+
+
+class _ClientProtocol(asyncio.DatagramProtocol):
+    def __init__(self, client):
+        self._client = client
+
+    def datagram_received(self, data, addr):
+        self._client._datagram_received(data)
+
+
+class CommandClient:
+    """
+    Pipelined command client for one fillhead.
+
+    Args:
+        host: Device IP address or host name
+        port: Device UDP port
+        timeout: Seconds to wait for the first reply to a command before resending it; only
+            used when correlate is True, since the firmware sends nothing before DONE for some
+            long-running commands
+        retries: Number of resends of an idempotent command before giving up; only used when
+            correlate is True, since without IDs a late reply to the first send cannot be told apart
+        completion_timeout: Seconds to wait for the terminal reply once the device has
+            answered (once the command is sent if correlate is False), or None to wait indefinitely
+        max_in_flight: Commands sent without a terminal reply yet, kept below the device's
+            RX queue size
+        correlate: If True, append a correlation ID to every command; only for devices that echo
+            it (sim_farm). The firmware parser rejects the extra argument, so by default no IDs
+            are sent and replies are matched by the command name they echo
+        on_message: Optional callback(message) for every message that does not answer a
+            command, such as telemetry and INFO messages; message is bytes for binary frames
+            and str otherwise
+    """
+
+    def __init__(self, host, port=DEFAULT_PORT, timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES,
+                 completion_timeout=DEFAULT_COMPLETION_TIMEOUT, max_in_flight=DEFAULT_MAX_IN_FLIGHT,
+                 correlate=False, on_message=None):
+        if max_in_flight < 1:
+            raise ValueError(f"max_in_flight must be at least 1, got {max_in_flight}")
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.retries = retries if correlate else 0
+        self.completion_timeout = completion_timeout
+        self.correlate = correlate
+        self.on_message = on_message
+        self._transport = None
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._ids = itertools.count(1)
+        self._pending = {}
+
+    async def connect(self, local_port=0, discover=True):
+        """
+        Open the UDP endpoint and, by default, register it as the device's GUI address so
+        replies and telemetry are sent here.
+
+        Args:
+            local_port: Local UDP port to bind (0 picks a free port)
+            discover: Send discover_device with this client's port
+        """
+        loop = asyncio.get_running_loop()
+        self._transport, _ = await loop.create_datagram_endpoint(
+            lambda: _ClientProtocol(self), local_addr=('0.0.0.0', local_port), remote_addr=(self.host, self.port))
+        if discover:
+            await self.send('discover_device', [f"PORT={self._transport.get_extra_info('sockname')[1]}"])
+
+    def close(self):
+        """Close the UDP endpoint and fail every command still waiting for a reply."""
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+        for pending in self._pending.values():
+            if not pending.future.done():
+                pending.future.set_exception(ConnectionError("Command client closed"))
+        self._pending.clear()
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+    @property
+    def in_flight(self):
+        """Number of commands sent that have not had a terminal reply yet."""
+        return len(self._pending)
+
+    async def send(self, command, args=(), timeout=None, completion_timeout=None):
+        """
+        Send a command and wait for its terminal reply.
+
+        Args:
+            command: Command name from commands.json
+            args: Already formatted argument strings
+            timeout: Overrides the client's reply timeout for this command
+            completion_timeout: Overrides the client's completion timeout for this command
+
+        Returns:
+            Reply text, without its prefix and correlation ID
+
+        Raises:
+            KeyError: If the command is not defined in commands.json
+            CommandError: If the device replies with an error
+            TimeoutError: If no reply or no terminal reply arrives in time
+        """
+        if command not in COMMAND_IDS:
+            raise KeyError(f"Unknown command: {command}")
+        if self._transport is None:
+            raise RuntimeError("Command client is not connected")
+        timeout = self.timeout if timeout is None else timeout
+        completion_timeout = self.completion_timeout if completion_timeout is None else completion_timeout
+
+        async with self._slots:
+            key = next(self._ids)
+            payload = encode_command(command, args, key if self.correlate else None)
+            pending = _Pending(command, asyncio.get_running_loop().create_future())
+            self._pending[key] = pending
+            attempts = self.retries + 1 if command in IDEMPOTENT_COMMANDS else 1
+            try:
+                self._transport.sendto(payload)
+                if self.correlate:
+                    await self._wait_for_ack(pending, payload, attempts, timeout)
+                try:
+                    return await asyncio.wait_for(pending.future, completion_timeout)
+                except asyncio.TimeoutError:
+                    raise TimeoutError(f"{command} did not complete within {completion_timeout} s") from None
+            finally:
+                self._pending.pop(key, None)
+
+    async def _wait_for_ack(self, pending, payload, attempts, timeout):
+        for attempt in range(1, attempts + 1):
+            try:
+                await asyncio.wait_for(pending.acked.wait(), timeout)
+                return
+            except asyncio.TimeoutError:
+                if attempt < attempts:
+                    self._transport.sendto(payload)
+        raise TimeoutError(f"No reply to {pending.command} after {attempts} attempt(s)")
+
+    def _datagram_received(self, data):
+        for message in split_datagram(data):
+            if is_frame(message):
+                if self.on_message is not None:
+                    self.on_message(message)
+            else:
+                self._handle_message(message.decode('ascii', errors='replace'))
+
+    def _handle_message(self, text):
+        kind, body, key = parse_reply(text)
+        terminal = kind in TERMINAL_REPLIES
+        if key is not None:
+            pending = self._pending.get(key)
+        elif terminal and not self.correlate:
+            pending = self._match_reply(kind, body)
+        else:
+            pending = None
+        if pending is None or pending.future.done():
+            if self.on_message is not None:
+                self.on_message(text)
+            return
+
+        pending.acked.set()
+        if not terminal:
+            if self.on_message is not None:
+                self.on_message(text)
+        elif kind in ERROR_REPLIES:
+            pending.future.set_exception(CommandError(pending.command, body))
+        else:
+            pending.future.set_result(body)
+
+    def _match_reply(self, kind, body):
+        """Returns the command an uncorrelated terminal reply answers, or None if it is not known."""
+        waiting = [pending for pending in self._pending.values() if not pending.future.done()]
+        command = _REPLY_COMMANDS.get(kind)
+        for pending in waiting:
+            if pending.command == command or names_command(body, pending.command):
+                return pending
+        return waiting[0] if len(waiting) == 1 else None
+
+    #----------------------------------------------------------------------------------------------
+    # Commands
+    #----------------------------------------------------------------------------------------------
+
+    async def enable(self, *, timeout=None, completion_timeout=None):
+        """
+        Command to enable all motors.
+
+        Returns:
+            Reply text, without its prefix and correlation ID
+        """
+        return await self.send('enable', (), timeout=timeout, completion_timeout=completion_timeout)
+
+    async def disable(self, *, timeout=None, completion_timeout=None):
+        """
+        Command to disable all motors.
+
+        Returns:
+            Reply text, without its prefix and correlation ID
+        """
+        return await self.send('disable', (), timeout=timeout, completion_timeout=completion_timeout)
+
+    async def discover_device(self, *, timeout=None, completion_timeout=None):
+        """
+        Generic command for any device to respond to.
+
+        Returns:
+            Reply text, without its prefix and correlation ID
+        """
+        return await self.send('discover_device', (), timeout=timeout, completion_timeout=completion_timeout)
+
+    async def abort(self, *, timeout=None, completion_timeout=None):
+        """
+        Command to halt all ongoing operations.
+
+        Returns:
+            Reply text, without its prefix and correlation ID
+        """
+        return await self.send('abort', (), timeout=timeout, completion_timeout=completion_timeout)
+
+    async def clear_errors(self, *, timeout=None, completion_timeout=None):
+        """
+        Command to clear any existing fault states.
+
+        Returns:
+            Reply text, without its prefix and correlation ID
+        """
+        return await self.send('clear_errors', (), timeout=timeout, completion_timeout=completion_timeout)
+
+    async def request_keyframe(self, *, timeout=None, completion_timeout=None):
+        """
+        Command to send a full telemetry keyframe next, e.g. after the host detects a sequence gap.
+
+        Returns:
+            Reply text, without its prefix and correlation ID
+        """
+        return await self.send('request_keyframe', (), timeout=timeout, completion_timeout=completion_timeout)
+
+    async def inject_stator(self, volume, speed=None, *, timeout=None, completion_timeout=None):
+        """
+        Command to dispense a specific volume using the stator (5:1) configuration.
+
+        Args:
+            volume: Float in ml
+            speed: Float in ml/s (optional)
+
+        Returns:
+            Reply text, without its prefix and correlation ID
+        """
+        args = [_float('volume', volume)]
+        if speed is not None:
+            args.append(_float('speed', speed))
+        return await self.send('inject_stator', args, timeout=timeout, completion_timeout=completion_timeout)
+
+    async def inject_rotor(self, volume, speed=None, *, timeout=None, completion_timeout=None):
+        """
+        Command to dispense a specific volume using the rotor (1:1) configuration.
+
+        Args:
+            volume: Float in ml
+            speed: Float in ml/s (optional)
+
+        Returns:
+            Reply text, without its prefix and correlation ID
+        """
+        args = [_float('volume', volume)]
+        if speed is not None:
+            args.append(_float('speed', speed))
+        return await self.send('inject_rotor', args, timeout=timeout, completion_timeout=completion_timeout)
+
+    async def jog_move(self, distance, *, timeout=None, completion_timeout=None):
+        """
+        Command to jog the injector motors by a relative distance.
+
+        Args:
+            distance: Float in mm
+
+        Returns:
+            Reply text, without its prefix and correlation ID
+        """
+        args = [_float('distance', distance)]
+        return await self.send('jog_move', args, timeout=timeout, completion_timeout=completion_timeout)
+
+    async def machine_home(self, *, timeout=None, completion_timeout=None):
+        """
+        Command to home the main machine axis.
+
+        Returns:
+            Reply text, without its prefix and correlation ID
+        """
+        return await self.send('machine_home', (), timeout=timeout, completion_timeout=completion_timeout)
+
+    async def cartridge_home(self, *, timeout=None, completion_timeout=None):
+        """
+        Command to home the injector against the cartridge.
+
+        Returns:
+            Reply text, without its prefix and correlation ID
+        """
+        return await self.send('cartridge_home', (), timeout=timeout, completion_timeout=completion_timeout)
+
+    async def move_to_cartridge_home(self, *, timeout=None, completion_timeout=None):
+        """
+        Command to move the injector to the cartridge home position.
+
+        Returns:
+            Reply text, without its prefix and correlation ID
+        """
+        return await self.send('move_to_cartridge_home', (), timeout=timeout, completion_timeout=completion_timeout)
+
+    async def move_to_cartridge_retract(self, distance, *, timeout=None, completion_timeout=None):
+        """
+        Command to retract the injector a specified distance from cartridge home.
+
+        Args:
+            distance: Float in mm
+
+        Returns:
+            Reply text, without its prefix and correlation ID
+        """
+        args = [_float('distance', distance)]
+        return await self.send('move_to_cartridge_retract', args, timeout=timeout, completion_timeout=completion_timeout)
+
+    async def pause_injection(self, *, timeout=None, completion_timeout=None):
+        """
+        Command to pause an ongoing injection.
+
+        Returns:
+            Reply text, without its prefix and correlation ID
+        """
+        return await self.send('pause_injection', (), timeout=timeout, completion_timeout=completion_timeout)
+
+    async def resume_injection(self, *, timeout=None, completion_timeout=None):
+        """
+        Command to resume a paused injection.
+
+        Returns:
+            Reply text, without its prefix and correlation ID
+        """
+        return await self.send('resume_injection', (), timeout=timeout, completion_timeout=completion_timeout)
+
+    async def cancel_injection(self, *, timeout=None, completion_timeout=None):
+        """
+        Command to cancel an ongoing injection.
+
+        Returns:
+            Reply text, without its prefix and correlation ID
+        """
+        return await self.send('cancel_injection', (), timeout=timeout, completion_timeout=completion_timeout)
+
+    async def vacuum_on(self, target=None, *, timeout=None, completion_timeout=None):
+        """
+        Command to turn the vacuum pump on.
+
+        Args:
+            target: Float in psi (optional)
+
+        Returns:
+            Reply text, without its prefix and correlation ID
+        """
+        args = []
+        if target is not None:
+            args.append(_float('target', target))
+        return await self.send('vacuum_on', args, timeout=timeout, completion_timeout=completion_timeout)
+
+    async def vacuum_off(self, *, timeout=None, completion_timeout=None):
+        """
+        Command to turn the vacuum pump off.
+
+        Returns:
+            Reply text, without its prefix and correlation ID
+        """
+        return await self.send('vacuum_off', (), timeout=timeout, completion_timeout=completion_timeout)
+
+    async def vacuum_leak_test(self, delta=None, duration=None, *, timeout=None, completion_timeout=None):
+        """
+        Command to initiate a vacuum leak test.
+
+        Args:
+            delta: Float in psi (optional)
+            duration: Float in s (optional)
+
+        Returns:
+            Reply text, without its prefix and correlation ID
+        """
+        args = []
+        if delta is not None:
+            args.append(_float('delta', delta))
+        if duration is not None:
+            if delta is None:
+                raise ValueError("duration requires delta")
+            args.append(_float('duration', duration))
+        return await self.send('vacuum_leak_test', args, timeout=timeout, completion_timeout=completion_timeout)
+
+    async def heater_on(self, setpoint=None, *, timeout=None, completion_timeout=None):
+        """
+        Command to turn the heater on.
+
+        Args:
+            setpoint: Float in C (optional)
+
+        Returns:
+            Reply text, without its prefix and correlation ID
+        """
+        args = []
+        if setpoint is not None:
+            args.append(_float('setpoint', setpoint))
+        return await self.send('heater_on', args, timeout=timeout, completion_timeout=completion_timeout)
+
+    async def heater_off(self, *, timeout=None, completion_timeout=None):
+        """
+        Command to turn the heater off.
+
+        Returns:
+            Reply text, without its prefix and correlation ID
+        """
+        return await self.send('heater_off', (), timeout=timeout, completion_timeout=completion_timeout)
+
+    async def injection_valve_home(self, *, timeout=None, completion_timeout=None):
+        """
+        Command to home the injection valve.
+
+        Returns:
+            Reply text, without its prefix and correlation ID
+        """
+        return await self.send('injection_valve_home', (), timeout=timeout, completion_timeout=completion_timeout)
+
+    async def injection_valve_open(self, *, timeout=None, completion_timeout=None):
+        """
+        Command to open the injection valve.
+
+        Returns:
+            Reply text, without its prefix and correlation ID
+        """
+        return await self.send('injection_valve_open', (), timeout=timeout, completion_timeout=completion_timeout)
+
+    async def injection_valve_close(self, *, timeout=None, completion_timeout=None):
+        """
+        Command to close the injection valve.
+
+        Returns:
+            Reply text, without its prefix and correlation ID
+        """
+        return await self.send('injection_valve_close', (), timeout=timeout, completion_timeout=completion_timeout)
+
+    async def injection_valve_jog(self, distance, *, timeout=None, completion_timeout=None):
+        """
+        Command to jog the injection valve motor.
+
+        Args:
+            distance: Float in mm
+
+        Returns:
+            Reply text, without its prefix and correlation ID
+        """
+        args = [_float('distance', distance)]
+        return await self.send('injection_valve_jog', args, timeout=timeout, completion_timeout=completion_timeout)
+
+    async def vacuum_valve_home(self, *, timeout=None, completion_timeout=None):
+        """
+        Command to home the vacuum valve.
+
+        Returns:
+            Reply text, without its prefix and correlation ID
+        """
+        return await self.send('vacuum_valve_home', (), timeout=timeout, completion_timeout=completion_timeout)
+
+    async def vacuum_valve_open(self, *, timeout=None, completion_timeout=None):
+        """
+        Command to open the vacuum valve.
+
+        Returns:
+            Reply text, without its prefix and correlation ID
+        """
+        return await self.send('vacuum_valve_open', (), timeout=timeout, completion_timeout=completion_timeout)
+
+    async def vacuum_valve_close(self, *, timeout=None, completion_timeout=None):
+        """
+        Command to close the vacuum valve.
+
+        Returns:
+            Reply text, without its prefix and correlation ID
+        """
+        return await self.send('vacuum_valve_close', (), timeout=timeout, completion_timeout=completion_timeout)
+
+    async def vacuum_valve_jog(self, distance, *, timeout=None, completion_timeout=None):
+        """
+        Command to jog the vacuum valve motor.
+
+        Args:
+            distance: Float in mm
+
+        Returns:
+            Reply text, without its prefix and correlation ID
+        """
+        args = [_float('distance', distance)]
+        return await self.send('vacuum_valve_jog', args, timeout=timeout, completion_timeout=completion_timeout)
+
+    async def test_command(self, position, action, *, timeout=None, completion_timeout=None):
+        """
+        test_command
+
+        Args:
+            position: Float in mm
+            action: String
+
+        Returns:
+            Reply text, without its prefix and correlation ID
+        """
+        args = [_float('position', position), _string('action', action)]
+        return await self.send('test_command', args, timeout=timeout, completion_timeout=completion_timeout)
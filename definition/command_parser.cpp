@@ -2,74 +2,125 @@
  * @file command_parser.cpp
  * @brief Command parsing and dispatching implementations for the Fillhead controller.
  * @details AUTO-GENERATED FILE - DO NOT EDIT MANUALLY
- * Generated from commands.json on 2025-11-03 11:25:17
+ * Generated from commands.json (source CRC-32 B4AC7350)
  */
 
 #include "command_parser.h"
+#include <stddef.h>
+#include <stdint.h>
 #include <string.h>
 
+//==================================================================================================
+// Command Lookup Table
+//==================================================================================================
+
+// Minimal perfect hash over the command names. The first hash (FNV-1a basis) selects a bucket;
+// the bucket's displacement seeds a second hash that selects the only slot the token can be in.
+// The slot is then compared exactly, so prefixes and unknown tokens return CMD_UNKNOWN.
+#define CMD_HASH_BASIS          0x811C9DC5u
+#define CMD_HASH_TABLE_SIZE     30
+#define CMD_MAX_TOKEN_LENGTH    25
+
+typedef struct {
+    const char* name;
+    uint8_t     length;
+    Command     cmd;
+} CommandEntry;
+
+static const uint16_t s_commandDisplacements[CMD_HASH_TABLE_SIZE] = {
+        2,     0,     0,     0,     0,     4,     2,     0,
+        2,     0,     7,     1,     1,     0,     1,     0,
+        0,     0,     0,     3,     1,     1,     7,     5,
+        3,     0,    20,     6,    32,     3,
+};
+
+static const CommandEntry s_commandTable[CMD_HASH_TABLE_SIZE] = {
+    { CMD_STR_VACUUM_VALVE_CLOSE,          18, CMD_VACUUM_VALVE_CLOSE },
+    { CMD_STR_CANCEL_INJECTION,            16, CMD_CANCEL_INJECTION },
+    { CMD_STR_INJECTION_VALVE_HOME,        20, CMD_INJECTION_VALVE_HOME },
+    { CMD_STR_TEST_COMMAND,                12, CMD_TEST_COMMAND },
+    { CMD_STR_CARTRIDGE_HOME,              14, CMD_CARTRIDGE_HOME },
+    { CMD_STR_DISABLE,                      7, CMD_DISABLE },
+    { CMD_STR_HEATER_ON,                    9, CMD_HEATER_ON },
+    { CMD_STR_JOG_MOVE,                     8, CMD_JOG_MOVE },
+    { CMD_STR_CLEAR_ERRORS,                12, CMD_CLEAR_ERRORS },
+    { CMD_STR_INJECT_STATOR,               13, CMD_INJECT_STATOR },
+    { CMD_STR_MOVE_TO_CARTRIDGE_RETRACT,   25, CMD_MOVE_TO_CARTRIDGE_RETRACT },
+    { CMD_STR_VACUUM_VALVE_HOME,           17, CMD_VACUUM_VALVE_HOME },
+    { CMD_STR_ENABLE,                       6, CMD_ENABLE },
+    { CMD_STR_MACHINE_HOME,                12, CMD_MACHINE_HOME },
+    { CMD_STR_HEATER_OFF,                  10, CMD_HEATER_OFF },
+    { CMD_STR_INJECT_ROTOR,                12, CMD_INJECT_ROTOR },
+    { CMD_STR_REQUEST_KEYFRAME,            16, CMD_REQUEST_KEYFRAME },
+    { CMD_STR_PAUSE_INJECTION,             15, CMD_PAUSE_INJECTION },
+    { CMD_STR_INJECTION_VALVE_CLOSE,       21, CMD_INJECTION_VALVE_CLOSE },
+    { CMD_STR_VACUUM_LEAK_TEST,            16, CMD_VACUUM_LEAK_TEST },
+    { CMD_STR_INJECTION_VALVE_OPEN,        20, CMD_INJECTION_VALVE_OPEN },
+    { CMD_STR_VACUUM_ON,                    9, CMD_VACUUM_ON },
+    { CMD_STR_MOVE_TO_CARTRIDGE_HOME,      22, CMD_MOVE_TO_CARTRIDGE_HOME },
+    { CMD_STR_RESUME_INJECTION,            16, CMD_RESUME_INJECTION },
+    { CMD_STR_DISCOVER_DEVICE,             15, CMD_DISCOVER_DEVICE },
+    { CMD_STR_ABORT,                        5, CMD_ABORT },
+    { CMD_STR_INJECTION_VALVE_JOG,         19, CMD_INJECTION_VALVE_JOG },
+    { CMD_STR_VACUUM_VALVE_OPEN,           17, CMD_VACUUM_VALVE_OPEN },
+    { CMD_STR_VACUUM_OFF,                  10, CMD_VACUUM_OFF },
+    { CMD_STR_VACUUM_VALVE_JOG,            16, CMD_VACUUM_VALVE_JOG },
+};
+
+static uint32_t commandHash(const char* str, size_t len, uint32_t seed) {
+    uint32_t h = seed;
+    for (size_t i = 0; i < len; i++) {
+        h ^= (uint8_t)str[i];
+        h *= 0x01000193u;
+    }
+    return h;
+}
+
+static size_t commandTokenLength(const char* cmdStr) {
+    size_t len = 0;
+    while (cmdStr[len] != '\0' && cmdStr[len] != ' ' && cmdStr[len] != '\t' && cmdStr[len] != '\r' && cmdStr[len] != '\n') {
+        len++;
+    }
+    return len;
+}
+
 //==================================================================================================
 // Command Parser Implementation
 //==================================================================================================
 
 Command parseCommand(const char* cmdStr) {
-    if (strncmp(cmdStr, CMD_STR_ENABLE, strlen(CMD_STR_ENABLE)) == 0) return CMD_ENABLE;
-    if (strncmp(cmdStr, CMD_STR_DISABLE, strlen(CMD_STR_DISABLE)) == 0) return CMD_DISABLE;
-    if (strncmp(cmdStr, CMD_STR_DISCOVER_DEVICE, strlen(CMD_STR_DISCOVER_DEVICE)) == 0) return CMD_DISCOVER_DEVICE;
-    if (strncmp(cmdStr, CMD_STR_ABORT, strlen(CMD_STR_ABORT)) == 0) return CMD_ABORT;
-    if (strncmp(cmdStr, CMD_STR_CLEAR_ERRORS, strlen(CMD_STR_CLEAR_ERRORS)) == 0) return CMD_CLEAR_ERRORS;
-    if (strncmp(cmdStr, CMD_STR_INJECT_STATOR, strlen(CMD_STR_INJECT_STATOR)) == 0) return CMD_INJECT_STATOR;
-    if (strncmp(cmdStr, CMD_STR_INJECT_ROTOR, strlen(CMD_STR_INJECT_ROTOR)) == 0) return CMD_INJECT_ROTOR;
-    if (strncmp(cmdStr, CMD_STR_JOG_MOVE, strlen(CMD_STR_JOG_MOVE)) == 0) return CMD_JOG_MOVE;
-    if (strncmp(cmdStr, CMD_STR_MACHINE_HOME, strlen(CMD_STR_MACHINE_HOME)) == 0) return CMD_MACHINE_HOME;
-    if (strncmp(cmdStr, CMD_STR_CARTRIDGE_HOME, strlen(CMD_STR_CARTRIDGE_HOME)) == 0) return CMD_CARTRIDGE_HOME;
-    if (strncmp(cmdStr, CMD_STR_MOVE_TO_CARTRIDGE_HOME, strlen(CMD_STR_MOVE_TO_CARTRIDGE_HOME)) == 0) return CMD_MOVE_TO_CARTRIDGE_HOME;
-    if (strncmp(cmdStr, CMD_STR_MOVE_TO_CARTRIDGE_RETRACT, strlen(CMD_STR_MOVE_TO_CARTRIDGE_RETRACT)) == 0) return CMD_MOVE_TO_CARTRIDGE_RETRACT;
-    if (strncmp(cmdStr, CMD_STR_PAUSE_INJECTION, strlen(CMD_STR_PAUSE_INJECTION)) == 0) return CMD_PAUSE_INJECTION;
-    if (strncmp(cmdStr, CMD_STR_RESUME_INJECTION, strlen(CMD_STR_RESUME_INJECTION)) == 0) return CMD_RESUME_INJECTION;
-    if (strncmp(cmdStr, CMD_STR_CANCEL_INJECTION, strlen(CMD_STR_CANCEL_INJECTION)) == 0) return CMD_CANCEL_INJECTION;
-    if (strncmp(cmdStr, CMD_STR_VACUUM_ON, strlen(CMD_STR_VACUUM_ON)) == 0) return CMD_VACUUM_ON;
-    if (strncmp(cmdStr, CMD_STR_VACUUM_OFF, strlen(CMD_STR_VACUUM_OFF)) == 0) return CMD_VACUUM_OFF;
-    if (strncmp(cmdStr, CMD_STR_VACUUM_LEAK_TEST, strlen(CMD_STR_VACUUM_LEAK_TEST)) == 0) return CMD_VACUUM_LEAK_TEST;
-    if (strncmp(cmdStr, CMD_STR_HEATER_ON, strlen(CMD_STR_HEATER_ON)) == 0) return CMD_HEATER_ON;
-    if (strncmp(cmdStr, CMD_STR_HEATER_OFF, strlen(CMD_STR_HEATER_OFF)) == 0) return CMD_HEATER_OFF;
-    if (strncmp(cmdStr, CMD_STR_INJECTION_VALVE_HOME, strlen(CMD_STR_INJECTION_VALVE_HOME)) == 0) return CMD_INJECTION_VALVE_HOME;
-    if (strncmp(cmdStr, CMD_STR_INJECTION_VALVE_OPEN, strlen(CMD_STR_INJECTION_VALVE_OPEN)) == 0) return CMD_INJECTION_VALVE_OPEN;
-    if (strncmp(cmdStr, CMD_STR_INJECTION_VALVE_CLOSE, strlen(CMD_STR_INJECTION_VALVE_CLOSE)) == 0) return CMD_INJECTION_VALVE_CLOSE;
-    if (strncmp(cmdStr, CMD_STR_INJECTION_VALVE_JOG, strlen(CMD_STR_INJECTION_VALVE_JOG)) == 0) return CMD_INJECTION_VALVE_JOG;
-    if (strncmp(cmdStr, CMD_STR_VACUUM_VALVE_HOME, strlen(CMD_STR_VACUUM_VALVE_HOME)) == 0) return CMD_VACUUM_VALVE_HOME;
-    if (strncmp(cmdStr, CMD_STR_VACUUM_VALVE_OPEN, strlen(CMD_STR_VACUUM_VALVE_OPEN)) == 0) return CMD_VACUUM_VALVE_OPEN;
-    if (strncmp(cmdStr, CMD_STR_VACUUM_VALVE_CLOSE, strlen(CMD_STR_VACUUM_VALVE_CLOSE)) == 0) return CMD_VACUUM_VALVE_CLOSE;
-    if (strncmp(cmdStr, CMD_STR_VACUUM_VALVE_JOG, strlen(CMD_STR_VACUUM_VALVE_JOG)) == 0) return CMD_VACUUM_VALVE_JOG;
-    if (strncmp(cmdStr, CMD_STR_TEST_COMMAND, strlen(CMD_STR_TEST_COMMAND)) == 0) return CMD_TEST_COMMAND;
+    if (cmdStr == NULL) return CMD_UNKNOWN;
+    
+    size_t len = commandTokenLength(cmdStr);
+    if (len == 0 || len > CMD_MAX_TOKEN_LENGTH) return CMD_UNKNOWN;
+    
+    uint32_t bucket = commandHash(cmdStr, len, CMD_HASH_BASIS) % CMD_HASH_TABLE_SIZE;
+    uint32_t slot = commandHash(cmdStr, len, s_commandDisplacements[bucket]) % CMD_HASH_TABLE_SIZE;
+    const CommandEntry* entry = &s_commandTable[slot];
+    if (entry->length == len && memcmp(entry->name, cmdStr, len) == 0) return entry->cmd;
     return CMD_UNKNOWN;
 }
 
 const char* getCommandParams(const char* cmdStr, Command cmd) {
     switch (cmd) {
         case CMD_INJECT_STATOR:
-            return cmdStr + strlen(CMD_STR_INJECT_STATOR);
         case CMD_INJECT_ROTOR:
-            return cmdStr + strlen(CMD_STR_INJECT_ROTOR);
         case CMD_JOG_MOVE:
-            return cmdStr + strlen(CMD_STR_JOG_MOVE);
         case CMD_MOVE_TO_CARTRIDGE_RETRACT:
-            return cmdStr + strlen(CMD_STR_MOVE_TO_CARTRIDGE_RETRACT);
         case CMD_VACUUM_ON:
-            return cmdStr + strlen(CMD_STR_VACUUM_ON);
         case CMD_VACUUM_LEAK_TEST:
-            return cmdStr + strlen(CMD_STR_VACUUM_LEAK_TEST);
         case CMD_HEATER_ON:
-            return cmdStr + strlen(CMD_STR_HEATER_ON);
         case CMD_INJECTION_VALVE_JOG:
-            return cmdStr + strlen(CMD_STR_INJECTION_VALVE_JOG);
         case CMD_VACUUM_VALVE_JOG:
-            return cmdStr + strlen(CMD_STR_VACUUM_VALVE_JOG);
         case CMD_TEST_COMMAND:
-            return cmdStr + strlen(CMD_STR_TEST_COMMAND);
+            break;
         default:
             return NULL;
     }
+    
+    const char* params = cmdStr + commandTokenLength(cmdStr);
+    while (*params == ' ' || *params == '\t') params++;
+    return params;
 }
 
 //==================================================================================================
@@ -103,6 +154,11 @@ bool dispatchCommand(Command cmd, const char* params) {
             // handle_clear_errors();
             return true;
 
+        case CMD_REQUEST_KEYFRAME:
+            // TODO: Implement handler
+            // handle_request_keyframe();
+            return true;
+
         case CMD_INJECT_STATOR:
             // TODO: Implement handler with parameters
             // handle_inject_stator(params);
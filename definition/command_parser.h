@@ -2,7 +2,7 @@
  * @file command_parser.h
  * @brief Command parsing and dispatching declarations for the Fillhead controller.
  * @details AUTO-GENERATED FILE - DO NOT EDIT MANUALLY
- * Generated from commands.json on 2025-11-03 11:25:17
+ * Generated from commands.json (source CRC-32 B4AC7350)
  * 
  * This header declares utility functions to parse and dispatch commands for the Fillhead.
  * @see commands.h for command definitions
@@ -20,6 +20,9 @@
  * @brief Parse a command string and return the corresponding Command enum.
  * @param cmdStr The command string to parse
  * @return The parsed Command enum value, or CMD_UNKNOWN if not recognized
+ * 
+ * @details The first whitespace-delimited token must match a command name exactly.
+ * Lookup is a constant-time perfect hash generated from commands.json.
  */
 Command parseCommand(const char* cmdStr);
 
@@ -0,0 +1,209 @@
+"""
+Fillhead Command Table
+Command names, Command enum values and parameter definitions for host-side tools.
+
+AUTO-GENERATED FILE - DO NOT EDIT MANUALLY
+Generated from commands.json (source CRC-32 B4AC7350)
+To modify commands, edit commands.json and regenerate this file.
+"""
+
+CMD_UNKNOWN = 0
+
+# Marks the optional trailing correlation ID argument, e.g. "jog_move 5.0 #17"
+CORRELATION_PREFIX = '#'
+
+# Command name -> Command enum value in commands.h
+COMMAND_IDS = {
+    'enable': 1,
+    'disable': 2,
+    'discover_device': 3,
+    'abort': 4,
+    'clear_errors': 5,
+    'request_keyframe': 6,
+    'test_command': 7,
+    'inject_stator': 8,
+    'inject_rotor': 9,
+    'jog_move': 10,
+    'machine_home': 11,
+    'cartridge_home': 12,
+    'move_to_cartridge_home': 13,
+    'move_to_cartridge_retract': 14,
+    'pause_injection': 15,
+    'resume_injection': 16,
+    'cancel_injection': 17,
+    'injection_valve_home': 18,
+    'injection_valve_open': 19,
+    'injection_valve_close': 20,
+    'injection_valve_jog': 21,
+    'vacuum_valve_home': 22,
+    'vacuum_valve_open': 23,
+    'vacuum_valve_close': 24,
+    'vacuum_valve_jog': 25,
+    'heater_on': 26,
+    'heater_off': 27,
+    'vacuum_on': 28,
+    'vacuum_off': 29,
+    'vacuum_leak_test': 30,
+}
+
+# Command name -> tuple of (parameter, type, optional)
+COMMAND_PARAMS = {
+    'enable': (),
+    'disable': (),
+    'discover_device': (),
+    'abort': (),
+    'clear_errors': (),
+    'request_keyframe': (),
+    'inject_stator': (('volume', 'float', False), ('speed', 'float', True)),
+    'inject_rotor': (('volume', 'float', False), ('speed', 'float', True)),
+    'jog_move': (('distance', 'float', False),),
+    'machine_home': (),
+    'cartridge_home': (),
+    'move_to_cartridge_home': (),
+    'move_to_cartridge_retract': (('distance', 'float', False),),
+    'pause_injection': (),
+    'resume_injection': (),
+    'cancel_injection': (),
+    'vacuum_on': (('target', 'float', True),),
+    'vacuum_off': (),
+    'vacuum_leak_test': (('delta', 'float', True), ('duration', 'float', True)),
+    'heater_on': (('setpoint', 'float', True),),
+    'heater_off': (),
+    'injection_valve_home': (),
+    'injection_valve_open': (),
+    'injection_valve_close': (),
+    'injection_valve_jog': (('distance', 'float', False),),
+    'vacuum_valve_home': (),
+    'vacuum_valve_open': (),
+    'vacuum_valve_close': (),
+    'vacuum_valve_jog': (('distance', 'float', False),),
+    'test_command': (('position', 'float', False), ('action', 'string', False)),
+}
+
+# Command name -> reply types the device sends for it
+COMMAND_RETURNS = {
+    'enable': ('done', 'error'),
+    'disable': ('done', 'error'),
+    'discover_device': ('discovery_response',),
+    'abort': ('done', 'error'),
+    'clear_errors': ('done', 'error'),
+    'request_keyframe': ('done',),
+    'inject_stator': ('done', 'error'),
+    'inject_rotor': ('done', 'error'),
+    'jog_move': ('done', 'error'),
+    'machine_home': ('done', 'error'),
+    'cartridge_home': ('done', 'error'),
+    'move_to_cartridge_home': ('done', 'error'),
+    'move_to_cartridge_retract': ('done', 'error'),
+    'pause_injection': ('done', 'error'),
+    'resume_injection': ('done', 'error'),
+    'cancel_injection': ('done', 'error'),
+    'vacuum_on': ('done', 'error'),
+    'vacuum_off': ('done', 'error'),
+    'vacuum_leak_test': ('passed', 'failed'),
+    'heater_on': ('done', 'error'),
+    'heater_off': ('done', 'error'),
+    'injection_valve_home': ('done', 'error'),
+    'injection_valve_open': ('done', 'error'),
+    'injection_valve_close': ('done', 'error'),
+    'injection_valve_jog': ('done', 'error'),
+    'vacuum_valve_home': ('done', 'error'),
+    'vacuum_valve_open': ('done', 'error'),
+    'vacuum_valve_close': ('done', 'error'),
+    'vacuum_valve_jog': ('done', 'error'),
+    'test_command': ('done', 'error'),
+}
+
+# Commands marked "idempotent" in commands.json: running one twice leaves the device as running it
+# once would, so they are the only commands a client may resend
+IDEMPOTENT_COMMANDS = frozenset((
+    'enable',
+    'disable',
+    'discover_device',
+    'abort',
+    'clear_errors',
+    'request_keyframe',
+    'pause_injection',
+    'cancel_injection',
+    'vacuum_on',
+    'vacuum_off',
+    'heater_on',
+    'heater_off',
+    'injection_valve_open',
+    'injection_valve_close',
+    'vacuum_valve_open',
+    'vacuum_valve_close',
+))
+
+
+def command_token(command):
+    """
+    Extract the command name from a raw command string.
+
+    Args:
+        command: Raw command string, e.g. "inject_stator 10 0.5" or "fillhead.machine_home"
+
+    Returns:
+        The lowercase command name without a leading device prefix
+    """
+    token = command.split(None, 1)[0].lower() if command.strip() else ''
+    if token.startswith('fillhead.'):
+        token = token[len('fillhead.'):]
+    return token
+
+
+def split_correlation(args):
+    """
+    Separate a trailing correlation ID from a command's arguments.
+
+    Args:
+        args: List of argument strings following the command name
+
+    Returns:
+        Tuple of (args without the ID, ID string including CORRELATION_PREFIX or None)
+    """
+    if args and args[-1].startswith(CORRELATION_PREFIX) and args[-1][len(CORRELATION_PREFIX):].isdigit():
+        return args[:-1], args[-1]
+    return args, None
+
+
+def encode_command(command, args=(), tag=None):
+    """
+    Build the datagram for a command.
+
+    Args:
+        command: Command name from commands.json
+        args: Already formatted argument strings
+        tag: Optional correlation ID number, appended as CORRELATION_PREFIX + tag
+
+    Returns:
+        The command line as ASCII bytes
+
+    Raises:
+        KeyError: If the command is not defined in commands.json
+    """
+    if command not in COMMAND_IDS:
+        raise KeyError(f"Unknown command: {command}")
+    words = [command, *args]
+    if tag is not None:
+        words.append(f"{CORRELATION_PREFIX}{tag}")
+    return ' '.join(words).encode('ascii')
+
+
+def build_dispatch(handlers):
+    """
+    Build a command dispatch dict, checking every entry against commands.json.
+
+    Args:
+        handlers: Mapping of command name to handler
+
+    Returns:
+        Dict of command name to handler
+
+    Raises:
+        KeyError: If a handler is registered for a command that commands.json does not define
+    """
+    unknown = [name for name in handlers if name not in COMMAND_IDS]
+    if unknown:
+        raise KeyError(f"Handlers registered for unknown commands: {', '.join(sorted(unknown))}")
+    return dict(handlers)
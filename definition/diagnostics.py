@@ -0,0 +1,320 @@
+"""
+Fillhead Loop Diagnostics
+Parses FILLHEAD_DIAG messages and aggregates them into latency histograms.
+
+With DIAGNOSTICS_ENABLED set, the firmware reports one message per reporting window (see
+diagnostics.json): loop period and RX queue dwell histograms, the mean and worst cost of each
+part of the main loop, and queue high-water marks and drop counts. Histograms use log2
+microsecond buckets, so windows are merged by adding bucket counts and percentiles are
+estimated within a bucket.
+
+Each window is kept with the time it was received. A late DONE or a missed torque limit can then
+be checked against the window it fell in: a loop period or RX dwell far above normal points at
+the firmware, while normal figures point at the network.
+
+Usage:
+    python -m definition.diagnostics summary run.tlog
+    python -m definition.diagnostics listen 192.168.1.50 --interval 10
+"""
+import argparse
+import asyncio
+import bisect
+import time
+
+import numpy as np
+
+from .schema import load_definition
+
+DIAGNOSTICS = load_definition('diagnostics.json')
+DIAG_PREFIX = DIAGNOSTICS['prefix']
+HISTOGRAM_BUCKETS = DIAGNOSTICS['histogram_buckets']
+SECTIONS = tuple(DIAGNOSTICS['sections'])
+
+# Lower bound of each histogram bucket in microseconds; the last bucket is open-ended.
+BUCKET_LOWER_US = np.array([0] + [1 << i for i in range(1, HISTOGRAM_BUCKETS)], dtype=np.int64)
+BUCKET_UPPER_US = np.array([1 << i for i in range(1, HISTOGRAM_BUCKETS + 1)], dtype=np.int64)
+
+
+def _field_kinds():
+    kinds = {}
+    for name, spec in DIAGNOSTICS['fields'].items():
+        if spec['type'] == 'sections':
+            suffix = name[len('section'):]
+            kinds.update((section + suffix, 'uint32') for section in SECTIONS)
+        else:
+            kinds[name] = spec['type']
+    return kinds
+
+
+# Message key -> 'uint32' or 'histogram', with section fields expanded (e.g. 'heater_max_us')
+FIELD_KINDS = _field_kinds()
+
+
+def is_diagnostics(message):
+    """Returns True if a device message is a diagnostics report."""
+    return message.startswith(DIAG_PREFIX)
+
+
+def parse_diagnostics(message):
+    """
+    Parse a diagnostics message.
+
+    Args:
+        message: Message text starting with DIAG_PREFIX
+
+    Returns:
+        Dict of key to int, or to an int64 array of bucket counts for histograms. Keys not in
+        diagnostics.json are ignored so newer firmware can add fields.
+
+    Raises:
+        ValueError: If the message is not a diagnostics report or a value is malformed
+    """
+    if not is_diagnostics(message):
+        raise ValueError(f"Not a diagnostics message: {message[:40]!r}")
+    values = {}
+    for item in message[len(DIAG_PREFIX):].strip().split(','):
+        key, sep, text = item.partition(':')
+        kind = FIELD_KINDS.get(key)
+        if not sep or kind is None:
+            continue
+        if kind == 'histogram':
+            counts = np.array([int(count) for count in text.split('/')], dtype=np.int64)
+            if len(counts) != HISTOGRAM_BUCKETS:
+                raise ValueError(f"{key} has {len(counts)} buckets, expected {HISTOGRAM_BUCKETS}")
+            values[key] = counts
+        else:
+            values[key] = int(text)
+    return values
+
+
+class LatencyHistogram:
+    """
+    Log2 microsecond histogram matching the firmware's diagnostics buckets.
+
+    Attributes:
+        counts: int64 array of counts per bucket
+    """
+
+    def __init__(self):
+        self.counts = np.zeros(HISTOGRAM_BUCKETS, dtype=np.int64)
+
+    @property
+    def total(self):
+        return int(self.counts.sum())
+
+    def add_counts(self, counts):
+        """Merge bucket counts from a diagnostics message (or another histogram's counts)."""
+        self.counts += counts
+
+    def add(self, durations_us):
+        """Count one or more durations measured on the host, in microseconds."""
+        durations = np.atleast_1d(np.asarray(durations_us, dtype=np.int64))
+        buckets = np.zeros(len(durations), dtype=np.int64)
+        positive = durations >= 2
+        buckets[positive] = np.floor(np.log2(durations[positive])).astype(np.int64)
+        np.add.at(self.counts, np.minimum(buckets, HISTOGRAM_BUCKETS - 1), 1)
+
+    def percentile(self, q):
+        """
+        Estimate the q-th percentile (0-100) in microseconds, interpolating linearly within
+        the bucket it falls in. Values in the open-ended last bucket are reported as its lower bound.
+
+        Returns:
+            Estimated duration, or None if the histogram is empty
+        """
+        total = self.total
+        if total == 0:
+            return None
+        rank = q / 100.0 * total
+        cumulative = np.cumsum(self.counts)
+        bucket = min(int(np.searchsorted(cumulative, rank, side='left')), HISTOGRAM_BUCKETS - 1)
+        if bucket == HISTOGRAM_BUCKETS - 1:
+            return float(BUCKET_LOWER_US[bucket])
+        before = cumulative[bucket - 1] if bucket > 0 else 0
+        fraction = (rank - before) / self.counts[bucket] if self.counts[bucket] else 0.0
+        lower, upper = BUCKET_LOWER_US[bucket], BUCKET_UPPER_US[bucket]
+        return float(lower + fraction * (upper - lower))
+
+    def format(self, width=40):
+        """Returns the non-empty buckets as a text bar chart, one line per bucket."""
+        peak = self.counts.max()
+        lines = []
+        for bucket in np.flatnonzero(self.counts):
+            lower = BUCKET_LOWER_US[bucket]
+            label = f">= {lower} us" if bucket == HISTOGRAM_BUCKETS - 1 else f"{lower}-{BUCKET_UPPER_US[bucket] - 1} us"
+            bar = '#' * max(1, int(round(width * self.counts[bucket] / peak)))
+            lines.append(f"{label:>16} {self.counts[bucket]:>10} {bar}")
+        return '\n'.join(lines)
+
+
+class DiagnosticsAggregator:
+    """
+    Accumulates diagnostics windows into loop period and command dwell histograms.
+
+    Attributes:
+        loop_hist: LatencyHistogram of main loop periods
+        dwell_hist: LatencyHistogram of RX queue dwell times
+        windows: List of (time, parsed values) for every window fed, in time order
+    """
+
+    def __init__(self):
+        self.loop_hist = LatencyHistogram()
+        self.dwell_hist = LatencyHistogram()
+        self.windows = []
+        self._times = []
+        self.loops = 0
+        self.commands = 0
+        self.loop_min_us = None
+        self.loop_max_us = 0
+        self.dwell_max_us = 0
+        self.section_total_us = dict.fromkeys(SECTIONS, 0)
+        self.section_max_us = dict.fromkeys(SECTIONS, 0)
+        self.high_water = {'rx_hwm': 0, 'tx_hwm': 0, 'tx_bytes_hwm': 0}
+        self.drops = {'rx_drops': 0, 'tx_drops': 0}
+
+    def feed(self, message, timestamp=None):
+        """
+        Add a device message if it is a diagnostics report.
+
+        Args:
+            message: Message text; anything other than a diagnostics report is ignored
+            timestamp: Time the message was received (defaults to time.time())
+
+        Returns:
+            True if the message was a diagnostics report
+        """
+        if not is_diagnostics(message):
+            return False
+        self.add(parse_diagnostics(message), time.time() if timestamp is None else timestamp)
+        return True
+
+    def add(self, values, timestamp):
+        """Add one parsed diagnostics window received at timestamp."""
+        index = bisect.bisect_right(self._times, timestamp)
+        self._times.insert(index, timestamp)
+        self.windows.insert(index, (timestamp, values))
+
+        loops = values.get('loops', 0)
+        self.loops += loops
+        self.commands += values.get('cmds', 0)
+        if loops:
+            minimum = values.get('loop_min_us', 0)
+            self.loop_min_us = minimum if self.loop_min_us is None else min(self.loop_min_us, minimum)
+        self.loop_max_us = max(self.loop_max_us, values.get('loop_max_us', 0))
+        self.dwell_max_us = max(self.dwell_max_us, values.get('dwell_max_us', 0))
+        if 'loop_hist' in values:
+            self.loop_hist.add_counts(values['loop_hist'])
+        if 'dwell_hist' in values:
+            self.dwell_hist.add_counts(values['dwell_hist'])
+        for section in SECTIONS:
+            self.section_total_us[section] += values.get(f'{section}_avg_us', 0) * loops
+            self.section_max_us[section] = max(self.section_max_us[section], values.get(f'{section}_max_us', 0))
+        for key in self.high_water:
+            self.high_water[key] = max(self.high_water[key], values.get(key, 0))
+        for key in self.drops:
+            self.drops[key] += values.get(key, 0)
+
+    def window_at(self, timestamp):
+        """
+        Returns the parsed diagnostics window covering timestamp (the first one received at or
+        after it), or None if no window was received after timestamp.
+        """
+        index = bisect.bisect_left(self._times, timestamp)
+        return self.windows[index][1] if index < len(self.windows) else None
+
+    def overrun_windows(self, limit_us):
+        """Returns the (time, values) windows whose longest loop period exceeded limit_us."""
+        return [(t, values) for t, values in self.windows if values.get('loop_max_us', 0) > limit_us]
+
+    def section_avg_us(self):
+        """Returns the mean cost per loop of each section over every window, in microseconds."""
+        return {section: total / self.loops if self.loops else 0.0 for section, total in self.section_total_us.items()}
+
+    def summary(self):
+        """Returns the aggregate figures as a flat dict. Percentile estimates are capped at the reported maximum."""
+        def capped(histogram, q, maximum):
+            value = histogram.percentile(q)
+            return None if value is None else min(value, float(maximum))
+
+        result = {
+            'windows': len(self.windows),
+            'loops': self.loops,
+            'loop_min_us': self.loop_min_us,
+            'loop_p50_us': capped(self.loop_hist, 50, self.loop_max_us),
+            'loop_p99_us': capped(self.loop_hist, 99, self.loop_max_us),
+            'loop_max_us': self.loop_max_us,
+            'cmds': self.commands,
+            'dwell_p50_us': capped(self.dwell_hist, 50, self.dwell_max_us),
+            'dwell_p99_us': capped(self.dwell_hist, 99, self.dwell_max_us),
+            'dwell_max_us': self.dwell_max_us,
+        }
+        result.update(self.high_water)
+        result.update(self.drops)
+        return result
+
+    def format(self):
+        """Returns a human-readable report with both histograms and the per-section costs."""
+        def us(value):
+            return '-' if value is None else f"{value:.0f} us"
+
+        summary = self.summary()
+        lines = [
+            f"{summary['windows']} window(s), {self.loops} loops, {self.commands} commands",
+            f"Loop period: min {us(self.loop_min_us)}, p50 {us(summary['loop_p50_us'])}, "
+            f"p99 {us(summary['loop_p99_us'])}, max {us(self.loop_max_us)}",
+            self.loop_hist.format(),
+            f"RX dwell: p50 {us(summary['dwell_p50_us'])}, p99 {us(summary['dwell_p99_us'])}, "
+            f"max {us(self.dwell_max_us)}",
+            self.dwell_hist.format(),
+            "Section cost (avg / max per loop):",
+        ]
+        averages = self.section_avg_us()
+        lines += [f"{section:>12} {averages[section]:>8.1f} / {self.section_max_us[section]} us" for section in SECTIONS]
+        lines.append("Queues: " + ', '.join(f"{key} {value}" for key, value in {**self.high_water, **self.drops}.items()))
+        return '\n'.join(line for line in lines if line)
+
+
+async def _listen(host, port, interval):
+    from .command_client import CommandClient
+
+    aggregator = DiagnosticsAggregator()
+
+    def on_message(message):
+        if isinstance(message, str):
+            aggregator.feed(message)
+
+    async with CommandClient(host, port, on_message=on_message):
+        while True:
+            await asyncio.sleep(interval)
+            print(aggregator.format(), end='\n\n', flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aggregate fillhead loop diagnostics into latency histograms.")
+    subparsers = parser.add_subparsers(dest='action', required=True)
+    summary = subparsers.add_parser('summary', help="summarize the diagnostics in a telemetry log")
+    summary.add_argument('path')
+    listen = subparsers.add_parser('listen', help="discover a device and print running summaries")
+    listen.add_argument('host')
+    listen.add_argument('--port', type=int, default=8888, help="device UDP port")
+    listen.add_argument('--interval', type=float, default=10.0, help="seconds between summaries")
+    args = parser.parse_args()
+
+    if args.action == 'summary':
+        from .telemetry_log import TelemetryLog
+
+        aggregator = DiagnosticsAggregator()
+        with TelemetryLog(args.path) as log:
+            for timestamp, _, text in log.messages():
+                aggregator.feed(text, timestamp)
+        print(aggregator.format())
+        return
+
+    try:
+        asyncio.run(_listen(args.host, args.port, args.interval))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
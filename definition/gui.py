@@ -12,19 +12,174 @@ if __name__ == "__main__":
 
 from src import theme
 
+FRAME_INTERVAL_MS = 33  # Minimum time between panel refreshes (~30 frames per second)
+
+
+class GuiUpdateBatcher:
+    """
+    Coalesces panel updates so each Tk frame applies at most one refresh.
+
+    Variable writes only mark their refresh callbacks dirty; the callbacks run once on the next
+    frame no matter how many writes arrived in between. Widget options and derived variables are
+    only touched when their value actually changes.
+
+    Args:
+        widget: Any widget of the panel, used to schedule the frame callback
+        interval_ms: Minimum time between refreshes
+    """
+
+    def __init__(self, widget, interval_ms=FRAME_INTERVAL_MS):
+        self._widget = widget
+        self._interval_ms = interval_ms
+        self._after_id = None
+        self._flushing = False
+        self._dirty = {}
+        self._pending = {}
+        self._options = {}
+
+    def watch(self, var, callback):
+        """Run callback on the next frame whenever var is written."""
+        var.trace_add('write', lambda *args: self.mark(callback))
+
+    def mark(self, callback):
+        """Queue callback for the next frame."""
+        self._dirty[callback] = None
+        self._schedule()
+
+    def submit(self, variables, values):
+        """
+        Queue a telemetry snapshot for the next frame. Later snapshots replace earlier ones.
+
+        Args:
+            variables: Mapping of variable name to tkinter variable (e.g. shared_gui_refs)
+            values: Mapping of variable name to new value
+        """
+        for name, value in values.items():
+            self._pending[variables[name]] = value
+        self._schedule()
+
+    def set_var(self, var, value):
+        """Write var only if its value differs, so unchanged values fire no traces."""
+        try:
+            if var.get() == value:
+                return
+        except tk.TclError:
+            pass
+        var.set(value)
+
+    def configure(self, widget, **options):
+        """Apply only the widget options whose value differs from the last one applied."""
+        applied = self._options.setdefault(widget, {})
+        changed = {key: value for key, value in options.items() if applied.get(key) != value}
+        if changed:
+            applied.update(changed)
+            widget.config(**changed)
+
+    def flush(self):
+        """Apply the pending snapshot and run every dirty callback now."""
+        if self._after_id is not None:
+            self._widget.after_cancel(self._after_id)
+            self._after_id = None
+        self._flushing = True
+        try:
+            pending, self._pending = self._pending, {}
+            for var, value in pending.items():
+                self.set_var(var, value)
+            dirty, self._dirty = self._dirty, {}
+            for callback in dirty:
+                callback()
+        finally:
+            self._flushing = False
+        if self._dirty or self._pending:
+            self._schedule()
+
+    def _schedule(self):
+        if self._after_id is None and not self._flushing:
+            self._after_id = self._widget.after(self._interval_ms, self.flush)
+
+
+def _configure(updater, widget, **options):
+    if updater is not None:
+        updater.configure(widget, **options)
+    else:
+        widget.config(**options)
+
+
+def _watch(updater, var, callback):
+    if updater is not None:
+        updater.watch(var, callback)
+    else:
+        var.trace_add('write', callback)
+
+
+# Telemetry field -> GUI variables that display it
+TELEMETRY_GUI_VARIABLES = {
+    'main_state': ('fillhead_main_state_var',),
+    'injector_state': ('fillhead_injector_state_var',),
+    'inj_valve_state': ('fillhead_inj_valve_state_var',),
+    'vac_valve_state': ('fillhead_vac_valve_state_var',),
+    'heater_state': ('fillhead_heater_state_var',),
+    'vacuum_state': ('fillhead_vacuum_state_var',),
+    'injector_torque': ('fillhead_torque0_var',),
+    'injector_homed': ('fillhead_homed0_var', 'fillhead_homed1_var'),
+    'injection_cumulative_ml': ('fillhead_inject_cumulative_ml_var',),
+    'injection_active_ml': ('fillhead_inject_active_ml_var',),
+    'injection_target_ml': ('injection_target_ml_var',),
+    'inj_valve_pos': ('fillhead_inj_valve_pos_var',),
+    'inj_valve_torque': ('fillhead_torque2_var',),
+    'inj_valve_homed': ('fillhead_inj_valve_homed_var',),
+    'vac_valve_pos': ('fillhead_vac_valve_pos_var',),
+    'vac_valve_motor_torque': ('fillhead_torque3_var',),
+    'vac_valve_homed': ('fillhead_vac_valve_homed_var',),
+    'temp_c': ('fillhead_temp_c_var',),
+    'heater_setpoint': ('pid_setpoint_var',),
+    'vacuum_psig': ('fillhead_vacuum_psig_var',),
+}
+
+def apply_telemetry_record(shared_gui_refs, record, changed=None):
+    """
+    Show a typed telemetry record on the Fillhead panel; it is applied on the next frame.
+
+    Values are formatted here, once, from the record's ints and floats. Derived displays
+    (heater, dispensed totals, value colors) read the record directly instead of parsing text.
+
+    Args:
+        shared_gui_refs: The dict passed to create_gui_components()
+        record: telemetry_record.TelemetryRecord holding the latest values
+        changed: Names of the fields that changed (e.g. from record.update()); None updates all
+    """
+    shared_gui_refs['fillhead_telemetry_record'] = record
+    values = {}
+    for field in (TELEMETRY_GUI_VARIABLES if changed is None else changed):
+        for var_name in TELEMETRY_GUI_VARIABLES.get(field, ()):
+            values[var_name] = getattr(record, field) if var_name in NUMERIC_GUI_VARIABLES else record.format(field)
+    shared_gui_refs['fillhead_update_batcher'].submit(shared_gui_refs, values)
+
+
+def apply_telemetry_snapshot(shared_gui_refs, values):
+    """
+    Queue one decoded telemetry snapshot for the Fillhead panel; it is applied on the next frame.
+
+    Args:
+        shared_gui_refs: The dict passed to create_gui_components()
+        values: Mapping of GUI variable name (see get_gui_variable_names()) to new value
+    """
+    shared_gui_refs['fillhead_update_batcher'].submit(shared_gui_refs, values)
+
+
 # --- GUI Helper Functions (self-contained in each module) ---
 
-def make_homed_tracer(var, label_to_color):
+def make_homed_tracer(var, label_to_color, updater=None):
     """Changes a label's color based on 'Homed' status."""
     def tracer(*args):
         state = var.get()
         if state == 'Homed':
-            label_to_color.config(foreground=theme.SUCCESS_GREEN)
+            _configure(updater, label_to_color, foreground=theme.SUCCESS_GREEN)
         else:
-            label_to_color.config(foreground=theme.ERROR_RED)
+            _configure(updater, label_to_color, foreground=theme.ERROR_RED)
     return tracer
 
-def make_torque_tracer(double_var, string_var):
+def make_torque_tracer(double_var, string_var, updater=None):
     """Updates a string variable with a percentage from a double variable."""
     def tracer(*args):
         try:
@@ -34,12 +189,16 @@ def make_torque_tracer(double_var, string_var):
             # Convert to float, stripping non-numeric parts if necessary
             val_float = float(str(val_raw).split()[0])
             
-            string_var.set(f"{int(val_float)}%")
+            text = f"{int(val_float)}%"
         except (tk.TclError, ValueError, IndexError):
-            string_var.set("ERR")
+            text = "ERR"
+        if updater is not None:
+            updater.set_var(string_var, text)
+        else:
+            string_var.set(text)
     return tracer
 
-def make_state_tracer(var, label_to_color):
+def make_state_tracer(var, label_to_color, updater=None):
     """Changes a label's color based on general device state."""
     def tracer(*args):
         state = var.get().upper()
@@ -47,48 +206,51 @@ def make_state_tracer(var, label_to_color):
         if "STANDBY" in state: color = theme.SUCCESS_GREEN
         elif "BUSY" in state or "ACTIVE" in state or "HOMING" in state or "MOVING" in state: color = theme.BUSY_BLUE
         elif "ERROR" in state: color = theme.ERROR_RED
-        label_to_color.config(foreground=color)
+        _configure(updater, label_to_color, foreground=color)
     return tracer
 
-def make_on_off_tracer(var, *labels_with_colors):
+def make_on_off_tracer(var, *labels_with_colors, updater=None):
     """Changes label colors for ON/OFF states."""
     def tracer(*args):
         state = var.get().upper()
         is_on = "ON" in state or "ACTIVE" in state
         for label, on_color, off_color in labels_with_colors:
             color = on_color if is_on else off_color
-            label.config(foreground=color)
+            _configure(updater, label, foreground=color)
     return tracer
 
-def make_heater_value_tracer(var, label_to_color):
+def _parse_number(var):
+    return lambda: float(var.get().split()[0])
+
+def make_heater_value_tracer(var, label_to_color, updater=None, get_value=None):
+    get_value = get_value or _parse_number(var)
     def tracer(*args):
         try:
-            value_str = var.get().split()[0]
-            temp = float(value_str)
+            temp = get_value()
             color = theme.SUCCESS_GREEN if 0 <= temp <= 200 else theme.FG_COLOR
-            label_to_color.config(foreground=color)
+            _configure(updater, label_to_color, foreground=color)
         except (ValueError, IndexError):
-            label_to_color.config(foreground=theme.FG_COLOR)
+            _configure(updater, label_to_color, foreground=theme.FG_COLOR)
     return tracer
 
-def make_vacuum_value_tracer(var, label_to_color):
+def make_vacuum_value_tracer(var, label_to_color, updater=None, get_value=None):
+    get_value = get_value or _parse_number(var)
     def tracer(*args):
         try:
-            value_str = var.get().split()[0]
-            pressure = float(value_str)
+            pressure = get_value()
             color = theme.SUCCESS_GREEN if -15 <= pressure <= 1 else theme.FG_COLOR
-            label_to_color.config(foreground=color)
+            _configure(updater, label_to_color, foreground=color)
         except (ValueError, IndexError):
-            label_to_color.config(foreground=theme.FG_COLOR)
+            _configure(updater, label_to_color, foreground=theme.FG_COLOR)
     return tracer
 
-def create_torque_widget(parent, torque_dv, height):
+def create_torque_widget(parent, torque_dv, height, updater=None):
     """Creates a vertical torque meter widget."""
     torque_frame = ttk.Frame(parent, height=height, width=30, style='TFrame')
     torque_frame.pack_propagate(False)
     torque_sv = tk.StringVar()
-    torque_frame.tracer = make_torque_tracer(torque_dv, torque_sv)
-    torque_dv.trace_add('write', torque_frame.tracer)
+    torque_frame.tracer = make_torque_tracer(torque_dv, torque_sv, updater)
+    _watch(updater, torque_dv, torque_frame.tracer)
     pbar = ttk.Progressbar(torque_frame, variable=torque_dv, maximum=100, orient=tk.VERTICAL, style='Card.Vertical.TProgressbar')
     pbar.pack(fill=tk.BOTH, expand=True)
     label = ttk.Label(torque_frame, textvariable=torque_sv, font=theme.FONT_SMALL, anchor='center', style='Subtle.TLabel')
@@ -96,7 +258,7 @@ def create_torque_widget(parent, torque_dv, height):
     torque_frame.tracer()
     return torque_frame
 
-def create_device_frame(parent, title, state_var, conn_var):
+def create_device_frame(parent, title, state_var, conn_var, updater=None):
     """Creates the main bordered frame for a device panel."""
     outer_container = ttk.Frame(parent, style='CardBorder.TFrame', padding=1)
     container = ttk.Frame(outer_container, style='Card.TFrame', padding=10)
@@ -109,8 +271,8 @@ def create_device_frame(parent, title, state_var, conn_var):
     ip_label.pack(side=tk.LEFT, anchor='sw', pady=(0, 2))
     state_label = ttk.Label(header_frame, textvariable=state_var, font=theme.FONT_BOLD, style='Subtle.TLabel')
     state_label.pack(side=tk.RIGHT)
-    state_label.tracer = make_state_tracer(state_var, state_label)
-    state_var.trace_add('write', state_label.tracer)
+    state_label.tracer = make_state_tracer(state_var, state_label, updater)
+    _watch(updater, state_var, state_label.tracer)
     state_label.tracer()
     def conn_tracer(*args):
         full_status = conn_var.get()
@@ -149,6 +311,10 @@ def get_gui_variable_names():
         'cycle_dispensed_var' # Added for cycle dispensed logic
     ]
 
+# Torque variables drive progress bars, so they hold numbers rather than display text. Other panels
+# share these variables, so every torque variable stays a DoubleVar even if no telemetry field feeds it.
+NUMERIC_GUI_VARIABLES = frozenset(name for name in get_gui_variable_names() if 'torque' in name)
+
 
 # --- Main GUI Creation Function ---
 
@@ -158,13 +324,34 @@ def create_gui_components(parent, shared_gui_refs):
     # Initialize all required tkinter variables
     for var_name in get_gui_variable_names():
         if var_name.endswith('_var'):
-            if 'torque' in var_name:
+            if var_name in NUMERIC_GUI_VARIABLES:
                 shared_gui_refs.setdefault(var_name, tk.DoubleVar(value=0.0))
             else:
                 shared_gui_refs.setdefault(var_name, tk.StringVar(value='---'))
+
+    # All tracers below are deferred to one refresh per frame through this batcher
+    updater = GuiUpdateBatcher(parent)
+    shared_gui_refs['fillhead_update_batcher'] = updater
     
+    def typed_record():
+        return shared_gui_refs.get('fillhead_telemetry_record')
+
+    def typed_value(field, var_name):
+        var_value = _parse_number(shared_gui_refs[var_name])
+        def get_value():
+            record = typed_record()
+            return getattr(record, field) if record is not None else var_value()
+        return get_value
+
     # --- Tracers moved from main.py ---
+    # Each reads the typed record when the host provides one (apply_telemetry_record) and
+    # falls back to parsing the variable text otherwise.
     def update_heater_display(*args):
+        record = typed_record()
+        if record is not None:
+            setpoint = f"{record.heater_setpoint:.1f}" if record.heater_state else "---"
+            updater.set_var(shared_gui_refs['fillhead_heater_display_var'], f"{record.temp_c:.1f} / {setpoint} °C")
+            return
         try:
             temp_val = shared_gui_refs['fillhead_temp_c_var'].get().split()[0]
             heater_state = shared_gui_refs['fillhead_heater_state_var'].get().upper()
@@ -175,36 +362,45 @@ def create_gui_components(parent, shared_gui_refs):
             else:
                 setpoint_val = "---"
 
-            shared_gui_refs['fillhead_heater_display_var'].set(f"{temp_val} / {setpoint_val} °C")
+            updater.set_var(shared_gui_refs['fillhead_heater_display_var'], f"{temp_val} / {setpoint_val} °C")
         except (IndexError, ValueError, tk.TclError):
-            shared_gui_refs['fillhead_heater_display_var'].set("--- / --- °C")
+            updater.set_var(shared_gui_refs['fillhead_heater_display_var'], "--- / --- °C")
 
-    shared_gui_refs['fillhead_temp_c_var'].trace_add("write", update_heater_display)
-    shared_gui_refs['pid_setpoint_var'].trace_add("write", update_heater_display)
-    shared_gui_refs['fillhead_heater_state_var'].trace_add("write", update_heater_display)
+    updater.watch(shared_gui_refs['fillhead_temp_c_var'], update_heater_display)
+    updater.watch(shared_gui_refs['pid_setpoint_var'], update_heater_display)
+    updater.watch(shared_gui_refs['fillhead_heater_state_var'], update_heater_display)
 
     def update_total_dispensed(*args):
+        record = typed_record()
+        if record is not None:
+            updater.set_var(shared_gui_refs['total_dispensed_var'], f"{record.injection_cumulative_ml:.2f} ml")
+            return
         try:
             total_val = shared_gui_refs['fillhead_inject_cumulative_ml_var'].get().split()[0]
-            shared_gui_refs['total_dispensed_var'].set(f"{total_val} ml")
+            updater.set_var(shared_gui_refs['total_dispensed_var'], f"{total_val} ml")
         except (IndexError, ValueError, tk.TclError):
-            shared_gui_refs['total_dispensed_var'].set("--- ml")
+            updater.set_var(shared_gui_refs['total_dispensed_var'], "--- ml")
 
-    shared_gui_refs['fillhead_inject_cumulative_ml_var'].trace_add("write", update_total_dispensed)
+    updater.watch(shared_gui_refs['fillhead_inject_cumulative_ml_var'], update_total_dispensed)
 
     def update_cycle_dispensed(*args):
+        record = typed_record()
+        if record is not None:
+            updater.set_var(shared_gui_refs['cycle_dispensed_var'],
+                            f"{record.injection_active_ml:.2f} / {record.injection_target_ml:.2f} ml")
+            return
         try:
             active_val = shared_gui_refs['fillhead_inject_active_ml_var'].get().split()[0]
             target_val = shared_gui_refs['injection_target_ml_var'].get()
             if target_val == '---':
-                shared_gui_refs['cycle_dispensed_var'].set(f"{active_val} / --- ml")
+                updater.set_var(shared_gui_refs['cycle_dispensed_var'], f"{active_val} / --- ml")
             else:
-                shared_gui_refs['cycle_dispensed_var'].set(f"{active_val} / {float(target_val):.2f} ml")
+                updater.set_var(shared_gui_refs['cycle_dispensed_var'], f"{active_val} / {float(target_val):.2f} ml")
         except (IndexError, ValueError, tk.TclError):
-            shared_gui_refs['cycle_dispensed_var'].set("--- / --- ml")
+            updater.set_var(shared_gui_refs['cycle_dispensed_var'], "--- / --- ml")
 
-    shared_gui_refs['fillhead_inject_active_ml_var'].trace_add("write", update_cycle_dispensed)
-    shared_gui_refs['injection_target_ml_var'].trace_add("write", update_cycle_dispensed)
+    updater.watch(shared_gui_refs['fillhead_inject_active_ml_var'], update_cycle_dispensed)
+    updater.watch(shared_gui_refs['injection_target_ml_var'], update_cycle_dispensed)
 
 
     # Helper variables
@@ -212,7 +408,7 @@ def create_gui_components(parent, shared_gui_refs):
     font_injector_readout = ("JetBrains Mono", 12, "bold")
     small_bar_height = 20
     
-    fillhead_outer_container, fillhead_content = create_device_frame(parent, "Fillhead", shared_gui_refs['fillhead_main_state_var'], shared_gui_refs['status_var_fillhead'])
+    fillhead_outer_container, fillhead_content = create_device_frame(parent, "Fillhead", shared_gui_refs['fillhead_main_state_var'], shared_gui_refs['status_var_fillhead'], updater)
     
     # Override the IP label tracer for fillhead to show "@ IP" or "@ COM"
     ip_label = getattr(fillhead_outer_container, 'ip_label', None)
@@ -261,24 +457,24 @@ def create_gui_components(parent, shared_gui_refs):
     ttk.Label(inj_frame, text="Injector:", font=font_injector_readout, style='Subtle.TLabel').pack(anchor='w')
     injector_state_label = ttk.Label(inj_frame, textvariable=shared_gui_refs['fillhead_injector_state_var'], font=font_injector_readout, style='Subtle.TLabel')
     injector_state_label.pack(anchor='w')
-    injector_state_label.tracer = make_state_tracer(shared_gui_refs['fillhead_injector_state_var'], injector_state_label)
-    shared_gui_refs['fillhead_injector_state_var'].trace_add('write', injector_state_label.tracer)
+    injector_state_label.tracer = make_state_tracer(shared_gui_refs['fillhead_injector_state_var'], injector_state_label, updater)
+    updater.watch(shared_gui_refs['fillhead_injector_state_var'], injector_state_label.tracer)
     injector_state_label.tracer()
 
     machine_label = ttk.Label(content_grid, text="Machine:", font=font_injector_readout, style='Subtle.TLabel')
     machine_label.grid(row=0, column=2, sticky='w', padx=(10, 5))
     ttk.Label(content_grid, textvariable=shared_gui_refs['fillhead_machine_steps_var'], font=font_injector_readout, style='Subtle.TLabel', anchor='e').grid(row=0, column=3, sticky='ew')
     machine_homed_var = shared_gui_refs['fillhead_homed0_var']
-    machine_label.tracer = make_homed_tracer(machine_homed_var, machine_label)
-    machine_homed_var.trace_add('write', machine_label.tracer)
+    machine_label.tracer = make_homed_tracer(machine_homed_var, machine_label, updater)
+    updater.watch(machine_homed_var, machine_label.tracer)
     machine_label.tracer()
     
     cartridge_label = ttk.Label(content_grid, text="Cartridge:", font=font_injector_readout, style='Subtle.TLabel')
     cartridge_label.grid(row=1, column=2, sticky='w', padx=(10, 5))
     ttk.Label(content_grid, textvariable=shared_gui_refs['fillhead_cartridge_steps_var'], font=font_injector_readout, style='Subtle.TLabel', anchor='e').grid(row=1, column=3, sticky='ew')
     cartridge_homed_var = shared_gui_refs['fillhead_homed1_var']
-    cartridge_label.tracer = make_homed_tracer(cartridge_homed_var, cartridge_label)
-    cartridge_homed_var.trace_add('write', cartridge_label.tracer)
+    cartridge_label.tracer = make_homed_tracer(cartridge_homed_var, cartridge_label, updater)
+    updater.watch(cartridge_homed_var, cartridge_label.tracer)
     cartridge_label.tracer()
 
     total_disp_frame = ttk.Frame(content_grid, style='Card.TFrame')
@@ -293,7 +489,7 @@ def create_gui_components(parent, shared_gui_refs):
     ttk.Label(cycle_disp_frame, text="Cycle Dispensed:", font=font_injector_readout, style='Subtle.TLabel').grid(row=0, column=0, sticky='w')
     ttk.Label(cycle_disp_frame, textvariable=shared_gui_refs['fillhead_inject_active_ml_var'], foreground=theme.SUCCESS_GREEN, font=font_injector_readout, style='Subtle.TLabel', anchor='e').grid(row=0, column=1, sticky='ew')
 
-    injector_torque_widget = create_torque_widget(content_grid, shared_gui_refs['fillhead_torque0_var'], 115)
+    injector_torque_widget = create_torque_widget(content_grid, shared_gui_refs['fillhead_torque0_var'], 115, updater)
     injector_torque_widget.grid(row=0, column=4, rowspan=4, sticky='ns', padx=(10, 0))
     
     ttk.Separator(fillhead_content, orient='horizontal').pack(fill='x', pady=8, padx=10)
@@ -310,11 +506,11 @@ def create_gui_components(parent, shared_gui_refs):
         axis_label.grid(row=0, column=0, sticky='w', padx=(0, 5))
         ttk.Label(axis_frame, textvariable=shared_gui_refs[axis_info['state_var']], font=font_small_readout, style='Subtle.TLabel').grid(row=0, column=1, sticky='w', padx=(0, 10))
         ttk.Label(axis_frame, textvariable=shared_gui_refs[axis_info['pos_var']], font=font_small_readout, anchor='e', style='Subtle.TLabel').grid(row=0, column=2, sticky='ew', padx=(0, 10))
-        torque_widget = create_torque_widget(axis_frame, shared_gui_refs[axis_info['torque_var']], small_bar_height)
+        torque_widget = create_torque_widget(axis_frame, shared_gui_refs[axis_info['torque_var']], small_bar_height, updater)
         torque_widget.grid(row=0, column=3, rowspan=1, sticky='ns', padx=(10, 0))
         homed_var = shared_gui_refs[axis_info['homed_var']]
-        axis_label.tracer = make_homed_tracer(homed_var, axis_label)
-        homed_var.trace_add('write', axis_label.tracer)
+        axis_label.tracer = make_homed_tracer(homed_var, axis_label, updater)
+        updater.watch(homed_var, axis_label.tracer)
         axis_label.tracer()
 
     ttk.Separator(fillhead_content, orient='horizontal').pack(fill='x', pady=8, padx=10)
@@ -326,11 +522,12 @@ def create_gui_components(parent, shared_gui_refs):
     vac_label.grid(row=0, column=0, sticky='w', padx=(0, 5))
     vac_status_label = ttk.Label(vac_frame, textvariable=shared_gui_refs['fillhead_vacuum_state_var'], font=font_small_readout, style='Subtle.TLabel')
     vac_status_label.grid(row=0, column=1, sticky='w', padx=(0,10))
-    vac_status_tracer = make_on_off_tracer(shared_gui_refs['fillhead_vacuum_state_var'], (vac_status_label, theme.SUCCESS_GREEN, theme.COMMENT_COLOR))
-    shared_gui_refs['fillhead_vacuum_state_var'].trace_add('write', vac_status_tracer)
+    vac_status_tracer = make_on_off_tracer(shared_gui_refs['fillhead_vacuum_state_var'], (vac_status_label, theme.SUCCESS_GREEN, theme.COMMENT_COLOR), updater=updater)
+    updater.watch(shared_gui_refs['fillhead_vacuum_state_var'], vac_status_tracer)
     vac_status_tracer()
-    vac_value_tracer = make_vacuum_value_tracer(shared_gui_refs['fillhead_vacuum_psig_var'], vac_label)
-    shared_gui_refs['fillhead_vacuum_psig_var'].trace_add('write', vac_value_tracer)
+    vac_value_tracer = make_vacuum_value_tracer(shared_gui_refs['fillhead_vacuum_psig_var'], vac_label, updater,
+                                                typed_value('vacuum_psig', 'fillhead_vacuum_psig_var'))
+    updater.watch(shared_gui_refs['fillhead_vacuum_psig_var'], vac_value_tracer)
     vac_value_tracer()
     ttk.Label(vac_frame, textvariable=shared_gui_refs['fillhead_vacuum_psig_var'], font=font_small_readout, foreground=theme.PRIMARY_ACCENT, anchor='e', style='Subtle.TLabel').grid(row=0, column=2, sticky='ew', padx=(0, 10))
 
@@ -341,11 +538,12 @@ def create_gui_components(parent, shared_gui_refs):
     heater_label.grid(row=0, column=0, sticky='w', padx=(0, 5))
     heater_status_label = ttk.Label(heater_frame, textvariable=shared_gui_refs['fillhead_heater_state_var'], font=font_small_readout, style='Subtle.TLabel')
     heater_status_label.grid(row=0, column=1, sticky='w', padx=(0,10))
-    heater_status_tracer = make_on_off_tracer(shared_gui_refs['fillhead_heater_state_var'], (heater_status_label, theme.SUCCESS_GREEN, theme.COMMENT_COLOR))
-    shared_gui_refs['fillhead_heater_state_var'].trace_add('write', heater_status_tracer)
+    heater_status_tracer = make_on_off_tracer(shared_gui_refs['fillhead_heater_state_var'], (heater_status_label, theme.SUCCESS_GREEN, theme.COMMENT_COLOR), updater=updater)
+    updater.watch(shared_gui_refs['fillhead_heater_state_var'], heater_status_tracer)
     heater_status_tracer()
-    heater_value_tracer = make_heater_value_tracer(shared_gui_refs['fillhead_temp_c_var'], heater_label)
-    shared_gui_refs['fillhead_temp_c_var'].trace_add('write', heater_value_tracer)
+    heater_value_tracer = make_heater_value_tracer(shared_gui_refs['fillhead_temp_c_var'], heater_label, updater,
+                                                   typed_value('temp_c', 'fillhead_temp_c_var'))
+    updater.watch(shared_gui_refs['fillhead_temp_c_var'], heater_value_tracer)
     heater_value_tracer()
     ttk.Label(heater_frame, textvariable=shared_gui_refs['fillhead_heater_display_var'], font=font_small_readout, foreground=theme.WARNING_YELLOW, anchor='e', style='Subtle.TLabel').grid(row=0, column=2, sticky='ew', padx=(0, 10))
     
@@ -0,0 +1,526 @@
+"""
+Fillhead Injection Analytics
+Streaming flow, torque, temperature and leak-test metrics computed from decoded telemetry.
+
+The analyzer consumes the (time, kind, payload) items that TelemetryReplay.items() yields, or the
+same items built live from a receive loop: 'telemetry' dicts (full snapshots or the changed fields
+from TelemetryStateDecoder), 'command' text sent to the device and 'response' text it sent back.
+Each injection and each vacuum leak test is a cycle. Recent samples are held in fixed-length
+rolling windows whose sums are updated per sample, so the cost of a sample does not depend on the
+window length or the cycle length, and no run is ever buffered whole.
+
+The outputs are (time, kind, payload) items too, so stages can be chained:
+    (time, 'anomaly', dict)  when a sample first crosses a threshold (re-armed once it clears)
+    (time, 'cycle', dict)    summary when an injection or leak test ends
+
+Metrics:
+    flow          slope of injection_active_ml over the window, against the commanded speed
+    torque        injector_torque against the feed torque limit and the window mean (z-score)
+    temperature   temp_c against heater_setpoint while the heater is on
+    leak          slope of vacuum_psig while leak testing, projected over the test duration
+
+Usage:
+    python -m definition.injection_analytics run.tlog
+    python -m definition.injection_analytics run.tlog --window 50 --flow-tolerance 0.1
+"""
+import argparse
+import json
+import math
+
+import numpy as np
+
+from .command_table import command_token, split_correlation
+from .telemetry_record import FIELD_MAPS, TelemetryRecord
+
+DEFAULT_WINDOW_SAMPLES = 20       # 2 s of telemetry at the default 100 ms interval
+DEFAULT_INJECT_SPEED = 0.5        # INJECT_DEFAULT_SPEED_MLS in inc/config.h
+DEFAULT_TORQUE_LIMIT = 30.0       # FEED_DEFAULT_TORQUE_PERCENT in inc/config.h
+DEFAULT_LEAK_DELTA = 0.1          # DEFAULT_LEAK_TEST_DELTA_PSIG in inc/config.h
+DEFAULT_LEAK_DURATION = 10.0      # DEFAULT_LEAK_TEST_DURATION_MS in inc/config.h, in seconds
+DEFAULT_FLOW_TOLERANCE = 0.2      # Fraction of the commanded speed the measured flow may differ by
+DEFAULT_FLOW_SETTLE = 1.0         # Seconds after the start or a resume before flow is judged
+DEFAULT_TORQUE_WARNING = 0.9      # Fraction of the torque limit that raises torque_limit
+DEFAULT_TORQUE_Z = 4.0            # Deviations from the window mean that count as a torque spike
+DEFAULT_TORQUE_MIN_EXCURSION = 2.0  # Smallest torque spike flagged, in %, so a flat signal is quiet
+DEFAULT_TEMP_TOLERANCE = 5.0      # Degrees C from the setpoint
+
+INJECT_COMMANDS = ('inject_stator', 'inject_rotor')
+
+# Injection window channels; leak tests use a separate one-channel vacuum_psig window
+CHANNELS = ('injection_active_ml', 'injector_torque', 'temp_c')
+ACTIVE_ML, TORQUE, TEMP = range(len(CHANNELS))
+
+
+def _state_code(field, label):
+    """Returns the telemetry value of an enum field's label in telemetry.json."""
+    return next(code for code, name in FIELD_MAPS[field].items() if name == label)
+
+
+INJECTOR_FEEDING = _state_code('injector_state', 'feeding')
+VACUUM_LEAK_TESTING = _state_code('vacuum_state', 'leak testing')
+HEATER_ACTIVE = _state_code('heater_state', 'active')
+
+
+class RollingWindow:
+    """
+    The most recent samples of several channels, with constant-time statistics.
+
+    Samples live in a NumPy ring buffer. The sums of t, t^2 and, per channel, x, x^2 and t*x are
+    updated as samples enter and leave, so mean(), std() and slope() cost the same for any window
+    length. Every capacity samples the sums are recomputed from the buffer and the time origin is
+    moved to the oldest sample, which bounds rounding drift over long runs at O(1) amortized cost.
+
+    Args:
+        channels: Values per sample
+        capacity: Samples kept
+    """
+
+    def __init__(self, channels, capacity):
+        if capacity < 2:
+            raise ValueError(f"Window capacity must be at least 2, got {capacity}")
+        self.capacity = capacity
+        self._times = np.zeros(capacity)
+        self._values = np.zeros((capacity, channels))
+        self.clear()
+
+    def clear(self):
+        """Drop every sample."""
+        self.count = 0
+        self._next = 0
+        self._origin = None
+        self._since_refresh = 0
+        self._sum_t = 0.0
+        self._sum_tt = 0.0
+        channels = self._values.shape[1]
+        self._sum_x = np.zeros(channels)
+        self._sum_xx = np.zeros(channels)
+        self._sum_tx = np.zeros(channels)
+
+    def push(self, timestamp, values):
+        """Add a sample, evicting the oldest one once the window is full."""
+        if self._origin is None:
+            self._origin = timestamp
+        t = timestamp - self._origin
+        x = np.asarray(values, dtype=float)
+        slot = self._next
+        if self.count == self.capacity:
+            old_t, old_x = self._times[slot], self._values[slot]
+            self._sum_t -= old_t
+            self._sum_tt -= old_t * old_t
+            self._sum_x -= old_x
+            self._sum_xx -= old_x * old_x
+            self._sum_tx -= old_t * old_x
+        else:
+            self.count += 1
+        self._times[slot] = t
+        self._values[slot] = x
+        self._sum_t += t
+        self._sum_tt += t * t
+        self._sum_x += x
+        self._sum_xx += x * x
+        self._sum_tx += t * x
+        self._next = (slot + 1) % self.capacity
+        self._since_refresh += 1
+        if self._since_refresh >= self.capacity:
+            self._refresh()
+
+    @property
+    def full(self):
+        return self.count == self.capacity
+
+    def mean(self):
+        """Returns the per-channel mean, or NaNs if the window is empty."""
+        if self.count == 0:
+            return np.full(len(self._sum_x), np.nan)
+        return self._sum_x / self.count
+
+    def std(self):
+        """Returns the per-channel population standard deviation."""
+        mean = self.mean()
+        return np.sqrt(np.maximum(self._sum_xx / max(self.count, 1) - mean * mean, 0.0))
+
+    def slope(self):
+        """Returns the per-channel least-squares slope against time, or NaNs with under two distinct times."""
+        n = self.count
+        denominator = n * self._sum_tt - self._sum_t * self._sum_t
+        if n < 2 or denominator <= 1e-12 * max(1.0, n * self._sum_tt):
+            return np.full(len(self._sum_x), np.nan)
+        return (n * self._sum_tx - self._sum_t * self._sum_x) / denominator
+
+    def _refresh(self):
+        self._since_refresh = 0
+        rows = slice(0, self.count)
+        times = self._times[rows]
+        shift = times.min()
+        times -= shift
+        self._origin += shift
+        values = self._values[rows]
+        self._sum_t = times.sum()
+        self._sum_tt = times @ times
+        self._sum_x = values.sum(axis=0)
+        self._sum_xx = (values * values).sum(axis=0)
+        self._sum_tx = times @ values
+
+
+class _Cycle:
+    """Running totals of one injection or leak test; constant size however long it runs."""
+
+    def __init__(self, kind, command, timestamp, values, params):
+        self.kind = kind
+        self.command = command
+        self.start = timestamp
+        self.end = timestamp
+        self.params = params
+        self.start_values = dict(values)
+        self.samples = 0
+        self.paused_time = 0.0
+        self.paused_at = None
+        self.resumed_at = timestamp
+        self.verdict = None
+        self.anomalies = {}
+        self.active = set()
+        self.minimum = {}
+        self.maximum = {}
+        self.total = {}
+
+    def add(self, name, value):
+        if value is None or (isinstance(value, float) and math.isnan(value)):
+            return
+        self.minimum[name] = min(self.minimum.get(name, value), value)
+        self.maximum[name] = max(self.maximum.get(name, value), value)
+        self.total[name] = self.total.get(name, 0.0) + value
+
+
+class InjectionAnalyzer:
+    """
+    Streaming analytics for one fillhead.
+
+    Args:
+        window: Samples in the rolling windows
+        flow_tolerance: Fraction of the commanded speed the measured flow may differ by
+        flow_settle: Seconds after an injection starts or resumes before flow is judged
+        torque_limit: Feed torque limit in %; torque_limit is flagged above torque_warning of it
+        torque_warning: Fraction of torque_limit that raises torque_limit
+        torque_z: Standard deviations from the mean of the preceding window that raise torque_spike
+        torque_min_excursion: Smallest deviation in % that raises torque_spike
+        temp_tolerance: Degrees C from heater_setpoint that raise temperature
+    """
+
+    def __init__(self, window=DEFAULT_WINDOW_SAMPLES, flow_tolerance=DEFAULT_FLOW_TOLERANCE,
+                 flow_settle=DEFAULT_FLOW_SETTLE, torque_limit=DEFAULT_TORQUE_LIMIT,
+                 torque_warning=DEFAULT_TORQUE_WARNING, torque_z=DEFAULT_TORQUE_Z,
+                 torque_min_excursion=DEFAULT_TORQUE_MIN_EXCURSION, temp_tolerance=DEFAULT_TEMP_TOLERANCE):
+        self.flow_tolerance = flow_tolerance
+        self.flow_settle = flow_settle
+        self.torque_limit = torque_limit
+        self.torque_warning = torque_warning
+        self.torque_z = torque_z
+        self.torque_min_excursion = torque_min_excursion
+        self.temp_tolerance = temp_tolerance
+        self.window = RollingWindow(len(CHANNELS), window)
+        self.leak_window = RollingWindow(1, window)
+        self.values = TelemetryRecord().as_dict()
+        self.injection = None
+        self.leak_test = None
+        self._pending_inject = None
+        self._pending_leak = None
+
+    def feed(self, timestamp, kind, payload):
+        """
+        Process one item of the stream.
+
+        Args:
+            timestamp: Item time in seconds
+            kind: 'telemetry', 'command' or 'response'; other kinds are ignored
+            payload: Dict of telemetry field values, or the message text
+
+        Returns:
+            List of (time, kind, dict) outputs, usually empty
+        """
+        if kind == 'telemetry':
+            return self._telemetry(timestamp, payload)
+        if kind == 'command':
+            self._command(timestamp, payload)
+        elif kind == 'response':
+            self._response(payload)
+        return []
+
+    def finish(self, timestamp=None):
+        """
+        End the stream, summarizing any cycle still open as incomplete.
+
+        Returns:
+            List of (time, 'cycle', dict) outputs
+        """
+        outputs = []
+        for cycle in (self.injection, self.leak_test):
+            if cycle is not None:
+                outputs.append(self._close(cycle, cycle.end if timestamp is None else timestamp, complete=False))
+        self.injection = self.leak_test = None
+        return outputs
+
+    # --- Input handling ---
+
+    def _command(self, timestamp, text):
+        words = text.split()
+        if not words:
+            return
+        token = command_token(text)
+        args, _ = split_correlation(words[1:])
+        try:
+            numbers = [float(arg) for arg in args]
+        except ValueError:
+            return
+        if token in INJECT_COMMANDS and numbers:
+            speed = numbers[1] if len(numbers) > 1 else DEFAULT_INJECT_SPEED
+            self._pending_inject = (token, {'volume_ml': numbers[0], 'speed_mls': speed})
+        elif token == 'vacuum_leak_test':
+            delta = numbers[0] if len(numbers) > 0 else DEFAULT_LEAK_DELTA
+            duration = numbers[1] if len(numbers) > 1 else DEFAULT_LEAK_DURATION
+            self._pending_leak = (token, {'delta_psi': delta, 'test_duration_s': duration})
+        elif token == 'pause_injection' and self.injection is not None and self.injection.paused_at is None:
+            self.injection.paused_at = timestamp
+        elif token == 'resume_injection' and self.injection is not None and self.injection.paused_at is not None:
+            self.injection.paused_time += timestamp - self.injection.paused_at
+            self.injection.paused_at = None
+            self.injection.resumed_at = timestamp
+            self.window.clear()
+
+    def _response(self, text):
+        if self.leak_test is None:
+            return
+        upper = text.upper()
+        if 'LEAK_TEST PASSED' in upper:
+            self.leak_test.verdict = 'passed'
+        elif 'LEAK_TEST FAILED' in upper:
+            self.leak_test.verdict = 'failed'
+
+    def _telemetry(self, timestamp, payload):
+        values = self.values
+        values.update(payload)
+        outputs = []
+
+        feeding = values['injector_state'] == INJECTOR_FEEDING
+        if feeding and self.injection is None:
+            command, params = self._pending_inject or (None, {'volume_ml': values['injection_target_ml'],
+                                                              'speed_mls': None})
+            self._pending_inject = None
+            self.injection = _Cycle('injection', command, timestamp, values, params)
+            self.window.clear()
+        elif not feeding and self.injection is not None:
+            outputs.append(self._close(self.injection, timestamp))
+            self.injection = None
+
+        leak_testing = values['vacuum_state'] == VACUUM_LEAK_TESTING
+        if leak_testing and self.leak_test is None:
+            command, params = self._pending_leak or (None, {'delta_psi': DEFAULT_LEAK_DELTA,
+                                                            'test_duration_s': DEFAULT_LEAK_DURATION})
+            self._pending_leak = None
+            self.leak_test = _Cycle('leak_test', command, timestamp, values, params)
+            self.leak_window.clear()
+        elif not leak_testing and self.leak_test is not None:
+            outputs.append(self._close(self.leak_test, timestamp))
+            self.leak_test = None
+
+        if self.injection is not None:
+            # Torque spikes are scored against the previous samples only; a window that already holds
+            # the spike inflates its own std and caps the z-score at sqrt(window - 1).
+            window = self.window
+            baseline = (window.mean()[TORQUE], window.std()[TORQUE]) if window.full else None
+            window.push(timestamp, [values[name] for name in CHANNELS])
+            self._injection_sample(timestamp, outputs, baseline)
+        if self.leak_test is not None:
+            self.leak_window.push(timestamp, (values['vacuum_psig'],))
+            self._leak_sample(timestamp, outputs)
+        return outputs
+
+    # --- Metrics ---
+
+    def _injection_sample(self, timestamp, outputs, torque_baseline):
+        cycle = self.injection
+        values = self.values
+        window = self.window
+        cycle.end = timestamp
+        cycle.samples += 1
+        torque = values['injector_torque']
+        cycle.add('active_ml', values['injection_active_ml'])
+        cycle.add('torque', torque)
+        cycle.add('temp_c', values['temp_c'])
+        if cycle.paused_at is not None:
+            return
+
+        slope = window.slope()
+        flow = slope[ACTIVE_ML]
+        speed = cycle.params.get('speed_mls')
+        settled = timestamp - cycle.resumed_at >= self.flow_settle and window.full
+        if settled and not math.isnan(flow):
+            cycle.add('flow', flow)
+            if speed:
+                error = (flow - speed) / speed
+                self._flag(cycle, outputs, timestamp, 'flow_low', error < -self.flow_tolerance,
+                           flow_mls=flow, speed_mls=speed)
+                self._flag(cycle, outputs, timestamp, 'flow_high', error > self.flow_tolerance,
+                           flow_mls=flow, speed_mls=speed)
+
+        self._flag(cycle, outputs, timestamp, 'torque_limit', torque > self.torque_limit * self.torque_warning,
+                   torque=torque, limit=self.torque_limit)
+        if torque_baseline is not None:
+            mean, std = torque_baseline
+            excursion = abs(torque - mean)
+            spike = excursion >= self.torque_min_excursion and excursion > self.torque_z * std
+            self._flag(cycle, outputs, timestamp, 'torque_spike', spike, torque=torque, window_mean=mean)
+
+        if values['heater_state'] == HEATER_ACTIVE:
+            deviation = values['temp_c'] - values['heater_setpoint']
+            self._flag(cycle, outputs, timestamp, 'temperature', abs(deviation) > self.temp_tolerance,
+                       temp_c=values['temp_c'], setpoint_c=values['heater_setpoint'])
+
+    def _leak_sample(self, timestamp, outputs):
+        cycle = self.leak_test
+        cycle.end = timestamp
+        cycle.samples += 1
+        pressure = self.values['vacuum_psig']
+        cycle.add('vacuum_psig', pressure)
+        rise = pressure - cycle.start_values['vacuum_psig']
+        elapsed = timestamp - cycle.start
+        window = self.leak_window
+        rate = window.slope()[0] if window.count >= window.capacity // 2 else math.nan
+        if math.isnan(rate):
+            return
+        cycle.add('decay_rate', rate)
+        remaining = max(0.0, cycle.params['test_duration_s'] - elapsed)
+        projected = rise + max(rate, 0.0) * remaining
+        self._flag(cycle, outputs, timestamp, 'leak', projected > cycle.params['delta_psi'],
+                   rise_psi=rise, projected_rise_psi=projected, decay_psi_s=rate)
+
+    def _flag(self, cycle, outputs, timestamp, name, condition, **detail):
+        """Emit an anomaly when condition becomes true; it re-arms once condition is false again."""
+        if not condition:
+            cycle.active.discard(name)
+            return
+        if name in cycle.active:
+            return
+        cycle.active.add(name)
+        cycle.anomalies[name] = cycle.anomalies.get(name, 0) + 1
+        outputs.append((timestamp, 'anomaly', {
+            'anomaly': name,
+            'cycle': cycle.kind,
+            'command': cycle.command,
+            'elapsed_s': timestamp - cycle.start,
+            **{key: float(value) for key, value in detail.items()},
+        }))
+
+    def _close(self, cycle, timestamp, complete=True):
+        elapsed = timestamp - cycle.start
+        summary = {
+            'cycle': cycle.kind,
+            'command': cycle.command,
+            'start': cycle.start,
+            'duration_s': elapsed,
+            'samples': cycle.samples,
+            'complete': complete,
+            **cycle.params,
+        }
+        if cycle.kind == 'injection':
+            paused = cycle.paused_time + (timestamp - cycle.paused_at if cycle.paused_at is not None else 0.0)
+            dispensed = self.values['injection_cumulative_ml'] - cycle.start_values['injection_cumulative_ml']
+            if dispensed <= 0.0:
+                dispensed = max(cycle.maximum.get('active_ml', 0.0), self.values['injection_active_ml'])
+            pumping = elapsed - paused
+            summary.update(
+                paused_s=paused,
+                dispensed_ml=dispensed,
+                mean_flow_mls=dispensed / pumping if pumping > 0 else None,
+                min_flow_mls=cycle.minimum.get('flow'),
+                max_flow_mls=cycle.maximum.get('flow'),
+                max_torque=cycle.maximum.get('torque'),
+                mean_torque=cycle.total['torque'] / cycle.samples if cycle.samples else None,
+                min_temp_c=cycle.minimum.get('temp_c'),
+                max_temp_c=cycle.maximum.get('temp_c'),
+            )
+        else:
+            rise = self.values['vacuum_psig'] - cycle.start_values['vacuum_psig']
+            summary.update(
+                start_psig=cycle.start_values['vacuum_psig'],
+                rise_psi=rise,
+                mean_decay_psi_s=rise / elapsed if elapsed > 0 else None,
+                max_decay_psi_s=cycle.maximum.get('decay_rate'),
+                verdict=cycle.verdict or ('failed' if rise > cycle.params['delta_psi'] else 'passed'),
+                verdict_source='device' if cycle.verdict else 'host',
+            )
+        summary['anomalies'] = dict(cycle.anomalies)
+        return timestamp, 'cycle', {key: float(value) if isinstance(value, np.floating) else value
+                                    for key, value in summary.items()}
+
+
+def analyze(items, **options):
+    """
+    Run one fillhead's stream through an InjectionAnalyzer.
+
+    Args:
+        items: Iterable of (time, kind, payload), e.g. TelemetryReplay(log).items()
+        **options: InjectionAnalyzer arguments
+
+    Yields:
+        (time, 'anomaly' or 'cycle', dict) outputs as soon as they are known
+    """
+    analyzer = InjectionAnalyzer(**options)
+    last = None
+    for timestamp, kind, payload in items:
+        last = timestamp
+        yield from analyzer.feed(timestamp, kind, payload)
+    yield from analyzer.finish(last)
+
+
+def analyze_fleet(items, **options):
+    """
+    Run the interleaved streams of many fillheads, with one analyzer per device.
+
+    Args:
+        items: Iterable of (device, time, kind, payload); device is any hashable key
+        **options: InjectionAnalyzer arguments
+
+    Yields:
+        (device, time, 'anomaly' or 'cycle', dict) outputs as soon as they are known
+    """
+    analyzers = {}
+    for device, timestamp, kind, payload in items:
+        analyzer = analyzers.get(device)
+        if analyzer is None:
+            analyzer = analyzers[device] = InjectionAnalyzer(**options)
+        for output in analyzer.feed(timestamp, kind, payload):
+            yield (device, *output)
+    for device, analyzer in analyzers.items():
+        for output in analyzer.finish():
+            yield (device, *output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compute injection and leak-test metrics from a telemetry log.")
+    parser.add_argument('path', help="telemetry log written by telemetry_log.TelemetryRecorder")
+    parser.add_argument('--window', type=int, default=DEFAULT_WINDOW_SAMPLES, help="rolling window in samples")
+    parser.add_argument('--flow-tolerance', type=float, default=DEFAULT_FLOW_TOLERANCE,
+                        help="allowed flow error as a fraction of the commanded speed")
+    parser.add_argument('--torque-limit', type=float, default=DEFAULT_TORQUE_LIMIT, help="feed torque limit in %%")
+    parser.add_argument('--json', action='store_true', help="print one JSON object per output")
+    args = parser.parse_args()
+
+    from .telemetry_log import TelemetryLog, TelemetryReplay
+
+    with TelemetryLog(args.path) as log:
+        outputs = analyze(TelemetryReplay(log).items(), window=args.window,
+                          flow_tolerance=args.flow_tolerance, torque_limit=args.torque_limit)
+        for timestamp, kind, payload in outputs:
+            if args.json:
+                print(json.dumps({'time': timestamp, 'kind': kind, **payload}))
+            elif kind == 'anomaly':
+                detail = ', '.join(f"{key}={value:.3g}" for key, value in payload.items()
+                                   if isinstance(value, float) and key != 'elapsed_s')
+                print(f"{timestamp:.3f}  ANOMALY {payload['anomaly']} in {payload['cycle']} "
+                      f"at +{payload['elapsed_s']:.1f} s: {detail}")
+            else:
+                print(f"{timestamp:.3f}  CYCLE {json.dumps(payload)}")
+
+
+if __name__ == "__main__":
+    main()
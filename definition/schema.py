@@ -0,0 +1,56 @@
+"""
+Fillhead Schema
+Loads the JSON definitions for runtime modules, from the precompiled schema cache when it is current.
+
+codegen writes the parsed definitions into schema_cache.py, which Python keeps as bytecode, so
+loading a definition costs an import and a CRC-32 of the JSON file rather than a JSON parse. A
+definition whose JSON file was edited after the last codegen run is parsed from the file instead,
+so a stale cache is never used. Each definition is loaded once per process and shared between
+callers; treat it as read-only.
+
+The code generator itself always parses the JSON files (see codegen.load_definition()).
+"""
+import os
+import zlib
+
+DEFINITION_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_loaded = {}
+
+
+def source_crc(data):
+    """Returns the CRC-32 identifying the contents of a definition file."""
+    return zlib.crc32(data) & 0xFFFFFFFF
+
+
+def load_definition(name):
+    """
+    Load one of the JSON definition files from this directory.
+
+    Args:
+        name: File name, e.g. "telemetry.json"
+
+    Returns:
+        The parsed JSON content, shared with every other caller
+    """
+    definition = _loaded.get(name)
+    if definition is None:
+        with open(os.path.join(DEFINITION_DIR, name), 'rb') as f:
+            data = f.read()
+        definition = _from_cache(name, data)
+        if definition is None:
+            import json
+
+            definition = json.loads(data.decode('utf-8'))
+        _loaded[name] = definition
+    return definition
+
+
+def _from_cache(name, data):
+    try:
+        from . import schema_cache
+    except ImportError:
+        return None
+    if schema_cache.SOURCE_CRCS.get(name) != source_crc(data):
+        return None
+    return schema_cache.DEFINITIONS[name]
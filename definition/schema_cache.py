@@ -0,0 +1,426 @@
+"""
+Fillhead Schema Cache
+Parsed copies of the JSON definitions, so loading them at runtime is an import of this module's
+bytecode instead of a JSON parse. Read through schema.load_definition(), which only uses an entry
+while the CRC-32 of its JSON file still matches.
+
+AUTO-GENERATED FILE - DO NOT EDIT MANUALLY
+Generated from telemetry.json, commands.json, diagnostics.json, events.json (source CRC-32 22FD0D7D)
+To modify a definition, edit its JSON file and regenerate this file.
+"""
+
+# File name -> CRC-32 of the JSON the entry was parsed from
+SOURCE_CRCS = {
+    'telemetry.json': 0x585D33F5,
+    'commands.json': 0xB4AC7350,
+    'diagnostics.json': 0x4D57DE72,
+    'events.json': 0x8E811822,
+}
+
+# File name -> parsed definition
+DEFINITIONS = {'telemetry.json': {'main_state': {'type': 'int',
+                                   'default': 0,
+                                   'map': {'0': 'standby',
+                                           '1': 'busy',
+                                           '2': 'error',
+                                           '3': 'disabled',
+                                           '4': 'clearing errors'},
+                                   'help': 'Overall fillhead system state'},
+                    'injector_state': {'type': 'int',
+                                       'default': 0,
+                                       'map': {'0': 'standby',
+                                               '1': 'homing',
+                                               '2': 'jogging',
+                                               '3': 'feeding',
+                                               '4': 'motor fault'},
+                                       'help': 'Current operational state of the injector motors'},
+                    'inj_valve_state': {'type': 'int',
+                                        'default': 0,
+                                        'map': {'0': 'not homed',
+                                                '1': 'closed',
+                                                '2': 'open',
+                                                '3': 'halted',
+                                                '4': 'moving',
+                                                '5': 'homing',
+                                                '6': 'jogging',
+                                                '7': 'resetting',
+                                                '8': 'error'},
+                                        'help': 'Current state of the injection pinch valve'},
+                    'vac_valve_state': {'type': 'int',
+                                        'default': 0,
+                                        'map': {'0': 'not homed',
+                                                '1': 'closed',
+                                                '2': 'open',
+                                                '3': 'halted',
+                                                '4': 'moving',
+                                                '5': 'homing',
+                                                '6': 'jogging',
+                                                '7': 'resetting',
+                                                '8': 'error'},
+                                        'help': 'Current state of the vacuum pinch valve'},
+                    'heater_state': {'type': 'int',
+                                     'default': 0,
+                                     'map': {'0': 'off', '1': 'active'},
+                                     'help': 'Heater PID control status'},
+                    'vacuum_state': {'type': 'int',
+                                     'default': 0,
+                                     'map': {'0': 'off',
+                                             '1': 'pulldown',
+                                             '2': 'settling',
+                                             '3': 'leak testing',
+                                             '4': 'on',
+                                             '5': 'error'},
+                                     'help': 'Current vacuum system operation state'},
+                    'injector_torque': {'unit': '%',
+                                        'type': 'float',
+                                        'default': 0.0,
+                                        'precision': 1,
+                                        'batch': True,
+                                        'help': 'Current motor torque percentage for injector'},
+                    'injector_homed': {'type': 'int',
+                                       'default': 0,
+                                       'map': {'0': 'not homed', '1': 'homed'},
+                                       'help': 'Indicates if injector has been homed to machine zero'},
+                    'injection_cumulative_ml': {'unit': 'ml',
+                                                'type': 'float',
+                                                'default': 0.0,
+                                                'precision': 2,
+                                                'help': 'Total volume dispensed since last cartridge home'},
+                    'injection_active_ml': {'unit': 'ml',
+                                            'type': 'float',
+                                            'default': 0.0,
+                                            'precision': 2,
+                                            'help': 'Volume dispensed in current injection operation'},
+                    'injection_target_ml': {'unit': 'ml',
+                                            'type': 'float',
+                                            'default': 0.0,
+                                            'precision': 2,
+                                            'help': 'Target volume for current injection operation'},
+                    'motors_enabled': {'type': 'bool',
+                                       'default': 1,
+                                       'map': {'0': 'disabled', '1': 'enabled'},
+                                       'help': 'Global motor power enable status'},
+                    'inj_valve_pos': {'unit': 'mm',
+                                      'type': 'float',
+                                      'default': 0.0,
+                                      'precision': 2,
+                                      'help': 'Current position of injection valve actuator'},
+                    'inj_valve_torque': {'unit': '%',
+                                         'type': 'float',
+                                         'default': 0.0,
+                                         'precision': 1,
+                                         'batch': True,
+                                         'help': 'Current motor torque percentage for injection valve'},
+                    'inj_valve_homed': {'type': 'bool',
+                                        'default': 0,
+                                        'map': {'0': 'not homed', '1': 'homed'},
+                                        'help': 'Indicates if injection valve has been homed'},
+                    'vac_valve_pos': {'unit': 'mm',
+                                      'type': 'float',
+                                      'default': 0.0,
+                                      'precision': 2,
+                                      'help': 'Current position of vacuum valve actuator'},
+                    'vac_valve_motor_torque': {'unit': '%',
+                                               'type': 'float',
+                                               'default': 0.0,
+                                               'precision': 1,
+                                               'batch': True,
+                                               'help': 'Current motor torque percentage for vacuum valve'},
+                    'vac_valve_homed': {'type': 'bool',
+                                        'default': 0,
+                                        'map': {'0': 'not homed', '1': 'homed'},
+                                        'help': 'Indicates if vacuum valve has been homed'},
+                    'temp_c': {'unit': 'C',
+                               'type': 'float',
+                               'default': 25.0,
+                               'precision': 1,
+                               'batch': True,
+                               'help': 'Current material temperature from thermocouple'},
+                    'heater_setpoint': {'unit': 'C',
+                                        'type': 'float',
+                                        'default': 70.0,
+                                        'precision': 1,
+                                        'help': 'Target temperature setpoint for PID controller'},
+                    'vacuum_psig': {'unit': 'PSIG',
+                                    'type': 'float',
+                                    'default': 0.5,
+                                    'precision': 2,
+                                    'batch': True,
+                                    'help': 'Current vacuum pressure reading'}},
+ 'commands.json': {'enable': {'device': 'fillhead',
+                              'target': 'device',
+                              'idempotent': True,
+                              'params': [],
+                              'returns': ['done', 'error'],
+                              'help': 'Command to enable all motors.'},
+                   'disable': {'device': 'fillhead',
+                               'target': 'device',
+                               'idempotent': True,
+                               'params': [],
+                               'returns': ['done', 'error'],
+                               'help': 'Command to disable all motors.'},
+                   'discover_device': {'device': 'fillhead',
+                                       'target': 'device',
+                                       'idempotent': True,
+                                       'params': [],
+                                       'returns': ['discovery_response'],
+                                       'help': 'Generic command for any device to respond to.'},
+                   'abort': {'device': 'fillhead',
+                             'target': 'device',
+                             'idempotent': True,
+                             'params': [],
+                             'returns': ['done', 'error'],
+                             'help': 'Command to halt all ongoing operations.'},
+                   'clear_errors': {'device': 'fillhead',
+                                    'target': 'device',
+                                    'idempotent': True,
+                                    'params': [],
+                                    'returns': ['done', 'error'],
+                                    'help': 'Command to clear any existing fault states.'},
+                   'request_keyframe': {'device': 'fillhead',
+                                        'target': 'device',
+                                        'idempotent': True,
+                                        'params': [],
+                                        'returns': ['done'],
+                                        'help': 'Command to send a full telemetry keyframe next, e.g. after '
+                                                'the host detects a sequence gap.'},
+                   'inject_stator': {'device': 'fillhead',
+                                     'target': 'device',
+                                     'params': [{'parameter': 'volume', 'unit': 'ml', 'type': 'float'},
+                                                {'parameter': 'speed',
+                                                 'unit': 'ml/s',
+                                                 'type': 'float',
+                                                 'optional': True}],
+                                     'returns': ['done', 'error'],
+                                     'help': 'Command to dispense a specific volume using the stator (5:1) '
+                                             'configuration.'},
+                   'inject_rotor': {'device': 'fillhead',
+                                    'target': 'device',
+                                    'params': [{'parameter': 'volume', 'unit': 'ml', 'type': 'float'},
+                                               {'parameter': 'speed',
+                                                'unit': 'ml/s',
+                                                'type': 'float',
+                                                'optional': True}],
+                                    'returns': ['done', 'error'],
+                                    'help': 'Command to dispense a specific volume using the rotor (1:1) '
+                                            'configuration.'},
+                   'jog_move': {'device': 'fillhead',
+                                'target': 'device',
+                                'params': [{'parameter': 'distance', 'unit': 'mm', 'type': 'float'}],
+                                'returns': ['done', 'error'],
+                                'help': 'Command to jog the injector motors by a relative distance.'},
+                   'machine_home': {'device': 'fillhead',
+                                    'target': 'device',
+                                    'params': [],
+                                    'returns': ['done', 'error'],
+                                    'help': 'Command to home the main machine axis.'},
+                   'cartridge_home': {'device': 'fillhead',
+                                      'target': 'device',
+                                      'params': [],
+                                      'returns': ['done', 'error'],
+                                      'help': 'Command to home the injector against the cartridge.'},
+                   'move_to_cartridge_home': {'device': 'fillhead',
+                                              'target': 'device',
+                                              'params': [],
+                                              'returns': ['done', 'error'],
+                                              'help': 'Command to move the injector to the cartridge home '
+                                                      'position.'},
+                   'move_to_cartridge_retract': {'device': 'fillhead',
+                                                 'target': 'device',
+                                                 'params': [{'parameter': 'distance',
+                                                             'unit': 'mm',
+                                                             'type': 'float'}],
+                                                 'returns': ['done', 'error'],
+                                                 'help': 'Command to retract the injector a specified '
+                                                         'distance from cartridge home.'},
+                   'pause_injection': {'device': 'fillhead',
+                                       'target': 'device',
+                                       'idempotent': True,
+                                       'params': [],
+                                       'returns': ['done', 'error'],
+                                       'help': 'Command to pause an ongoing injection.'},
+                   'resume_injection': {'device': 'fillhead',
+                                        'target': 'device',
+                                        'params': [],
+                                        'returns': ['done', 'error'],
+                                        'help': 'Command to resume a paused injection.'},
+                   'cancel_injection': {'device': 'fillhead',
+                                        'target': 'device',
+                                        'idempotent': True,
+                                        'params': [],
+                                        'returns': ['done', 'error'],
+                                        'help': 'Command to cancel an ongoing injection.'},
+                   'vacuum_on': {'device': 'fillhead',
+                                 'target': 'device',
+                                 'idempotent': True,
+                                 'params': [{'parameter': 'target',
+                                             'unit': 'psi',
+                                             'type': 'float',
+                                             'optional': True}],
+                                 'returns': ['done', 'error'],
+                                 'help': 'Command to turn the vacuum pump on.'},
+                   'vacuum_off': {'device': 'fillhead',
+                                  'target': 'device',
+                                  'idempotent': True,
+                                  'params': [],
+                                  'returns': ['done', 'error'],
+                                  'help': 'Command to turn the vacuum pump off.'},
+                   'vacuum_leak_test': {'device': 'fillhead',
+                                        'target': 'device',
+                                        'params': [{'parameter': 'delta',
+                                                    'unit': 'psi',
+                                                    'type': 'float',
+                                                    'optional': True},
+                                                   {'parameter': 'duration',
+                                                    'unit': 's',
+                                                    'type': 'float',
+                                                    'optional': True}],
+                                        'returns': ['passed', 'failed'],
+                                        'help': 'Command to initiate a vacuum leak test.'},
+                   'heater_on': {'device': 'fillhead',
+                                 'target': 'device',
+                                 'idempotent': True,
+                                 'params': [{'parameter': 'setpoint',
+                                             'unit': 'C',
+                                             'type': 'float',
+                                             'optional': True}],
+                                 'returns': ['done', 'error'],
+                                 'help': 'Command to turn the heater on.'},
+                   'heater_off': {'device': 'fillhead',
+                                  'target': 'device',
+                                  'idempotent': True,
+                                  'params': [],
+                                  'returns': ['done', 'error'],
+                                  'help': 'Command to turn the heater off.'},
+                   'injection_valve_home': {'device': 'fillhead',
+                                            'target': 'device',
+                                            'params': [],
+                                            'returns': ['done', 'error'],
+                                            'help': 'Command to home the injection valve.'},
+                   'injection_valve_open': {'device': 'fillhead',
+                                            'target': 'device',
+                                            'idempotent': True,
+                                            'params': [],
+                                            'returns': ['done', 'error'],
+                                            'help': 'Command to open the injection valve.'},
+                   'injection_valve_close': {'device': 'fillhead',
+                                             'target': 'device',
+                                             'idempotent': True,
+                                             'params': [],
+                                             'returns': ['done', 'error'],
+                                             'help': 'Command to close the injection valve.'},
+                   'injection_valve_jog': {'device': 'fillhead',
+                                           'target': 'device',
+                                           'params': [{'parameter': 'distance',
+                                                       'unit': 'mm',
+                                                       'type': 'float'}],
+                                           'returns': ['done', 'error'],
+                                           'help': 'Command to jog the injection valve motor.'},
+                   'vacuum_valve_home': {'device': 'fillhead',
+                                         'target': 'device',
+                                         'params': [],
+                                         'returns': ['done', 'error'],
+                                         'help': 'Command to home the vacuum valve.'},
+                   'vacuum_valve_open': {'device': 'fillhead',
+                                         'target': 'device',
+                                         'idempotent': True,
+                                         'params': [],
+                                         'returns': ['done', 'error'],
+                                         'help': 'Command to open the vacuum valve.'},
+                   'vacuum_valve_close': {'device': 'fillhead',
+                                          'target': 'device',
+                                          'idempotent': True,
+                                          'params': [],
+                                          'returns': ['done', 'error'],
+                                          'help': 'Command to close the vacuum valve.'},
+                   'vacuum_valve_jog': {'device': 'fillhead',
+                                        'target': 'device',
+                                        'params': [{'parameter': 'distance', 'unit': 'mm', 'type': 'float'}],
+                                        'returns': ['done', 'error'],
+                                        'help': 'Command to jog the vacuum valve motor.'},
+                   'test_command': {'device': 'fillhead',
+                                    'target': 'device',
+                                    'description': 'A test command!',
+                                    'params': [{'parameter': 'position', 'type': 'float', 'unit': 'mm'},
+                                               {'parameter': 'action', 'type': 'string'}],
+                                    'returns': ['done', 'error']}},
+ 'diagnostics.json': {'prefix': 'FILLHEAD_DIAG: ',
+                      'interval_ms': 1000,
+                      'histogram_buckets': 16,
+                      'sections': {'comms': 'CommsController::update (UDP receive and TX queue drain)',
+                                   'dispatch': 'Command parsing and dispatch',
+                                   'injector': 'Injector::updateState',
+                                   'inj_valve': 'Injection PinchValve::updateState',
+                                   'vac_valve': 'Vacuum PinchValve::updateState',
+                                   'heater': 'HeaterController::updateState',
+                                   'vacuum': 'VacuumController::updateState',
+                                   'sensors': 'Temperature and vacuum sensor sampling',
+                                   'telemetry': 'Telemetry formatting and enqueueing'},
+                      'fields': {'window_ms': {'type': 'uint32',
+                                               'unit': 'ms',
+                                               'help': 'Length of the reporting window this message covers'},
+                                 'loops': {'type': 'uint32', 'help': 'Main loop iterations in the window'},
+                                 'loop_min_us': {'type': 'uint32',
+                                                 'unit': 'us',
+                                                 'help': 'Shortest loop period'},
+                                 'loop_max_us': {'type': 'uint32',
+                                                 'unit': 'us',
+                                                 'help': 'Longest loop period'},
+                                 'loop_hist': {'type': 'histogram',
+                                               'unit': 'us',
+                                               'help': 'Loop period counts; bucket 0 holds 0-1 us and bucket '
+                                                       'i holds [2^i, 2^(i+1)) us, the last bucket is '
+                                                       'open-ended'},
+                                 'section_avg_us': {'type': 'sections',
+                                                    'unit': 'us',
+                                                    'help': 'Mean cost per loop of each section, keyed '
+                                                            '<section>_avg_us'},
+                                 'section_max_us': {'type': 'sections',
+                                                    'unit': 'us',
+                                                    'help': 'Worst single-loop cost of each section, keyed '
+                                                            '<section>_max_us'},
+                                 'rx_hwm': {'type': 'uint32',
+                                            'help': 'Highest RX queue depth in the window (capacity '
+                                                    'RX_QUEUE_SIZE - 1)'},
+                                 'tx_hwm': {'type': 'uint32',
+                                            'help': 'Highest TX queue depth in the window (capacity '
+                                                    'TX_QUEUE_SIZE - 1)'},
+                                 'tx_bytes_hwm': {'type': 'uint32',
+                                                  'unit': 'B',
+                                                  'help': 'Most TX data buffer bytes in use in the window '
+                                                          '(capacity TX_BUFFER_SIZE)'},
+                                 'rx_drops': {'type': 'uint32',
+                                              'help': 'Commands dropped because the RX queue was full'},
+                                 'tx_drops': {'type': 'uint32',
+                                              'help': 'Messages dropped because the TX queue was full'},
+                                 'cmds': {'type': 'uint32', 'help': 'Commands dispatched in the window'},
+                                 'dwell_max_us': {'type': 'uint32',
+                                                  'unit': 'us',
+                                                  'help': 'Longest time a command waited in the RX queue '
+                                                          'before dispatch'},
+                                 'dwell_hist': {'type': 'histogram',
+                                                'unit': 'us',
+                                                'help': 'RX queue dwell time counts, bucketed like '
+                                                        'loop_hist'}}},
+ 'events.json': {'script_run': {'device': 'fillhead',
+                                'description': 'Firmware requesting script to start or resume execution. '
+                                               'Sent when conditions are safe to continue.',
+                                'type': 'script_control',
+                                'params': []},
+                 'script_hold': {'device': 'fillhead',
+                                 'description': 'Firmware requesting script to pause execution. Sent when a '
+                                                'safety condition is triggered or operator requests pause.',
+                                 'type': 'script_control',
+                                 'params': [{'parameter': 'reason',
+                                             'type': 'string',
+                                             'optional': True,
+                                             'description': 'Human-readable reason for the hold'}]},
+                 'script_reset': {'device': 'fillhead',
+                                  'description': 'Firmware requesting script to abort and reset to '
+                                                 'beginning. Sent on critical errors or when operator '
+                                                 'presses reset button.',
+                                  'type': 'script_control',
+                                  'params': [{'parameter': 'reason',
+                                              'type': 'string',
+                                              'optional': True,
+                                              'description': 'Human-readable reason for the reset'}]}}}
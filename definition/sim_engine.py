@@ -0,0 +1,162 @@
+"""
+Fillhead Simulation Engine
+Discrete-event scheduler with a virtual clock shared by every simulated process.
+
+Events are callbacks scheduled at a virtual time. In real-time mode the clock follows the wall
+clock (optionally scaled by a speed factor); otherwise the clock jumps straight from one event to
+the next, so hours of simulated operation run in seconds.
+"""
+import heapq
+import itertools
+import threading
+import time
+
+
+class Event:
+    """
+    Handle for a scheduled callback, returned by SimEngine.schedule() and SimEngine.every().
+
+    Attributes:
+        time: Virtual time in seconds at which the callback runs next
+        period: Repeat period in seconds, or None for a one-shot event
+        cancelled: True once SimEngine.cancel() has been called for this event
+    """
+    __slots__ = ('time', 'period', 'callback', 'args', 'cancelled')
+
+    def __init__(self, time, period, callback, args):
+        self.time = time
+        self.period = period
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+
+class SimEngine:
+    """
+    Single scheduler driving all simulated motions and dynamics on a virtual clock.
+
+    Args:
+        realtime: If True, sync() and run() keep the virtual clock in step with the wall clock;
+            if False, run() processes events as fast as possible
+        speed: Virtual seconds per wall-clock second in real-time mode
+
+    Callbacks are run with the engine lock held and may schedule or cancel further events.
+    """
+
+    def __init__(self, realtime=True, speed=1.0):
+        if speed <= 0:
+            raise ValueError(f"Speed must be positive, got {speed}")
+        self.realtime = realtime
+        self.speed = speed
+        self.now = 0.0
+        self._queue = []
+        self._counter = itertools.count()
+        self._lock = threading.RLock()
+        self._wall_start = time.monotonic()
+
+    def schedule(self, delay, callback, *args):
+        """
+        Run callback(*args) once, delay virtual seconds from now.
+
+        Returns:
+            Event handle that can be passed to cancel()
+        """
+        return self._push(Event(self.now + max(0.0, delay), None, callback, args))
+
+    def every(self, period, callback, *args):
+        """
+        Run callback(*args) every period virtual seconds, starting one period from now.
+
+        Returns:
+            Event handle that can be passed to cancel()
+        """
+        if period <= 0:
+            raise ValueError(f"Period must be positive, got {period}")
+        return self._push(Event(self.now + period, period, callback, args))
+
+    def cancel(self, event):
+        """Cancel a scheduled event. Cancelling an event that already ran is a no-op."""
+        if event is not None:
+            event.cancelled = True
+
+    def next_event_time(self):
+        """Returns the virtual time of the next pending event, or None if nothing is scheduled."""
+        with self._lock:
+            self._drop_cancelled()
+            return self._queue[0][0] if self._queue else None
+
+    def advance(self, until):
+        """
+        Run every event due at or before virtual time until, in time order, then set the clock to until.
+
+        Returns:
+            Number of callbacks run
+        """
+        ran = 0
+        with self._lock:
+            while True:
+                self._drop_cancelled()
+                if not self._queue or self._queue[0][0] > until:
+                    break
+                event_time, _, event = heapq.heappop(self._queue)
+                self.now = event_time
+                if event.period is not None:
+                    event.time = event_time + event.period
+                    self._push(event)
+                else:
+                    event.cancelled = True
+                event.callback(*event.args)
+                ran += 1
+            self.now = max(self.now, until)
+        return ran
+
+    def sync(self):
+        """
+        Advance the clock to the current wall-clock time. Does nothing unless in real-time mode.
+
+        Returns:
+            Number of callbacks run
+        """
+        if not self.realtime:
+            return 0
+        return self.advance((time.monotonic() - self._wall_start) * self.speed)
+
+    def run(self, duration, stop_event=None):
+        """
+        Run the simulation for duration virtual seconds.
+
+        In real-time mode this sleeps between events to track the wall clock; otherwise it returns
+        as soon as every event in the window has run.
+
+        Args:
+            duration: Virtual seconds to simulate
+            stop_event: Optional threading.Event that ends a real-time run early
+        """
+        end = self.now + duration
+        if not self.realtime:
+            self.advance(end)
+            return
+        # Re-anchor the wall clock so time spent outside run() is not replayed in a burst.
+        self._wall_start = time.monotonic() - self.now / self.speed
+        while self.now < end:
+            if stop_event is not None and stop_event.is_set():
+                return
+            target = self.next_event_time()
+            target = end if target is None else min(target, end)
+            delay = (target - self.now) / self.speed
+            if delay > 0:
+                if stop_event is not None:
+                    if stop_event.wait(delay):
+                        return
+                else:
+                    time.sleep(delay)
+            self.advance(target)
+
+    def _push(self, event):
+        with self._lock:
+            heapq.heappush(self._queue, (event.time, next(self._counter), event))
+        return event
+
+    def _drop_cancelled(self):
+        while self._queue and self._queue[0][2].cancelled:
+            heapq.heappop(self._queue)
@@ -0,0 +1,301 @@
+"""
+Fillhead Simulator Farm
+Runs many independent simulated fillheads in one asyncio event loop.
+
+Each device listens on its own UDP port with its own state. All devices share a single
+real-time SimEngine, one vectorized FillheadPhysics model for the heater, vacuum and injector
+dynamics and one telemetry emitter task, so the farm needs no thread per device or per in-flight
+motion. A device's physical quantities live only in the model's arrays, at the device's index, so
+a physics tick is one vectorized step whatever the device count.
+
+Commands may end with a correlation ID (see command_client.py). Replies to such a command echo
+the ID, long-running commands are acknowledged with START straight away, and a resent command
+is answered with its last reply instead of being run twice.
+
+Usage:
+    python -m definition.sim_farm --count 50 --base-port 8888
+"""
+import argparse
+import asyncio
+from collections import OrderedDict
+from collections.abc import MutableMapping
+
+from . import simulator
+from .command_table import COMMAND_IDS, CORRELATION_PREFIX, command_token, split_correlation
+from .sim_engine import SimEngine
+from .sim_physics import VACUUM_HOLDING, VACUUM_OFF, VACUUM_PULLING, FillheadPhysics
+
+DEFAULT_BASE_PORT = 8888          # LOCAL_PORT in inc/config.h
+DEFAULT_TELEMETRY_INTERVAL = 0.1  # TELEMETRY_INTERVAL_MS in inc/config.h
+TELEM_PREFIX = "FILLHEAD_TELEM: "
+REPLY_CACHE_SIZE = 256            # Correlated replies remembered per device for answering resends
+
+_CORRELATION_BYTES = CORRELATION_PREFIX.encode()
+
+# State key -> FillheadPhysics array holding it
+_PHYSICS_ARRAYS = {
+    'temp_c': 'temp_c',
+    'heater_setpoint': 'setpoint_c',
+    'vacuum_psig': 'vacuum_psig',
+    'vacuum_target_psig': 'vacuum_target_psig',
+    'injector_torque': 'injector_torque',
+}
+# FillheadPhysics vacuum state -> telemetry vacuum_state
+_VACUUM_STATES = {
+    VACUUM_OFF: simulator.VACUUM_OFF,
+    VACUUM_PULLING: simulator.VACUUM_PULLDOWN,
+    VACUUM_HOLDING: simulator.VACUUM_ON,
+}
+
+
+class _PhysicsState(MutableMapping):
+    """
+    A device's state dict whose heater, vacuum and injector keys are its elements of the shared
+    FillheadPhysics arrays.
+
+    Commands and telemetry read and write single elements, so nothing is copied between the state
+    and the model when it steps.
+
+    Args:
+        physics: Shared FillheadPhysics
+        index: The device's index in the physics arrays
+    """
+
+    def __init__(self, physics, index):
+        self._physics = physics
+        self._index = index
+        self._state = simulator.initial_state()
+
+    def __getitem__(self, key):
+        array = _PHYSICS_ARRAYS.get(key)
+        if array is not None:
+            return float(getattr(self._physics, array)[self._index])
+        if key == 'heater_state':
+            return int(self._physics.heater_on[self._index])
+        if key == 'vacuum_state':
+            return _VACUUM_STATES[int(self._physics.vacuum_state[self._index])]
+        return self._state[key]
+
+    def __setitem__(self, key, value):
+        physics, index = self._physics, self._index
+        array = _PHYSICS_ARRAYS.get(key)
+        if array is not None:
+            getattr(physics, array)[index] = value
+        elif key == 'heater_state':
+            if not value:
+                physics.heater_stop(index)
+            elif not physics.heater_on[index]:
+                physics.heater_start(index)
+        elif key == 'vacuum_state':
+            if value == simulator.VACUUM_OFF:
+                physics.vacuum_stop(index)
+            elif physics.vacuum_state[index] == VACUUM_OFF:
+                physics.vacuum_start(index)
+        else:
+            self._state[key] = value
+
+    def __delitem__(self, key):
+        del self._state[key]
+
+    def __iter__(self):
+        return iter(self._state)
+
+    def __len__(self):
+        return len(self._state)
+
+
+class _DatagramSocket:
+    """
+    Adapts an asyncio datagram transport to the sock.sendto() interface the simulator plugin expects.
+
+    Remembers the latest reply sent for each (address, correlation ID) so resent commands can be answered.
+    """
+
+    def __init__(self, transport):
+        self._transport = transport
+        self.replies = OrderedDict()
+
+    def sendto(self, data, address):
+        self._transport.sendto(data, address)
+        tag = data.rpartition(b' ')[2]
+        if tag.startswith(_CORRELATION_BYTES):
+            key = (address, tag.decode())
+            self.replies[key] = data
+            self.replies.move_to_end(key)
+            if len(self.replies) > REPLY_CACHE_SIZE:
+                self.replies.popitem(last=False)
+
+
+class SimulatedFillhead(asyncio.DatagramProtocol):
+    """
+    One simulated fillhead: its UDP endpoint, state and GUI address.
+
+    Provides the device_sim interface used by simulator.handle_command().
+
+    Args:
+        device_id: Index of the device within the farm and in the physics arrays
+        port: UDP port the device listens on
+        engine: Shared SimEngine the device's motions and dynamics are scheduled on
+        physics: Shared FillheadPhysics holding the device's heater, vacuum and injector state
+    """
+
+    def __init__(self, device_id, port, engine, physics):
+        self.device_id = device_id
+        self.port = port
+        self.state = _PhysicsState(physics, device_id)
+        self.gui_address = None
+        self.sock = None
+        self.commands_received = 0
+        simulator.attach(self, engine, physics, device_id)
+
+    def set_state(self, key, value):
+        self.state[key] = value
+
+    def connection_made(self, transport):
+        self.sock = _DatagramSocket(transport)
+
+    def datagram_received(self, data, addr):
+        try:
+            message = data.decode('ascii').strip()
+        except UnicodeDecodeError:
+            return
+        if not message:
+            return
+        self.commands_received += 1
+        command, *args = message.split()
+        args, tag = split_correlation(args)
+        suffix = f" {tag}" if tag else ""
+
+        if tag is not None:
+            reply = self.sock.replies.get((addr, tag))
+            if reply is not None:
+                self.sock.sendto(reply, addr)
+                return
+
+        token = command_token(command)
+        if token not in COMMAND_IDS:
+            self.sock.sendto(f"ERROR: Unknown command {command}{suffix}".encode(), addr)
+            return
+
+        if token == 'discover_device':
+            port = next((arg[5:] for arg in args if arg.upper().startswith('PORT=')), None)
+            if port is None:
+                self.gui_address = addr
+            elif port.isdigit():
+                self.gui_address = (addr[0], int(port))
+            else:
+                return
+            self.sock.sendto(f"DISCOVERY: DEVICE_ID=fillhead{suffix}".encode(), self.gui_address)
+            return
+
+        # Deferred replies are built from the command name, so the ID travels with it.
+        try:
+            handled = simulator.handle_command(self, command + suffix, args, addr)
+        except (IndexError, ValueError):
+            self.sock.sendto(f"ERROR: Invalid arguments for {command}{suffix}".encode(), addr)
+            return
+        if not handled:
+            self.sock.sendto(f"DONE: {command}{suffix}".encode(), addr)
+        elif tag is not None:
+            self.sock.sendto(f"START: {command}{suffix}".encode(), addr)
+
+    def telemetry_message(self):
+        """Returns the text telemetry datagram for the current state."""
+        fields = ','.join(f"{key}:{value:.2f}" if isinstance(value, float) else f"{key}:{value}"
+                          for key, value in simulator.telemetry_items(self.state))
+        return (TELEM_PREFIX + fields).encode()
+
+
+class SimulatorFarm:
+    """
+    Hosts count simulated fillheads on consecutive UDP ports.
+
+    Args:
+        count: Number of devices
+        base_port: UDP port of the first device; device N listens on base_port + N
+        host: Local address to bind
+        telemetry_interval: Seconds between telemetry datagrams to each discovered GUI
+        speed: Virtual seconds per wall-clock second for the shared engine
+    """
+
+    def __init__(self, count, base_port=DEFAULT_BASE_PORT, host='0.0.0.0',
+                 telemetry_interval=DEFAULT_TELEMETRY_INTERVAL, speed=1.0):
+        if count < 1:
+            raise ValueError(f"Device count must be at least 1, got {count}")
+        self.host = host
+        self.telemetry_interval = telemetry_interval
+        self.engine = SimEngine(realtime=True, speed=speed)
+        self.physics = FillheadPhysics(count, dt=simulator.PHYSICS_PERIOD)
+        self.devices = [SimulatedFillhead(i, base_port + i, self.engine, self.physics) for i in range(count)]
+        self.engine.every(simulator.PHYSICS_PERIOD, self.physics.step)
+        self._transports = []
+        self._tasks = []
+
+    async def start(self):
+        """Bind every device's UDP port and start the engine and telemetry tasks."""
+        loop = asyncio.get_running_loop()
+        for device in self.devices:
+            transport, _ = await loop.create_datagram_endpoint(
+                lambda device=device: device, local_addr=(self.host, device.port))
+            self._transports.append(transport)
+        self._tasks = [
+            asyncio.create_task(self._run_engine()),
+            asyncio.create_task(self._emit_telemetry()),
+        ]
+
+    async def stop(self):
+        """Cancel the farm's tasks and close every UDP endpoint."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for transport in self._transports:
+            transport.close()
+        self._transports = []
+
+    async def serve_forever(self):
+        """Start the farm and run until cancelled."""
+        await self.start()
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await self.stop()
+
+    async def _run_engine(self):
+        # Wake for the next scheduled event, but at least every physics period.
+        while True:
+            self.engine.sync()
+            next_time = self.engine.next_event_time()
+            delay = simulator.PHYSICS_PERIOD
+            if next_time is not None:
+                delay = min(delay, max(0.0, (next_time - self.engine.now) / self.engine.speed))
+            await asyncio.sleep(delay)
+
+    async def _emit_telemetry(self):
+        while True:
+            for device in self.devices:
+                if device.gui_address is not None:
+                    device.sock.sendto(device.telemetry_message(), device.gui_address)
+            await asyncio.sleep(self.telemetry_interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run many simulated fillheads in one process.")
+    parser.add_argument('--count', type=int, default=1, help="number of simulated fillheads")
+    parser.add_argument('--base-port', type=int, default=DEFAULT_BASE_PORT, help="UDP port of the first device")
+    parser.add_argument('--host', default='0.0.0.0', help="local address to bind")
+    parser.add_argument('--telemetry-interval', type=float, default=DEFAULT_TELEMETRY_INTERVAL,
+                        help="seconds between telemetry datagrams")
+    parser.add_argument('--speed', type=float, default=1.0, help="simulated seconds per real second")
+    args = parser.parse_args()
+
+    farm = SimulatorFarm(args.count, args.base_port, args.host, args.telemetry_interval, args.speed)
+    print(f"Simulating {args.count} fillhead(s) on UDP ports {args.base_port}-{args.base_port + args.count - 1}")
+    try:
+        asyncio.run(farm.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
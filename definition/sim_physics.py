@@ -0,0 +1,230 @@
+"""
+Fillhead Physics Model
+Vectorized plant model for many simulated fillheads, advanced one fixed time step at a time.
+
+Every quantity is a NumPy array with one element per device, so a step costs a handful of
+array operations regardless of device count. The heater loop reproduces the firmware's
+HeaterController (PID update, output and integral clamps, time-proportioned relay and EWMA
+sensor filter) on a lumped thermal-mass plant, which makes it usable for tuning PID gains
+offline. The vacuum loop follows VacuumController: pump until the target is reached, then
+seal and leak.
+"""
+import numpy as np
+
+# Firmware constants (inc/config.h)
+PID_UPDATE_INTERVAL_S = 0.1
+PID_PWM_PERIOD_S = 1.0
+DEFAULT_HEATER_SETPOINT_C = 70.0
+DEFAULT_HEATER_KP = 60.0
+DEFAULT_HEATER_KI = 2.5
+DEFAULT_HEATER_KD = 40.0
+EWMA_ALPHA_SENSORS = 0.5
+DEFAULT_VACUUM_TARGET_PSIG = -14.0
+VAC_PRESSURE_MIN = -14.7
+DEFAULT_INJECTOR_TORQUE_OFFSET = -2.4
+STATOR_PISTON_DIAMETERS_MM = (75.0, 33.0)
+ROTOR_PISTON_DIAMETERS_MM = (33.0, 33.0)
+
+# Plant parameters
+AMBIENT_C = 25.0
+HEATER_POWER_W = 200.0
+HEAT_CAPACITY_J_PER_C = 400.0
+THERMAL_RESISTANCE_C_PER_W = 0.5
+VACUUM_PUMP_TAU_S = 2.0
+VACUUM_LEAK_PSI_PER_S = 0.005
+INJECTOR_FRICTION_PERCENT = 4.0
+INJECTOR_VISCOUS_PERCENT_PER_MMS = 2.5
+
+VACUUM_OFF = 0
+VACUUM_PULLING = 1
+VACUUM_HOLDING = 2
+
+
+def ml_per_mm(piston_diameters_mm):
+    """Returns the volume in ml displaced per mm of injector travel for a set of ganged pistons."""
+    return sum(np.pi / 4.0 * d * d for d in piston_diameters_mm) / 1000.0
+
+
+class FillheadPhysics:
+    """
+    Plant and controller state for count fillheads.
+
+    Args:
+        count: Number of simulated devices
+        dt: Step length in seconds (defaults to the firmware PID interval)
+        ambient_c: Ambient temperature in Celsius
+
+    Attributes:
+        time: Simulated seconds since construction
+        temp_c: Filtered thermocouple reading, as reported by the firmware
+        heater_output: PID output in percent
+        vacuum_psig: Chamber pressure
+        vacuum_leak_psi_per_s: Rate the sealed chamber leaks back toward ambient
+        injector_pos_mm: Injector plunger position
+        injector_torque: Injector motor torque in percent
+    """
+
+    def __init__(self, count, dt=PID_UPDATE_INTERVAL_S, ambient_c=AMBIENT_C):
+        if count < 1:
+            raise ValueError(f"Device count must be at least 1, got {count}")
+        self.count = count
+        self.dt = dt
+        self.ambient_c = ambient_c
+        self.time = 0.0
+
+        # Heater
+        self.plant_temp_c = np.full(count, ambient_c)
+        self.temp_c = np.full(count, ambient_c)
+        self.heater_on = np.zeros(count, dtype=bool)
+        self.setpoint_c = np.full(count, DEFAULT_HEATER_SETPOINT_C)
+        self.kp = np.full(count, DEFAULT_HEATER_KP)
+        self.ki = np.full(count, DEFAULT_HEATER_KI)
+        self.kd = np.full(count, DEFAULT_HEATER_KD)
+        self.pid_integral = np.zeros(count)
+        self.pid_last_error = np.zeros(count)
+        self.heater_output = np.zeros(count)
+        self.relay_on = np.zeros(count, dtype=bool)
+
+        # Vacuum
+        self.vacuum_psig = np.zeros(count)
+        self.vacuum_target_psig = np.full(count, DEFAULT_VACUUM_TARGET_PSIG)
+        self.vacuum_state = np.full(count, VACUUM_OFF, dtype=np.int8)
+        self.vacuum_leak_psi_per_s = np.full(count, VACUUM_LEAK_PSI_PER_S)
+
+        # Injector
+        self.injector_pos_mm = np.zeros(count)
+        self.injector_target_mm = np.zeros(count)
+        self.injector_vel_mms = np.zeros(count)
+        self.injector_torque = np.zeros(count)
+
+    #----------------------------------------------------------------------------------------------
+    # Commands (index may be an int, a slice or an index/mask array)
+    #----------------------------------------------------------------------------------------------
+
+    def heater_start(self, index, setpoint_c=None):
+        """Enable PID control, resetting the PID terms as HeaterController::heaterOn() does."""
+        if setpoint_c is not None:
+            self.setpoint_c[index] = setpoint_c
+        self.heater_on[index] = True
+        self.pid_integral[index] = 0.0
+        self.pid_last_error[index] = 0.0
+        self.heater_output[index] = 0.0
+
+    def heater_stop(self, index):
+        """Disable PID control and open the relay."""
+        self.heater_on[index] = False
+        self.heater_output[index] = 0.0
+        self.relay_on[index] = False
+
+    def set_heater_gains(self, index, kp, ki, kd):
+        """Set PID gains and reset the PID terms."""
+        self.kp[index] = kp
+        self.ki[index] = ki
+        self.kd[index] = kd
+        self.pid_integral[index] = 0.0
+        self.pid_last_error[index] = 0.0
+
+    def vacuum_start(self, index, target_psig=None):
+        """Start pulling vacuum toward the target pressure."""
+        if target_psig is not None:
+            self.vacuum_target_psig[index] = target_psig
+        self.vacuum_state[index] = VACUUM_PULLING
+
+    def vacuum_stop(self, index):
+        """Stop the pump; the sealed chamber leaks back toward ambient."""
+        self.vacuum_state[index] = VACUUM_OFF
+
+    def injector_move(self, index, distance_mm, velocity_mms):
+        """Start a relative injector move at constant velocity."""
+        self.injector_target_mm[index] = self.injector_pos_mm[index] + distance_mm
+        self.injector_vel_mms[index] = abs(velocity_mms)
+
+    def inject(self, index, volume_ml, speed_mls, piston_diameters_mm=STATOR_PISTON_DIAMETERS_MM):
+        """Start an injection of volume_ml at speed_mls through the given ganged pistons."""
+        displacement = ml_per_mm(piston_diameters_mm)
+        self.injector_move(index, volume_ml / displacement, speed_mls / displacement)
+
+    def injector_moving(self):
+        """Returns a boolean array, True where the injector has not reached its target."""
+        return self.injector_pos_mm != self.injector_target_mm
+
+    #----------------------------------------------------------------------------------------------
+    # Simulation
+    #----------------------------------------------------------------------------------------------
+
+    def step(self):
+        """Advance every device by one time step."""
+        dt = self.dt
+        self.time += dt
+
+        # Heater PID (HeaterController::updateState)
+        on = self.heater_on
+        error = self.setpoint_c - self.temp_c
+        integral = self.pid_integral + error * dt
+        derivative = (error - self.pid_last_error) / dt
+        output = np.clip(self.kp * error + self.ki * integral + self.kd * derivative, 0.0, 100.0)
+        limit = np.where(self.ki > 0, 100.0 / np.where(self.ki > 0, self.ki, 1.0), np.inf)
+        integral = np.clip(integral, 0.0, limit)
+        self.pid_integral = np.where(on, integral, self.pid_integral)
+        self.pid_last_error = np.where(on, error, self.pid_last_error)
+        self.heater_output = np.where(on, output, 0.0)
+        self.relay_on = on & ((self.time % PID_PWM_PERIOD_S) < PID_PWM_PERIOD_S * self.heater_output / 100.0)
+
+        # Lumped thermal mass with loss to ambient, then the firmware's EWMA sensor filter
+        power = np.where(self.relay_on, HEATER_POWER_W, 0.0)
+        loss = (self.plant_temp_c - self.ambient_c) / THERMAL_RESISTANCE_C_PER_W
+        self.plant_temp_c = self.plant_temp_c + (power - loss) * dt / HEAT_CAPACITY_J_PER_C
+        self.temp_c = EWMA_ALPHA_SENSORS * self.plant_temp_c + (1.0 - EWMA_ALPHA_SENSORS) * self.temp_c
+
+        # Vacuum: exponential pump-down while pulling, constant leak toward ambient otherwise
+        pulling = self.vacuum_state == VACUUM_PULLING
+        pumped = self.vacuum_psig + (VAC_PRESSURE_MIN - self.vacuum_psig) * min(1.0, dt / VACUUM_PUMP_TAU_S)
+        leaked = np.minimum(self.vacuum_psig + self.vacuum_leak_psi_per_s * dt, np.maximum(self.vacuum_psig, 0.0))
+        self.vacuum_psig = np.where(pulling, pumped, leaked)
+        self.vacuum_state[pulling & (self.vacuum_psig <= self.vacuum_target_psig)] = VACUUM_HOLDING
+
+        # Injector: constant-velocity move to target; torque from friction plus viscous load
+        remaining = self.injector_target_mm - self.injector_pos_mm
+        travel = np.clip(remaining, -self.injector_vel_mms * dt, self.injector_vel_mms * dt)
+        self.injector_pos_mm = np.where(np.abs(remaining) <= self.injector_vel_mms * dt,
+                                        self.injector_target_mm, self.injector_pos_mm + travel)
+        speed = np.abs(travel) / dt
+        self.injector_torque = np.where(
+            speed > 0,
+            INJECTOR_FRICTION_PERCENT + INJECTOR_VISCOUS_PERCENT_PER_MMS * speed + DEFAULT_INJECTOR_TORQUE_OFFSET,
+            0.0)
+
+    def run(self, duration):
+        """Advance every device by duration seconds (rounded to whole steps)."""
+        for _ in range(int(round(duration / self.dt))):
+            self.step()
+
+
+def heater_step_response(gains, setpoint_c=DEFAULT_HEATER_SETPOINT_C, duration=600.0,
+                         dt=PID_UPDATE_INTERVAL_S, ambient_c=AMBIENT_C):
+    """
+    Simulate the heater step response for many PID gain sets at once.
+
+    Args:
+        gains: Sequence of (kp, ki, kd) tuples, one simulated heater per tuple
+        setpoint_c: Setpoint applied at time zero
+        duration: Seconds to simulate
+        dt: Step length in seconds
+        ambient_c: Starting and ambient temperature
+
+    Returns:
+        Tuple of (times, temps) where times has shape (steps,) and temps has shape
+        (steps, len(gains)) holding the reported (filtered) temperature
+    """
+    gains = np.asarray(gains, dtype=float).reshape(-1, 3)
+    physics = FillheadPhysics(len(gains), dt=dt, ambient_c=ambient_c)
+    physics.set_heater_gains(slice(None), gains[:, 0], gains[:, 1], gains[:, 2])
+    physics.heater_start(slice(None), setpoint_c)
+    steps = int(round(duration / dt))
+    times = np.empty(steps)
+    temps = np.empty((steps, len(gains)))
+    for i in range(steps):
+        physics.step()
+        times[i] = physics.time
+        temps[i] = physics.temp_c
+    return times, temps
@@ -0,0 +1,315 @@
+"""
+Fillhead Scenario Sweep
+Runs a grid of fill recipes, each on its own simulated fillhead, across a process pool.
+
+A recipe sets the parameters of one fill cycle: the inject, heater_on, vacuum_on and
+vacuum_leak_test command arguments from commands.json, the feed torque limit, the heater PID gains
+and the chamber leak rate of the plant. Each run builds a one-device sim_physics.FillheadPhysics
+and plays the cycle the way the firmware sequences it:
+
+    heat to the setpoint and pull vacuum at the same time
+    leak test once the target is reached (settle, then measure the pressure rise)
+    re-pull vacuum and inject once the material is up to temperature and the leak test passed
+
+Runs share nothing, so they are spread over every core with one result row per recipe: the
+recipe, the outcome, the duration of each phase in simulated seconds, telemetry summaries (peak
+temperature, pressure rise, peak torque) and the wall-clock cost of the run.
+
+Usage:
+    python -m definition.sim_sweep --set speed=0.25,0.5,1.0 --set setpoint=60,70,80
+    python -m definition.sim_sweep --grid sweep.json --workers 8 --csv results.csv
+"""
+import argparse
+import csv
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .command_table import COMMAND_PARAMS
+from .sim_physics import (DEFAULT_HEATER_KD, DEFAULT_HEATER_KI, DEFAULT_HEATER_KP, DEFAULT_HEATER_SETPOINT_C,
+                          DEFAULT_VACUUM_TARGET_PSIG, ROTOR_PISTON_DIAMETERS_MM, STATOR_PISTON_DIAMETERS_MM,
+                          VACUUM_HOLDING, VACUUM_LEAK_PSI_PER_S, FillheadPhysics)
+
+# Firmware constants (inc/config.h)
+INJECT_DEFAULT_SPEED_MLS = 0.5
+FEED_DEFAULT_TORQUE_PERCENT = 30.0
+DEFAULT_VACUUM_RAMP_TIMEOUT_S = 30.0
+DEFAULT_LEAK_TEST_DELTA_PSIG = 0.1
+DEFAULT_LEAK_TEST_DURATION_S = 10.0
+VACUUM_SETTLE_TIME_S = 2.0
+
+PISTONS = {
+    'stator': STATOR_PISTON_DIAMETERS_MM,
+    'rotor': ROTOR_PISTON_DIAMETERS_MM,
+}
+
+# Recipe parameter -> (command, parameter) in commands.json, checked at import time
+COMMAND_ARGUMENTS = {
+    'volume': ('inject_stator', 'volume'),
+    'speed': ('inject_stator', 'speed'),
+    'setpoint': ('heater_on', 'setpoint'),
+    'target': ('vacuum_on', 'target'),
+    'leak_delta': ('vacuum_leak_test', 'delta'),
+    'leak_duration': ('vacuum_leak_test', 'duration'),
+}
+
+DEFAULT_RECIPE = {
+    'piston': 'stator',                               # inject_stator or inject_rotor
+    'volume': 10.0,                                   # ml
+    'speed': INJECT_DEFAULT_SPEED_MLS,                # ml/s
+    'torque_limit': FEED_DEFAULT_TORQUE_PERCENT,      # %; exceeding it faults the injection
+    'setpoint': DEFAULT_HEATER_SETPOINT_C,            # C
+    'kp': DEFAULT_HEATER_KP,
+    'ki': DEFAULT_HEATER_KI,
+    'kd': DEFAULT_HEATER_KD,
+    'temp_band': 2.0,                                 # C from the setpoint that counts as ready
+    'heat_timeout': 900.0,                            # s
+    'target': DEFAULT_VACUUM_TARGET_PSIG,             # psig
+    'ramp_timeout': DEFAULT_VACUUM_RAMP_TIMEOUT_S,    # s
+    'leak_delta': DEFAULT_LEAK_TEST_DELTA_PSIG,       # psi rise allowed during the test
+    'leak_duration': DEFAULT_LEAK_TEST_DURATION_S,    # s
+    'leak_rate': VACUUM_LEAK_PSI_PER_S,               # psi/s the sealed chamber leaks (plant)
+    'inject_timeout': 600.0,                          # s from the start of the injection
+}
+
+# Columns of a result row after the recipe parameters
+RESULT_COLUMNS = (
+    'status', 'cycle_s', 'heat_s', 'overshoot_c', 'pulldown_s', 'leak_rise_psi', 'inject_s',
+    'dispensed_ml', 'max_torque', 'final_temp_c', 'steps', 'wall_s',
+)
+
+
+def _check_command_arguments():
+    for name, (command, parameter) in COMMAND_ARGUMENTS.items():
+        if parameter not in (p[0] for p in COMMAND_PARAMS.get(command, ())):
+            raise KeyError(f"Recipe parameter '{name}' maps to {command}.{parameter}, "
+                           f"which commands.json does not define")
+
+
+_check_command_arguments()
+
+
+def make_recipe(**overrides):
+    """
+    Returns DEFAULT_RECIPE with overrides applied.
+
+    Raises:
+        KeyError: If an override is not a recipe parameter
+        ValueError: If piston is not 'stator' or 'rotor', speed is not positive or volume is negative
+    """
+    unknown = sorted(set(overrides) - set(DEFAULT_RECIPE))
+    if unknown:
+        raise KeyError(f"Unknown recipe parameters: {', '.join(unknown)}")
+    recipe = dict(DEFAULT_RECIPE, **overrides)
+    if recipe['piston'] not in PISTONS:
+        raise ValueError(f"Piston must be one of {', '.join(PISTONS)}, got '{recipe['piston']}'")
+    if not recipe['speed'] > 0:
+        raise ValueError(f"Speed must be positive, got {recipe['speed']}")
+    if not recipe['volume'] >= 0:
+        raise ValueError(f"Volume must not be negative, got {recipe['volume']}")
+    return recipe
+
+
+def expand_grid(grid):
+    """
+    Expand a parameter grid into recipes, one per combination.
+
+    Args:
+        grid: Mapping of recipe parameter to a list of values (or a single value to fix it)
+
+    Returns:
+        List of recipe dicts, varying the last parameter fastest
+    """
+    names = list(grid)
+    choices = [value if isinstance(value, (list, tuple)) else [value] for value in grid.values()]
+    return [make_recipe(**dict(zip(names, combination))) for combination in itertools.product(*choices)]
+
+
+def run_recipe(recipe, dt=0.1):
+    """
+    Simulate one fill cycle on an isolated fillhead.
+
+    Args:
+        recipe: Recipe dict, e.g. from make_recipe()
+        dt: Simulation step in seconds
+
+    Returns:
+        Result row: the recipe followed by RESULT_COLUMNS. status is 'ok', 'heater_timeout',
+        'vacuum_timeout', 'leak_failed', 'torque_fault' or 'inject_timeout'; phases that never
+        ran are None
+
+    Raises:
+        ValueError: If the recipe is invalid (see make_recipe()) or dt is not positive
+    """
+    wall_start = time.perf_counter()
+    r = make_recipe(**recipe)
+    if not dt > 0:
+        raise ValueError(f"dt must be positive, got {dt}")
+    physics = FillheadPhysics(1, dt=dt)
+    physics.set_heater_gains(0, r['kp'], r['ki'], r['kd'])
+    physics.vacuum_leak_psi_per_s[0] = r['leak_rate']
+    physics.heater_start(0, r['setpoint'])
+    physics.vacuum_start(0, r['target'])
+
+    result = dict.fromkeys(RESULT_COLUMNS)
+    result['overshoot_c'] = 0.0
+    leak_start = leak_start_psig = inject_start = None
+    status = None
+    steps = 0
+    while status is None:
+        physics.step()
+        steps += 1
+        now = physics.time
+        temp = float(physics.temp_c[0])
+        pressure = float(physics.vacuum_psig[0])
+        result['overshoot_c'] = max(result['overshoot_c'], temp - r['setpoint'])
+
+        if result['heat_s'] is None:
+            if abs(temp - r['setpoint']) <= r['temp_band']:
+                result['heat_s'] = now
+            elif now >= r['heat_timeout']:
+                status = 'heater_timeout'
+
+        # Pull-down, settle, then measure the rise with the pump off (VacuumController)
+        if result['pulldown_s'] is None:
+            if physics.vacuum_state[0] == VACUUM_HOLDING:
+                result['pulldown_s'] = now
+            elif now >= r['ramp_timeout']:
+                status = 'vacuum_timeout'
+        elif result['leak_rise_psi'] is None:
+            if leak_start is None and now - result['pulldown_s'] >= VACUUM_SETTLE_TIME_S:
+                leak_start, leak_start_psig = now, pressure
+            if leak_start is not None:
+                rise = pressure - leak_start_psig
+                if rise > r['leak_delta']:
+                    result['leak_rise_psi'] = rise
+                    status = 'leak_failed'
+                elif now - leak_start >= r['leak_duration']:
+                    result['leak_rise_psi'] = rise
+                    physics.vacuum_start(0, r['target'])
+
+        if inject_start is None:
+            if result['heat_s'] is not None and result['leak_rise_psi'] is not None and status is None:
+                inject_start = now
+                physics.inject(0, r['volume'], r['speed'], PISTONS[r['piston']])
+        else:
+            result['max_torque'] = max(result['max_torque'] or 0.0, float(physics.injector_torque[0]))
+            if result['max_torque'] > r['torque_limit']:
+                status = 'torque_fault'
+            elif not physics.injector_moving()[0]:
+                result['inject_s'] = now - inject_start
+                result['cycle_s'] = now
+                status = 'ok'
+            elif now - inject_start >= r['inject_timeout']:
+                status = 'inject_timeout'
+
+    if inject_start is not None:
+        target_mm = float(physics.injector_target_mm[0])
+        travel = float(physics.injector_pos_mm[0])
+        result['dispensed_ml'] = travel * r['volume'] / target_mm if target_mm else 0.0
+    result['status'] = status
+    result['final_temp_c'] = float(physics.temp_c[0])
+    result['steps'] = steps
+    result['wall_s'] = time.perf_counter() - wall_start
+    return {**r, **result}
+
+
+def run_sweep(recipes, workers=None, dt=0.1):
+    """
+    Run every recipe, in parallel across processes.
+
+    Args:
+        recipes: Sequence of recipe dicts
+        workers: Worker processes; None uses every core, 1 runs in this process
+        dt: Simulation step in seconds
+
+    Returns:
+        List of result rows in recipe order
+    """
+    recipes = list(recipes)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(recipes) < 2:
+        return [run_recipe(recipe, dt) for recipe in recipes]
+    # A few chunks per worker keeps the pool busy without paying per-recipe IPC.
+    chunksize = max(1, len(recipes) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=min(workers, len(recipes))) as pool:
+        return list(pool.map(run_recipe, recipes, itertools.repeat(dt), chunksize=chunksize))
+
+
+def format_table(rows, columns=None):
+    """Returns result rows as an aligned text table."""
+    if not rows:
+        return ''
+    columns = columns or list(rows[0])
+    cells = [[_format_cell(row[column]) for column in columns] for row in rows]
+    widths = [max(len(column), *(len(line[i]) for line in cells)) for i, column in enumerate(columns)]
+    lines = ['  '.join(column.rjust(width) for column, width in zip(columns, widths))]
+    lines += ['  '.join(cell.rjust(width) for cell, width in zip(line, widths)) for line in cells]
+    return '\n'.join(lines)
+
+
+def _format_cell(value):
+    if value is None:
+        return '-'
+    if isinstance(value, float):
+        return f"{value:.4g}"
+    return str(value)
+
+
+def _parse_value(text):
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a grid of fill recipes on simulated fillheads in parallel.")
+    parser.add_argument('--grid', help="JSON file mapping recipe parameters to lists of values")
+    parser.add_argument('--set', action='append', default=[], metavar='NAME=V1,V2',
+                        help="vary (or fix) one recipe parameter; may be repeated")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('--dt', type=float, default=0.1, help="simulation step in seconds")
+    parser.add_argument('--csv', help="write the result table to this CSV file")
+    parser.add_argument('--sort', default=None, help="sort the printed table by this column")
+    args = parser.parse_args()
+
+    grid = {}
+    if args.grid:
+        with open(args.grid, 'r') as f:
+            grid.update(json.load(f))
+    for item in args.set:
+        name, sep, values = item.partition('=')
+        if not sep:
+            parser.error(f"--set expects NAME=V1,V2,..., got '{item}'")
+        grid[name] = [_parse_value(value) for value in values.split(',')]
+    try:
+        recipes = expand_grid(grid)
+    except (KeyError, ValueError) as exc:
+        parser.error(str(exc))
+
+    start = time.perf_counter()
+    rows = run_sweep(recipes, args.workers, args.dt)
+    elapsed = time.perf_counter() - start
+
+    if args.sort:
+        rows_shown = sorted(rows, key=lambda row: (row[args.sort] is None, row[args.sort]))
+    else:
+        rows_shown = rows
+    varied = [name for name in grid if len(set(row[name] for row in rows)) > 1]
+    print(format_table(rows_shown, varied + list(RESULT_COLUMNS)))
+    print(f"\n{len(rows)} run(s) in {elapsed:.1f} s ({sum(row['wall_s'] for row in rows):.1f} s of simulation)",
+          file=sys.stderr)
+
+    if args.csv:
+        with open(args.csv, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]) if rows else list(DEFAULT_RECIPE) + list(RESULT_COLUMNS))
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+if __name__ == "__main__":
+    main()
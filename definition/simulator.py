@@ -1,136 +1,355 @@
 """
 Fillhead Device Simulator
 Handles fillhead-specific command simulation and state updates.
+
+Long-running commands and the heater and vacuum dynamics are events on a SimEngine virtual
+clock rather than sleeping worker threads. By default each device gets its own real-time
+engine, advanced by update_state(); call attach() first to share one engine between many
+devices, to run as fast as possible or to drive the device from a shared
+sim_physics.FillheadPhysics model.
 """
-import time
+from .command_table import build_dispatch, command_token
+from .sim_engine import SimEngine
+
+PHYSICS_PERIOD = 0.1      # Virtual seconds between heater PID / vacuum updates
+INJECTION_PERIOD = 0.05   # Virtual seconds between injected-volume updates
+HOMING_DURATION = 2.0
+VALVE_HOMING_DURATION = 1.5
+INJECTION_DURATION = 2.0  # Virtual seconds an injection takes without a physics model
+INJECT_DEFAULT_SPEED = 0.5  # ml/s, INJECT_DEFAULT_SPEED_MLS in inc/config.h
+VACUUM_PUMP_TAU = 2.0     # Seconds for the pump to close ~63% of the gap to the target
+VACUUM_LEAK_TAU = 20.0    # Seconds for the chamber to leak ~63% of the way back to ambient
+DEFAULT_VACUUM_TARGET = -14.0
+
+# Telemetry enum values (the "map" entries in telemetry.json)
+MAIN_STANDBY = 0
+MAIN_BUSY = 1
+INJECTOR_STANDBY = 0
+INJECTOR_HOMING = 1
+INJECTOR_FEEDING = 3
+VALVE_NOT_HOMED = 0
+VALVE_CLOSED = 1
+VALVE_OPEN = 2
+VALVE_HOMING = 5
+VACUUM_OFF = 0
+VACUUM_PULLDOWN = 1
+VACUUM_ON = 4
+VACUUM_ON_BAND = 0.5      # psi from the target at which pull-down reports as on
+
+# State keys that are not telemetry fields: set points the firmware keeps but does not report
+INTERNAL_KEYS = ('vacuum_target_psig',)
+
+# Keys the host's DeviceSimulator read before the state took the telemetry.json names. They are
+# written alongside the new keys, with their old values, but never sent as telemetry.
+LEGACY_KEYS = {
+    'injection_target_ml': 'inj_tgt_ml',
+    'injection_active_ml': 'inj_active_ml',
+    'injection_cumulative_ml': 'inj_cumulative_ml',
+    'heater_state': 'h_st',
+    'heater_setpoint': 'h_sp',
+    'temp_c': 'h_pv',
+}
+LEGACY_ONLY_KEYS = ('MAIN_STATE', 'inj_st', 'inj_h_mach', 'inj_h_cart', 'inj_mach_mm', 'inj_cart_mm',
+                    'inj_valve_st', 'vac_valve_st', 'h_op')
+_NOT_TELEMETRY = frozenset(INTERNAL_KEYS) | frozenset(LEGACY_KEYS.values()) | frozenset(LEGACY_ONLY_KEYS)
+
+
+def initial_state():
+    """
+    Returns a fresh state dict holding every key the fillhead simulation reads or writes.
+
+    Every key except INTERNAL_KEYS is a telemetry.json field with a value of the field's type, so
+    the state can be sent as telemetry as-is. codegen checks this whenever it runs. The legacy keys
+    (LEGACY_KEYS, LEGACY_ONLY_KEYS) are added as the simulation writes them.
+    """
+    return {
+        'main_state': MAIN_STANDBY,
+        'injector_state': INJECTOR_STANDBY,
+        'inj_valve_state': VALVE_NOT_HOMED,
+        'vac_valve_state': VALVE_NOT_HOMED,
+        'heater_state': 0,
+        'vacuum_state': VACUUM_OFF,
+        'injector_torque': 0.0,
+        'injector_homed': 0,
+        'injection_cumulative_ml': 0.0,
+        'injection_active_ml': 0.0,
+        'injection_target_ml': 0.0,
+        'motors_enabled': 1,
+        'inj_valve_pos': 0.0,
+        'inj_valve_torque': 0.0,
+        'inj_valve_homed': 0,
+        'vac_valve_pos': 0.0,
+        'vac_valve_motor_torque': 0.0,
+        'vac_valve_homed': 0,
+        'temp_c': 25.0,
+        'heater_setpoint': 70.0,
+        'vacuum_psig': 0.0,
+        'vacuum_target_psig': DEFAULT_VACUUM_TARGET,
+    }
+
+
+def telemetry_items(state):
+    """Returns the (field, value) pairs of a state dict that are sent as telemetry."""
+    return [(key, value) for key, value in state.items() if key not in _NOT_TELEMETRY]
+
+
+def attach(device_sim, engine=None, physics=None, index=None):
+    """
+    Bind a simulated device to a SimEngine and start its periodic dynamics.
+
+    Args:
+        device_sim: Reference to the DeviceSimulator instance
+        engine: Engine to schedule on; a new real-time engine is created if None
+        physics: Shared sim_physics.FillheadPhysics that steps the heater, vacuum and injector
+            of the device at index, or None for the simple per-device heater and vacuum update
+        index: The device's index in physics
+
+    Returns:
+        The engine the device is attached to
+    """
+    if engine is None:
+        engine = SimEngine(realtime=True)
+    state = device_sim.state
+    for key, value in initial_state().items():
+        state.setdefault(key, state.get(LEGACY_KEYS.get(key), value))
+    device_sim.sim_engine = engine
+    device_sim.sim_model = physics
+    device_sim.sim_index = index
+    device_sim.sim_physics = engine.every(PHYSICS_PERIOD, _physics_step, device_sim) if physics is None else None
+    device_sim.sim_injection = None
+    return engine
+
+
+def get_engine(device_sim):
+    """Returns the engine a device is attached to, attaching it to a new real-time engine if needed."""
+    engine = getattr(device_sim, 'sim_engine', None)
+    if engine is None:
+        engine = attach(device_sim)
+    return engine
 
 
 def handle_command(device_sim, command, args, gui_address):
     """
     Handle fillhead-specific commands.
-    
+
     Args:
         device_sim: Reference to the DeviceSimulator instance
-        command: Command string (e.g., "fillhead.machine.home")
+        command: Command string (e.g., "machine_home" or "fillhead.machine_home")
         args: List of command arguments
         gui_address: Tuple of (ip, port) for GUI
-    
+
     Returns:
         True if command was handled, False to use default handler
     """
-    # Normalize to lowercase for case-insensitive matching
-    cmd_lower = command.lower()
-    
-    if cmd_lower == "jog_move":
-        device_sim.state['inj_mach_mm'] += float(args[0])
-        device_sim.state['inj_cart_mm'] += float(args[1])
-        return False  # Send generic DONE
-    
-    elif cmd_lower == "inject_move":
-        vol = float(args[0])
-        device_sim.state['inj_tgt_ml'] = vol
-        device_sim.set_state('MAIN_STATE', 'INJECTING')
-        device_sim.command_queue.append((simulate_injection, (device_sim, vol, 2.0, gui_address, command)))
+    handler = _HANDLERS.get(command_token(command))
+    if handler is None:
+        return False
+    return handler(device_sim, command, args, gui_address)
+
+
+def _set(device_sim, key, value):
+    """Set a state key and the legacy key it replaced, if any."""
+    device_sim.state[key] = value
+    legacy = LEGACY_KEYS.get(key)
+    if legacy is not None:
+        device_sim.state[legacy] = value
+
+
+def _set_main_state(device_sim, state, legacy_state):
+    """Set main_state and the MAIN_STATE string the host's DeviceSimulator reports."""
+    device_sim.set_state('main_state', state)
+    device_sim.set_state('MAIN_STATE', legacy_state)
+
+
+def _jog_move(device_sim, command, args, gui_address):
+    distance = float(args[0])
+    device_sim.state['inj_mach_mm'] = device_sim.state.get('inj_mach_mm', 0.0) + distance
+    device_sim.state['inj_cart_mm'] = device_sim.state.get('inj_cart_mm', 0.0) + distance
+    return False  # Send generic DONE
+
+
+def _inject(device_sim, command, args, gui_address):
+    vol = float(args[0])
+    speed = float(args[1]) if len(args) > 1 else INJECT_DEFAULT_SPEED
+    engine = get_engine(device_sim)
+    _set(device_sim, 'injection_target_ml', vol)
+    device_sim.state['injector_state'] = INJECTOR_FEEDING
+    _set_main_state(device_sim, MAIN_BUSY, 'INJECTING')
+    engine.cancel(device_sim.sim_injection)
+    start_vol = device_sim.state['injection_active_ml']
+    model = getattr(device_sim, 'sim_model', None)
+    if model is None:
+        device_sim.sim_injection = engine.every(
+            INJECTION_PERIOD, _injection_step, device_sim, engine.now, start_vol, vol, gui_address, command)
         return True
-    
-    elif cmd_lower == "fillhead.machine_home":
-        device_sim.set_state('MAIN_STATE', 'HOMING')
-        device_sim.command_queue.append((simulate_homing, (device_sim, 'machine', 2.0, gui_address, command)))
+
+    from .sim_physics import ROTOR_PISTON_DIAMETERS_MM, STATOR_PISTON_DIAMETERS_MM, ml_per_mm
+    pistons = ROTOR_PISTON_DIAMETERS_MM if command_token(command) == 'inject_rotor' else STATOR_PISTON_DIAMETERS_MM
+    index = device_sim.sim_index
+    start_mm = float(model.injector_pos_mm[index])
+    model.inject(index, vol, speed, pistons)
+    device_sim.sim_injection = engine.every(
+        INJECTION_PERIOD, _model_injection_step, device_sim, start_mm, ml_per_mm(pistons), start_vol, vol,
+        gui_address, command)
+    return True
+
+
+def _make_homing_handler(component):
+    def handler(device_sim, command, args, gui_address):
+        device_sim.state['injector_state'] = INJECTOR_HOMING
+        _set_main_state(device_sim, MAIN_BUSY, 'HOMING')
+        get_engine(device_sim).schedule(HOMING_DURATION, _finish_homing, device_sim, component, gui_address, command)
         return True
-    
-    elif cmd_lower == "fillhead.cartridge_home":
-        device_sim.set_state('MAIN_STATE', 'HOMING')
-        device_sim.command_queue.append((simulate_homing, (device_sim, 'cartridge', 2.0, gui_address, command)))
+    return handler
+
+
+def _make_valve_homing_handler(valve_type):
+    def handler(device_sim, command, args, gui_address):
+        device_sim.state[f'{valve_type}_state'] = VALVE_HOMING
+        _set_main_state(device_sim, MAIN_BUSY, 'HOMING')
+        get_engine(device_sim).schedule(VALVE_HOMING_DURATION, _finish_valve_homing, device_sim, valve_type, gui_address, command)
         return True
-    
-    elif cmd_lower.startswith("fillhead.inj_valve_"):
-        valve_type = 'inj_valve'
-        if 'home' in cmd_lower:
-            device_sim.set_state('MAIN_STATE', 'HOMING')
-            device_sim.command_queue.append((simulate_valve_homing, (device_sim, valve_type, 1.5, gui_address, command)))
-            return True
-        elif 'open' in cmd_lower:
-            device_sim.state[f'{valve_type}_st'] = 'Open'
-        elif 'close' in cmd_lower:
-            device_sim.state[f'{valve_type}_st'] = 'Closed'
-        return False  # Send generic DONE
-    
-    elif cmd_lower.startswith("fillhead.vac_valve_"):
-        valve_type = 'vac_valve'
-        if 'home' in cmd_lower:
-            device_sim.set_state('MAIN_STATE', 'HOMING')
-            device_sim.command_queue.append((simulate_valve_homing, (device_sim, valve_type, 1.5, gui_address, command)))
-            return True
-        elif 'open' in cmd_lower:
-            device_sim.state[f'{valve_type}_st'] = 'Open'
-        elif 'close' in cmd_lower:
-            device_sim.state[f'{valve_type}_st'] = 'Closed'
+    return handler
+
+
+def _make_valve_position_handler(valve_type, valve_state, legacy_state):
+    def handler(device_sim, command, args, gui_address):
+        device_sim.state[f'{valve_type}_state'] = valve_state
+        device_sim.state[f'{valve_type}_st'] = legacy_state
         return False  # Send generic DONE
-    
-    return False
+    return handler
 
 
-def simulate_homing(device_sim, component, duration, gui_address, command):
-    """Simulates fillhead homing process."""
-    time.sleep(duration)
-    if device_sim._stop_event.is_set():
-        return
-    
+def _heater_on(device_sim, command, args, gui_address):
+    _set(device_sim, 'heater_state', 1)
+    if args:
+        _set(device_sim, 'heater_setpoint', float(args[0]))
+    return False  # Send generic DONE
+
+
+def _heater_off(device_sim, command, args, gui_address):
+    _set(device_sim, 'heater_state', 0)
+    return False  # Send generic DONE
+
+
+def _vacuum_on(device_sim, command, args, gui_address):
+    device_sim.state['vacuum_state'] = VACUUM_PULLDOWN
+    device_sim.state['vacuum_target_psig'] = float(args[0]) if args else DEFAULT_VACUUM_TARGET
+    return False  # Send generic DONE
+
+
+def _vacuum_off(device_sim, command, args, gui_address):
+    device_sim.state['vacuum_state'] = VACUUM_OFF
+    return False  # Send generic DONE
+
+
+# Command name -> handler, checked against commands.json at import time
+_HANDLERS = build_dispatch({
+    'jog_move': _jog_move,
+    'inject_stator': _inject,
+    'inject_rotor': _inject,
+    'machine_home': _make_homing_handler('machine'),
+    'cartridge_home': _make_homing_handler('cartridge'),
+    'injection_valve_home': _make_valve_homing_handler('inj_valve'),
+    'injection_valve_open': _make_valve_position_handler('inj_valve', VALVE_OPEN, 'Open'),
+    'injection_valve_close': _make_valve_position_handler('inj_valve', VALVE_CLOSED, 'Closed'),
+    'vacuum_valve_home': _make_valve_homing_handler('vac_valve'),
+    'vacuum_valve_open': _make_valve_position_handler('vac_valve', VALVE_OPEN, 'Open'),
+    'vacuum_valve_close': _make_valve_position_handler('vac_valve', VALVE_CLOSED, 'Closed'),
+    'heater_on': _heater_on,
+    'heater_off': _heater_off,
+    'vacuum_on': _vacuum_on,
+    'vacuum_off': _vacuum_off,
+})
+
+
+def _send_done(device_sim, gui_address, command):
+    device_sim.sock.sendto(f"DONE: {command}".encode(), gui_address)
+
+
+def _finish_homing(device_sim, component, gui_address, command):
+    """Completes fillhead homing."""
     if component == 'machine':
+        device_sim.state['injector_homed'] = 1
         device_sim.state['inj_h_mach'] = 1
         device_sim.state['inj_mach_mm'] = 0.0
     elif component == 'cartridge':
         device_sim.state['inj_h_cart'] = 1
         device_sim.state['inj_cart_mm'] = 0.0
-    
+
+    device_sim.state['injector_state'] = INJECTOR_STANDBY
     device_sim.state['inj_st'] = 'Standby'
-    device_sim.set_state('MAIN_STATE', 'STANDBY')
-    device_sim.sock.sendto(f"DONE: {command}".encode(), gui_address)
+    _set_main_state(device_sim, MAIN_STANDBY, 'STANDBY')
+    _send_done(device_sim, gui_address, command)
 
 
-def simulate_valve_homing(device_sim, valve_type, duration, gui_address, command):
-    """Simulates valve homing."""
-    time.sleep(duration)
-    if device_sim._stop_event.is_set():
-        return
-    
+def _finish_valve_homing(device_sim, valve_type, gui_address, command):
+    """Completes valve homing."""
     device_sim.state[f'{valve_type}_homed'] = 1
     device_sim.state[f'{valve_type}_pos'] = 0.0
+    device_sim.state[f'{valve_type}_state'] = VALVE_OPEN
     device_sim.state[f'{valve_type}_st'] = 'Homed'
-    device_sim.set_state('MAIN_STATE', 'STANDBY')
-    device_sim.sock.sendto(f"DONE: {command}".encode(), gui_address)
+    _set_main_state(device_sim, MAIN_STANDBY, 'STANDBY')
+    _send_done(device_sim, gui_address, command)
 
 
-def simulate_injection(device_sim, volume, duration, gui_address, command):
-    """Simulates the injection process."""
-    start_time = time.time()
-    start_vol = device_sim.state['inj_active_ml']
-    
-    while time.time() - start_time < duration:
-        elapsed = time.time() - start_time
-        progress = elapsed / duration
-        device_sim.state['inj_active_ml'] = start_vol + volume * progress
-        time.sleep(0.05)
-        if device_sim._stop_event.is_set():
-            return
-
-    device_sim.state['inj_active_ml'] = 0
-    device_sim.state['inj_cumulative_ml'] += volume
-    device_sim.state['inj_tgt_ml'] = 0
-    device_sim.set_state('MAIN_STATE', 'STANDBY')
-    device_sim.sock.sendto(f"DONE: {command}".encode(), gui_address)
+def _injection_step(device_sim, start, start_vol, volume, gui_address, command):
+    """Advances an injection by one INJECTION_PERIOD, completing it once INJECTION_DURATION has elapsed."""
+    progress = (device_sim.sim_engine.now - start) / INJECTION_DURATION
+    if progress < 1.0:
+        _set(device_sim, 'injection_active_ml', start_vol + volume * progress)
+        return
 
+    _finish_injection(device_sim, volume, gui_address, command)
+
+
+def _model_injection_step(device_sim, start_mm, displacement, start_vol, volume, gui_address, command):
+    """Tracks an injection driven by the device's physics model, completing it once the injector stops."""
+    model, index = device_sim.sim_model, device_sim.sim_index
+    position = float(model.injector_pos_mm[index])
+    if position != model.injector_target_mm[index]:
+        _set(device_sim, 'injection_active_ml', start_vol + (position - start_mm) * displacement)
+        return
+    _finish_injection(device_sim, volume, gui_address, command)
+
+
+def _finish_injection(device_sim, volume, gui_address, command):
+    """Completes an injection."""
+    device_sim.sim_engine.cancel(device_sim.sim_injection)
+    device_sim.sim_injection = None
+    _set(device_sim, 'injection_active_ml', 0.0)
+    _set(device_sim, 'injection_cumulative_ml', device_sim.state['injection_cumulative_ml'] + volume)
+    _set(device_sim, 'injection_target_ml', 0.0)
+    device_sim.state['injector_state'] = INJECTOR_STANDBY
+    _set_main_state(device_sim, MAIN_STANDBY, 'STANDBY')
+    _send_done(device_sim, gui_address, command)
+
+
+def _physics_step(device_sim):
+    """Advances the heater PID loop and vacuum dynamics by one PHYSICS_PERIOD."""
+    state = device_sim.state
 
-def update_state(device_sim):
-    """Update fillhead dynamic state (called periodically)."""
     # Simulate heater PID loop
-    if device_sim.state.get('h_st') == 1:
-        error = device_sim.state.get('h_sp', 70) - device_sim.state.get('h_pv', 25)
-        device_sim.state['h_op'] = min(100, max(0, error * 10))
-        device_sim.state['h_pv'] += device_sim.state.get('h_op', 0) * 0.01 - 0.05
+    output = 0
+    if state['heater_state'] == 1:
+        output = min(100, max(0, (state['heater_setpoint'] - state['temp_c']) * 10))
+        _set(device_sim, 'temp_c', state['temp_c'] + output * 0.01 - 0.05)
+    elif state['temp_c'] > 25:
+        _set(device_sim, 'temp_c', state['temp_c'] - 0.1)
+    state['h_op'] = output
+
+    # Simulate vacuum: first-order pull-down while pumping, slow leak back to ambient otherwise
+    pressure = state['vacuum_psig']
+    if state['vacuum_state'] != VACUUM_OFF:
+        target, tau = state['vacuum_target_psig'], VACUUM_PUMP_TAU
     else:
-        device_sim.state['h_op'] = 0
-        if device_sim.state.get('h_pv', 0) > 25:
-            device_sim.state['h_pv'] -= 0.1
+        target, tau = 0.0, VACUUM_LEAK_TAU
+    pressure += (target - pressure) * min(1.0, PHYSICS_PERIOD / tau)
+    state['vacuum_psig'] = pressure
+    if state['vacuum_state'] == VACUUM_PULLDOWN and abs(pressure - target) <= VACUUM_ON_BAND:
+        state['vacuum_state'] = VACUUM_ON
 
 
+def update_state(device_sim):
+    """Update fillhead dynamic state (called periodically)."""
+    get_engine(device_sim).sync()
@@ -2,7 +2,7 @@
  * @file telemetry.cpp
  * @brief Telemetry construction implementation for the Fillhead controller.
  * @details AUTO-GENERATED FILE - DO NOT EDIT MANUALLY
- * Generated from telemetry.json on 2025-11-03 11:25:17
+ * Generated from telemetry.json (source CRC-32 585D33F5)
  */
 
 #include "telemetry.h"
@@ -162,15 +162,338 @@ int telemetry_build_message(const TelemetryData* data, char* buffer, size_t buff
     return pos;
 }
 
+//==================================================================================================
+// Binary Frame Construction
+//==================================================================================================
+
+int telemetry_build_frame(const TelemetryData* data, uint32_t sequence, uint8_t* buffer, size_t buffer_size) {
+    if (data == NULL || buffer == NULL || buffer_size < sizeof(TelemetryFrame)) return 0;
+    
+    TelemetryFrame frame;
+    frame.header.magic = TELEM_FRAME_MAGIC;
+    frame.header.version = TELEM_FRAME_VERSION;
+    frame.header.frame_type = TELEM_FRAME_TYPE_FULL;
+    frame.header.schema_hash = TELEM_SCHEMA_HASH;
+    frame.header.sequence = sequence;
+    
+    frame.main_state = data->main_state;
+    frame.injector_state = data->injector_state;
+    frame.inj_valve_state = data->inj_valve_state;
+    frame.vac_valve_state = data->vac_valve_state;
+    frame.heater_state = data->heater_state;
+    frame.vacuum_state = data->vacuum_state;
+    frame.injector_torque = data->injector_torque;
+    frame.injector_homed = data->injector_homed;
+    frame.injection_cumulative_ml = data->injection_cumulative_ml;
+    frame.injection_active_ml = data->injection_active_ml;
+    frame.injection_target_ml = data->injection_target_ml;
+    frame.motors_enabled = data->motors_enabled ? 1 : 0;
+    frame.inj_valve_pos = data->inj_valve_pos;
+    frame.inj_valve_torque = data->inj_valve_torque;
+    frame.inj_valve_homed = data->inj_valve_homed ? 1 : 0;
+    frame.vac_valve_pos = data->vac_valve_pos;
+    frame.vac_valve_motor_torque = data->vac_valve_motor_torque;
+    frame.vac_valve_homed = data->vac_valve_homed ? 1 : 0;
+    frame.temp_c = data->temp_c;
+    frame.heater_setpoint = data->heater_setpoint;
+    frame.vacuum_psig = data->vacuum_psig;
+    
+    memcpy(buffer, &frame, sizeof(frame));
+    return (int)sizeof(frame);
+}
+
+//==================================================================================================
+// Delta Frame Construction
+//==================================================================================================
+
+void telemetry_delta_init(TelemetryDeltaState* state, uint32_t keyframe_interval) {
+    if (state == NULL) return;
+    
+    telemetry_init(&state->last);
+    state->frames_since_keyframe = 0;
+    state->keyframe_interval = keyframe_interval > 0 ? keyframe_interval : TELEM_DEFAULT_KEYFRAME_INTERVAL;
+    state->keyframe_pending = true;
+}
+
+void telemetry_delta_request_keyframe(TelemetryDeltaState* state) {
+    if (state == NULL) return;
+    state->keyframe_pending = true;
+}
+
+int telemetry_build_delta_frame(TelemetryDeltaState* state, const TelemetryData* data, uint32_t sequence, uint8_t* buffer, size_t buffer_size) {
+    if (state == NULL || data == NULL || buffer == NULL || buffer_size < TELEM_DELTA_FRAME_MAX_SIZE) return 0;
+    
+    // Keyframe: resend everything and restart the interval.
+    if (state->keyframe_pending || state->frames_since_keyframe >= state->keyframe_interval) {
+        state->keyframe_pending = false;
+        state->frames_since_keyframe = 0;
+        state->last = *data;
+        return telemetry_build_frame(data, sequence, buffer, buffer_size);
+    }
+    
+    TelemetryFrameHeader header;
+    header.magic = TELEM_FRAME_MAGIC;
+    header.version = TELEM_FRAME_VERSION;
+    header.frame_type = TELEM_FRAME_TYPE_DELTA;
+    header.schema_hash = TELEM_SCHEMA_HASH;
+    header.sequence = sequence;
+    memcpy(buffer, &header, sizeof(header));
+    
+    uint32_t mask[TELEM_DELTA_MASK_WORDS] = {0};
+    size_t pos = sizeof(header) + sizeof(mask);
+    
+    // main_state
+    if (data->main_state != state->last.main_state) {
+        int32_t value = data->main_state;
+        memcpy(buffer + pos, &value, sizeof(value));
+        pos += sizeof(value);
+        mask[0] |= (1u << 0);
+    }
+    
+    // injector_state
+    if (data->injector_state != state->last.injector_state) {
+        int32_t value = data->injector_state;
+        memcpy(buffer + pos, &value, sizeof(value));
+        pos += sizeof(value);
+        mask[0] |= (1u << 1);
+    }
+    
+    // inj_valve_state
+    if (data->inj_valve_state != state->last.inj_valve_state) {
+        int32_t value = data->inj_valve_state;
+        memcpy(buffer + pos, &value, sizeof(value));
+        pos += sizeof(value);
+        mask[0] |= (1u << 2);
+    }
+    
+    // vac_valve_state
+    if (data->vac_valve_state != state->last.vac_valve_state) {
+        int32_t value = data->vac_valve_state;
+        memcpy(buffer + pos, &value, sizeof(value));
+        pos += sizeof(value);
+        mask[0] |= (1u << 3);
+    }
+    
+    // heater_state
+    if (data->heater_state != state->last.heater_state) {
+        int32_t value = data->heater_state;
+        memcpy(buffer + pos, &value, sizeof(value));
+        pos += sizeof(value);
+        mask[0] |= (1u << 4);
+    }
+    
+    // vacuum_state
+    if (data->vacuum_state != state->last.vacuum_state) {
+        int32_t value = data->vacuum_state;
+        memcpy(buffer + pos, &value, sizeof(value));
+        pos += sizeof(value);
+        mask[0] |= (1u << 5);
+    }
+    
+    // injector_torque
+    if (data->injector_torque != state->last.injector_torque) {
+        float value = data->injector_torque;
+        memcpy(buffer + pos, &value, sizeof(value));
+        pos += sizeof(value);
+        mask[0] |= (1u << 6);
+    }
+    
+    // injector_homed
+    if (data->injector_homed != state->last.injector_homed) {
+        int32_t value = data->injector_homed;
+        memcpy(buffer + pos, &value, sizeof(value));
+        pos += sizeof(value);
+        mask[0] |= (1u << 7);
+    }
+    
+    // injection_cumulative_ml
+    if (data->injection_cumulative_ml != state->last.injection_cumulative_ml) {
+        float value = data->injection_cumulative_ml;
+        memcpy(buffer + pos, &value, sizeof(value));
+        pos += sizeof(value);
+        mask[0] |= (1u << 8);
+    }
+    
+    // injection_active_ml
+    if (data->injection_active_ml != state->last.injection_active_ml) {
+        float value = data->injection_active_ml;
+        memcpy(buffer + pos, &value, sizeof(value));
+        pos += sizeof(value);
+        mask[0] |= (1u << 9);
+    }
+    
+    // injection_target_ml
+    if (data->injection_target_ml != state->last.injection_target_ml) {
+        float value = data->injection_target_ml;
+        memcpy(buffer + pos, &value, sizeof(value));
+        pos += sizeof(value);
+        mask[0] |= (1u << 10);
+    }
+    
+    // motors_enabled
+    if (data->motors_enabled != state->last.motors_enabled) {
+        uint8_t value = data->motors_enabled ? 1 : 0;
+        memcpy(buffer + pos, &value, sizeof(value));
+        pos += sizeof(value);
+        mask[0] |= (1u << 11);
+    }
+    
+    // inj_valve_pos
+    if (data->inj_valve_pos != state->last.inj_valve_pos) {
+        float value = data->inj_valve_pos;
+        memcpy(buffer + pos, &value, sizeof(value));
+        pos += sizeof(value);
+        mask[0] |= (1u << 12);
+    }
+    
+    // inj_valve_torque
+    if (data->inj_valve_torque != state->last.inj_valve_torque) {
+        float value = data->inj_valve_torque;
+        memcpy(buffer + pos, &value, sizeof(value));
+        pos += sizeof(value);
+        mask[0] |= (1u << 13);
+    }
+    
+    // inj_valve_homed
+    if (data->inj_valve_homed != state->last.inj_valve_homed) {
+        uint8_t value = data->inj_valve_homed ? 1 : 0;
+        memcpy(buffer + pos, &value, sizeof(value));
+        pos += sizeof(value);
+        mask[0] |= (1u << 14);
+    }
+    
+    // vac_valve_pos
+    if (data->vac_valve_pos != state->last.vac_valve_pos) {
+        float value = data->vac_valve_pos;
+        memcpy(buffer + pos, &value, sizeof(value));
+        pos += sizeof(value);
+        mask[0] |= (1u << 15);
+    }
+    
+    // vac_valve_motor_torque
+    if (data->vac_valve_motor_torque != state->last.vac_valve_motor_torque) {
+        float value = data->vac_valve_motor_torque;
+        memcpy(buffer + pos, &value, sizeof(value));
+        pos += sizeof(value);
+        mask[0] |= (1u << 16);
+    }
+    
+    // vac_valve_homed
+    if (data->vac_valve_homed != state->last.vac_valve_homed) {
+        uint8_t value = data->vac_valve_homed ? 1 : 0;
+        memcpy(buffer + pos, &value, sizeof(value));
+        pos += sizeof(value);
+        mask[0] |= (1u << 17);
+    }
+    
+    // temp_c
+    if (data->temp_c != state->last.temp_c) {
+        float value = data->temp_c;
+        memcpy(buffer + pos, &value, sizeof(value));
+        pos += sizeof(value);
+        mask[0] |= (1u << 18);
+    }
+    
+    // heater_setpoint
+    if (data->heater_setpoint != state->last.heater_setpoint) {
+        float value = data->heater_setpoint;
+        memcpy(buffer + pos, &value, sizeof(value));
+        pos += sizeof(value);
+        mask[0] |= (1u << 19);
+    }
+    
+    // vacuum_psig
+    if (data->vacuum_psig != state->last.vacuum_psig) {
+        float value = data->vacuum_psig;
+        memcpy(buffer + pos, &value, sizeof(value));
+        pos += sizeof(value);
+        mask[0] |= (1u << 20);
+    }
+    
+    memcpy(buffer + sizeof(header), mask, sizeof(mask));
+    state->last = *data;
+    state->frames_since_keyframe++;
+    return (int)pos;
+}
+
+//==================================================================================================
+// Batch Frame Construction
+//==================================================================================================
+
+void telemetry_batch_init(TelemetryBatchBuffer* batch) {
+    if (batch == NULL) return;
+    
+    batch->head = 0;
+    batch->count = 0;
+    batch->dropped = 0;
+}
+
+void telemetry_batch_push(TelemetryBatchBuffer* batch, const TelemetryData* data, uint32_t timestamp_ms) {
+    if (batch == NULL || data == NULL) return;
+    
+    // Overwrite the oldest sample when full so the newest history is kept.
+    if (batch->count == TELEM_BATCH_CAPACITY) {
+        batch->head = (batch->head + 1) % TELEM_BATCH_CAPACITY;
+        batch->count--;
+        batch->dropped++;
+    }
+    
+    TelemetrySample* sample = &batch->samples[(batch->head + batch->count) % TELEM_BATCH_CAPACITY];
+    sample->timestamp_ms = timestamp_ms;
+    sample->injector_torque = data->injector_torque;
+    sample->inj_valve_torque = data->inj_valve_torque;
+    sample->vac_valve_motor_torque = data->vac_valve_motor_torque;
+    sample->temp_c = data->temp_c;
+    sample->vacuum_psig = data->vacuum_psig;
+    batch->count++;
+}
+
+int telemetry_batch_build_frame(TelemetryBatchBuffer* batch, uint32_t sequence, uint8_t* buffer, size_t buffer_size) {
+    if (batch == NULL || buffer == NULL || buffer_size < sizeof(TelemetryBatchHeader) + sizeof(TelemetrySample)) return 0;
+    if (batch->count == 0) return 0;
+    
+    size_t n = (buffer_size - sizeof(TelemetryBatchHeader)) / sizeof(TelemetrySample);
+    if (n > TELEM_BATCH_MAX_SAMPLES) n = TELEM_BATCH_MAX_SAMPLES;
+    if (n > batch->count) n = batch->count;
+    
+    TelemetryBatchHeader header;
+    header.header.magic = TELEM_FRAME_MAGIC;
+    header.header.version = TELEM_FRAME_VERSION;
+    header.header.frame_type = TELEM_FRAME_TYPE_BATCH;
+    header.header.schema_hash = TELEM_SCHEMA_HASH;
+    header.header.sequence = sequence;
+    header.sample_count = (uint16_t)n;
+    header.dropped_samples = batch->dropped > 0xFFFF ? 0xFFFF : (uint16_t)batch->dropped;
+    memcpy(buffer, &header, sizeof(header));
+    
+    // Copy oldest first, in up to two runs when the queued samples wrap around the end of the ring.
+    size_t pos = sizeof(header);
+    size_t first = TELEM_BATCH_CAPACITY - batch->head;
+    if (first > n) first = n;
+    memcpy(buffer + pos, &batch->samples[batch->head], first * sizeof(TelemetrySample));
+    pos += first * sizeof(TelemetrySample);
+    if (n > first) {
+        memcpy(buffer + pos, &batch->samples[0], (n - first) * sizeof(TelemetrySample));
+        pos += (n - first) * sizeof(TelemetrySample);
+    }
+    
+    batch->head = (batch->head + n) % TELEM_BATCH_CAPACITY;
+    batch->count -= n;
+    batch->dropped = 0;
+    return (int)pos;
+}
+
 //==================================================================================================
 // Telemetry Transmission
 //==================================================================================================
 
-// NOTE: You need to provide a sendMessage() implementation based on your comms setup
+// NOTE: telemetry_send() is only compiled when sendMessage is defined for your comms setup.
+// The Fillhead firmware builds its frames in Fillhead::publishTelemetry() instead.
 // For example:
 // extern CommsController comms;
 // #define sendMessage(msg) comms.enqueueTx(msg, comms.m_guiIp, comms.m_guiPort)
 
+#ifdef sendMessage
 void telemetry_send(const TelemetryData* data) {
     char buffer[512];
     int len = telemetry_build_message(data, buffer, sizeof(buffer));
@@ -178,4 +501,5 @@ void telemetry_send(const TelemetryData* data) {
     if (len > 0) {
         sendMessage(buffer);
     }
-}
\ No newline at end of file
+}
+#endif
\ No newline at end of file
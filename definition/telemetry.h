@@ -2,7 +2,7 @@
  * @file telemetry.h
  * @brief Telemetry structure and construction interface for the Fillhead controller.
  * @details AUTO-GENERATED FILE - DO NOT EDIT MANUALLY
- * Generated from telemetry.json on 2025-11-03 11:25:17
+ * Generated from telemetry.json (source CRC-32 585D33F5)
  * 
  * This header defines the complete telemetry data structure for the Fillhead.
  * All telemetry fields are assembled in one centralized location.
@@ -12,6 +12,7 @@
 
 #include <stdint.h>
 #include <stdbool.h>
+#include <stddef.h>
 
 //==================================================================================================
 // Telemetry Field Keys
@@ -79,6 +80,127 @@ typedef struct {
     float        vacuum_psig                   ; ///< Current vacuum pressure reading
 } TelemetryData;
 
+//==================================================================================================
+// Binary Telemetry Frame
+//==================================================================================================
+
+/**
+ * @name Binary Frame Constants
+ * @brief Header values identifying a packed binary telemetry frame.
+ * @details The frame is a fixed, little-endian layout of every field in telemetry.json.
+ * The host rejects frames whose schema hash does not match its own copy of telemetry.json.
+ * @{
+ */
+#define TELEM_FRAME_MAGIC                        0xF17E         ///< Leading frame marker. Its first byte is never printable ASCII.
+#define TELEM_FRAME_VERSION                      1              ///< Version of the frame header layout.
+#define TELEM_SCHEMA_HASH                        0x0B44A5EEu    ///< FNV-1a hash of the telemetry field names, types and batch membership.
+#define TELEM_FRAME_TYPE_FULL                    0              ///< Frame carries every telemetry field (keyframe).
+#define TELEM_FRAME_TYPE_DELTA                   1              ///< Frame carries only the fields that changed since the previous frame.
+#define TELEM_DELTA_MASK_WORDS                   1              ///< Number of 32-bit changed-field mask words in a delta frame.
+#define TELEM_DEFAULT_KEYFRAME_INTERVAL          50             ///< Default number of delta frames between keyframes.
+#define TELEM_FRAME_TYPE_BATCH                   2              ///< Frame carries a block of timestamped samples of the batched fields.
+#define TELEM_BATCH_CAPACITY                     64             ///< Samples held by a TelemetryBatchBuffer before the oldest is overwritten.
+#define TELEM_BATCH_MAX_SAMPLES                  42             ///< Most samples that fit in one 1024-byte batch frame.
+/** @} */
+
+/**
+ * @struct TelemetryFrameHeader
+ * @brief Header prepended to every binary telemetry frame.
+ */
+typedef struct __attribute__((packed)) {
+    uint16_t     magic                         ; ///< Always TELEM_FRAME_MAGIC
+    uint8_t      version                       ; ///< Always TELEM_FRAME_VERSION
+    uint8_t      frame_type                    ; ///< One of the TELEM_FRAME_TYPE_* values
+    uint32_t     schema_hash                   ; ///< Always TELEM_SCHEMA_HASH
+    uint32_t     sequence                      ; ///< Incremented by the sender for every frame
+} TelemetryFrameHeader;
+
+/**
+ * @struct TelemetryFrame
+ * @brief Packed on-the-wire image of TelemetryData.
+ */
+typedef struct __attribute__((packed)) {
+    TelemetryFrameHeader header                ; ///< Frame header
+    int32_t      main_state                    ; ///< Overall fillhead system state
+    int32_t      injector_state                ; ///< Current operational state of the injector motors
+    int32_t      inj_valve_state               ; ///< Current state of the injection pinch valve
+    int32_t      vac_valve_state               ; ///< Current state of the vacuum pinch valve
+    int32_t      heater_state                  ; ///< Heater PID control status
+    int32_t      vacuum_state                  ; ///< Current vacuum system operation state
+    float        injector_torque               ; ///< Current motor torque percentage for injector
+    int32_t      injector_homed                ; ///< Indicates if injector has been homed to machine zero
+    float        injection_cumulative_ml       ; ///< Total volume dispensed since last cartridge home
+    float        injection_active_ml           ; ///< Volume dispensed in current injection operation
+    float        injection_target_ml           ; ///< Target volume for current injection operation
+    uint8_t      motors_enabled                ; ///< Global motor power enable status
+    float        inj_valve_pos                 ; ///< Current position of injection valve actuator
+    float        inj_valve_torque              ; ///< Current motor torque percentage for injection valve
+    uint8_t      inj_valve_homed               ; ///< Indicates if injection valve has been homed
+    float        vac_valve_pos                 ; ///< Current position of vacuum valve actuator
+    float        vac_valve_motor_torque        ; ///< Current motor torque percentage for vacuum valve
+    uint8_t      vac_valve_homed               ; ///< Indicates if vacuum valve has been homed
+    float        temp_c                        ; ///< Current material temperature from thermocouple
+    float        heater_setpoint               ; ///< Target temperature setpoint for PID controller
+    float        vacuum_psig                   ; ///< Current vacuum pressure reading
+} TelemetryFrame;
+
+/**
+ * @name Delta Frame Layout
+ * @brief A delta frame is a TelemetryFrameHeader, TELEM_DELTA_MASK_WORDS changed-field mask words
+ * (bit N set means the Nth field of telemetry.json follows), then the changed fields packed in
+ * schema order with the same types as TelemetryFrame.
+ * @{
+ */
+#define TELEM_DELTA_FRAME_MAX_SIZE               (sizeof(TelemetryFrame) + TELEM_DELTA_MASK_WORDS * sizeof(uint32_t)) ///< Largest possible delta frame.
+/** @} */
+
+/**
+ * @struct TelemetryDeltaState
+ * @brief Sender-side state for delta telemetry.
+ * @details Holds the snapshot the host last received so that only changed fields are sent.
+ */
+typedef struct {
+    TelemetryData last                          ; ///< Snapshot described by the most recent frame
+    uint32_t     frames_since_keyframe         ; ///< Delta frames sent since the last keyframe
+    uint32_t     keyframe_interval             ; ///< Delta frames between forced keyframes
+    bool         keyframe_pending              ; ///< Send a keyframe next, regardless of the interval
+} TelemetryDeltaState;
+
+/**
+ * @struct TelemetrySample
+ * @brief One timestamped sample of the telemetry fields marked "batch" in telemetry.json.
+ */
+typedef struct __attribute__((packed)) {
+    uint32_t     timestamp_ms                  ; ///< Milliseconds since boot when the sample was taken
+    float        injector_torque               ; ///< Current motor torque percentage for injector
+    float        inj_valve_torque              ; ///< Current motor torque percentage for injection valve
+    float        vac_valve_motor_torque        ; ///< Current motor torque percentage for vacuum valve
+    float        temp_c                        ; ///< Current material temperature from thermocouple
+    float        vacuum_psig                   ; ///< Current vacuum pressure reading
+} TelemetrySample;
+
+/**
+ * @struct TelemetryBatchHeader
+ * @brief Header of a batch frame, followed by sample_count TelemetrySample records, oldest first.
+ */
+typedef struct __attribute__((packed)) {
+    TelemetryFrameHeader header                ; ///< Frame header
+    uint16_t     sample_count                  ; ///< Number of samples in this frame
+    uint16_t     dropped_samples               ; ///< Samples overwritten in the ring buffer since the previous batch frame
+} TelemetryBatchHeader;
+
+/**
+ * @struct TelemetryBatchBuffer
+ * @brief Ring buffer of samples waiting to be sent in batch frames.
+ * @details When full, the oldest sample is overwritten and counted in dropped.
+ */
+typedef struct {
+    TelemetrySample samples[TELEM_BATCH_CAPACITY] ; ///< Sample storage
+    uint16_t     head                          ; ///< Index of the oldest queued sample
+    uint16_t     count                         ; ///< Number of queued samples
+    uint32_t     dropped                       ; ///< Samples overwritten since the last batch frame
+} TelemetryBatchBuffer;
+
 //==================================================================================================
 // Telemetry Construction Functions
 //==================================================================================================
@@ -100,10 +222,86 @@ void telemetry_init(TelemetryData* data);
  */
 int telemetry_build_message(const TelemetryData* data, char* buffer, size_t buffer_size);
 
+/**
+ * @brief Build a packed binary telemetry frame from data structure.
+ * @param data Pointer to TelemetryData structure containing current values
+ * @param sequence Frame sequence number, incremented by the caller for every frame sent
+ * @param buffer Output buffer to write the frame into
+ * @param buffer_size Size of output buffer
+ * @return Number of bytes written, or 0 if the buffer is too small
+ * 
+ * @details The frame contains zero bytes, so it must be sent with an explicit length
+ * rather than as a null-terminated string.
+ */
+int telemetry_build_frame(const TelemetryData* data, uint32_t sequence, uint8_t* buffer, size_t buffer_size);
+
+/**
+ * @brief Initialize delta telemetry state.
+ * @param state Pointer to TelemetryDeltaState structure to initialize
+ * @param keyframe_interval Delta frames between keyframes (0 selects TELEM_DEFAULT_KEYFRAME_INTERVAL)
+ * 
+ * @details The first frame built after initialization is always a keyframe.
+ */
+void telemetry_delta_init(TelemetryDeltaState* state, uint32_t keyframe_interval);
+
+/**
+ * @brief Force the next delta frame to be a keyframe.
+ * @param state Pointer to TelemetryDeltaState structure
+ * 
+ * @details Call this when the host sends request_keyframe after a sequence gap, or when a new host
+ * is discovered.
+ */
+void telemetry_delta_request_keyframe(TelemetryDeltaState* state);
+
+/**
+ * @brief Build the next frame of a delta telemetry stream.
+ * @param state Pointer to TelemetryDeltaState structure, updated with the values sent
+ * @param data Pointer to TelemetryData structure containing current values
+ * @param sequence Frame sequence number, incremented by the caller for every frame sent
+ * @param buffer Output buffer to write the frame into
+ * @param buffer_size Size of output buffer (at least TELEM_DELTA_FRAME_MAX_SIZE)
+ * @return Number of bytes written, or 0 if the buffer is too small
+ * 
+ * @details Emits a full frame when a keyframe is due, otherwise a delta frame containing only
+ * the fields that differ from the previous frame. A delta frame with no changed fields is
+ * still sent so the host can detect gaps from the sequence number.
+ */
+int telemetry_build_delta_frame(TelemetryDeltaState* state, const TelemetryData* data, uint32_t sequence, uint8_t* buffer, size_t buffer_size);
+
+/**
+ * @brief Initialize a batch ring buffer.
+ * @param batch Pointer to TelemetryBatchBuffer structure to initialize
+ */
+void telemetry_batch_init(TelemetryBatchBuffer* batch);
+
+/**
+ * @brief Queue one sample of the batched fields.
+ * @param batch Pointer to TelemetryBatchBuffer structure
+ * @param data Pointer to TelemetryData structure containing current values
+ * @param timestamp_ms Time the values were sampled, in milliseconds
+ * 
+ * @details Call this at sensor sample rate. If the buffer is full, the oldest sample is overwritten.
+ */
+void telemetry_batch_push(TelemetryBatchBuffer* batch, const TelemetryData* data, uint32_t timestamp_ms);
+
+/**
+ * @brief Move the oldest queued samples into a batch frame.
+ * @param batch Pointer to TelemetryBatchBuffer structure; sent samples are removed
+ * @param sequence Frame sequence number of the batch stream, incremented by the caller for every batch frame sent
+ * @param buffer Output buffer to write the frame into
+ * @param buffer_size Size of output buffer
+ * @return Number of bytes written, or 0 if no samples are queued or the buffer cannot hold one sample
+ * 
+ * @details At most TELEM_BATCH_MAX_SAMPLES samples are sent per frame. Call repeatedly until it returns
+ * 0 to drain the buffer. Batch frames use their own sequence counter, separate from full and delta frames.
+ */
+int telemetry_batch_build_frame(TelemetryBatchBuffer* batch, uint32_t sequence, uint8_t* buffer, size_t buffer_size);
+
 /**
  * @brief Send telemetry message via Serial.
  * @param data Pointer to TelemetryData structure containing current values
  * 
- * @details Builds and transmits the complete telemetry message.
+ * @details Builds and transmits the complete telemetry message. Only available when
+ * sendMessage is defined as a macro before telemetry.cpp is compiled.
  */
 void telemetry_send(const TelemetryData* data);
\ No newline at end of file
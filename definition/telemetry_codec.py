@@ -0,0 +1,389 @@
+"""
+Fillhead Telemetry Codec
+Encodes and decodes packed binary telemetry frames, delta telemetry streams and sample batches.
+
+AUTO-GENERATED FILE - DO NOT EDIT MANUALLY
+Generated from telemetry.json (source CRC-32 585D33F5)
+To modify telemetry fields, edit telemetry.json and regenerate this file.
+"""
+import struct
+
+FRAME_MAGIC = 0xF17E
+FRAME_VERSION = 1
+SCHEMA_HASH = 0x0B44A5EE
+FRAME_TYPE_FULL = 0
+FRAME_TYPE_DELTA = 1
+FRAME_TYPE_BATCH = 2
+DELTA_MASK_WORDS = 1
+DEFAULT_KEYFRAME_INTERVAL = 50
+BATCH_MAX_SAMPLES = 42
+MESSAGE_SEPARATOR = b'\n'
+
+FIELD_NAMES = (
+    'main_state',
+    'injector_state',
+    'inj_valve_state',
+    'vac_valve_state',
+    'heater_state',
+    'vacuum_state',
+    'injector_torque',
+    'injector_homed',
+    'injection_cumulative_ml',
+    'injection_active_ml',
+    'injection_target_ml',
+    'motors_enabled',
+    'inj_valve_pos',
+    'inj_valve_torque',
+    'inj_valve_homed',
+    'vac_valve_pos',
+    'vac_valve_motor_torque',
+    'vac_valve_homed',
+    'temp_c',
+    'heater_setpoint',
+    'vacuum_psig',
+)
+
+FIELD_DEFAULTS = (
+    0,
+    0,
+    0,
+    0,
+    0,
+    0,
+    0.0,
+    0,
+    0.0,
+    0.0,
+    0.0,
+    1,
+    0.0,
+    0.0,
+    0,
+    0.0,
+    0.0,
+    0,
+    25.0,
+    70.0,
+    0.5,
+)
+
+FIELD_MAPS = {
+    'main_state': {0: 'standby', 1: 'busy', 2: 'error', 3: 'disabled', 4: 'clearing errors'},
+    'injector_state': {0: 'standby', 1: 'homing', 2: 'jogging', 3: 'feeding', 4: 'motor fault'},
+    'inj_valve_state': {0: 'not homed', 1: 'closed', 2: 'open', 3: 'halted', 4: 'moving', 5: 'homing', 6: 'jogging', 7: 'resetting', 8: 'error'},
+    'vac_valve_state': {0: 'not homed', 1: 'closed', 2: 'open', 3: 'halted', 4: 'moving', 5: 'homing', 6: 'jogging', 7: 'resetting', 8: 'error'},
+    'heater_state': {0: 'off', 1: 'active'},
+    'vacuum_state': {0: 'off', 1: 'pulldown', 2: 'settling', 3: 'leak testing', 4: 'on', 5: 'error'},
+    'injector_homed': {0: 'not homed', 1: 'homed'},
+    'motors_enabled': {0: 'disabled', 1: 'enabled'},
+    'inj_valve_homed': {0: 'not homed', 1: 'homed'},
+    'vac_valve_homed': {0: 'not homed', 1: 'homed'},
+}
+
+BATCH_FIELD_NAMES = (
+    'injector_torque',
+    'inj_valve_torque',
+    'vac_valve_motor_torque',
+    'temp_c',
+    'vacuum_psig',
+)
+
+# NumPy structured dtype of one batch sample, matching TelemetrySample
+BATCH_DTYPE = [
+    ('timestamp_ms', '<u4'),
+    ('injector_torque', '<f4'),
+    ('inj_valve_torque', '<f4'),
+    ('vac_valve_motor_torque', '<f4'),
+    ('temp_c', '<f4'),
+    ('vacuum_psig', '<f4'),
+]
+
+HEADER = struct.Struct('<HBBII')
+FRAME = struct.Struct('<HBBIIiiiiiififffBffBffBfff')
+FIELD_FORMATS = 'iiiiiififffBffBffBfff'
+DELTA_MASK = struct.Struct('<1I')
+BATCH_HEADER = struct.Struct('<HH')
+BATCH_SAMPLE = struct.Struct('<Ifffff')
+
+_MAGIC_BYTES = struct.pack('<H', FRAME_MAGIC)
+
+
+def is_frame(data):
+    """Returns True if a received datagram is a binary telemetry frame rather than a text message."""
+    return data[:2] == _MAGIC_BYTES
+
+
+def split_datagram(data):
+    """
+    Split a received datagram into the messages it carries.
+
+    The firmware coalesces consecutive text messages for the same destination into one
+    datagram, separated by MESSAGE_SEPARATOR. Binary frames are always sent on their own.
+
+    Returns:
+        List of bytes: the whole datagram for a binary frame, otherwise each non-empty message
+    """
+    if is_frame(data):
+        return [data]
+    return [message for message in data.split(MESSAGE_SEPARATOR) if message]
+
+
+def encode_frame(values, sequence):
+    """
+    Pack a telemetry snapshot into a full binary frame.
+
+    Args:
+        values: Mapping of field name to value; missing fields use their telemetry.json default
+        sequence: Frame sequence number
+
+    Returns:
+        The frame as bytes
+    """
+    payload = [values.get(name, default) for name, default in zip(FIELD_NAMES, FIELD_DEFAULTS)]
+    return FRAME.pack(FRAME_MAGIC, FRAME_VERSION, FRAME_TYPE_FULL, SCHEMA_HASH, sequence & 0xFFFFFFFF, *payload)
+
+
+def decode_header(data):
+    """
+    Unpack and validate the header of a binary frame.
+
+    Args:
+        data: Received datagram
+
+    Returns:
+        Tuple of (frame_type, sequence)
+
+    Raises:
+        ValueError: If the datagram is not a frame or was built from a different telemetry.json
+    """
+    if len(data) < HEADER.size:
+        raise ValueError(f"Frame too short: {len(data)} bytes")
+    magic, version, frame_type, schema_hash, sequence = HEADER.unpack_from(data)
+    if magic != FRAME_MAGIC:
+        raise ValueError(f"Bad frame magic 0x{magic:04X}")
+    if version != FRAME_VERSION:
+        raise ValueError(f"Unsupported frame version {version}")
+    if schema_hash != SCHEMA_HASH:
+        raise ValueError(f"Schema hash mismatch: device 0x{schema_hash:08X}, host 0x{SCHEMA_HASH:08X}")
+    return frame_type, sequence
+
+
+def decode_frame(data):
+    """
+    Unpack a full binary telemetry frame.
+
+    Args:
+        data: Received datagram
+
+    Returns:
+        Tuple of (sequence, dict of field name to raw value)
+
+    Raises:
+        ValueError: If the datagram is not a valid full frame for this schema
+    """
+    frame_type, sequence = decode_header(data)
+    if frame_type != FRAME_TYPE_FULL:
+        raise ValueError(f"Not a full frame (type {frame_type})")
+    if len(data) != FRAME.size:
+        raise ValueError(f"Frame length {len(data)} does not match schema length {FRAME.size}")
+    values = FRAME.unpack(data)
+    return sequence, dict(zip(FIELD_NAMES, values[5:]))
+
+
+_delta_layouts = {}
+
+
+def _delta_layout(mask):
+    """Returns the cached (struct, field names) pair for the payload of a delta frame with the given mask."""
+    layout = _delta_layouts.get(mask)
+    if layout is None:
+        indices = [i for i in range(len(FIELD_NAMES)) if mask >> i & 1]
+        layout = (struct.Struct('<' + ''.join(FIELD_FORMATS[i] for i in indices)),
+                  tuple(FIELD_NAMES[i] for i in indices))
+        _delta_layouts[mask] = layout
+    return layout
+
+
+def encode_batch(samples, sequence, dropped=0):
+    """
+    Pack timestamped samples of the batched fields into a batch frame.
+
+    Args:
+        samples: Sequence of (timestamp_ms, values) pairs, oldest first; missing fields in values
+            use their telemetry.json default
+        sequence: Batch stream sequence number
+        dropped: Number of samples lost before these ones
+
+    Returns:
+        The frame as bytes
+
+    Raises:
+        ValueError: If more than BATCH_MAX_SAMPLES samples are given
+    """
+    if len(samples) > BATCH_MAX_SAMPLES:
+        raise ValueError(f"Too many samples for one batch frame: {len(samples)} > {BATCH_MAX_SAMPLES}")
+    defaults = dict(zip(FIELD_NAMES, FIELD_DEFAULTS))
+    parts = [HEADER.pack(FRAME_MAGIC, FRAME_VERSION, FRAME_TYPE_BATCH, SCHEMA_HASH, sequence & 0xFFFFFFFF),
+             BATCH_HEADER.pack(len(samples), min(dropped, 0xFFFF))]
+    for timestamp_ms, values in samples:
+        parts.append(BATCH_SAMPLE.pack(timestamp_ms & 0xFFFFFFFF,
+                                       *(values.get(name, defaults[name]) for name in BATCH_FIELD_NAMES)))
+    return b''.join(parts)
+
+
+def decode_batch(data):
+    """
+    Unpack a batch frame into NumPy arrays. Requires NumPy.
+
+    Args:
+        data: Received datagram
+
+    Returns:
+        Tuple of (sequence, dropped_samples, dict of column name to array). The columns are
+        "timestamp_ms" and every name in BATCH_FIELD_NAMES, one element per sample, oldest first.
+        The arrays are read-only views of data.
+
+    Raises:
+        ValueError: If the datagram is not a valid batch frame for this schema
+    """
+    import numpy as np
+
+    frame_type, sequence = decode_header(data)
+    if frame_type != FRAME_TYPE_BATCH:
+        raise ValueError(f"Not a batch frame (type {frame_type})")
+    if len(data) < HEADER.size + BATCH_HEADER.size:
+        raise ValueError(f"Batch frame too short: {len(data)} bytes")
+    count, dropped = BATCH_HEADER.unpack_from(data, HEADER.size)
+    offset = HEADER.size + BATCH_HEADER.size
+    if len(data) != offset + count * BATCH_SAMPLE.size:
+        raise ValueError(f"Batch frame length {len(data)} does not match its sample count {count}")
+    samples = np.frombuffer(data, dtype=np.dtype(BATCH_DTYPE), count=count, offset=offset)
+    return sequence, dropped, {name: samples[name] for name in samples.dtype.names}
+
+
+class TelemetryDeltaEncoder:
+    """
+    Produces a delta telemetry stream, mirroring telemetry_build_delta_frame() in the firmware.
+
+    Args:
+        keyframe_interval: Delta frames between keyframes
+    """
+
+    def __init__(self, keyframe_interval=DEFAULT_KEYFRAME_INTERVAL):
+        self.keyframe_interval = keyframe_interval
+        self.sequence = 0
+        self._last = None
+        self._frames_since_keyframe = 0
+        self._keyframe_pending = True
+
+    def request_keyframe(self):
+        """Force the next frame to be a keyframe."""
+        self._keyframe_pending = True
+
+    def encode(self, values):
+        """
+        Build the next frame of the stream.
+
+        Args:
+            values: Mapping of field name to value; missing fields use their telemetry.json default
+
+        Returns:
+            The frame as bytes, either a full keyframe or a delta frame
+        """
+        current = tuple(values.get(name, default) for name, default in zip(FIELD_NAMES, FIELD_DEFAULTS))
+        sequence = self.sequence
+        self.sequence = (sequence + 1) & 0xFFFFFFFF
+
+        if self._keyframe_pending or self._frames_since_keyframe >= self.keyframe_interval:
+            self._keyframe_pending = False
+            self._frames_since_keyframe = 0
+            self._last = current
+            return FRAME.pack(FRAME_MAGIC, FRAME_VERSION, FRAME_TYPE_FULL, SCHEMA_HASH, sequence, *current)
+
+        mask = 0
+        changed = []
+        for index, (value, last) in enumerate(zip(current, self._last)):
+            if value != last:
+                mask |= 1 << index
+                changed.append(value)
+        self._last = current
+        self._frames_since_keyframe += 1
+        payload, _ = _delta_layout(mask)
+        words = [(mask >> (32 * i)) & 0xFFFFFFFF for i in range(DELTA_MASK_WORDS)]
+        return (HEADER.pack(FRAME_MAGIC, FRAME_VERSION, FRAME_TYPE_DELTA, SCHEMA_HASH, sequence)
+                + DELTA_MASK.pack(*words) + payload.pack(*changed))
+
+
+class TelemetryStateDecoder:
+    """
+    Rebuilds full telemetry state from a stream of keyframes and delta frames.
+
+    Attributes:
+        state: Dict of the latest value of every field, or None until the first keyframe arrives
+        sequence: Sequence number of the last frame received
+        gaps: Number of sequence gaps detected
+        needs_keyframe: True while the state is stale after a gap; delta frames are discarded
+            until the next keyframe arrives; send the request_keyframe command to get one early
+
+    Batch frames carry their own sequence counter and are ignored; decode them with decode_batch().
+    """
+
+    def __init__(self):
+        self.state = None
+        self.sequence = None
+        self.gaps = 0
+        self.needs_keyframe = True
+
+    def feed(self, data):
+        """
+        Apply one received frame.
+
+        Args:
+            data: Received datagram
+
+        Returns:
+            Dict of the fields updated by this frame (every field for a keyframe), or None if the
+            frame was a batch frame or was discarded while waiting for a keyframe
+
+        Raises:
+            ValueError: If the datagram is not a valid frame for this schema
+        """
+        frame_type, sequence = decode_header(data)
+        if frame_type == FRAME_TYPE_BATCH:
+            return None
+
+        # Validate the whole frame before touching the sequence so a truncated datagram is rejected
+        # without counting as received.
+        if frame_type == FRAME_TYPE_FULL:
+            if len(data) != FRAME.size:
+                raise ValueError(f"Frame length {len(data)} does not match schema length {FRAME.size}")
+            values = dict(zip(FIELD_NAMES, FRAME.unpack(data)[5:]))
+        elif frame_type == FRAME_TYPE_DELTA:
+            if len(data) < HEADER.size + DELTA_MASK.size:
+                raise ValueError(f"Delta frame too short: {len(data)} bytes")
+            words = DELTA_MASK.unpack_from(data, HEADER.size)
+            mask = 0
+            for i, word in enumerate(words):
+                mask |= word << (32 * i)
+            if mask >> len(FIELD_NAMES):
+                raise ValueError(f"Delta frame mask 0x{mask:X} names fields outside the schema")
+            payload, names = _delta_layout(mask)
+            if len(data) != HEADER.size + DELTA_MASK.size + payload.size:
+                raise ValueError(f"Delta frame length {len(data)} does not match its field mask")
+            values = dict(zip(names, payload.unpack_from(data, HEADER.size + DELTA_MASK.size)))
+        else:
+            raise ValueError(f"Unknown frame type {frame_type}")
+
+        if self.sequence is not None and sequence != (self.sequence + 1) & 0xFFFFFFFF:
+            self.gaps += 1
+            self.needs_keyframe = True
+        self.sequence = sequence
+
+        if frame_type == FRAME_TYPE_FULL:
+            self.state = values
+            self.needs_keyframe = False
+            return dict(values)
+        if self.needs_keyframe:
+            return None
+        self.state.update(values)
+        return values
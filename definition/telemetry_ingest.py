@@ -0,0 +1,495 @@
+"""
+Fillhead Telemetry Ingest
+Headless service that receives telemetry from every fillhead on a line and publishes the latest
+state of each one through a shared-memory snapshot table.
+
+One UDP socket serves the whole line. discover_device is sent to every target (a broadcast
+address finds every fillhead on the subnet, for a few rounds) with this socket's port, so all
+devices stream their telemetry to it. The receive loop drains the socket without blocking, up to a batch of datagrams
+per wake-up, and hands each batch to decoder processes sharded by device address: one device
+always goes to the same worker, so its delta-frame state lives in one place and rows never have
+two writers.
+
+Workers decode binary frames and text telemetry and write the fields straight into the device's
+row of the snapshot table. GUIs and loggers attach to the table by name and read it in place:
+SnapshotTable.rows is a NumPy structured array over the shared memory, so a column such as
+rows['temp_c'] is a view across every device, and read() returns one row copied consistently.
+
+Usage:
+    python -m definition.telemetry_ingest                          # broadcast discovery
+    python -m definition.telemetry_ingest 127.0.0.1:8888 --count 50 --workers 4
+    python -m definition.telemetry_ingest --attach fillhead-telemetry   # print a running table
+"""
+import argparse
+import multiprocessing
+import selectors
+import socket
+import struct
+import sys
+import time
+import zlib
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .command_table import encode_command
+from .telemetry_codec import SCHEMA_HASH, TelemetryStateDecoder, is_frame, split_datagram
+from .telemetry_log import COLUMN_DTYPES
+from .telemetry_record import FIELD_TYPES, TELEM_PREFIX, TelemetryRecord
+
+DEFAULT_DEVICE_PORT = 8888            # LOCAL_PORT in inc/config.h
+MAX_DATAGRAM_SIZE = 1024              # MAX_PACKET_LENGTH in inc/config.h
+DEFAULT_TABLE_NAME = 'fillhead-telemetry'
+DEFAULT_CAPACITY = 64                 # Devices the snapshot table has rows for
+DEFAULT_BATCH_SIZE = 256              # Datagrams drained from the socket per wake-up
+DEFAULT_RECEIVE_BUFFER = 4 * 1024 * 1024
+DEFAULT_DISCOVERY_INTERVAL = 5.0      # Seconds between discovery rounds for targets not heard from
+DEFAULT_BROADCAST_ROUNDS = 3          # Discovery rounds sent to a broadcast target before it is retired
+DEFAULT_READ_TIMEOUT = 0.1            # Seconds read() waits for a row that is being written
+TELEMETRY_INTERVAL = 0.1              # TELEMETRY_INTERVAL_MS in inc/config.h
+
+TABLE_MAGIC = 0x46485354              # 'FHST'
+TABLE_HEADER = struct.Struct('<IIII')  # magic, schema hash, capacity, device count
+
+# Row layout: a sequence counter (odd while the row is being written), the device address, receive
+# statistics, then one column per telemetry.json field.
+ROW_DTYPE = np.dtype([
+    ('sequence', '<u4'),
+    ('host', 'S15'),
+    ('port', '<u2'),
+    ('updates', '<u4'),
+    ('gaps', '<u4'),
+    ('errors', '<u4'),
+    ('time', '<f8'),
+] + [(name, COLUMN_DTYPES[kind]) for name, kind in FIELD_TYPES.items()])
+
+_TELEM_PREFIX_BYTES = TELEM_PREFIX.encode('ascii')
+_DISCOVERY_PREFIX = b'DISCOVERY:'
+_STOP = None
+
+# Tables created by this process; attaching to one of them must leave the tracker registration alone
+_created = set()
+
+
+class SnapshotTable:
+    """
+    Latest telemetry of every device, in a named shared-memory block.
+
+    Each row has a single writer (the ingest worker that owns the device), which makes the row's
+    sequence counter odd while it writes, so read() can retry instead of returning a torn row.
+
+    Args:
+        name: Shared-memory block name
+        capacity: Rows to allocate; only used when creating
+        create: Create the block (the ingest service) rather than attach to an existing one
+        track: Leave an attached block registered with the resource tracker; only for processes
+            started by the creating service, which share its tracker
+
+    Attributes:
+        rows: Structured array of ROW_DTYPE over the shared memory, one row per possible device
+
+    Raises:
+        ValueError: If an attached table was written for a different telemetry schema
+    """
+
+    def __init__(self, name=DEFAULT_TABLE_NAME, capacity=DEFAULT_CAPACITY, create=False, track=False):
+        if create:
+            self._shm = shared_memory.SharedMemory(name, create=True,
+                                                   size=TABLE_HEADER.size + capacity * ROW_DTYPE.itemsize)
+            self._shm.buf[:] = bytes(len(self._shm.buf))
+            TABLE_HEADER.pack_into(self._shm.buf, 0, TABLE_MAGIC, SCHEMA_HASH, capacity, 0)
+            _created.add(name)
+        else:
+            self._shm = _attach(name, track)
+            magic, schema_hash, capacity, _ = TABLE_HEADER.unpack_from(self._shm.buf, 0)
+            if magic != TABLE_MAGIC:
+                self._shm.close()
+                raise ValueError(f"Shared memory '{name}' is not a telemetry snapshot table")
+            if schema_hash != SCHEMA_HASH:
+                self._shm.close()
+                raise ValueError(f"Snapshot table schema 0x{schema_hash:08X} does not match "
+                                 f"this host's telemetry.json (0x{SCHEMA_HASH:08X})")
+        self.name = name
+        self.capacity = capacity
+        self.owner = create
+        self.rows = np.ndarray((capacity,), dtype=ROW_DTYPE, buffer=self._shm.buf, offset=TABLE_HEADER.size)
+
+    @property
+    def device_count(self):
+        """Number of rows in use; rows are assigned in the order devices are first heard from."""
+        return TABLE_HEADER.unpack_from(self._shm.buf, 0)[3]
+
+    def add_device(self, host, port):
+        """
+        Assign the next free row to a device. Only the ingest service calls this.
+
+        Returns:
+            Row index
+
+        Raises:
+            ValueError: If every row is taken
+        """
+        index = self.device_count
+        if index >= self.capacity:
+            raise ValueError(f"Snapshot table is full ({self.capacity} devices)")
+        row = self.rows[index]
+        row['host'] = host.encode('ascii')
+        row['port'] = port
+        defaults = TelemetryRecord()
+        for name in FIELD_TYPES:
+            row[name] = getattr(defaults, name)
+        TABLE_HEADER.pack_into(self._shm.buf, 0, TABLE_MAGIC, SCHEMA_HASH, self.capacity, index + 1)
+        return index
+
+    def devices(self):
+        """Returns the 'host:port' of each device, in row order."""
+        count = self.device_count
+        return [f"{host.decode('ascii')}:{port}"
+                for host, port in zip(self.rows['host'][:count], self.rows['port'][:count])]
+
+    def read(self, index, timeout=DEFAULT_READ_TIMEOUT):
+        """
+        Returns a consistent copy of one row as a dict, retrying while its writer is mid-update.
+
+        Args:
+            index: Row index
+            timeout: Seconds to keep retrying before giving up
+
+        Raises:
+            TimeoutError: If the row stayed mid-update for timeout, e.g. because its writer died
+        """
+        sequence = self.rows['sequence']
+        deadline = None
+        while True:
+            before = int(sequence[index])
+            if not before & 1:
+                row = self.rows[index].copy()
+                if int(sequence[index]) == before:
+                    return {name: row[name].item() for name in ROW_DTYPE.names}
+            if deadline is None:
+                deadline = time.monotonic() + timeout
+            elif time.monotonic() >= deadline:
+                raise TimeoutError(f"Snapshot row {index} has been mid-update for {timeout} s")
+            time.sleep(0.0001)
+
+    def close(self):
+        """Detach from the shared memory, and remove it if this table created it."""
+        if self._shm is None:
+            return
+        self.rows = None
+        self._shm.close()
+        if self.owner:
+            self._shm.unlink()
+            _created.discard(self.name)
+        self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _attach(name, track):
+    shm = shared_memory.SharedMemory(name)
+    if track or name in _created:
+        return shm
+    # Before Python 3.13 attaching registers the block with the resource tracker, which would
+    # remove it when this reader exits; only the creating service should unlink it.
+    try:
+        from multiprocessing import resource_tracker
+
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    except (ImportError, AttributeError, KeyError):
+        pass
+    return shm
+
+
+def _write_row(rows, index, timestamp, values, gaps, errors):
+    row = rows[index]
+    row['sequence'] += 1
+    for name, value in (values or {}).items():
+        row[name] = value
+    row['updates'] += 1
+    row['gaps'] = gaps
+    row['errors'] = errors
+    row['time'] = timestamp
+    row['sequence'] += 1
+
+
+def _worker(table_name, inbox):
+    """Decoder process: applies batches of (row, datagram) pairs to its devices' rows."""
+    table = SnapshotTable(table_name, track=True)
+    rows = table.rows
+    decoders = {}
+    records = {}
+    errors = {}
+    try:
+        while True:
+            batch = inbox.get()
+            if batch is _STOP:
+                return
+            timestamp, items = batch
+            for index, data in items:
+                values = None
+                failed = False
+                try:
+                    if is_frame(data):
+                        decoder = decoders.get(index)
+                        if decoder is None:
+                            decoder = decoders[index] = TelemetryStateDecoder()
+                        values = decoder.feed(data)
+                    else:
+                        record = records.get(index)
+                        if record is None:
+                            record = records[index] = TelemetryRecord()
+                        for message in split_datagram(data):
+                            if message.startswith(_TELEM_PREFIX_BYTES):
+                                changed = record.update_from_message(message.decode('ascii'))
+                                values = values or {}
+                                values.update((name, getattr(record, name)) for name in changed)
+                except (ValueError, UnicodeDecodeError):
+                    errors[index] = errors.get(index, 0) + 1
+                    failed = True
+                # Rows start at the telemetry.json defaults, so only changed fields are written, but
+                # every applied message counts as an update and refreshes the row's time.
+                if values is not None or failed:
+                    decoder = decoders.get(index)
+                    _write_row(rows, index, timestamp, values, decoder.gaps if decoder else 0, errors.get(index, 0))
+    finally:
+        rows = None
+        table.close()
+
+
+def _is_broadcast(host):
+    return host == '255.255.255.255' or host.endswith('.255')
+
+
+def parse_target(text, default_port=DEFAULT_DEVICE_PORT):
+    """Returns (host, port) for 'host' or 'host:port'."""
+    host, sep, port = text.rpartition(':')
+    if not sep:
+        return text, default_port
+    if not port.isdigit():
+        raise ValueError(f"Invalid port in '{text}'")
+    return host, int(port)
+
+
+class TelemetryIngest:
+    """
+    Receives every fillhead's telemetry on one socket and publishes it to a SnapshotTable.
+
+    Args:
+        targets: (host, port) pairs to send discover_device to; broadcast addresses are allowed
+        workers: Decoder processes; devices are sharded across them by address
+        local_port: Port to receive on (0 picks a free one)
+        table_name: Name of the shared-memory snapshot table to create
+        capacity: Maximum number of devices
+        batch_size: Datagrams drained from the socket per wake-up
+        discovery_interval: Seconds between discovery rounds for targets not yet heard from
+        broadcast_rounds: Discovery rounds sent to a broadcast target before it is retired; replies
+            come from each device's own address, so a broadcast target is never heard from itself
+        receive_buffer: Socket receive buffer in bytes, sized to absorb bursts from a whole line
+
+    Attributes:
+        table: The SnapshotTable being published
+        received: Datagrams received
+        batches: Batches handed to the workers
+    """
+
+    def __init__(self, targets, workers=2, local_port=0, table_name=DEFAULT_TABLE_NAME,
+                 capacity=DEFAULT_CAPACITY, batch_size=DEFAULT_BATCH_SIZE,
+                 discovery_interval=DEFAULT_DISCOVERY_INTERVAL, broadcast_rounds=DEFAULT_BROADCAST_ROUNDS,
+                 receive_buffer=DEFAULT_RECEIVE_BUFFER):
+        if workers < 1:
+            raise ValueError(f"workers must be at least 1, got {workers}")
+        # Replies come from the device's IP address, so resolve host names to match them.
+        self.targets = [(socket.gethostbyname(host), port) for host, port in targets]
+        self.batch_size = batch_size
+        self.discovery_interval = discovery_interval
+        self.broadcast_rounds = broadcast_rounds
+        self._rounds = dict.fromkeys(self.targets, 0)
+        self.received = 0
+        self.batches = 0
+        self._rows = {}
+        self._heard = set()
+        self._last_discovery = None
+
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, receive_buffer)
+        self.sock.bind(('0.0.0.0', local_port))
+        self.sock.setblocking(False)
+        self.port = self.sock.getsockname()[1]
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self.sock, selectors.EVENT_READ)
+
+        self.table = SnapshotTable(table_name, capacity, create=True)
+        self._inboxes = [multiprocessing.Queue() for _ in range(workers)]
+        self._workers = [multiprocessing.Process(target=_worker, args=(table_name, inbox), daemon=True,
+                                                 name=f'telemetry-ingest-{i}')
+                         for i, inbox in enumerate(self._inboxes)]
+        for process in self._workers:
+            process.start()
+
+    def discover(self):
+        """
+        Send discover_device, with this service's port, to every target not yet heard from and to
+        broadcast targets that have had fewer than broadcast_rounds rounds.
+        """
+        message = encode_command('discover_device', [f"PORT={self.port}"])
+        for target in self.targets:
+            if target in self._heard:
+                continue
+            if _is_broadcast(target[0]):
+                if self._rounds[target] >= self.broadcast_rounds:
+                    continue
+                self._rounds[target] += 1
+            try:
+                self.sock.sendto(message, target)
+            except OSError:
+                pass
+        self._last_discovery = time.monotonic()
+
+    def rediscover(self):
+        """Restart discovery of broadcast targets, e.g. after a fillhead is added to the line."""
+        self._rounds = dict.fromkeys(self.targets, 0)
+        self._last_discovery = None
+
+    def poll(self, timeout=TELEMETRY_INTERVAL):
+        """
+        Wait up to timeout for datagrams, then drain up to batch_size of them without blocking
+        and dispatch them to the workers, one queue put per worker.
+
+        Returns:
+            Number of datagrams received
+        """
+        if self._last_discovery is None or time.monotonic() - self._last_discovery >= self.discovery_interval:
+            self.discover()
+        if not self._selector.select(timeout):
+            return 0
+        timestamp = time.time()
+        shards = [[] for _ in self._inboxes]
+        count = 0
+        recvfrom = self.sock.recvfrom
+        while count < self.batch_size:
+            try:
+                data, address = recvfrom(MAX_DATAGRAM_SIZE)
+            except (BlockingIOError, InterruptedError):
+                break
+            except ConnectionResetError:
+                continue
+            count += 1
+            index = self._rows.get(address)
+            if index is None:
+                if not (data.startswith(_TELEM_PREFIX_BYTES) or data.startswith(_DISCOVERY_PREFIX) or is_frame(data)):
+                    continue
+                index = self._add_device(address)
+                if index is None:
+                    continue
+            if data.startswith(_DISCOVERY_PREFIX):
+                continue
+            shards[self._shard(address)].append((index, data))
+        for inbox, items in zip(self._inboxes, shards):
+            if items:
+                inbox.put((timestamp, items))
+                self.batches += 1
+        self.received += count
+        return count
+
+    def serve_forever(self):
+        """Receive and publish until interrupted."""
+        while True:
+            self.poll()
+
+    def close(self):
+        """Stop the workers, close the socket and remove the snapshot table."""
+        if self.sock is None:
+            return
+        for inbox in self._inboxes:
+            inbox.put(_STOP)
+        for process in self._workers:
+            process.join(timeout=2.0)
+            if process.is_alive():
+                process.terminate()
+        self._selector.close()
+        self.sock.close()
+        self.sock = None
+        self.table.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _shard(self, address):
+        return zlib.crc32(f"{address[0]}:{address[1]}".encode('ascii')) % len(self._inboxes)
+
+    def _add_device(self, address):
+        try:
+            index = self.table.add_device(*address)
+        except ValueError as exc:
+            print(f"Ignoring {address[0]}:{address[1]}: {exc}", file=sys.stderr)
+            self._rows[address] = None
+            return None
+        self._rows[address] = index
+        self._heard.add(address)
+        return index
+
+
+def format_table(table, fields=('main_state', 'temp_c', 'vacuum_psig', 'injection_active_ml')):
+    """Returns a text summary of every device in a snapshot table."""
+    now = time.time()
+    lines = [f"{'device':<21} {'updates':>8} {'gaps':>5} {'age_s':>6} " + ' '.join(f"{name:>20}" for name in fields)]
+    for index, device in enumerate(table.devices()):
+        try:
+            row = table.read(index)
+        except TimeoutError:
+            lines.append(f"{device:<21} (row is stuck mid-update)")
+            continue
+        age = now - row['time'] if row['time'] else float('nan')
+        lines.append(f"{device:<21} {row['updates']:>8} {row['gaps']:>5} {age:>6.2f} "
+                     + ' '.join(f"{row[name]:>20.6g}" for name in fields))
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Receive telemetry from every fillhead into a shared-memory table.")
+    parser.add_argument('targets', nargs='*', default=['255.255.255.255'],
+                        help="device host[:port] to discover (default: broadcast)")
+    parser.add_argument('--count', type=int, default=1,
+                        help="devices per target on consecutive ports, as started by sim_farm --count")
+    parser.add_argument('--workers', type=int, default=2, help="decoder processes")
+    parser.add_argument('--local-port', type=int, default=0, help="UDP port to receive telemetry on")
+    parser.add_argument('--name', default=DEFAULT_TABLE_NAME, help="shared-memory table name")
+    parser.add_argument('--capacity', type=int, default=DEFAULT_CAPACITY, help="maximum number of devices")
+    parser.add_argument('--interval', type=float, default=5.0, help="seconds between printed summaries")
+    parser.add_argument('--attach', metavar='NAME', help="print the table published by a running service instead")
+    args = parser.parse_args()
+
+    try:
+        if args.attach:
+            with SnapshotTable(args.attach) as table:
+                while True:
+                    print(format_table(table), end='\n\n', flush=True)
+                    time.sleep(args.interval)
+
+        try:
+            targets = [(host, port + i) for host, port in map(parse_target, args.targets) for i in range(args.count)]
+        except ValueError as exc:
+            parser.error(str(exc))
+        with TelemetryIngest(targets, args.workers, args.local_port, args.name, args.capacity) as ingest:
+            print(f"Receiving on UDP port {ingest.port}, publishing to shared memory '{args.name}'", file=sys.stderr)
+            next_summary = time.monotonic() + args.interval
+            while True:
+                ingest.poll()
+                if time.monotonic() >= next_summary:
+                    print(format_table(ingest.table), end='\n\n', flush=True)
+                    next_summary += args.interval
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
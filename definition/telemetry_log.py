@@ -0,0 +1,377 @@
+"""
+Fillhead Telemetry Log
+Records decoded telemetry, events and command traffic to an append-only columnar file and replays it.
+
+File layout:
+    Header: magic, header length, then a JSON description of the telemetry columns (one per
+    telemetry.json field, plus the leading "time" column) and the schema hash.
+    Blocks: each starts with (tag, rows, payload bytes).
+        b'TELM' blocks hold `rows` telemetry samples stored column by column, in header order.
+        b'MSGS' blocks hold a UTF-8 JSON list of [time, kind, text] messages.
+
+The recorder only queues samples on the caller's thread; a background writer builds and appends
+the blocks. Readers memory-map the file and walk the block headers, so opening a long log does
+not parse any samples, and each column is read only when requested.
+
+Usage:
+    python -m definition.telemetry_log info run.tlog
+    python -m definition.telemetry_log replay run.tlog --speed 10 --gui 127.0.0.1:6272
+"""
+import argparse
+import json
+import mmap
+import queue
+import socket
+import struct
+import threading
+import time
+
+import numpy as np
+
+from .schema import load_definition
+from .telemetry_codec import SCHEMA_HASH
+from .telemetry_record import FIELD_TYPES, TELEM_PREFIX, TelemetryRecord
+
+LOG_MAGIC = b'FHTLOG\x01\x00'
+LOG_HEADER = struct.Struct('<8sI')      # magic, JSON header length
+BLOCK_HEADER = struct.Struct('<4sII')   # tag, rows, payload bytes
+TAG_TELEMETRY = b'TELM'
+TAG_MESSAGES = b'MSGS'
+DEFAULT_BLOCK_ROWS = 4096
+DEFAULT_FLUSH_INTERVAL = 1.0
+
+MESSAGE_EVENT = 'event'
+MESSAGE_COMMAND = 'command'
+MESSAGE_RESPONSE = 'response'
+
+COLUMN_DTYPES = {
+    int: '<i4',
+    float: '<f4',
+    bool: 'u1',
+}
+
+_CLOSE = object()
+
+
+def telemetry_columns():
+    """Returns the (name, dtype) column layout for the current telemetry.json."""
+    return [('time', '<f8')] + [(name, COLUMN_DTYPES[kind]) for name, kind in FIELD_TYPES.items()]
+
+
+class TelemetryRecorder:
+    """
+    Appends telemetry, events and command/response traffic to a log file.
+
+    Args:
+        path: File to create (an existing file is truncated)
+        block_rows: Telemetry samples per block
+        flush_interval: Seconds after which a partial block is written anyway
+
+    The record_* methods only enqueue and return immediately; they are safe to call from the
+    receive thread. Call close() (or use the recorder as a context manager) to flush.
+    """
+
+    def __init__(self, path, block_rows=DEFAULT_BLOCK_ROWS, flush_interval=DEFAULT_FLUSH_INTERVAL):
+        self.path = path
+        self.block_rows = block_rows
+        self.flush_interval = flush_interval
+        self.columns = telemetry_columns()
+        self._events = load_definition('events.json')
+        self._queue = queue.SimpleQueue()
+        self._file = open(path, 'wb')
+        header = json.dumps({'schema_hash': SCHEMA_HASH, 'columns': self.columns}).encode('utf-8')
+        self._file.write(LOG_HEADER.pack(LOG_MAGIC, len(header)) + header)
+        self._writer = threading.Thread(target=self._run, name='telemetry-log-writer', daemon=True)
+        self._writer.start()
+
+    def record_telemetry(self, values, timestamp=None):
+        """
+        Queue a telemetry update. Fields missing from values keep their previous value, so the
+        changed-field dicts from TelemetryStateDecoder can be passed directly.
+        """
+        self._queue.put((TAG_TELEMETRY, time.time() if timestamp is None else timestamp, dict(values)))
+
+    def record_event(self, name, params=(), timestamp=None):
+        """
+        Queue an events.json event.
+
+        Raises:
+            KeyError: If name is not defined in events.json
+        """
+        if name not in self._events:
+            raise KeyError(f"Unknown event '{name}'")
+        self._record_message(MESSAGE_EVENT, ' '.join([name, *map(str, params)]), timestamp)
+
+    def record_command(self, text, timestamp=None):
+        """Queue a command sent to the device."""
+        self._record_message(MESSAGE_COMMAND, text, timestamp)
+
+    def record_response(self, text, timestamp=None):
+        """Queue a text message received from the device (DONE:, ERROR:, ...)."""
+        self._record_message(MESSAGE_RESPONSE, text, timestamp)
+
+    def close(self):
+        """Flush everything queued and close the file."""
+        if self._file is None:
+            return
+        self._queue.put(_CLOSE)
+        self._writer.join()
+        self._file.close()
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _record_message(self, kind, text, timestamp):
+        self._queue.put((TAG_MESSAGES, time.time() if timestamp is None else timestamp, (kind, text)))
+
+    def _run(self):
+        index = {name: i for i, (name, _) in enumerate(self.columns)}
+        current = [0.0] + list(TelemetryRecord().as_dict().values())
+        rows = []
+        messages = []
+        last_flush = time.monotonic()
+        while True:
+            timeout = max(0.0, self.flush_interval - (time.monotonic() - last_flush))
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            if item is _CLOSE:
+                break
+            if item is not None:
+                tag, timestamp, payload = item
+                if tag == TAG_TELEMETRY:
+                    current[0] = timestamp
+                    for name, value in payload.items():
+                        if name in index:
+                            current[index[name]] = value
+                    rows.append(tuple(current))
+                else:
+                    messages.append([timestamp, *payload])
+            if len(rows) >= self.block_rows or time.monotonic() - last_flush >= self.flush_interval:
+                self._write_blocks(rows, messages)
+                rows, messages = [], []
+                last_flush = time.monotonic()
+        self._write_blocks(rows, messages)
+
+    def _write_blocks(self, rows, messages):
+        if rows:
+            table = list(zip(*rows))
+            payload = b''.join(np.asarray(column, dtype=dtype).tobytes()
+                               for column, (_, dtype) in zip(table, self.columns))
+            self._file.write(BLOCK_HEADER.pack(TAG_TELEMETRY, len(rows), len(payload)) + payload)
+        if messages:
+            payload = json.dumps(messages).encode('utf-8')
+            self._file.write(BLOCK_HEADER.pack(TAG_MESSAGES, len(messages), len(payload)) + payload)
+        if rows or messages:
+            self._file.flush()
+
+
+class TelemetryLog:
+    """
+    Read-only, memory-mapped view of a telemetry log.
+
+    Args:
+        path: Log file written by TelemetryRecorder
+
+    Attributes:
+        columns: List of (name, dtype) telemetry columns, as recorded
+        schema_hash: telemetry.json schema hash of the recording firmware/host
+        rows: Number of telemetry samples
+
+    Raises:
+        ValueError: If the file is not a telemetry log
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < LOG_HEADER.size:
+            raise ValueError(f"{path} is not a telemetry log")
+        magic, header_length = LOG_HEADER.unpack_from(self._map)
+        if magic != LOG_MAGIC:
+            raise ValueError(f"{path} is not a telemetry log")
+        header = json.loads(self._map[LOG_HEADER.size:LOG_HEADER.size + header_length])
+        self.schema_hash = header['schema_hash']
+        self.columns = [tuple(column) for column in header['columns']]
+        self._dtypes = [np.dtype(dtype) for _, dtype in self.columns]
+        self._telemetry_blocks = []
+        self._message_blocks = []
+        self._cache = {}
+
+        # Walk the block headers; a block cut short by a crash ends the log.
+        offset = LOG_HEADER.size + header_length
+        while offset + BLOCK_HEADER.size <= len(self._map):
+            tag, rows, length = BLOCK_HEADER.unpack_from(self._map, offset)
+            offset += BLOCK_HEADER.size
+            if offset + length > len(self._map):
+                break
+            if tag == TAG_TELEMETRY:
+                self._telemetry_blocks.append((offset, rows))
+            elif tag == TAG_MESSAGES:
+                self._message_blocks.append((offset, length))
+            offset += length
+        self.rows = sum(rows for _, rows in self._telemetry_blocks)
+
+    @property
+    def names(self):
+        """Returns the names of the telemetry columns, starting with "time"."""
+        return [name for name, _ in self.columns]
+
+    def column(self, name):
+        """
+        Returns one telemetry column as a NumPy array of length rows.
+
+        Raises:
+            KeyError: If the log has no such column
+        """
+        if name in self._cache:
+            return self._cache[name]
+        names = self.names
+        if name not in names:
+            raise KeyError(f"No column '{name}' in {self.path}")
+        position = names.index(name)
+        dtype = self._dtypes[position]
+        parts = []
+        for offset, rows in self._telemetry_blocks:
+            start = offset + rows * sum(d.itemsize for d in self._dtypes[:position])
+            parts.append(np.frombuffer(self._map, dtype=dtype, count=rows, offset=start))
+        array = np.concatenate(parts) if parts else np.empty(0, dtype=dtype)
+        self._cache[name] = array
+        return array
+
+    def messages(self):
+        """Returns every recorded message as a list of (time, kind, text), in recording order."""
+        result = []
+        for offset, length in self._message_blocks:
+            result.extend(tuple(message) for message in json.loads(self._map[offset:offset + length]))
+        return result
+
+    def snapshot(self, timestamp):
+        """Returns a dict of the telemetry values in effect at timestamp (the last sample at or before it)."""
+        times = self.column('time')
+        index = max(0, int(np.searchsorted(times, timestamp, side='right')) - 1)
+        return {name: self.column(name)[index].item() for name in self.names[1:]}
+
+    def close(self):
+        self._cache.clear()
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class TelemetryReplay:
+    """
+    Plays a telemetry log back in time order at a multiple of real time.
+
+    Args:
+        log: TelemetryLog to play
+        speed: Playback rate relative to the recording (e.g. 1.0 to 100.0)
+    """
+
+    def __init__(self, log, speed=1.0):
+        if speed <= 0:
+            raise ValueError(f"Speed must be positive, got {speed}")
+        self.log = log
+        self.speed = speed
+
+    def items(self):
+        """
+        Yields every recorded item in time order, without pacing.
+
+        Yields:
+            (time, 'telemetry', dict of field values) or (time, kind, text) for messages
+        """
+        names = self.log.names[1:]
+        times = self.log.column('time').tolist()
+        columns = [self.log.column(name).tolist() for name in names]
+        messages = sorted(self.log.messages(), key=lambda message: message[0])
+        m = 0
+        for i, timestamp in enumerate(times):
+            while m < len(messages) and messages[m][0] <= timestamp:
+                yield messages[m]
+                m += 1
+            yield timestamp, 'telemetry', {name: column[i] for name, column in zip(names, columns)}
+        yield from messages[m:]
+
+    def run(self, on_telemetry, on_message=None, stop_event=None):
+        """
+        Replay the log, calling on_telemetry(time, values) and on_message(time, kind, text)
+        when each item is due. Blocks until the end of the log or until stop_event is set.
+        """
+        start_wall = None
+        for timestamp, kind, payload in self.items():
+            if start_wall is None:
+                start_wall, start_time = time.monotonic(), timestamp
+            delay = start_wall + (timestamp - start_time) / self.speed - time.monotonic()
+            if delay > 0:
+                if stop_event is not None:
+                    if stop_event.wait(delay):
+                        return
+                else:
+                    time.sleep(delay)
+            elif stop_event is not None and stop_event.is_set():
+                return
+            if kind == 'telemetry':
+                on_telemetry(timestamp, payload)
+            elif on_message is not None:
+                on_message(timestamp, kind, payload)
+
+
+def _address(text):
+    host, _, port = text.rpartition(':')
+    return host, int(port)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or replay a fillhead telemetry log.")
+    subparsers = parser.add_subparsers(dest='action', required=True)
+    info = subparsers.add_parser('info', help="summarize a log")
+    info.add_argument('path')
+    replay = subparsers.add_parser('replay', help="replay a log over UDP")
+    replay.add_argument('path')
+    replay.add_argument('--speed', type=float, default=1.0, help="playback rate, e.g. 1 to 100")
+    replay.add_argument('--gui', type=_address, help="host:port to send telemetry and device messages to")
+    replay.add_argument('--device', type=_address, help="host:port to send recorded commands to")
+    args = parser.parse_args()
+
+    with TelemetryLog(args.path) as log:
+        if args.action == 'info':
+            times = log.column('time')
+            duration = times[-1] - times[0] if len(times) else 0.0
+            print(f"{args.path}: {log.rows} samples over {duration:.1f} s, {len(log.messages())} messages, "
+                  f"schema 0x{log.schema_hash:08X}" + ("" if log.schema_hash == SCHEMA_HASH else " (differs from current)"))
+            return
+
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+        def on_telemetry(timestamp, values):
+            if args.gui:
+                fields = ','.join(f"{name}:{int(value) if isinstance(value, bool) else value}"
+                                  for name, value in values.items())
+                sock.sendto((TELEM_PREFIX + fields).encode(), args.gui)
+
+        def on_message(timestamp, kind, text):
+            if kind == MESSAGE_COMMAND:
+                if args.device:
+                    sock.sendto(text.encode(), args.device)
+            elif args.gui:
+                sock.sendto(text.encode(), args.gui)
+
+        try:
+            TelemetryReplay(log, args.speed).run(on_telemetry, on_message)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
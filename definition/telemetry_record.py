@@ -0,0 +1,238 @@
+"""
+Fillhead Telemetry Record
+Typed telemetry snapshot with one slot per telemetry field.
+
+AUTO-GENERATED FILE - DO NOT EDIT MANUALLY
+Generated from telemetry.json (source CRC-32 585D33F5)
+To modify telemetry fields, edit telemetry.json and regenerate this file.
+"""
+
+TELEM_PREFIX = "FILLHEAD_TELEM: "
+
+FIELD_TYPES = {
+    'main_state': int,
+    'injector_state': int,
+    'inj_valve_state': int,
+    'vac_valve_state': int,
+    'heater_state': int,
+    'vacuum_state': int,
+    'injector_torque': float,
+    'injector_homed': int,
+    'injection_cumulative_ml': float,
+    'injection_active_ml': float,
+    'injection_target_ml': float,
+    'motors_enabled': bool,
+    'inj_valve_pos': float,
+    'inj_valve_torque': float,
+    'inj_valve_homed': bool,
+    'vac_valve_pos': float,
+    'vac_valve_motor_torque': float,
+    'vac_valve_homed': bool,
+    'temp_c': float,
+    'heater_setpoint': float,
+    'vacuum_psig': float,
+}
+
+FIELD_UNITS = {
+    'injector_torque': '%',
+    'injection_cumulative_ml': 'ml',
+    'injection_active_ml': 'ml',
+    'injection_target_ml': 'ml',
+    'inj_valve_pos': 'mm',
+    'inj_valve_torque': '%',
+    'vac_valve_pos': 'mm',
+    'vac_valve_motor_torque': '%',
+    'temp_c': 'C',
+    'heater_setpoint': 'C',
+    'vacuum_psig': 'PSIG',
+}
+
+FIELD_PRECISION = {
+    'injector_torque': 1,
+    'injection_cumulative_ml': 2,
+    'injection_active_ml': 2,
+    'injection_target_ml': 2,
+    'inj_valve_pos': 2,
+    'inj_valve_torque': 1,
+    'vac_valve_pos': 2,
+    'vac_valve_motor_torque': 1,
+    'temp_c': 1,
+    'heater_setpoint': 1,
+    'vacuum_psig': 2,
+}
+
+FIELD_MAPS = {
+    'main_state': {0: 'standby', 1: 'busy', 2: 'error', 3: 'disabled', 4: 'clearing errors'},
+    'injector_state': {0: 'standby', 1: 'homing', 2: 'jogging', 3: 'feeding', 4: 'motor fault'},
+    'inj_valve_state': {0: 'not homed', 1: 'closed', 2: 'open', 3: 'halted', 4: 'moving', 5: 'homing', 6: 'jogging', 7: 'resetting', 8: 'error'},
+    'vac_valve_state': {0: 'not homed', 1: 'closed', 2: 'open', 3: 'halted', 4: 'moving', 5: 'homing', 6: 'jogging', 7: 'resetting', 8: 'error'},
+    'heater_state': {0: 'off', 1: 'active'},
+    'vacuum_state': {0: 'off', 1: 'pulldown', 2: 'settling', 3: 'leak testing', 4: 'on', 5: 'error'},
+    'injector_homed': {0: 'not homed', 1: 'homed'},
+    'motors_enabled': {0: 'disabled', 1: 'enabled'},
+    'inj_valve_homed': {0: 'not homed', 1: 'homed'},
+    'vac_valve_homed': {0: 'not homed', 1: 'homed'},
+}
+
+
+def _to_bool(value):
+    if isinstance(value, str):
+        value = float(value)
+    return bool(value)
+
+
+def _to_int(value):
+    # Firmware may print int fields with a float format, e.g. "1.00".
+    if isinstance(value, str):
+        value = float(value)
+    return int(value)
+
+
+_COERCE = {name: _to_bool if kind is bool else _to_int if kind is int else kind
+           for name, kind in FIELD_TYPES.items()}
+
+
+class TelemetryRecord:
+    """
+    Latest value of every telemetry field, stored as int, float or bool.
+
+    Enum fields keep their raw integer; label() decodes it through the telemetry.json map and
+    format() renders any field for display, so values are parsed once and formatted only when shown.
+
+    Args:
+        **values: Initial field values; unspecified fields use their telemetry.json default
+    """
+    __slots__ = (
+        'main_state',
+        'injector_state',
+        'inj_valve_state',
+        'vac_valve_state',
+        'heater_state',
+        'vacuum_state',
+        'injector_torque',
+        'injector_homed',
+        'injection_cumulative_ml',
+        'injection_active_ml',
+        'injection_target_ml',
+        'motors_enabled',
+        'inj_valve_pos',
+        'inj_valve_torque',
+        'inj_valve_homed',
+        'vac_valve_pos',
+        'vac_valve_motor_torque',
+        'vac_valve_homed',
+        'temp_c',
+        'heater_setpoint',
+        'vacuum_psig',
+    )
+
+    def __init__(self, **values):
+        self.main_state = 0
+        self.injector_state = 0
+        self.inj_valve_state = 0
+        self.vac_valve_state = 0
+        self.heater_state = 0
+        self.vacuum_state = 0
+        self.injector_torque = 0.0
+        self.injector_homed = 0
+        self.injection_cumulative_ml = 0.0
+        self.injection_active_ml = 0.0
+        self.injection_target_ml = 0.0
+        self.motors_enabled = True
+        self.inj_valve_pos = 0.0
+        self.inj_valve_torque = 0.0
+        self.inj_valve_homed = False
+        self.vac_valve_pos = 0.0
+        self.vac_valve_motor_torque = 0.0
+        self.vac_valve_homed = False
+        self.temp_c = 25.0
+        self.heater_setpoint = 70.0
+        self.vacuum_psig = 0.5
+        if values:
+            self.update(values)
+
+    @classmethod
+    def from_message(cls, message):
+        """Build a record from a text telemetry message ("FILLHEAD_TELEM: key:value,...")."""
+        record = cls()
+        record.update_from_message(message)
+        return record
+
+    def update(self, values):
+        """
+        Set fields from a mapping, converting each value to the field's type.
+
+        Args:
+            values: Mapping of field name to value (e.g. the dict from a decoded binary frame)
+
+        Returns:
+            List of the names of fields whose value changed
+
+        Raises:
+            KeyError: If a name is not a telemetry field
+            ValueError: If a value cannot be converted to the field's type
+        """
+        changed = []
+        for name, value in values.items():
+            coerce = _COERCE.get(name)
+            if coerce is None:
+                raise KeyError(f"Unknown telemetry field '{name}'")
+            value = coerce(value)
+            if getattr(self, name) != value:
+                setattr(self, name, value)
+                changed.append(name)
+        return changed
+
+    def update_from_message(self, message):
+        """
+        Set fields from a text telemetry message. Keys that are not telemetry fields are ignored.
+
+        Keys may be padded with spaces, as the firmware's TELEM_KEY_* macros are. Empty items, such
+        as one left by a trailing comma, are skipped.
+
+        Returns:
+            List of the names of fields whose value changed
+
+        Raises:
+            ValueError: If the message is malformed or a value cannot be converted
+        """
+        if message.startswith(TELEM_PREFIX):
+            message = message[len(TELEM_PREFIX):]
+        values = {}
+        for item in message.strip().split(','):
+            if not item.strip():
+                continue
+            name, sep, value = item.partition(':')
+            if not sep:
+                raise ValueError(f"Malformed telemetry item '{item}'")
+            name = name.strip()
+            if name in _COERCE:
+                values[name] = value
+        return self.update(values)
+
+    def label(self, name):
+        """Returns the map label of an enum field's current value, or the value as text if unmapped."""
+        value = getattr(self, name)
+        return FIELD_MAPS[name].get(int(value), str(value))
+
+    def format(self, name):
+        """Returns the display text of a field: its label for enum fields, else value and unit."""
+        if name in FIELD_MAPS:
+            return self.label(name).title()
+        value = getattr(self, name)
+        text = f"{value:.{FIELD_PRECISION[name]}f}" if name in FIELD_PRECISION else str(value)
+        unit = FIELD_UNITS.get(name)
+        return f"{text} {unit}" if unit else text
+
+    def as_dict(self):
+        """Returns the record as a dict of field name to value."""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __eq__(self, other):
+        if not isinstance(other, TelemetryRecord):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self):
+        fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"TelemetryRecord({fields})"
@@ -23,6 +23,7 @@
  #define CMD_STR_DISCOVER_DEVICE                     "discover_device               " ///< Generic command for any device to respond to.
  #define CMD_STR_ABORT                               "abort                         " ///< Command to halt all ongoing operations.
  #define CMD_STR_CLEAR_ERRORS                        "clear_errors                  " ///< Command to clear any existing fault states.
+ #define CMD_STR_REQUEST_KEYFRAME                    "request_keyframe"               ///< Command to send a full telemetry keyframe next.
  /** @} */
  
  /**
@@ -90,6 +91,7 @@
 	 CMD_DISCOVER_DEVICE                     ///< @see CMD_STR_DISCOVER_DEVICE,
 	 CMD_ABORT                               ///< @see CMD_STR_ABORT,
 	 CMD_CLEAR_ERRORS                        ///< @see CMD_STR_CLEAR_ERRORS,
+	 CMD_REQUEST_KEYFRAME,                   ///< @see CMD_STR_REQUEST_KEYFRAME
  
 	 // Motion Commands
 	 CMD_INJECT_STATOR                       ///< @see CMD_STR_INJECT_STATOR,
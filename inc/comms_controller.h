@@ -25,12 +25,28 @@
  * @struct Message
  * @brief Represents a single data packet for communication.
  * @details This structure encapsulates a message payload along with its sender's
- * network information. It is used in the transmit (TX) and receive (RX) queues.
+ * network information. It is used in the receive (RX) queue.
  */
 struct Message {
 	char buffer[MAX_MESSAGE_LENGTH]; ///< The raw message payload as a C-style string.
 	IpAddress remoteIp;              ///< The IP address of the remote host (sender or recipient).
 	uint16_t remotePort;             ///< The port number of the remote host.
+	uint32_t receivedUs;             ///< Microseconds() time the message was queued, for dwell diagnostics.
+};
+
+/**
+ * @struct TxEntry
+ * @brief Describes one outgoing message stored in the TX data buffer.
+ * @details Outgoing messages are packed back to back into a shared byte buffer, so an
+ * entry only records where its payload lives and where it is going rather than holding
+ * a full `MAX_MESSAGE_LENGTH` copy.
+ */
+struct TxEntry {
+	uint16_t offset;                 ///< Offset of the payload in the TX data buffer.
+	uint16_t length;                 ///< Payload length in bytes (no terminator is stored).
+	IpAddress remoteIp;              ///< The IP address of the recipient.
+	uint16_t remotePort;             ///< The port number of the recipient.
+	bool binary;                     ///< True for binary frames, which are never coalesced.
 };
 
 /**
@@ -95,8 +111,10 @@ class CommsController {
     /**
      * @brief Enqueues a message into the TX queue to be sent.
      * @details This function is used by the application to send messages to a remote
-     * host. It copies the message and destination info into the TX queue. The
-     * `update()` method will handle the actual transmission.
+     * host. It copies only the message text (up to `MAX_MESSAGE_LENGTH - 1` bytes) into
+     * the TX data buffer and records the destination in the TX queue. The `update()`
+     * method will handle the actual transmission, coalescing it with neighbouring text
+     * messages for the same destination.
      * @param msg The raw message string to send.
      * @param ip The IP address of the destination.
      * @param port The port of the destination.
@@ -105,6 +123,19 @@ class CommsController {
      * @note If the queue is full, an error message is immediately sent back to the GUI.
      */
 	bool enqueueTx(const char* msg, const IpAddress& ip, uint16_t port);
+
+    /**
+     * @brief Enqueues a binary payload into the TX queue to be sent.
+     * @details Used for binary telemetry frames. The payload is always sent as a
+     * datagram of its own so the receiver can recognise it by its leading bytes.
+     * @param data The payload bytes.
+     * @param length The payload length in bytes, at most `MAX_PACKET_LENGTH`.
+     * @param ip The IP address of the destination.
+     * @param port The port of the destination.
+     * @return true if the payload was successfully enqueued.
+     * @return false if the TX queue is full or the payload is too long.
+     */
+	bool enqueueTx(const uint8_t* data, uint16_t length, const IpAddress& ip, uint16_t port);
 	
 	/**
      * @brief A helper function to enqueue a formatted status or event message.
@@ -146,6 +177,39 @@ class CommsController {
      */
 	uint16_t getGuiPort() const { return m_guiPort; }
 
+    /**
+     * @brief Gets the highest RX queue depth since the last `resetQueueStats()`.
+     * @return The number of queued commands at the peak.
+     */
+	uint16_t getRxHighWater() const { return m_rxHighWater; }
+
+    /**
+     * @brief Gets the highest TX queue depth since the last `resetQueueStats()`.
+     * @return The number of queued messages at the peak.
+     */
+	uint16_t getTxHighWater() const { return m_txHighWater; }
+
+    /**
+     * @brief Gets the most TX data buffer bytes in use since the last `resetQueueStats()`.
+     * @return The number of bytes at the peak.
+     */
+	uint16_t getTxBytesHighWater() const { return m_txBytesHighWater; }
+
+    /**
+     * @brief Gets the number of commands dropped on RX queue overflow since the last `resetQueueStats()`.
+     */
+	uint32_t getRxDropped() const { return m_rxDropped; }
+
+    /**
+     * @brief Gets the number of messages dropped on TX queue overflow since the last `resetQueueStats()`.
+     */
+	uint32_t getTxDropped() const { return m_txDropped; }
+
+    /**
+     * @brief Clears the queue high-water marks and drop counts.
+     */
+	void resetQueueStats();
+
 	// Setters
 	/**
      * @brief Sets the discovery state of the GUI.
@@ -175,11 +239,33 @@ class CommsController {
 
     /**
      * @brief Processes the outgoing message queue.
-     * @details Dequeues one message from the TX queue (if available) and sends it
-     * over UDP to its destination.
+     * @details Sends queued messages until the queue is empty or `TX_DRAIN_BUDGET_US`
+     * has elapsed. Consecutive text messages for the same destination are joined with
+     * `TX_MESSAGE_SEPARATOR` into a single datagram of up to `MAX_PACKET_LENGTH` bytes.
+     * Payloads are written straight from the TX data buffer without an intermediate copy.
      */
 	void processTxQueue();
 
+    /**
+     * @brief Copies a payload into the TX data buffer and queues its descriptor.
+     * @details Payloads are stored contiguously; if one does not fit before the end of
+     * the buffer it is placed at the start instead.
+     * @return true if the payload was queued.
+     * @return false if the TX queue or the TX data buffer is full.
+     */
+	bool pushTx(const uint8_t* data, uint16_t length, const IpAddress& ip, uint16_t port, bool binary);
+
+    /**
+     * @brief Releases the oldest TX queue entry and its space in the TX data buffer.
+     */
+	void popTx();
+
+    /**
+     * @brief Counts a dropped TX message and sends an overflow error directly to the GUI,
+     * bypassing the full TX queue.
+     */
+	void reportTxOverflow();
+
     /**
      * @brief Configures and initializes the Ethernet hardware.
      * @details This function handles the low-level setup of the Ethernet manager,
@@ -206,7 +292,18 @@ class CommsController {
 	volatile int m_rxQueueHead;         ///< Index of the next free slot in the RX queue.
 	volatile int m_rxQueueTail;         ///< Index of the next message to be read from the RX queue.
 
-	Message m_txQueue[TX_QUEUE_SIZE];   ///< The circular buffer for outgoing messages.
+	TxEntry m_txQueue[TX_QUEUE_SIZE];   ///< The circular buffer of outgoing message descriptors.
 	volatile int m_txQueueHead;         ///< Index of the next free slot in the TX queue.
 	volatile int m_txQueueTail;         ///< Index of the next message to be sent from the TX queue.
+
+	uint8_t m_txData[TX_BUFFER_SIZE];   ///< Packed payloads of the messages in the TX queue.
+	uint16_t m_txDataHead;              ///< Offset just past the newest payload in the TX data buffer.
+	uint16_t m_txDataTail;              ///< Offset of the oldest payload in the TX data buffer.
+
+	// Queue Statistics (reported by LoopDiagnostics)
+	uint16_t m_rxHighWater;             ///< Highest RX queue depth since the last reset.
+	uint16_t m_txHighWater;             ///< Highest TX queue depth since the last reset.
+	uint16_t m_txBytesHighWater;        ///< Most TX data buffer bytes in use since the last reset.
+	uint32_t m_rxDropped;               ///< Commands dropped on RX queue overflow since the last reset.
+	uint32_t m_txDropped;               ///< Messages dropped on TX queue overflow since the last reset.
 };
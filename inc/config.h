@@ -22,11 +22,45 @@
 #define LOCAL_PORT                      8888      ///< The UDP port this device listens on for incoming commands.
 #define MAX_PACKET_LENGTH               1024      ///< Maximum size in bytes for a single UDP packet. Must be large enough for the longest telemetry string.
 #define RX_QUEUE_SIZE                   32        ///< Number of incoming messages that can be buffered before processing.
-#define TX_QUEUE_SIZE                   32        ///< Number of outgoing messages that can be buffered before sending.
+#define TX_QUEUE_SIZE                   64        ///< Number of outgoing messages that can be buffered before sending.
+#define TX_BUFFER_SIZE                  8192      ///< Bytes of storage shared by all queued outgoing messages. Each message uses only its own length.
+#define TX_DRAIN_BUDGET_US              500       ///< Time budget (in microseconds) for sending queued datagrams in each update.
+#define TX_MESSAGE_SEPARATOR            '\n'      ///< Separator between text messages coalesced into one datagram.
 #define MAX_MESSAGE_LENGTH              MAX_PACKET_LENGTH ///< Maximum size of a single message in the Rx/Tx queues.
 #define TELEMETRY_INTERVAL_MS			100       ///< How often (in milliseconds) telemetry data is published to the GUI.
 /** @} */
 
+//==================================================================================================
+// Telemetry Format
+//==================================================================================================
+/**
+ * @name Telemetry Format Selection
+ * @brief Selects how `publishTelemetry()` encodes telemetry (see definition/telemetry.json).
+ * @details Binary formats are built by the generated definition/telemetry.cpp and need a host
+ * that decodes them with definition/telemetry_codec.py.
+ * @{
+ */
+#define TELEMETRY_FORMAT_TEXT           0         ///< `FILLHEAD_TELEM:` text message assembled from each controller's telemetry string.
+#define TELEMETRY_FORMAT_FRAME          1         ///< Packed binary frame carrying every telemetry field.
+#define TELEMETRY_FORMAT_DELTA          2         ///< Binary frames carrying only the fields that changed, with periodic keyframes.
+#define TELEMETRY_FORMAT                TELEMETRY_FORMAT_TEXT ///< Format published every `TELEMETRY_INTERVAL_MS`.
+#define TELEMETRY_KEYFRAME_INTERVAL     50        ///< Delta frames between full keyframes in `TELEMETRY_FORMAT_DELTA`. The host can ask for one sooner with `REQUEST_KEYFRAME`.
+#define TELEMETRY_BATCH_ENABLED         0         ///< Set to 1 to keep every sensor sample of the "batch" fields in telemetry.json and send them in batch frames alongside the selected format.
+/** @} */
+
+//==================================================================================================
+// Diagnostics
+//==================================================================================================
+/**
+ * @name Loop and Queue Diagnostics
+ * @brief Opt-in instrumentation reported as `FILLHEAD_DIAG:` messages (see definition/diagnostics.json).
+ * @{
+ */
+#define DIAGNOSTICS_ENABLED             0         ///< Set to 1 to time the main loop and report diagnostics. When 0 the instrumentation compiles away.
+#define DIAGNOSTICS_INTERVAL_MS         1000      ///< How often (in milliseconds) a diagnostics message is published to the GUI.
+#define DIAG_HISTOGRAM_BUCKETS          16        ///< Number of log2 microsecond buckets in each diagnostics histogram.
+/** @} */
+
 //==================================================================================================
 // System Behavior
 //==================================================================================================
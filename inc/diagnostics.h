@@ -0,0 +1,147 @@
+/**
+ * @file diagnostics.h
+ * @author agent
+ * @date October 16, 2026
+ * @brief Defines the opt-in main loop and queue instrumentation for the Fillhead.
+ *
+ * @details This file defines the `LoopDiagnostics` class, which measures the main loop
+ * period, the cost of each part of the loop and how long commands wait in the RX queue.
+ * Once per `DIAGNOSTICS_INTERVAL_MS` the accumulated window is formatted as a
+ * `FILLHEAD_DIAG:` message whose fields are defined in `definition/diagnostics.json`.
+ * When `DIAGNOSTICS_ENABLED` is 0 every timing method is an inline no-op and compiles away.
+ */
+#pragma once
+
+#include "config.h"
+#include <stddef.h>
+
+class CommsController; // Forward declaration
+
+#define DIAG_PREFIX                     "FILLHEAD_DIAG: " ///< Prefix for diagnostics messages.
+
+/**
+ * @enum DiagSection
+ * @brief Identifies the timed parts of the main loop.
+ * @details The order must match the `sections` list in `definition/diagnostics.json`.
+ */
+enum DiagSection : uint8_t {
+	DIAG_SECTION_COMMS,      ///< CommsController::update (UDP receive and TX queue drain).
+	DIAG_SECTION_DISPATCH,   ///< Command parsing and dispatch.
+	DIAG_SECTION_INJECTOR,   ///< Injector::updateState.
+	DIAG_SECTION_INJ_VALVE,  ///< Injection PinchValve::updateState.
+	DIAG_SECTION_VAC_VALVE,  ///< Vacuum PinchValve::updateState.
+	DIAG_SECTION_HEATER,     ///< HeaterController::updateState.
+	DIAG_SECTION_VACUUM,     ///< VacuumController::updateState.
+	DIAG_SECTION_SENSORS,    ///< Temperature and vacuum sensor sampling.
+	DIAG_SECTION_TELEMETRY,  ///< Telemetry formatting and enqueueing.
+	DIAG_SECTION_COUNT       ///< Number of sections; not a section itself.
+};
+
+/**
+ * @class LoopDiagnostics
+ * @brief Accumulates main loop timing statistics over a reporting window.
+ *
+ * @details Loop periods and RX queue dwell times are counted in log2 microsecond
+ * histograms (bucket 0 holds 0-1 us, bucket i holds [2^i, 2^(i+1)) us and the last
+ * bucket is open-ended), so percentiles can be estimated on the host without the
+ * firmware storing individual samples. Section costs are kept as a total and a maximum.
+ */
+class LoopDiagnostics {
+	public:
+	/**
+	 * @brief Constructs a new LoopDiagnostics object with an empty window.
+	 */
+	LoopDiagnostics();
+
+	/**
+	 * @brief Returns a timestamp to pass to `endSection()`.
+	 * @return The current time in microseconds, or 0 if diagnostics are disabled.
+	 */
+	uint32_t mark() const {
+		return DIAGNOSTICS_ENABLED ? Microseconds() : 0;
+	}
+
+	/**
+	 * @brief Marks the start of a main loop iteration.
+	 * @details Records the period since the previous iteration started in the loop histogram.
+	 */
+	void beginLoop() {
+		if (!DIAGNOSTICS_ENABLED) return;
+		uint32_t now = Microseconds();
+		if (m_loopStarted) {
+			uint32_t period = now - m_lastLoopStartUs;
+			m_loopHistogram[bucketFor(period)]++;
+			if (period < m_loopMinUs) m_loopMinUs = period;
+			if (period > m_loopMaxUs) m_loopMaxUs = period;
+			m_loops++;
+		}
+		m_loopStarted = true;
+		m_lastLoopStartUs = now;
+	}
+
+	/**
+	 * @brief Charges the time since `startUs` to a section of the loop.
+	 * @param section The section that just finished.
+	 * @param startUs The value returned by `mark()` (or a previous `endSection()`) when it started.
+	 * @return The current time, so consecutive sections can be chained without another `mark()`.
+	 */
+	uint32_t endSection(DiagSection section, uint32_t startUs) {
+		if (!DIAGNOSTICS_ENABLED) return 0;
+		uint32_t now = Microseconds();
+		uint32_t cost = now - startUs;
+		m_sectionTotalUs[section] += cost;
+		if (cost > m_sectionMaxUs[section]) m_sectionMaxUs[section] = cost;
+		return now;
+	}
+
+	/**
+	 * @brief Records how long a command waited in the RX queue before being dispatched.
+	 * @param receivedUs The `Message::receivedUs` timestamp of the dequeued command.
+	 */
+	void recordDwell(uint32_t receivedUs) {
+		if (!DIAGNOSTICS_ENABLED) return;
+		uint32_t dwell = Microseconds() - receivedUs;
+		m_dwellHistogram[bucketFor(dwell)]++;
+		if (dwell > m_dwellMaxUs) m_dwellMaxUs = dwell;
+		m_commands++;
+	}
+
+	/**
+	 * @brief Formats the current window as a diagnostics message and starts a new window.
+	 * @details Queue high-water marks and drop counts are read from the CommsController,
+	 * whose queue statistics are reset along with the window.
+	 * @param buffer Destination for the null-terminated message.
+	 * @param size Size of `buffer` in bytes.
+	 * @param nowMs The current `Milliseconds()` time, used for the window length.
+	 * @param comms The CommsController whose queue statistics are reported.
+	 */
+	void format(char* buffer, size_t size, uint32_t nowMs, CommsController& comms);
+
+	private:
+	/**
+	 * @brief Returns the log2 histogram bucket for a duration in microseconds.
+	 */
+	static uint8_t bucketFor(uint32_t us) {
+		if (us < 2) return 0;
+		uint8_t bucket = 31 - __builtin_clz(us);
+		return bucket < DIAG_HISTOGRAM_BUCKETS ? bucket : DIAG_HISTOGRAM_BUCKETS - 1;
+	}
+
+	/**
+	 * @brief Clears every statistic and starts a new window at `nowMs`.
+	 */
+	void resetWindow(uint32_t nowMs);
+
+	uint32_t m_windowStartMs;                           ///< Milliseconds() time the current window started.
+	bool m_loopStarted;                                 ///< True once a loop start has been recorded.
+	uint32_t m_lastLoopStartUs;                         ///< Microseconds() time the previous loop started.
+	uint32_t m_loops;                                   ///< Loop periods recorded in the window.
+	uint32_t m_loopMinUs;                               ///< Shortest loop period in the window.
+	uint32_t m_loopMaxUs;                               ///< Longest loop period in the window.
+	uint32_t m_loopHistogram[DIAG_HISTOGRAM_BUCKETS];   ///< Loop period counts per log2 bucket.
+	uint32_t m_sectionTotalUs[DIAG_SECTION_COUNT];      ///< Total time spent in each section.
+	uint32_t m_sectionMaxUs[DIAG_SECTION_COUNT];        ///< Worst single-loop time in each section.
+	uint32_t m_commands;                                ///< Commands dispatched in the window.
+	uint32_t m_dwellMaxUs;                              ///< Longest RX queue dwell in the window.
+	uint32_t m_dwellHistogram[DIAG_HISTOGRAM_BUCKETS];  ///< RX queue dwell counts per log2 bucket.
+};
@@ -18,6 +18,8 @@
 #include "pinch_valve_controller.h"
 #include "heater_controller.h"
 #include "vacuum_controller.h"
+#include "diagnostics.h"
+#include "../definition/telemetry.h"
 
 /**
  * @enum MainState
@@ -122,11 +124,29 @@ private:
 	/**
 	 * @brief Aggregates telemetry data from all sub-controllers and sends it as a single packet.
 	 * @details This function is called periodically. It polls each sub-controller for its
-	 * latest telemetry data, assembles it into a single formatted string, and enqueues
-	 * it for transmission by the `CommsController`.
+	 * latest telemetry data, encodes it in the `TELEMETRY_FORMAT` selected in `config.h`
+	 * (a formatted string or a binary frame), and enqueues it for transmission by the
+	 * `CommsController`. When `TELEMETRY_BATCH_ENABLED` is set, the queued sensor samples
+	 * are sent as batch frames first.
 	 */
     void publishTelemetry();
 
+	/**
+	 * @brief Fills a `TelemetryData` structure from the current state of all sub-controllers.
+	 * @details The fields follow definition/telemetry.json, so the generated frame builders in
+	 * definition/telemetry.cpp can encode the result.
+	 * @param[out] data The structure to fill.
+	 */
+    void buildTelemetryData(TelemetryData* data);
+
+	/**
+	 * @brief Formats the loop diagnostics window and sends it to the GUI.
+	 * @details Called every `DIAGNOSTICS_INTERVAL_MS` when `DIAGNOSTICS_ENABLED` is set.
+	 * The window is restarted even if no GUI has been discovered.
+	 * @param now The current `Milliseconds()` time.
+	 */
+    void publishDiagnostics(uint32_t now);
+
     // --- System-Level Command Handlers ---
     /**
      * @brief Enables all motors and places the system in a ready state.
@@ -160,6 +180,7 @@ private:
     PinchValve       m_vacuumValve;     ///< Manages the motorized vacuum pinch valve.
     HeaterController m_heater;          ///< Manages the heater PID control loop.
     VacuumController m_vacuum;          ///< Manages the vacuum pump and pressure monitoring.
+    LoopDiagnostics  m_diagnostics;     ///< Times the main loop when DIAGNOSTICS_ENABLED is set.
 
     // Main system state machine
     MainState m_mainState;              ///< The current high-level state of the Fillhead system.
@@ -167,4 +188,11 @@ private:
     // Timers for periodic tasks
     uint32_t m_lastTelemetryTime;       ///< Timestamp of the last telemetry transmission.
     uint32_t m_lastSensorSampleTime;    ///< Timestamp of the last sensor poll.
+    uint32_t m_lastDiagnosticsTime;     ///< Timestamp of the last diagnostics report.
+
+    // Binary telemetry
+    uint32_t m_telemetrySequence;       ///< Sequence number of the next binary telemetry frame.
+    TelemetryDeltaState m_telemetryDelta; ///< Last snapshot sent, for `TELEMETRY_FORMAT_DELTA`.
+    TelemetryBatchBuffer m_telemetryBatch; ///< Sensor-rate samples waiting for the next publish, when `TELEMETRY_BATCH_ENABLED` is set.
+    uint32_t m_batchSequence;           ///< Sequence number of the next batch frame; batch frames have their own stream.
 };
\ No newline at end of file
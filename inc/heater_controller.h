@@ -90,6 +90,24 @@ class HeaterController {
 	 */
 	const char* getState() const;
 
+	/**
+	 * @brief Gets the heater state as the number reported in binary telemetry.
+	 * @return The `HeaterState` enum value.
+	 */
+	int32_t getStateCode() const { return (int32_t)m_heaterState; }
+
+	/**
+	 * @brief Gets the latest thermocouple temperature.
+	 * @return The temperature in Celsius.
+	 */
+	float getTemperature() const { return m_temperatureCelsius; }
+
+	/**
+	 * @brief Gets the PID setpoint.
+	 * @return The target temperature in Celsius.
+	 */
+	float getSetpoint() const { return m_pid_setpoint; }
+
 private:
 	Fillhead* m_controller;             ///< Pointer to the main Fillhead controller for sending messages.
 	HeaterState m_heaterState;          ///< The current operational state of the heater (ON/OFF).
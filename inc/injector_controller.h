@@ -155,6 +155,46 @@ public:
      */
     const char* getState() const;
 
+    /**
+     * @brief Gets the injector state as the number reported in binary telemetry.
+     * @return The `State` enum value (see `injector_state` in definition/telemetry.json).
+     */
+    int32_t getStateCode() const { return (int32_t)m_state; }
+
+    /**
+     * @brief Gets the smoothed torque of the primary injector motor.
+     * @return The EWMA-filtered torque in percent, or 0 when the motor is not moving.
+     */
+    float getTorque();
+
+    /**
+     * @brief Checks if machine homing has been completed.
+     */
+    bool isMachineHomed() const { return m_homingMachineDone; }
+
+    /**
+     * @brief Checks if the injector motors are enabled.
+     */
+    bool isEnabled() const { return m_isEnabled; }
+
+    /**
+     * @brief Gets the total volume dispensed since the last cartridge home, including the active operation.
+     * @return The volume in mL.
+     */
+    float getCumulativeMl() const { return m_cumulative_dispensed_ml + m_active_op_total_dispensed_ml; }
+
+    /**
+     * @brief Gets the volume dispensed so far in the active operation.
+     * @return The volume in mL.
+     */
+    float getActiveMl() const { return m_active_op_total_dispensed_ml; }
+
+    /**
+     * @brief Gets the target volume of the active operation.
+     * @return The volume in mL.
+     */
+    float getTargetMl() const { return m_active_op_target_ml; }
+
 private:
     /**
      * @name Private Helper Methods
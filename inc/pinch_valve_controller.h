@@ -156,6 +156,24 @@ public:
 	 */
 	const char* getState() const;
 
+	/**
+	 * @brief Gets the valve state as the number reported in binary telemetry.
+	 * @return The `PinchValveState` enum value.
+	 */
+	int32_t getStateCode() const { return (int32_t)m_state; }
+
+	/**
+	 * @brief Gets the commanded position of the valve actuator.
+	 * @return The position in mm.
+	 */
+	float getPositionMm() const { return (float)m_motor->PositionRefCommanded() / STEPS_PER_MM_PINCH; }
+
+	/**
+	 * @brief Gets the smoothed motor torque of the valve.
+	 * @return The EWMA-filtered torque in percent.
+	 */
+	float getTorque() { return getSmoothedTorque(); }
+
 private:
 	/**
 	 * @enum MoveType
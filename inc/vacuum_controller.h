@@ -104,6 +104,18 @@ class VacuumController {
 	 */
 	const char* getState() const;
 
+	/**
+	 * @brief Gets the vacuum state as the number reported in binary telemetry.
+	 * @return The `VacuumState` enum value.
+	 */
+	int32_t getStateCode() const { return (int32_t)m_state; }
+
+	/**
+	 * @brief Gets the latest vacuum pressure reading.
+	 * @return The pressure in PSIG.
+	 */
+	float getPressurePsig() const { return m_vacuumPressurePsig; }
+
 	private:
 	/**
 	 * @brief Formats and sends a status message via the main `Fillhead` controller.
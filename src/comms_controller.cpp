@@ -18,6 +18,9 @@ CommsController::CommsController() {
 	m_rxQueueTail = 0;
 	m_txQueueHead = 0;
 	m_txQueueTail = 0;
+	m_txDataHead = 0;
+	m_txDataTail = 0;
+	resetQueueStats();
 }
 
 void CommsController::setup() {
@@ -33,6 +36,7 @@ void CommsController::update() {
 bool CommsController::enqueueRx(const char* msg, const IpAddress& ip, uint16_t port) {
 	int next_head = (m_rxQueueHead + 1) % RX_QUEUE_SIZE;
 	if (next_head == m_rxQueueTail) {
+		m_rxDropped++;
 		if(m_guiDiscovered) {
 			char errorMsg[] = "INJ_ERROR: RX QUEUE OVERFLOW - COMMAND DROPPED";
 			m_udp.Connect(m_guiIp, m_guiPort);
@@ -45,7 +49,11 @@ bool CommsController::enqueueRx(const char* msg, const IpAddress& ip, uint16_t p
 	m_rxQueue[m_rxQueueHead].buffer[MAX_MESSAGE_LENGTH - 1] = '\0';
 	m_rxQueue[m_rxQueueHead].remoteIp = ip;
 	m_rxQueue[m_rxQueueHead].remotePort = port;
+	m_rxQueue[m_rxQueueHead].receivedUs = Microseconds();
 	m_rxQueueHead = next_head;
+
+	uint16_t depth = (m_rxQueueHead - m_rxQueueTail + RX_QUEUE_SIZE) % RX_QUEUE_SIZE;
+	if (depth > m_rxHighWater) m_rxHighWater = depth;
 	return true;
 }
 
@@ -59,24 +67,90 @@ bool CommsController::dequeueRx(Message& msg) {
 }
 
 bool CommsController::enqueueTx(const char* msg, const IpAddress& ip, uint16_t port) {
+	uint16_t length = strnlen(msg, MAX_MESSAGE_LENGTH - 1);
+	if (!pushTx((const uint8_t*)msg, length, ip, port, false)) {
+		reportTxOverflow();
+		return false;
+	}
+	return true;
+}
+
+bool CommsController::enqueueTx(const uint8_t* data, uint16_t length, const IpAddress& ip, uint16_t port) {
+	if (length > MAX_PACKET_LENGTH || !pushTx(data, length, ip, port, true)) {
+		reportTxOverflow();
+		return false;
+	}
+	return true;
+}
+
+bool CommsController::pushTx(const uint8_t* data, uint16_t length, const IpAddress& ip, uint16_t port, bool binary) {
 	int next_head = (m_txQueueHead + 1) % TX_QUEUE_SIZE;
 	if (next_head == m_txQueueTail) {
-		if(m_guiDiscovered) {
-			char errorMsg[] = "INJ_ERROR: TX QUEUE OVERFLOW - MESSAGE DROPPED";
-			m_udp.Connect(m_guiIp, m_guiPort);
-			m_udp.PacketWrite(errorMsg);
-			m_udp.PacketSend();
+		return false;
+	}
+
+	// Payloads occupy [tail, head) or, once wrapped, [tail, end) and [0, head). The head
+	// never catches up with the tail, so head == tail always means the buffer is empty.
+	uint16_t offset;
+	if (m_txDataHead >= m_txDataTail) {
+		if (TX_BUFFER_SIZE - m_txDataHead >= length) {
+			offset = m_txDataHead;
+		} else if (m_txDataTail > length) {
+			offset = 0;
+		} else {
+			return false;
 		}
+	} else if (m_txDataTail - m_txDataHead > length) {
+		offset = m_txDataHead;
+	} else {
 		return false;
 	}
-	strncpy(m_txQueue[m_txQueueHead].buffer, msg, MAX_MESSAGE_LENGTH);
-	m_txQueue[m_txQueueHead].buffer[MAX_MESSAGE_LENGTH - 1] = '\0';
-	m_txQueue[m_txQueueHead].remoteIp = ip;
-	m_txQueue[m_txQueueHead].remotePort = port;
+
+	memcpy(m_txData + offset, data, length);
+	TxEntry& entry = m_txQueue[m_txQueueHead];
+	entry.offset = offset;
+	entry.length = length;
+	entry.remoteIp = ip;
+	entry.remotePort = port;
+	entry.binary = binary;
+	m_txDataHead = offset + length;
 	m_txQueueHead = next_head;
+
+	uint16_t depth = (m_txQueueHead - m_txQueueTail + TX_QUEUE_SIZE) % TX_QUEUE_SIZE;
+	uint16_t bytes = (m_txDataHead >= m_txDataTail) ? m_txDataHead - m_txDataTail : TX_BUFFER_SIZE - m_txDataTail + m_txDataHead;
+	if (depth > m_txHighWater) m_txHighWater = depth;
+	if (bytes > m_txBytesHighWater) m_txBytesHighWater = bytes;
 	return true;
 }
 
+void CommsController::popTx() {
+	m_txQueueTail = (m_txQueueTail + 1) % TX_QUEUE_SIZE;
+	if (m_txQueueTail == m_txQueueHead) {
+		m_txDataHead = 0;
+		m_txDataTail = 0;
+	} else {
+		m_txDataTail = m_txQueue[m_txQueueTail].offset;
+	}
+}
+
+void CommsController::reportTxOverflow() {
+	m_txDropped++;
+	if(m_guiDiscovered) {
+		char errorMsg[] = "INJ_ERROR: TX QUEUE OVERFLOW - MESSAGE DROPPED";
+		m_udp.Connect(m_guiIp, m_guiPort);
+		m_udp.PacketWrite(errorMsg);
+		m_udp.PacketSend();
+	}
+}
+
+void CommsController::resetQueueStats() {
+	m_rxHighWater = 0;
+	m_txHighWater = 0;
+	m_txBytesHighWater = 0;
+	m_rxDropped = 0;
+	m_txDropped = 0;
+}
+
 void CommsController::processUdp() {
 	while (m_udp.PacketParse()) {
 		IpAddress remoteIp = m_udp.RemoteIp();
@@ -92,12 +166,38 @@ void CommsController::processUdp() {
 }
 
 void CommsController::processTxQueue() {
-	if (m_txQueueHead != m_txQueueTail) {
-		Message msg = m_txQueue[m_txQueueTail];
-		m_txQueueTail = (m_txQueueTail + 1) % TX_QUEUE_SIZE;
-		m_udp.Connect(msg.remoteIp, msg.remotePort);
-		m_udp.PacketWrite(msg.buffer);
+	uint32_t start = Microseconds();
+	while (m_txQueueHead != m_txQueueTail) {
+		IpAddress remoteIp = m_txQueue[m_txQueueTail].remoteIp;
+		uint16_t remotePort = m_txQueue[m_txQueueTail].remotePort;
+		bool binary = m_txQueue[m_txQueueTail].binary;
+		uint32_t datagramLength = 0;
+
+		// Write payloads straight from the data buffer, joining consecutive text messages
+		// for the same destination until the next one would overflow the datagram.
+		m_udp.Connect(remoteIp, remotePort);
+		while (true) {
+			const TxEntry& entry = m_txQueue[m_txQueueTail];
+			if (datagramLength > 0) {
+				m_udp.PacketWrite((uint8_t)TX_MESSAGE_SEPARATOR);
+				datagramLength++;
+			}
+			m_udp.PacketWrite(m_txData + entry.offset, entry.length);
+			datagramLength += entry.length;
+			popTx();
+
+			if (binary || m_txQueueHead == m_txQueueTail) break;
+			const TxEntry& next = m_txQueue[m_txQueueTail];
+			if (next.binary || next.remotePort != remotePort || (uint32_t)next.remoteIp != (uint32_t)remoteIp ||
+				datagramLength + 1 + next.length > MAX_PACKET_LENGTH) {
+				break;
+			}
+		}
 		m_udp.PacketSend();
+
+		if (Microseconds() - start >= TX_DRAIN_BUDGET_US) {
+			break;
+		}
 	}
 }
 
@@ -156,6 +256,7 @@ Command CommsController::parseCommand(const char* msg) {
 	if (strcmp(msg, CMD_STR_DISABLE) == 0) return CMD_DISABLE;
 	if (strcmp(msg, CMD_STR_ABORT) == 0) return CMD_ABORT;
 	if (strcmp(msg, CMD_STR_CLEAR_ERRORS) == 0) return CMD_CLEAR_ERRORS;
+	if (strcmp(msg, CMD_STR_REQUEST_KEYFRAME) == 0) return CMD_REQUEST_KEYFRAME;
 
 	// Injector Motion Commands
 	if (strncmp(msg, CMD_STR_JOG_MOVE, strlen(CMD_STR_JOG_MOVE)) == 0) return CMD_JOG_MOVE;
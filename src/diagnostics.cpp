@@ -0,0 +1,103 @@
+/**
+ * @file diagnostics.cpp
+ * @author agent
+ * @date October 16, 2026
+ * @brief Implements the opt-in main loop and queue instrumentation for the Fillhead.
+ *
+ * @details This file provides the implementation for the `LoopDiagnostics` class
+ * declared in `diagnostics.h`: resetting the reporting window and formatting it as a
+ * `FILLHEAD_DIAG:` message. The per-loop timing methods are inline in the header.
+ */
+#include "diagnostics.h"
+#include "comms_controller.h"
+#include <stdarg.h>
+#include <stdio.h>
+
+// Section names as they appear in the message keys; must match definition/diagnostics.json.
+static const char* const s_sectionNames[DIAG_SECTION_COUNT] = {
+	"comms", "dispatch", "injector", "inj_valve", "vac_valve", "heater", "vacuum", "sensors", "telemetry"
+};
+
+/**
+ * @brief Appends printf-style text to a partially filled buffer, never overrunning it.
+ */
+static void appendFormat(char* buffer, size_t size, size_t* used, const char* format, ...) {
+	if (*used >= size) return;
+	va_list args;
+	va_start(args, format);
+	int written = vsnprintf(buffer + *used, size - *used, format, args);
+	va_end(args);
+	if (written > 0) {
+		*used += (size_t)written;
+	}
+}
+
+/**
+ * @brief Appends a histogram as "key:c0/c1/.../cN," to a partially filled buffer.
+ */
+static void appendHistogram(char* buffer, size_t size, size_t* used, const char* key, const uint32_t* counts) {
+	appendFormat(buffer, size, used, "%s:", key);
+	for (int i = 0; i < DIAG_HISTOGRAM_BUCKETS; i++) {
+		appendFormat(buffer, size, used, i == 0 ? "%lu" : "/%lu", (unsigned long)counts[i]);
+	}
+	appendFormat(buffer, size, used, ",");
+}
+
+LoopDiagnostics::LoopDiagnostics() {
+	m_loopStarted = false;
+	m_lastLoopStartUs = 0;
+	resetWindow(0);
+}
+
+void LoopDiagnostics::resetWindow(uint32_t nowMs) {
+	m_windowStartMs = nowMs;
+	m_loops = 0;
+	m_loopMinUs = UINT32_MAX;
+	m_loopMaxUs = 0;
+	m_commands = 0;
+	m_dwellMaxUs = 0;
+	for (int i = 0; i < DIAG_HISTOGRAM_BUCKETS; i++) {
+		m_loopHistogram[i] = 0;
+		m_dwellHistogram[i] = 0;
+	}
+	for (int i = 0; i < DIAG_SECTION_COUNT; i++) {
+		m_sectionTotalUs[i] = 0;
+		m_sectionMaxUs[i] = 0;
+	}
+}
+
+void LoopDiagnostics::format(char* buffer, size_t size, uint32_t nowMs, CommsController& comms) {
+	size_t used = 0;
+	appendFormat(buffer, size, &used, "%swindow_ms:%lu,loops:%lu,loop_min_us:%lu,loop_max_us:%lu,",
+		DIAG_PREFIX,
+		(unsigned long)(nowMs - m_windowStartMs),
+		(unsigned long)m_loops,
+		(unsigned long)(m_loops > 0 ? m_loopMinUs : 0),
+		(unsigned long)m_loopMaxUs);
+	appendHistogram(buffer, size, &used, "loop_hist", m_loopHistogram);
+
+	for (int i = 0; i < DIAG_SECTION_COUNT; i++) {
+		appendFormat(buffer, size, &used, "%s_avg_us:%lu,", s_sectionNames[i],
+			(unsigned long)(m_loops > 0 ? m_sectionTotalUs[i] / m_loops : m_sectionTotalUs[i]));
+	}
+	for (int i = 0; i < DIAG_SECTION_COUNT; i++) {
+		appendFormat(buffer, size, &used, "%s_max_us:%lu,", s_sectionNames[i], (unsigned long)m_sectionMaxUs[i]);
+	}
+
+	appendFormat(buffer, size, &used, "rx_hwm:%lu,tx_hwm:%lu,tx_bytes_hwm:%lu,rx_drops:%lu,tx_drops:%lu,",
+		(unsigned long)comms.getRxHighWater(),
+		(unsigned long)comms.getTxHighWater(),
+		(unsigned long)comms.getTxBytesHighWater(),
+		(unsigned long)comms.getRxDropped(),
+		(unsigned long)comms.getTxDropped());
+	appendFormat(buffer, size, &used, "cmds:%lu,dwell_max_us:%lu,", (unsigned long)m_commands, (unsigned long)m_dwellMaxUs);
+	appendHistogram(buffer, size, &used, "dwell_hist", m_dwellHistogram);
+
+	// Drop the trailing comma.
+	if (used > 0 && used < size && buffer[used - 1] == ',') {
+		buffer[used - 1] = '\0';
+	}
+
+	comms.resetQueueStats();
+	resetWindow(nowMs);
+}
@@ -46,6 +46,11 @@ Fillhead::Fillhead() :
     // Initialize timers for periodic tasks.
     m_lastTelemetryTime = 0;
     m_lastSensorSampleTime = 0;
+    m_lastDiagnosticsTime = 0;
+    m_telemetrySequence = 0;
+    telemetry_delta_init(&m_telemetryDelta, TELEMETRY_KEYFRAME_INTERVAL);
+    telemetry_batch_init(&m_telemetryBatch);
+    m_batchSequence = 0;
 }
 
 
@@ -77,15 +82,23 @@ void Fillhead::setup() {
  * 2. Dequeues and handles one command per loop.
  * 3. Updates the state machines of all active components.
  * 4. Manages periodic tasks like sensor polling and telemetry transmission.
+ * Each step is timed by `m_diagnostics`; the timing compiles away unless
+ * `DIAGNOSTICS_ENABLED` is set.
  */
 void Fillhead::loop() {
+    m_diagnostics.beginLoop();
+
     // 1. Process all incoming/outgoing communication queues.
+    uint32_t start = m_diagnostics.mark();
     m_comms.update();
+    start = m_diagnostics.endSection(DIAG_SECTION_COMMS, start);
 
     // 2. Check for and handle one new command from the receive queue.
     Message msg;
     if (m_comms.dequeueRx(msg)) {
+        m_diagnostics.recordDwell(msg.receivedUs);
         dispatchCommand(msg);
+        m_diagnostics.endSection(DIAG_SECTION_DISPATCH, start);
     }
 
     // 3. Update the main state machine and all sub-controllers.
@@ -95,13 +108,28 @@ void Fillhead::loop() {
     uint32_t now = Milliseconds();
     if (now - m_lastSensorSampleTime >= SENSOR_SAMPLE_INTERVAL_MS) {
         m_lastSensorSampleTime = now;
+        start = m_diagnostics.mark();
         m_heater.updateTemperature();
         m_vacuum.updateVacuum();
+        if (TELEMETRY_BATCH_ENABLED) {
+            // Keep every sample, not just the one current at the next publish.
+            TelemetryData data;
+            buildTelemetryData(&data);
+            telemetry_batch_push(&m_telemetryBatch, &data, now);
+        }
+        m_diagnostics.endSection(DIAG_SECTION_SENSORS, start);
     }
 	
     if (m_comms.isGuiDiscovered() && (now - m_lastTelemetryTime >= TELEMETRY_INTERVAL_MS)) {
         m_lastTelemetryTime = now;
+        start = m_diagnostics.mark();
         publishTelemetry();
+        m_diagnostics.endSection(DIAG_SECTION_TELEMETRY, start);
+    }
+
+    if (DIAGNOSTICS_ENABLED && (now - m_lastDiagnosticsTime >= DIAGNOSTICS_INTERVAL_MS)) {
+        m_lastDiagnosticsTime = now;
+        publishDiagnostics(now);
     }
 }
 
@@ -116,11 +144,17 @@ void Fillhead::loop() {
  */
 void Fillhead::updateState() {
     // First, update the state of all sub-controllers to ensure their fault status is current.
+    uint32_t start = m_diagnostics.mark();
     m_injector.updateState();
+    start = m_diagnostics.endSection(DIAG_SECTION_INJECTOR, start);
     m_injectorValve.updateState();
+    start = m_diagnostics.endSection(DIAG_SECTION_INJ_VALVE, start);
     m_vacuumValve.updateState();
+    start = m_diagnostics.endSection(DIAG_SECTION_VAC_VALVE, start);
     m_heater.updateState();
+    start = m_diagnostics.endSection(DIAG_SECTION_HEATER, start);
     m_vacuum.updateState();
+    m_diagnostics.endSection(DIAG_SECTION_VACUUM, start);
 
     // Now, update the main Fillhead state based on the sub-controller states.
     switch (m_mainState) {
@@ -182,7 +216,8 @@ void Fillhead::dispatchCommand(const Message& msg) {
     
     // If the system is in an error state, block most commands.
     if (m_mainState == STATE_ERROR) {
-        if (command_enum != CMD_CLEAR_ERRORS && command_enum != CMD_DISABLE && command_enum != CMD_DISCOVER_DEVICE) {
+        if (command_enum != CMD_CLEAR_ERRORS && command_enum != CMD_DISABLE && command_enum != CMD_DISCOVER_DEVICE &&
+            command_enum != CMD_REQUEST_KEYFRAME) {
             m_comms.reportEvent(STATUS_PREFIX_ERROR, "Command ignored: System is in ERROR state. Send CLEAR_ERRORS to reset.");
             return;
         }
@@ -211,6 +246,8 @@ void Fillhead::dispatchCommand(const Message& msg) {
                 m_comms.setGuiIp(msg.remoteIp);
                 m_comms.setGuiPort(atoi(portStr + 5));
                 m_comms.setGuiDiscovered(true);
+                // A new host has no state to apply deltas to.
+                telemetry_delta_request_keyframe(&m_telemetryDelta);
                 m_comms.reportEvent(STATUS_PREFIX_DISCOVERY, "DEVICE_ID=fillhead");
             }
             break;
@@ -219,6 +256,10 @@ void Fillhead::dispatchCommand(const Message& msg) {
         case CMD_DISABLE:       disable(); break;
         case CMD_ABORT:         abort(); break;
         case CMD_CLEAR_ERRORS:  clearErrors(); break;
+        case CMD_REQUEST_KEYFRAME:
+            telemetry_delta_request_keyframe(&m_telemetryDelta);
+            m_comms.reportEvent(STATUS_PREFIX_DONE, "REQUEST_KEYFRAME complete.");
+            break;
 
         // --- Injector Motor Commands (Delegated to Injector) ---
         case CMD_JOG_MOVE:
@@ -292,6 +333,32 @@ void Fillhead::dispatchCommand(const Message& msg) {
 void Fillhead::publishTelemetry() {
     if (!m_comms.isGuiDiscovered()) return;
 
+    if (TELEMETRY_BATCH_ENABLED) {
+        // Drain the ring buffer; each frame carries up to TELEM_BATCH_MAX_SAMPLES samples.
+        uint8_t batchFrame[MAX_PACKET_LENGTH];
+        int length;
+        while ((length = telemetry_batch_build_frame(&m_telemetryBatch, m_batchSequence, batchFrame, sizeof(batchFrame))) > 0) {
+            m_batchSequence++;
+            m_comms.enqueueTx(batchFrame, (uint16_t)length, m_comms.getGuiIp(), m_comms.getGuiPort());
+        }
+    }
+
+    if (TELEMETRY_FORMAT != TELEMETRY_FORMAT_TEXT) {
+        TelemetryData data;
+        buildTelemetryData(&data);
+        uint8_t frame[TELEM_DELTA_FRAME_MAX_SIZE];
+        int length;
+        if (TELEMETRY_FORMAT == TELEMETRY_FORMAT_DELTA) {
+            length = telemetry_build_delta_frame(&m_telemetryDelta, &data, m_telemetrySequence++, frame, sizeof(frame));
+        } else {
+            length = telemetry_build_frame(&data, m_telemetrySequence++, frame, sizeof(frame));
+        }
+        if (length > 0) {
+            m_comms.enqueueTx(frame, (uint16_t)length, m_comms.getGuiIp(), m_comms.getGuiPort());
+        }
+        return;
+    }
+
     char telemetryBuffer[1024];
     const char* mainStateStr;
     switch(m_mainState) {
@@ -330,6 +397,44 @@ void Fillhead::publishTelemetry() {
     m_comms.enqueueTx(telemetryBuffer, m_comms.getGuiIp(), m_comms.getGuiPort());
 }
 
+/**
+ * @brief Fills a `TelemetryData` structure from the current state of all sub-controllers.
+ */
+void Fillhead::buildTelemetryData(TelemetryData* data) {
+    data->main_state = (int32_t)m_mainState;
+    data->injector_state = m_injector.getStateCode();
+    data->inj_valve_state = m_injectorValve.getStateCode();
+    data->vac_valve_state = m_vacuumValve.getStateCode();
+    data->heater_state = m_heater.getStateCode();
+    data->vacuum_state = m_vacuum.getStateCode();
+    data->injector_torque = m_injector.getTorque();
+    data->injector_homed = m_injector.isMachineHomed() ? 1 : 0;
+    data->injection_cumulative_ml = m_injector.getCumulativeMl();
+    data->injection_active_ml = m_injector.getActiveMl();
+    data->injection_target_ml = m_injector.getTargetMl();
+    data->motors_enabled = m_injector.isEnabled();
+    data->inj_valve_pos = m_injectorValve.getPositionMm();
+    data->inj_valve_torque = m_injectorValve.getTorque();
+    data->inj_valve_homed = m_injectorValve.isHomed();
+    data->vac_valve_pos = m_vacuumValve.getPositionMm();
+    data->vac_valve_motor_torque = m_vacuumValve.getTorque();
+    data->vac_valve_homed = m_vacuumValve.isHomed();
+    data->temp_c = m_heater.getTemperature();
+    data->heater_setpoint = m_heater.getSetpoint();
+    data->vacuum_psig = m_vacuum.getPressurePsig();
+}
+
+/**
+ * @brief Formats the loop diagnostics window and sends it to the GUI.
+ */
+void Fillhead::publishDiagnostics(uint32_t now) {
+    char diagnosticsBuffer[MAX_MESSAGE_LENGTH];
+    m_diagnostics.format(diagnosticsBuffer, sizeof(diagnosticsBuffer), now, m_comms);
+    if (m_comms.isGuiDiscovered()) {
+        m_comms.enqueueTx(diagnosticsBuffer, m_comms.getGuiIp(), m_comms.getGuiPort());
+    }
+}
+
 /**
  * @brief Enables all motors and places the system in a ready state.
  */
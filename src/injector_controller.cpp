@@ -780,6 +780,13 @@ const char* Injector::getTelemetryString() {
     return m_telemetryBuffer;
 }
 
+/**
+ * @brief Returns the smoothed torque of the primary motor for binary telemetry.
+ */
+float Injector::getTorque() {
+    return getSmoothedTorque(m_motorA, &m_smoothedTorqueValue0, &m_firstTorqueReading0);
+}
+
 bool Injector::isBusy() const {
     return m_state != STATE_STANDBY;
 }